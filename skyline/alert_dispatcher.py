@@ -0,0 +1,280 @@
+"""
+The alert dispatcher.
+
+Analyzer and Mirage add alerts to the queue of an AlertDispatcher thread and
+continue their run, rather than spawning and waiting on a process for each
+alert.  The dispatcher sends the queued alerts of each alerter in batches, each
+batch in its own process so that the matplotlib objects created by the
+alerters are cleared down when the process terminates, with a maximum number
+of concurrent processes per alerter.  The alerters reuse a single SMTP
+connection, requests session and SlackClient for all the alerts in a batch.
+If the app has a render function, the graphs of the queued smtp alerts are
+rendered by an AlertGraphRenderPool while the alerts wait in the queue.
+"""
+from __future__ import division
+import logging
+import traceback
+from collections import deque
+from multiprocessing import Process
+from threading import Lock, Thread
+from time import time, sleep
+from smtplib import SMTP
+
+import settings
+# The requests sessions of the process are shared with skyline_functions
+from skyline_functions import REQUESTS_SESSIONS
+
+try:
+    ALERT_DISPATCHER_PROCESSES = int(settings.ALERT_DISPATCHER_PROCESSES)
+except:
+    ALERT_DISPATCHER_PROCESSES = 2
+try:
+    ALERT_DISPATCHER_BATCH_SIZE = int(settings.ALERT_DISPATCHER_BATCH_SIZE)
+except:
+    ALERT_DISPATCHER_BATCH_SIZE = 10
+try:
+    ALERT_DISPATCHER_MAX_QUEUE_SIZE = int(settings.ALERT_DISPATCHER_MAX_QUEUE_SIZE)
+except:
+    ALERT_DISPATCHER_MAX_QUEUE_SIZE = 1000
+
+# The number of seconds each alert in a batch is allowed, as per the 15 seconds
+# that Analyzer and Mirage allowed spawn_alerter_process
+ALERT_TIMEOUT = 15
+
+ALERT_DISPATCHER_COUNTERS = [
+    'queued', 'deduplicated', 'dropped', 'dispatched', 'timed_out',
+    'failed_to_start']
+
+# The connections of the alerter process that are reused by the alerts in the
+# batch
+SMTP_CONNECTIONS = {}
+SLACK_CLIENTS = {}
+
+
+def get_smtp_connection(host='127.0.0.1'):
+    """
+    Returns the SMTP connection of the process, connecting if there is no
+    connection or the connection has been closed.
+
+    :param host: the SMTP host
+    :type host: str
+    :return: smtp
+    :rtype: smtplib.SMTP
+    """
+    smtp = SMTP_CONNECTIONS.get(host)
+    if smtp:
+        try:
+            if smtp.noop()[0] == 250:
+                return smtp
+        except:
+            pass
+    smtp = SMTP(host)
+    SMTP_CONNECTIONS[host] = smtp
+    return smtp
+
+
+def get_slack_client(token):
+    """
+    Returns the SlackClient of the process for the token.
+
+    :param token: the slack bot_user_oauth_access_token
+    :type token: str
+    :return: sc
+    :rtype: slackclient.SlackClient
+    """
+    if token not in SLACK_CLIENTS:
+        from slackclient import SlackClient
+        SLACK_CLIENTS[token] = SlackClient(token)
+    return SLACK_CLIENTS[token]
+
+
+def close_alerter_connections():
+    """
+    Close the SMTP connections and the requests sessions of the process.
+    """
+    for host in list(SMTP_CONNECTIONS.keys()):
+        try:
+            SMTP_CONNECTIONS[host].quit()
+        except:
+            pass
+        del SMTP_CONNECTIONS[host]
+    for name in list(REQUESTS_SESSIONS.keys()):
+        try:
+            REQUESTS_SESSIONS[name].close()
+        except:
+            pass
+        del REQUESTS_SESSIONS[name]
+    SLACK_CLIENTS.clear()
+
+
+def dispatch_alerts(skyline_app, alert_function, alerts):
+    """
+    Send a batch of alerts, run in an alerter process.
+
+    :param skyline_app: the app
+    :param alert_function: the trigger_alert function of the app
+    :param alerts: a list of the trigger_alert args of each alert
+    :type skyline_app: str
+    :type alert_function: function
+    :type alerts: list
+    :return: None
+    """
+    logger = logging.getLogger('%sLog' % skyline_app)
+    for alert_args in alerts:
+        try:
+            alert_function(*alert_args)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: alert_dispatcher :: failed to send alert - %s' % str(alert_args))
+    close_alerter_connections()
+
+
+class AlertDispatcher(Thread):
+    """
+    The alert dispatcher thread of an app.
+    """
+
+    def __init__(self, skyline_app, alert_function, render_function=None):
+        """
+        :param skyline_app: the app
+        :param alert_function: the trigger_alert function of the app, which is
+            called with the args that are queued
+        :param render_function: the function that renders the graph of an
+            smtp alert, which is called with the args that are queued
+        :type skyline_app: str
+        :type alert_function: function
+        :type render_function: function
+        """
+        super(AlertDispatcher, self).__init__()
+        self.daemon = True
+        self.skyline_app = skyline_app
+        self.logger = logging.getLogger('%sLog' % skyline_app)
+        self.alert_function = alert_function
+        self.lock = Lock()
+        self.queues = {}
+        self.queued_keys = set()
+        self.processes = {}
+        self.counters = dict([(counter, 0) for counter in ALERT_DISPATCHER_COUNTERS])
+        self.max_queue_latency = 0
+        self.render_pool = None
+        if render_function:
+            # Only import matplotlib in the apps that render alert graphs
+            from alert_graphs import AlertGraphRenderPool
+            self.render_pool = AlertGraphRenderPool(skyline_app, render_function)
+
+    def enqueue(self, alerter, dedupe_key, alert_args):
+        """
+        Add an alert to the queue of the alerter.  An alert is not added if an
+        alert with the same dedupe_key, the EXPIRATION_TIME last_alert key of
+        the alert, is already queued or being sent, or if the queue is full.
+
+        :param alerter: the alerter, alert[1]
+        :param dedupe_key: the last_alert key of the alert
+        :param alert_args: the args to call the alert_function with
+        :type alerter: str
+        :type dedupe_key: str
+        :type alert_args: tuple
+        :return: True if queued
+        :rtype: boolean
+        """
+        with self.lock:
+            if dedupe_key in self.queued_keys:
+                self.counters['deduplicated'] += 1
+                return False
+            queue_size = sum([len(alerter_queue) for alerter_queue in self.queues.values()])
+            if queue_size >= ALERT_DISPATCHER_MAX_QUEUE_SIZE:
+                self.counters['dropped'] += 1
+                self.logger.error('error :: alert_dispatcher :: queue is full, dropped alert - %s' % str(alert_args))
+                return False
+            if alerter not in self.queues:
+                self.queues[alerter] = deque()
+                self.processes[alerter] = []
+            self.queues[alerter].append((time(), dedupe_key, alert_args))
+            self.queued_keys.add(dedupe_key)
+            self.counters['queued'] += 1
+            # The backwards compatible email address alerts are smtp alerts
+            if self.render_pool and (alerter == 'smtp' or '@' in alerter):
+                self.render_pool.submit(alert_args)
+        return True
+
+    def metrics(self):
+        """
+        The back pressure metrics of the dispatcher, the counters are reset
+        each time the metrics are returned.
+
+        :return: metrics
+        :rtype: dict
+        """
+        with self.lock:
+            metrics = dict(self.counters)
+            metrics['queue_depth'] = sum([len(alerter_queue) for alerter_queue in self.queues.values()])
+            metrics['in_flight'] = sum([len(processes) for processes in self.processes.values()])
+            metrics['max_queue_latency'] = round(self.max_queue_latency, 3)
+            if self.render_pool:
+                metrics.update(self.render_pool.metrics())
+            self.counters = dict([(counter, 0) for counter in ALERT_DISPATCHER_COUNTERS])
+            self.max_queue_latency = 0
+        return metrics
+
+    def start_batches(self):
+        with self.lock:
+            for alerter in self.queues:
+                alerter_queue = self.queues[alerter]
+                while alerter_queue and len(self.processes[alerter]) < ALERT_DISPATCHER_PROCESSES:
+                    batch = []
+                    now = time()
+                    while alerter_queue and len(batch) < ALERT_DISPATCHER_BATCH_SIZE:
+                        queued_at, dedupe_key, alert_args = alerter_queue.popleft()
+                        self.max_queue_latency = max(self.max_queue_latency, (now - queued_at))
+                        batch.append((dedupe_key, alert_args))
+                    try:
+                        p = Process(
+                            target=dispatch_alerts,
+                            args=(self.skyline_app, self.alert_function, [alert_args for dedupe_key, alert_args in batch]))
+                        p.start()
+                    except:
+                        self.logger.error(traceback.format_exc())
+                        self.logger.error('error :: alert_dispatcher :: failed to start alerter process for %s' % alerter)
+                        self.counters['failed_to_start'] += len(batch)
+                        for dedupe_key, alert_args in batch:
+                            self.queued_keys.discard(dedupe_key)
+                        break
+                    self.processes[alerter].append((p, now, batch))
+
+    def check_processes(self):
+        with self.lock:
+            for alerter in self.processes:
+                running = []
+                for p, p_starts, batch in self.processes[alerter]:
+                    if p.is_alive():
+                        if time() - p_starts <= (ALERT_TIMEOUT * len(batch)):
+                            running.append((p, p_starts, batch))
+                            continue
+                        self.logger.info('%s :: alert_dispatcher :: timed out, killing the %s alerter process' % (
+                            self.skyline_app, alerter))
+                        try:
+                            p.terminate()
+                        except:
+                            self.logger.error(traceback.format_exc())
+                            self.logger.error('error :: alert_dispatcher :: failed to terminate %s alerter process' % alerter)
+                        self.counters['timed_out'] += len(batch)
+                    else:
+                        p.join()
+                        self.counters['dispatched'] += len(batch)
+                    for dedupe_key, alert_args in batch:
+                        self.queued_keys.discard(dedupe_key)
+                self.processes[alerter] = running
+            if self.render_pool:
+                self.render_pool.check()
+
+    def run(self):
+        self.logger.info('%s :: alert_dispatcher :: started' % self.skyline_app)
+        while True:
+            try:
+                self.check_processes()
+                self.start_batches()
+            except:
+                self.logger.error(traceback.format_exc())
+                self.logger.error('error :: alert_dispatcher :: dispatch failed')
+            # Just to avoid hogging the CPU
+            sleep(.1)
@@ -0,0 +1,382 @@
+"""
+Alert graphs.
+
+The Redis data graphs of the Analyzer and Mirage smtp alerts are rendered by a
+pool of render processes when the alert is added to the alert dispatcher queue,
+rather than by the alerter when the alert is sent.  The graphs are rendered
+into a content addressed image cache, keyed by the metric, the window and the
+resolution of the graph, from which the alerter picks up the rendered graph.
+Each render process reuses a single Agg figure for all the graphs it renders,
+rather than creating a pyplot figure per graph, and the render processes are
+replaced after ALERT_GRAPH_RENDER_MAX_TASKS graphs so that the memory that
+matplotlib retains is freed.
+"""
+from __future__ import division
+import logging
+import os
+import hashlib
+import json
+import traceback
+from multiprocessing import Pool
+from time import time, sleep
+import datetime as dt
+
+import matplotlib
+matplotlib.use('Agg')
+# Handle flake8 E402
+if True:
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.dates import DateFormatter
+    import numpy as np
+
+    import settings
+
+try:
+    ALERT_GRAPH_RENDER_PROCESSES = int(settings.ALERT_GRAPH_RENDER_PROCESSES)
+except:
+    ALERT_GRAPH_RENDER_PROCESSES = 1
+try:
+    ALERT_GRAPH_RENDER_WAIT = int(settings.ALERT_GRAPH_RENDER_WAIT)
+except:
+    ALERT_GRAPH_RENDER_WAIT = 5
+
+# The number of graphs a render process renders before it is replaced
+ALERT_GRAPH_RENDER_MAX_TASKS = 100
+
+# The number of seconds a graph is allowed to render in, if a render takes
+# longer the render processes are terminated and a new pool is started
+ALERT_GRAPH_RENDER_TIMEOUT = 60
+
+# The number of seconds rendered graphs are kept in the cache
+ALERT_GRAPH_CACHE_MAX_AGE = 3600
+
+ALERT_GRAPH_COUNTERS = ['graphs_queued', 'graphs_rendered', 'graphs_failed']
+
+# The Agg figure of the process that is reused for every graph
+FIGURES = {}
+
+
+def graph_cache_key(metric, window, resolution):
+    """
+    The content address of a graph in the alert graph cache.
+
+    :param metric: the metric name
+    :param window: the (from_timestamp, until_timestamp) of the graph
+    :param resolution: the resolution of the graph data, e.g. redis
+    :type metric: str
+    :type window: tuple
+    :type resolution: str
+    :return: cache_key
+    :rtype: str
+    """
+    cache_key_string = '%s.%s.%s.%s' % (
+        str(metric), str(int(window[0])), str(int(window[1])), str(resolution))
+    return hashlib.sha1(cache_key_string.encode('utf-8')).hexdigest()
+
+
+def graph_cache_file(skyline_app, cache_key):
+    """
+    The path of a graph in the alert graph cache of the app.
+
+    :param skyline_app: the app
+    :param cache_key: the cache key from :func:`graph_cache_key`
+    :type skyline_app: str
+    :type cache_key: str
+    :return: image_file
+    :rtype: str
+    """
+    return '%s/alert_graphs/%s/%s.png' % (
+        settings.SKYLINE_TMP_DIR, skyline_app, cache_key)
+
+
+def cached_graph(skyline_app, cache_key, wait=0):
+    """
+    Returns the file of a graph in the alert graph cache, waiting up to wait
+    seconds for a render process to render it.
+
+    :param skyline_app: the app
+    :param cache_key: the cache key from :func:`graph_cache_key`
+    :param wait: the number of seconds to wait for the graph
+    :type skyline_app: str
+    :type cache_key: str
+    :type wait: int
+    :return: image_file or None
+    :rtype: str
+    """
+    image_file = graph_cache_file(skyline_app, cache_key)
+    wait_until = time() + wait
+    while True:
+        if os.path.isfile(image_file):
+            return image_file
+        if time() >= wait_until:
+            return None
+        sleep(0.1)
+
+
+def graph_stats(image_file):
+    """
+    Returns the statistics of the time series of a graph that
+    :func:`render_timeseries_graph` saved with the graph.
+
+    :param image_file: the image file
+    :type image_file: str
+    :return: stats
+    :rtype: dict
+    """
+    stats = {}
+    try:
+        with open('%s.json' % image_file[:-len('.png')], 'r') as f:
+            stats = json.loads(f.read())
+    except:
+        pass
+    return stats
+
+
+def prune_graph_cache(skyline_app, max_age=ALERT_GRAPH_CACHE_MAX_AGE):
+    """
+    Remove the graphs older than max_age from the alert graph cache.
+
+    :param skyline_app: the app
+    :param max_age: the maximum age of a cached graph in seconds
+    :type skyline_app: str
+    :type max_age: int
+    :return: the number of graphs removed
+    :rtype: int
+    """
+    logger = logging.getLogger('%sLog' % skyline_app)
+    cache_dir = os.path.dirname(graph_cache_file(skyline_app, 'key'))
+    if not os.path.isdir(cache_dir):
+        return 0
+    removed = 0
+    oldest = time() - max_age
+    for image_file in os.listdir(cache_dir):
+        image_file_path = '%s/%s' % (cache_dir, image_file)
+        try:
+            if os.path.getmtime(image_file_path) < oldest:
+                os.remove(image_file_path)
+                removed += 1
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: alert_graphs :: failed to prune %s' % image_file_path)
+    return removed
+
+
+def get_figure():
+    """
+    Returns the Agg figure of the process, cleared for a new graph.
+
+    :return: fig
+    :rtype: matplotlib.figure.Figure
+    """
+    if 'redis' not in FIGURES:
+        fig = Figure(figsize=(8, 4), frameon=False)
+        FigureCanvasAgg(fig)
+        FIGURES['redis'] = fig
+    fig = FIGURES['redis']
+    fig.clf()
+    return fig
+
+
+def render_timeseries_graph(skyline_app, image_file, graph_title, timeseries):
+    """
+    Render the Redis data graph of an alert with its max, min, mean and
+    3-sigma lines to the image_file, with the statistics of the time series
+    saved alongside as json for :func:`graph_stats`.  The graph is written to a
+    temporary file and renamed so that an alerter waiting on the image_file
+    never reads a partially written graph.
+
+    :param skyline_app: the app
+    :param image_file: the image file
+    :param graph_title: the graph title
+    :param timeseries: the time series
+    :type skyline_app: str
+    :type image_file: str
+    :type graph_title: str
+    :type timeseries: list
+    :return: True or False
+    :rtype: boolean
+    """
+    logger = logging.getLogger('%sLog' % skyline_app)
+    try:
+        timeseries_x = [float(item[0]) for item in timeseries]
+        timeseries_y = [item[1] for item in timeseries]
+        values = np.array(timeseries_y, dtype=np.float64)
+        array_amax = np.amax(values)
+        array_amin = np.amin(values)
+        mean = values.mean()
+        # The sample standard deviation, as pandas Series.std
+        stdDev = values.std(ddof=1)
+        sigma3 = 3 * stdDev
+        sigma3_upper_bound = mean + sigma3
+        sigma3_lower_bound = mean - sigma3
+        datetimes = [dt.datetime.utcfromtimestamp(ts) for ts in timeseries_x]
+        stats = {
+            'array_amax': float(array_amax),
+            'array_amin': float(array_amin),
+            'mean': float(mean),
+            'stdDev': float(stdDev),
+            'sigma3': float(sigma3),
+            'sigma3_upper_bound': float(sigma3_upper_bound),
+            'sigma3_lower_bound': float(sigma3_lower_bound),
+            'last_value': float(values[-1]),
+        }
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: alert_graphs :: failed to determine the graph series')
+        return False
+
+    tmp_image_file = '%s.%s.tmp' % (image_file, str(os.getpid()))
+    try:
+        fig = get_figure()
+        ax = fig.add_subplot(111)
+        ax.set_title(graph_title, fontsize='small')
+        if hasattr(ax, 'set_facecolor'):
+            ax.set_facecolor('black')
+        else:
+            ax.set_axis_bgcolor('black')
+        xfmt = DateFormatter('%a %H:%M')
+        ax.xaxis.set_major_formatter(xfmt)
+        ax.plot(datetimes, timeseries_y, color='orange', lw=0.6, zorder=3)
+        ax.tick_params(axis='both', labelsize='xx-small', direction='out')
+        ax.tick_params(axis='x', labelrotation=0)
+        edge = [datetimes[0], datetimes[-1]]
+        max_value_label = 'max - %s' % str(array_amax)
+        ax.plot(edge, [array_amax] * 2, lw=1, label=max_value_label, color='m', ls='--', zorder=4)
+        min_value_label = 'min - %s' % str(array_amin)
+        ax.plot(edge, [array_amin] * 2, lw=1, label=min_value_label, color='b', ls='--', zorder=4)
+        mean_value_label = 'mean - %s' % str(mean)
+        ax.plot(edge, [mean] * 2, lw=1.5, label=mean_value_label, color='g', ls='--', zorder=4)
+        sigma3_text = (r'3$\sigma$')
+        sigma3_upper_label = '%s upper - %s' % (str(sigma3_text), str(sigma3_upper_bound))
+        ax.plot(edge, [sigma3_upper_bound] * 2, lw=1, label=sigma3_upper_label, color='r', ls='solid', zorder=4)
+        if sigma3_lower_bound > 0:
+            sigma3_lower_label = '%s lower - %s' % (str(sigma3_text), str(sigma3_lower_bound))
+            ax.plot(edge, [sigma3_lower_bound] * 2, lw=1, label=sigma3_lower_label, color='r', ls='solid', zorder=4)
+        ax.get_yaxis().get_major_formatter().set_useOffset(False)
+        ax.get_yaxis().get_major_formatter().set_scientific(False)
+        # Shrink current axis's height by 10% on the bottom
+        box = ax.get_position()
+        ax.set_position([box.x0, box.y0 + box.height * 0.1,
+                         box.width, box.height * 0.9])
+        # Put a legend below current axis
+        ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05),
+                  fancybox=True, shadow=True, ncol=4, fontsize='x-small')
+        ax.grid(True, which='both', axis='both', color='lightgray',
+                linestyle='solid', alpha=0.5, linewidth=0.6)
+        ax.margins(y=.02, x=.03)
+        image_dir = os.path.dirname(image_file)
+        if not os.path.exists(image_dir):
+            try:
+                os.makedirs(image_dir, mode=0o755)
+            except OSError:
+                # Created by another render process
+                pass
+        with open('%s.json' % image_file[:-len('.png')], 'w') as f:
+            f.write(json.dumps(stats))
+        fig.savefig(tmp_image_file, format='png')
+        os.rename(tmp_image_file, image_file)
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: alert_graphs :: failed to render %s' % image_file)
+        if os.path.isfile(tmp_image_file):
+            os.remove(tmp_image_file)
+        return False
+    finally:
+        if 'redis' in FIGURES:
+            FIGURES['redis'].clf()
+    return True
+
+
+class AlertGraphRenderPool(object):
+    """
+    The pool of render processes of an app that render the graphs of the
+    alerts that are added to the alert dispatcher queue.
+    """
+
+    def __init__(self, skyline_app, render_function):
+        """
+        :param skyline_app: the app
+        :param render_function: the function that renders the graph of an
+            alert into the alert graph cache, which is called with the args of
+            the alert function
+        :type skyline_app: str
+        :type render_function: function
+        """
+        self.skyline_app = skyline_app
+        self.logger = logging.getLogger('%sLog' % skyline_app)
+        self.render_function = render_function
+        self.pool = None
+        self.renders = []
+        self.counters = dict([(counter, 0) for counter in ALERT_GRAPH_COUNTERS])
+        self.last_pruned = 0
+
+    def submit(self, render_args):
+        """
+        Add the render of the graph of an alert to the pool.
+
+        :param render_args: the args of the alert function
+        :type render_args: tuple
+        :return: None
+        """
+        try:
+            if not self.pool:
+                self.pool = Pool(
+                    processes=ALERT_GRAPH_RENDER_PROCESSES,
+                    maxtasksperchild=ALERT_GRAPH_RENDER_MAX_TASKS)
+            render = self.pool.apply_async(self.render_function, render_args)
+            self.renders.append((render, time()))
+            self.counters['graphs_queued'] += 1
+        except:
+            self.logger.error(traceback.format_exc())
+            self.logger.error('error :: alert_graphs :: failed to submit render - %s' % str(render_args))
+
+    def check(self):
+        """
+        Count the completed renders, terminate the render processes if a
+        render has timed out and prune the alert graph cache.
+        """
+        rendering = []
+        timed_out = False
+        for render, submitted_at in self.renders:
+            if render.ready():
+                try:
+                    if render.get():
+                        self.counters['graphs_rendered'] += 1
+                    else:
+                        self.counters['graphs_failed'] += 1
+                except:
+                    self.logger.error(traceback.format_exc())
+                    self.logger.error('error :: alert_graphs :: render failed')
+                    self.counters['graphs_failed'] += 1
+                continue
+            if time() - submitted_at > ALERT_GRAPH_RENDER_TIMEOUT:
+                timed_out = True
+            rendering.append((render, submitted_at))
+        self.renders = rendering
+        if timed_out:
+            self.logger.info('%s :: alert_graphs :: render timed out, terminating the render processes' % self.skyline_app)
+            self.counters['graphs_failed'] += len(self.renders)
+            self.renders = []
+            try:
+                self.pool.terminate()
+            except:
+                self.logger.error(traceback.format_exc())
+                self.logger.error('error :: alert_graphs :: failed to terminate the render processes')
+            self.pool = None
+        if time() - self.last_pruned > 60:
+            self.last_pruned = time()
+            prune_graph_cache(self.skyline_app)
+
+    def metrics(self):
+        """
+        The render metrics, the counters are reset each time the metrics are
+        returned.
+
+        :return: metrics
+        :rtype: dict
+        """
+        metrics = dict(self.counters)
+        metrics['graphs_in_flight'] = len(self.renders)
+        self.counters = dict([(counter, 0) for counter in ALERT_GRAPH_COUNTERS])
+        return metrics
@@ -3,19 +3,22 @@ import logging
 import hashlib
 from smtplib import SMTP
 import alerters
-try:
-    import urllib2
-except ImportError:
-    import urllib.request
-    import urllib.error
+# @modified 20261019 - Alert graph render pool
+# urllib is no longer used as the graphs are fetched with
+# fetch_graphite_graph_image
+# try:
+#     import urllib2
+# except ImportError:
+#     import urllib.request
+#     import urllib.error
 
 # @added 20191023 - Task #3290: Handle urllib2 in py3
 #                   Branch #3262: py3
 # Use urlretrieve
-try:
-    import urllib2 as urllib
-except ImportError:
-    from urllib import request as urllib
+# try:
+#     import urllib2 as urllib
+# except ImportError:
+#     from urllib import request as urllib
 
 from ast import literal_eval
 from requests.utils import quote
@@ -25,6 +28,8 @@ import traceback
 # import redis
 from msgpack import Unpacker
 import datetime as dt
+# @added 20261019 - Alert graph render pool
+import shutil
 # @added 20180809 - Bug #2498: Incorrect scale in some graphs
 # @modified 20181025 - Feature #2618: alert_slack
 # Added gmtime and strftime
@@ -43,13 +48,15 @@ matplotlib.use('Agg')
 # @modified 20161228 - Feature #1828: ionosphere - mirage Redis data features
 # Handle flake8 E402
 if True:
-    import matplotlib.pyplot as plt
-    from matplotlib.pylab import rcParams
-    from matplotlib.dates import DateFormatter
+    # @modified 20261019 - Alert graph render pool
+    # The Redis data graphs are rendered by alert_graphs
+    # import matplotlib.pyplot as plt
+    # from matplotlib.pylab import rcParams
+    # from matplotlib.dates import DateFormatter
     # @modified 20191030 - Branch #3262: py3
     # import io
-    import numpy as np
-    import pandas as pd
+    # import numpy as np
+    # import pandas as pd
     import syslog
     import os.path
     import sys
@@ -88,11 +95,25 @@ if True:
         get_graphite_graph_image,
         # @modified 20191105 - Branch #3002: docker
         #                      Branch #3262: py3
-        get_graphite_port, get_graphite_render_uri, get_graphite_custom_headers,
+        # @modified 20261019 - Alert graph render pool
+        # get_graphite_port, get_graphite_render_uri, get_graphite_custom_headers,
+        get_graphite_port, get_graphite_render_uri,
         # @added 20200116: Feature #3396: http_alerter
         get_redis_conn_decoded,
         # @added 20200507 - Feature #3532: Sort all time series
-        sort_timeseries)
+        sort_timeseries,
+        # @added 20261019 - Alert graph render pool
+        fetch_graphite_graph_image, get_requests_session)
+    # @added 20261019 - Alert dispatcher
+    # @modified 20261019 - Alert graph render pool
+    # get_requests_session moved to skyline_functions
+    # from alert_dispatcher import (
+    #     get_smtp_connection, get_requests_session, get_slack_client)
+    from alert_dispatcher import get_smtp_connection, get_slack_client
+    # @added 20261019 - Alert graph render pool
+    from alert_graphs import (
+        graph_cache_key, graph_cache_file, cached_graph, graph_stats,
+        render_timeseries_graph, ALERT_GRAPH_RENDER_WAIT)
 
 skyline_app = 'analyzer'
 skyline_app_logger = '%sLog' % skyline_app
@@ -136,6 +157,134 @@ except:
     DOCKER_FAKE_EMAIL_ALERTS = False
 
 
+# @added 20261019 - Alert graph render pool
+def alert_smtp_redis_graph(alert, metric, context, wait=0):
+    """
+    Returns the Redis data graph of an smtp alert from the alert graph cache
+    and the statistics of its time series, waiting up to wait seconds for the
+    alert graph render pool to render it and rendering it if it has not been
+    rendered.  This is also the render
+    function of the Analyzer alert dispatcher, which renders the graph when the
+    alert is queued.
+
+    :param alert: the alert tuple
+    :param metric: the metric tuple
+    :param context: the app context
+    :param wait: the number of seconds to wait for the graph to be rendered
+    :type alert: tuple
+    :type metric: tuple
+    :type context: str
+    :type wait: int
+    :return: (image_file, stats) or (None, {})
+    :rtype: tuple
+    """
+    until_timestamp = int(metric[2])
+    from_timestamp = until_timestamp - full_duration_seconds
+    cache_key = graph_cache_key(
+        metric[1], (from_timestamp, until_timestamp), 'redis')
+    image_file = cached_graph(skyline_app, cache_key, wait)
+    if image_file:
+        logger.info('alert_smtp_redis_graph - using rendered graph - %s' % image_file)
+        return (image_file, graph_stats(image_file))
+
+    base_name = str(metric[1]).replace(settings.FULL_NAMESPACE, '', 1)
+    if len(base_name) > 254:
+        base_name = hashlib.sha224(str(metric[1]).replace(
+            settings.FULL_NAMESPACE, '', 1)).hexdigest()
+    json_file = None
+    if settings.IONOSPHERE_ENABLED:
+        timeseries_dir = base_name.replace('.', '/')
+        training_data_dir = '%s/%s/%s' % (
+            settings.IONOSPHERE_DATA_FOLDER, str(int(metric[2])),
+            timeseries_dir)
+        json_file = '%s/%s.%s.redis.%sh.json' % (
+            training_data_dir, base_name, skyline_app,
+            str(int(full_duration_in_hours)))
+
+    try:
+        main_alert_title = settings.CUSTOM_ALERT_OPTS['main_alert_title']
+    except:
+        main_alert_title = 'Skyline'
+    alert_context = context
+    if context == 'Analyzer':
+        try:
+            alert_context = settings.CUSTOM_ALERT_OPTS['analyzer_alert_heading']
+        except:
+            alert_context = 'Analyzer'
+    if context == 'Ionosphere':
+        try:
+            alert_context = settings.CUSTOM_ALERT_OPTS['ionosphere_alert_heading']
+        except:
+            alert_context = 'Ionosphere'
+    known_derivative_metric = is_derivative_metric(skyline_app, base_name)
+
+    # If the Ionosphere Redis data timeseries json exists it is used, as the
+    # Redis data has moved on since the anomaly.  Otherwise the Redis data is
+    # unpacked once and the Ionosphere json is created from it.
+    timeseries = None
+    # @added 20170920 - Bug #2168: Strange Redis derivative graph
+    using_original_redis_json = False
+    if json_file and os.path.isfile(json_file):
+        try:
+            with open(json_file, 'r') as f:
+                raw_timeseries = f.read()
+            timeseries_array_str = str(raw_timeseries).replace('(', '[').replace(')', ']')
+            timeseries = literal_eval(timeseries_array_str)
+            using_original_redis_json = True
+            logger.info('%s Redis timeseries replaced with timeseries from :: %s' % (skyline_app, json_file))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error(
+                'error :: %s failed to read timeseries data from %s' % (skyline_app, json_file))
+            timeseries = None
+    if not timeseries:
+        redis_metric_key = '%s%s' % (settings.FULL_NAMESPACE, metric[1])
+        try:
+            REDIS_ALERTER_CONN = get_redis_conn(skyline_app)
+            raw_series = REDIS_ALERTER_CONN.get(redis_metric_key)
+            unpacker = Unpacker(use_list=False)
+            unpacker.feed(raw_series)
+            timeseries = list(unpacker)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: alert_smtp_redis_graph - unpack timeseries failed')
+            timeseries = None
+        if json_file and timeseries:
+            timeseries_json = str(timeseries).replace('[', '(').replace(']', ')')
+            try:
+                write_data_to_file(skyline_app, json_file, 'w', timeseries_json)
+                logger.info('added %s Ionosphere Redis data timeseries json file :: %s' % (skyline_app, json_file))
+            except:
+                logger.info(traceback.format_exc())
+                logger.error('error :: failed to add %s Ionosphere Redis data timeseries json file :: %s' % (skyline_app, json_file))
+    if not timeseries:
+        return (None, {})
+
+    # @added 20200507 - Feature #3532: Sort all time series
+    timeseries = sort_timeseries(timeseries)
+
+    # @added 20170603 - Feature #2034: analyse_derivatives
+    # If this is the Mirage Redis json it already has nonNegativeDerivative
+    # applied to it
+    if known_derivative_metric and not using_original_redis_json:
+        try:
+            timeseries = nonNegativeDerivative(timeseries)
+            logger.info('alert_smtp_redis_graph - nonNegativeDerivative applied')
+        except:
+            logger.error('error :: alert_smtp_redis_graph - nonNegativeDerivative failed')
+
+    graph_title = '%s %s - ALERT - at %s hours - Redis data\n%s - anomalous value: %s' % (main_alert_title, alert_context, str(int(full_duration_in_hours)), metric[1], str(metric[0]))
+    if known_derivative_metric:
+        graph_title = 'Skyline %s - ALERT - at %s hours - Redis data (derivative graph)\n%s - anomalous value: %s' % (context, str(int(full_duration_in_hours)), metric[1], str(metric[0]))
+
+    image_file = graph_cache_file(skyline_app, cache_key)
+    if not render_timeseries_graph(skyline_app, image_file, graph_title, timeseries):
+        logger.error('error :: alert_smtp_redis_graph - failed to render the Redis data graph for %s' % metric[1])
+        return (None, {})
+    logger.info('alert_smtp_redis_graph - rendered graph - %s' % image_file)
+    return (image_file, graph_stats(image_file))
+
+
 def alert_smtp(alert, metric, context):
     """
     Called by :func:`~trigger_alert` and sends an alert via smtp to the
@@ -170,9 +319,11 @@ def alert_smtp(alert, metric, context):
         graphite_image_file = '%s/%s.%s.graphite.%sh.png' % (
             training_data_dir, base_name, skyline_app,
             str(int(full_duration_in_hours)))
-        json_file = '%s/%s.%s.redis.%sh.json' % (
-            training_data_dir, base_name, skyline_app,
-            str(int(full_duration_in_hours)))
+        # @modified 20261019 - Alert graph render pool
+        # The json is created in alert_smtp_redis_graph
+        # json_file = '%s/%s.%s.redis.%sh.json' % (
+        #     training_data_dir, base_name, skyline_app,
+        #     str(int(full_duration_in_hours)))
         training_data_redis_image = '%s/%s.%s.redis.plot.%sh.png' % (
             training_data_dir, base_name, skyline_app,
             str(int(full_duration_in_hours)))
@@ -278,7 +429,10 @@ def alert_smtp(alert, metric, context):
         #     REDIS_ALERTER_CONN = redis.StrictRedis(password=settings.REDIS_PASSWORD, unix_socket_path=settings.REDIS_SOCKET_PATH)
         # else:
         #     REDIS_ALERTER_CONN = redis.StrictRedis(unix_socket_path=settings.REDIS_SOCKET_PATH)
-        REDIS_ALERTER_CONN = get_redis_conn(skyline_app)
+        # @modified 20261019 - Alert graph render pool
+        # The Redis data is fetched in alert_smtp_redis_graph
+        # REDIS_ALERTER_CONN = get_redis_conn(skyline_app)
+        pass
     except:
         logger.error(traceback.format_exc())
         logger.error('error :: alert_smtp - redis connection failed')
@@ -336,7 +490,9 @@ def alert_smtp(alert, metric, context):
     # @added 20190518 - Branch #3002: docker
     graphite_port = get_graphite_port(skyline_app)
     graphite_render_uri = get_graphite_render_uri(skyline_app)
-    graphite_custom_headers = get_graphite_custom_headers(skyline_app)
+    # @modified 20261019 - Alert graph render pool
+    # The GRAPHITE_CUSTOM_HEADERS are added by fetch_graphite_graph_image
+    # graphite_custom_headers = get_graphite_custom_headers(skyline_app)
 
     graphite_from = dt.datetime.fromtimestamp(int(from_timestamp)).strftime('%H:%M_%Y%m%d')
     logger.info('graphite_from - %s' % str(graphite_from))
@@ -419,47 +575,55 @@ def alert_smtp(alert, metric, context):
                     logger.error('error :: alert_smtp - %s' % str(link))
                     image_data = None
 
+        # @modified 20261019 - Alert graph render pool
+        # Fetch the image with the pooled requests session with the Graphite
+        # timeouts
+        # if image_data is None:
+        #     try:
+        #         # @modified 20170913 - Task #2160: Test skyline with bandit
+        #         # Added nosec to exclude from bandit tests
+        #         # @modified 20190520 - Branch #3002: docker
+        #         # image_data = urllib2.urlopen(link).read()  # nosec
+        #         if graphite_custom_headers:
+        #             # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #             #                      Branch #3262: py3
+        #             # request = urllib2.Request(link, headers=graphite_custom_headers)
+        #             if python_version == 2:
+        #                 request = urllib.Request(link, headers=graphite_custom_headers)
+        #             if python_version == 3:
+        #                 request = urllib.request(link, headers=graphite_custom_headers)
+        #         else:
+        #             # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #             #                      Branch #3262: py3
+        #             # request = urllib2.Request(link)
+        #             if python_version == 2:
+        #                 request = urllib2.Request(link)
+        #             if python_version == 3:
+        #                 request = urllib.request(link)
+        #         # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #         #                      Branch #3262: py3
+        #         # image_data = urllib2.urlopen(request).read()  # nosec
+        #         if python_version == 2:
+        #             image_data = urllib2.urlopen(request).read()  # nosec
+        #         if python_version == 3:
+        #             image_data = urllib.request.urlopen(request).read()  # nosec
+        #         if settings.ENABLE_DEBUG or LOCAL_DEBUG:
+        #             logger.info('debug :: alert_smtp - image data OK')
+        #     # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #     #                      Branch #3262: py3
+        #     # except urllib2.URLError:
+        #     except:
+        #         logger.error(traceback.format_exc())
+        #         logger.error('error :: alert_smtp - failed to get image graph')
+        #         logger.error('error :: alert_smtp - %s' % str(link))
+        #         image_data = None
+        #         if settings.ENABLE_DEBUG or LOCAL_DEBUG:
+        #             logger.info('debug :: alert_smtp - image data None')
         if image_data is None:
-            try:
-                # @modified 20170913 - Task #2160: Test skyline with bandit
-                # Added nosec to exclude from bandit tests
-                # @modified 20190520 - Branch #3002: docker
-                # image_data = urllib2.urlopen(link).read()  # nosec
-                if graphite_custom_headers:
-                    # @modified 20191021 - Task #3290: Handle urllib2 in py3
-                    #                      Branch #3262: py3
-                    # request = urllib2.Request(link, headers=graphite_custom_headers)
-                    if python_version == 2:
-                        request = urllib.Request(link, headers=graphite_custom_headers)
-                    if python_version == 3:
-                        request = urllib.request(link, headers=graphite_custom_headers)
-                else:
-                    # @modified 20191021 - Task #3290: Handle urllib2 in py3
-                    #                      Branch #3262: py3
-                    # request = urllib2.Request(link)
-                    if python_version == 2:
-                        request = urllib2.Request(link)
-                    if python_version == 3:
-                        request = urllib.request(link)
-                # @modified 20191021 - Task #3290: Handle urllib2 in py3
-                #                      Branch #3262: py3
-                # image_data = urllib2.urlopen(request).read()  # nosec
-                if python_version == 2:
-                    image_data = urllib2.urlopen(request).read()  # nosec
-                if python_version == 3:
-                    image_data = urllib.request.urlopen(request).read()  # nosec
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - image data OK')
-            # @modified 20191021 - Task #3290: Handle urllib2 in py3
-            #                      Branch #3262: py3
-            # except urllib2.URLError:
-            except:
-                logger.error(traceback.format_exc())
+            image_data = fetch_graphite_graph_image(skyline_app, link)
+            if image_data is None:
                 logger.error('error :: alert_smtp - failed to get image graph')
                 logger.error('error :: alert_smtp - %s' % str(link))
-                image_data = None
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - image data None')
 
     if LOCAL_DEBUG:
         logger.info('debug :: alert_smtp - Memory usage after image_data: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -500,337 +664,41 @@ def alert_smtp(alert, metric, context):
         plot_redis_data = False
 
     if settings.SMTP_OPTS.get('embed-images') and plot_redis_data:
-        # Create graph from Redis data
-        redis_metric_key = '%s%s' % (settings.FULL_NAMESPACE, metric[1])
-        try:
-            raw_series = REDIS_ALERTER_CONN.get(redis_metric_key)
-            if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - raw_series: %s' % 'OK')
-        except:
-            if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - raw_series: %s' % 'FAIL')
-
-        try:
-            if LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - Memory usage before get Redis timeseries data: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-            unpacker = Unpacker(use_list=True)
-            unpacker.feed(raw_series)
-            timeseries_x = [float(item[0]) for item in unpacker]
-            unpacker = Unpacker(use_list=True)
-            unpacker.feed(raw_series)
-            timeseries_y = [item[1] for item in unpacker]
-
-            unpacker = Unpacker(use_list=False)
-            unpacker.feed(raw_series)
-            timeseries = list(unpacker)
-            if LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - Memory usage after get Redis timeseries data: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: alert_smtp - unpack timeseries failed')
-            timeseries = None
-
-        # @added 20200507 - Feature #3532: Sort all time series
-        # To ensure that there are no unordered timestamps in the time
-        # series which are artefacts of the collector or carbon-relay, sort
-        # all time series by timestamp before analysis.
-        original_timeseries = timeseries
-        if original_timeseries:
-            timeseries = sort_timeseries(original_timeseries)
-            del original_timeseries
-
-        if settings.IONOSPHERE_ENABLED and timeseries:
-            '''
-            .. todo: this is possibly to be used to allow the user to submit the
-                FULL_DURATION duration data set for the features profile to be
-                created against IF it is a Mirage metric.  This would allow for
-                additional granularity in Mirage metrics, thereby maintaining
-                their seasonality, but allow user and Skyline to analyze the
-                anomaly at a FULL_DURATION resolution as well.  Not sure how to
-                code that in Ionosphere context yet but could just be additonal
-                flag in the Ionosphere record.  In the Ionosphere frontend, the
-                user would be given an option to either create the features
-                profile on the Mirage timeseries or the redis FULL_DURATION
-                timeseries.  It is a little complicated, but doable.
-                # @modified 20161229 - Feature #1828: ionosphere - mirage Redis data features
-                However that ^^ is UNDESIRABLE in the Mirage/Ionosphere context
-                at the moment.  Ionosphere must only profile SECOND_ORDER_RESOLUTION_HOURS
-                currently so as to not pollute the seasonality aspect of Mirage
-            '''
-            # Create Ionosphere redis timeseries json if is does not exist
-            # @modified 20161229 - Feature #1830: Ionosphere alerts
-            # Only write the data to the file if it does not exist and replace
-            # the timeseries object if a json file exists
-
-            # @added 20170920 - Bug #2168: Strange Redis derivative graph
-            using_original_redis_json = False
-
-            if not os.path.isfile(json_file):
-                timeseries_json = str(timeseries).replace('[', '(').replace(']', ')')
-                try:
-                    write_data_to_file(skyline_app, json_file, 'w', timeseries_json)
-                    logger.info('added %s Ionosphere Redis data timeseries json file :: %s' % (skyline_app, json_file))
-                except:
-                    logger.info(traceback.format_exc())
-                    logger.error('error :: failed to add %s Ionosphere Redis data timeseries json file' % (skyline_app, json_file))
-            else:
-                # Replace the timeseries object
-                logger.info('%s Ionosphere Redis data timeseries json file already exists, using :: %s' % (skyline_app, json_file))
-                anomaly_json = json_file
-                try:
-                    # Read the timeseries json file
-                    with open(anomaly_json, 'r') as f:
-                        raw_timeseries = f.read()
-                    timeseries_array_str = str(raw_timeseries).replace('(', '[').replace(')', ']')
-                    timeseries = literal_eval(timeseries_array_str)
-                    logger.info('%s Redis timeseries replaced with timeseries from :: %s' % (skyline_app, anomaly_json))
-                    timeseries_x = [float(item[0]) for item in timeseries]
-                    timeseries_y = [item[1] for item in timeseries]
-                    # @added 20170920 - Bug #2168: Strange Redis derivative graph
-                    # This already has nonNegativeDerivative applied to it
-                    using_original_redis_json = True
-                except:
-                    logger.error(traceback.format_exc())
-                    logger.error(
-                        'error :: %s failed to read timeseries data from %s' % (skyline_app, anomaly_json))
-                    timeseries = None
-
-                # @added 20200507 - Feature #3532: Sort all time series
-                # To ensure that there are no unordered timestamps in the time
-                # series which are artefacts of the collector or carbon-relay, sort
-                # all time series by timestamp before analysis.
-                original_timeseries = timeseries
-                if original_timeseries:
-                    timeseries = sort_timeseries(original_timeseries)
-                    del original_timeseries
-
-        # @added 20170603 - Feature #2034: analyse_derivatives
-        if known_derivative_metric:
-
-            # @added 20170920 - Bug #2168: Strange Redis derivative graph
-            # If this is the Mirage Redis json it already has
-            # nonNegativeDerivative applied to it
-            if not using_original_redis_json:
-                logger.info('alert_smtp - nonNegativeDerivative being applied')
-
-                try:
-                    derivative_timeseries = nonNegativeDerivative(timeseries)
-                    timeseries = derivative_timeseries
-                    # @added 20170920 - Bug #2168: Strange Redis derivative graph
-                    logger.info('alert_smtp - nonNegativeDerivative applied')
-                except:
-                    logger.error('error :: alert_smtp - nonNegativeDerivative failed')
-            else:
-                logger.info('alert_smtp - nonNegativeDerivative not being applied, as it will have been applied in the original json')
-
-        # @added 21070726 - Bug #2068: Analyzer smtp alert error on Redis plot with derivative metrics
-        # If the nonNegativeDerivative has been calculated we need to reset the
-        # x and y as nonNegativeDerivative has to discard the first value as it
-        # has no delta for it so the timeseries is 1 item less.
-        if timeseries:
-            timeseries_x = [float(item[0]) for item in timeseries]
-            timeseries_y = [item[1] for item in timeseries]
-
-        pd_series_values = None
-        mean_series = None
-        if timeseries:
-            try:
-                if LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - Memory usage before pd.Series: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-                values = pd.Series([x[1] for x in timeseries])
-                # Because the truth value of a Series is ambiguous
-                pd_series_values = True
-                if LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - Memory usage after pd.Series: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-            except:
-                logger.error('error :: alert_smtp - pandas value series on timeseries failed')
-
-        if pd_series_values:
-            try:
-                array_median = np.median(values)
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - values median: %s' % str(array_median))
-
-                array_amax = np.amax(values)
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - array_amax: %s' % str(array_amax))
-                array_amin = np.amin(values)
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - array_amin: %s' % str(array_amin))
-                mean = values.mean()
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - mean: %s' % str(mean))
-                stdDev = values.std()
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - stdDev: %s' % str(stdDev))
-
-                sigma3 = 3 * stdDev
-                if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                    logger.info('debug :: alert_smtp - sigma3: %s' % str(sigma3))
-
-                # sigma3_series = [sigma3] * len(values)
-
-                sigma3_upper_bound = mean + sigma3
-                try:
-                    sigma3_lower_bound = mean - sigma3
-                except:
-                    sigma3_lower_bound = 0
-
-                sigma3_upper_series = [sigma3_upper_bound] * len(values)
-                sigma3_lower_series = [sigma3_lower_bound] * len(values)
-                amax_series = [array_amax] * len(values)
-                amin_series = [array_amin] * len(values)
-                mean_series = [mean] * len(values)
-            except:
-                logger.error('error :: alert_smtp - numpy ops on series failed')
-                mean_series = None
-
-        if mean_series:
-            # @modified 20191003 - Feature #3194: Add CUSTOM_ALERT_OPTS to settings
-            # Use main_alert_title and alert_context
-            # graph_title = 'Skyline %s - ALERT - at %s hours - Redis data\n%s - anomalous value: %s' % (context, str(int(full_duration_in_hours)), metric[1], str(metric[0]))
-            graph_title = '%s %s - ALERT - at %s hours - Redis data\n%s - anomalous value: %s' % (main_alert_title, alert_context, str(int(full_duration_in_hours)), metric[1], str(metric[0]))
-            # @added 20170603 - Feature #2034: analyse_derivatives
-            if known_derivative_metric:
-                graph_title = 'Skyline %s - ALERT - at %s hours - Redis data (derivative graph)\n%s - anomalous value: %s' % (context, str(int(full_duration_in_hours)), metric[1], str(metric[0]))
-
-            # @modified 20160814 - Bug #1558: Memory leak in Analyzer
-            # I think the buf is causing a memory leak, trying a file
-            # if python_version == 3:
-            #     buf = io.StringIO()
-            # else:
-            #     buf = io.BytesIO()
-            buf = '%s/%s.%s.%s.png' % (
-                settings.SKYLINE_TMP_DIR, skyline_app, str(int(metric[2])), metric[1])
-
-            if LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - Memory usage before plot Redis data: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-
-            # Too big
-            # rcParams['figure.figsize'] = 12, 6
-            rcParams['figure.figsize'] = 8, 4
-            try:
-                # fig = plt.figure()
-                fig = plt.figure(frameon=False)
-                ax = fig.add_subplot(111)
-                ax.set_title(graph_title, fontsize='small')
-                # @modified 20180417 - Bug #2358: set_axis_bgcolor method removed from Matplotlib - Luminosity
-                #                      IssueID #49 'AxesSubplot' object has no attribute 'set_axis_bgcolor'
-                # ax.set_axis_bgcolor('black')
-                if hasattr(ax, 'set_facecolor'):
-                    ax.set_facecolor('black')
-                else:
-                    ax.set_axis_bgcolor('black')
-
-                try:
-                    datetimes = [dt.datetime.utcfromtimestamp(ts) for ts in timeseries_x]
-                    if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                        logger.info('debug :: alert_smtp - datetimes: %s' % 'OK')
-                except:
-                    logger.error('error :: alert_smtp - datetimes: %s' % 'FAIL')
-
-                plt.xticks(rotation=0, horizontalalignment='center')
-                xfmt = DateFormatter('%a %H:%M')
-                plt.gca().xaxis.set_major_formatter(xfmt)
-
-                ax.xaxis.set_major_formatter(xfmt)
-
-                ax.plot(datetimes, timeseries_y, color='orange', lw=0.6, zorder=3)
-                ax.tick_params(axis='both', labelsize='xx-small')
-
-                max_value_label = 'max - %s' % str(array_amax)
-                ax.plot(datetimes, amax_series, lw=1, label=max_value_label, color='m', ls='--', zorder=4)
-                min_value_label = 'min - %s' % str(array_amin)
-                ax.plot(datetimes, amin_series, lw=1, label=min_value_label, color='b', ls='--', zorder=4)
-                mean_value_label = 'mean - %s' % str(mean)
-                ax.plot(datetimes, mean_series, lw=1.5, label=mean_value_label, color='g', ls='--', zorder=4)
-
-                sigma3_text = (r'3$\sigma$')
-                # sigma3_label = '%s - %s' % (str(sigma3_text), str(sigma3))
-
-                sigma3_upper_label = '%s upper - %s' % (str(sigma3_text), str(sigma3_upper_bound))
-                ax.plot(datetimes, sigma3_upper_series, lw=1, label=sigma3_upper_label, color='r', ls='solid', zorder=4)
-
-                if sigma3_lower_bound > 0:
-                    sigma3_lower_label = '%s lower - %s' % (str(sigma3_text), str(sigma3_lower_bound))
-                    ax.plot(datetimes, sigma3_lower_series, lw=1, label=sigma3_lower_label, color='r', ls='solid', zorder=4)
-
-                ax.get_yaxis().get_major_formatter().set_useOffset(False)
-                ax.get_yaxis().get_major_formatter().set_scientific(False)
-
-                # Shrink current axis's height by 10% on the bottom
-                box = ax.get_position()
-                ax.set_position([box.x0, box.y0 + box.height * 0.1,
-                                 box.width, box.height * 0.9])
-
-                # Put a legend below current axis
-                ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05),
-                          fancybox=True, shadow=True, ncol=4, fontsize='x-small')
-                plt.rc('lines', lw=2, color='w')
-
-                plt.grid(True)
-
-                ax.grid(b=True, which='both', axis='both', color='lightgray',
-                        linestyle='solid', alpha=0.5, linewidth=0.6)
-                # @modified 20180417 - Bug #2358: set_axis_bgcolor method removed from Matplotlib - Luminosity
-                #                      IssueID #49 'AxesSubplot' object has no attribute 'set_axis_bgcolor'
-                # ax.set_axis_bgcolor('black')
-                if hasattr(ax, 'set_facecolor'):
-                    ax.set_facecolor('black')
+        # @modified 20261019 - Alert graph render pool
+        # The Redis data graph is rendered by the alert graph render pool when
+        # the alert is queued and is picked up from the alert graph cache,
+        # rather than unpacking the Redis data and plotting it with pyplot in
+        # every alert.  The unpacking, the Ionosphere json and the
+        # nonNegativeDerivative are in alert_smtp_redis_graph.
+        buf, redis_graph_stats = alert_smtp_redis_graph(alert, metric, context, ALERT_GRAPH_RENDER_WAIT)
+        if buf:
+            if settings.IONOSPHERE_ENABLED:
+                if not os.path.exists(training_data_dir):
+                    mkdir_p(training_data_dir)
+                    logger.info('created dir - %s' % training_data_dir)
+                if not os.path.isfile(training_data_redis_image):
+                    try:
+                        shutil.copyfile(buf, training_data_redis_image)
+                        logger.info(
+                            'alert_smtp - save Redis training data image - %s' % (
+                                training_data_redis_image))
+                    except:
+                        logger.info(traceback.format_exc())
+                        logger.error(
+                            'error :: alert_smtp - could not save - %s' % (
+                                training_data_redis_image))
                 else:
-                    ax.set_axis_bgcolor('black')
-
-                rcParams['xtick.direction'] = 'out'
-                rcParams['ytick.direction'] = 'out'
-                ax.margins(y=.02, x=.03)
-                # tight_layout removes the legend box
-                # fig.tight_layout()
-                try:
-                    if LOCAL_DEBUG:
-                        logger.info('debug :: alert_smtp - Memory usage before plt.savefig: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-                    plt.savefig(buf, format='png')
-
-                    if settings.IONOSPHERE_ENABLED:
-                        if not os.path.exists(training_data_dir):
-                            mkdir_p(training_data_dir)
-                            logger.info('created dir - %s' % training_data_dir)
-
-                        if not os.path.isfile(training_data_redis_image):
-                            try:
-                                plt.savefig(training_data_redis_image, format='png')
-                                logger.info(
-                                    'alert_smtp - save Redis training data image - %s' % (
-                                        training_data_redis_image))
-                            except:
-                                logger.info(traceback.format_exc())
-                                logger.error(
-                                    'error :: alert_smtp - could not save - %s' % (
-                                        training_data_redis_image))
-                        else:
-                            logger.info(
-                                'alert_smtp - Redis training data image already exists - %s' % (
-                                    training_data_redis_image))
-
-                    # @added 20160814 - Bug #1558: Memory leak in Analyzer
-                    # As per http://www.mail-archive.com/matplotlib-users@lists.sourceforge.net/msg13222.html
-                    # savefig in the parent process was causing the memory leak
-                    # the below fig.clf() and plt.close() did not resolve this
-                    # however spawing a multiprocessing process for alert_smtp
-                    # does solve this as issue as all memory is freed when the
-                    # process terminates.
-                    fig.clf()
-                    plt.close(fig)
-                    redis_graph_content_id = 'redis.%s' % metric[1]
-                    redis_image_data = True
-                    if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                        logger.info('debug :: alert_smtp - savefig: %s' % 'OK')
-                        logger.info('debug :: alert_smtp - Memory usage after plt.savefig: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-                except:
-                    logger.info(traceback.format_exc())
-                    logger.error('error :: alert_smtp - plt.savefig: %s' % 'FAIL')
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: alert_smtp - could not build plot')
+                    logger.info(
+                        'alert_smtp - Redis training data image already exists - %s' % (
+                            training_data_redis_image))
+            redis_graph_content_id = 'redis.%s' % metric[1]
+            redis_image_data = True
+            array_amin = redis_graph_stats.get('array_amin')
+            array_amax = redis_graph_stats.get('array_amax')
+            mean = redis_graph_stats.get('mean')
+            sigma3 = redis_graph_stats.get('sigma3')
+            sigma3_upper_bound = redis_graph_stats.get('sigma3_upper_bound')
+            sigma3_lower_bound = redis_graph_stats.get('sigma3_lower_bound')
 
     if LOCAL_DEBUG:
         logger.info('debug :: alert_smtp - Memory usage before email: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -993,13 +861,16 @@ def alert_smtp(alert, metric, context):
                         # with open(buf, 'r') as f:
                         with open(buf, 'rb') as f:
                             plot_image_data = f.read()
-                        try:
-                            os.remove(buf)
-                        except OSError:
-                            logger.error(
-                                'error :: alert_smtp - failed to remove file - %s' % buf)
-                            logger.info(traceback.format_exc())
-                            pass
+                        # @modified 20261019 - Alert graph render pool
+                        # The graph is in the alert graph cache, which is
+                        # pruned by the render pool
+                        # try:
+                        #     os.remove(buf)
+                        # except OSError:
+                        #     logger.error(
+                        #         'error :: alert_smtp - failed to remove file - %s' % buf)
+                        #     logger.info(traceback.format_exc())
+                        #     pass
                     except:
                         logger.error('error :: failed to read plot file - %s' % buf)
                         plot_image_data = None
@@ -1054,7 +925,11 @@ def alert_smtp(alert, metric, context):
         # context without actually sending the email.
         if send_email_alert:
             try:
-                s = SMTP('127.0.0.1')
+                # @modified 20261019 - Alert dispatcher
+                # Reuse the SMTP connection of the alerter process for the
+                # batch of alerts
+                # s = SMTP('127.0.0.1')
+                s = get_smtp_connection('127.0.0.1')
                 # @modified 20180524 - Task #2384: Change alerters to cc other recipients
                 # Send to primary_recipient and cc_recipients
                 # s.sendmail(sender, recipient, msg.as_string())
@@ -1073,7 +948,10 @@ def alert_smtp(alert, metric, context):
                 logger.error(
                     'error :: alert_smtp - could not send email to primary_recipient :: %s, cc_recipients :: %s' %
                     (str(primary_recipient), str(cc_recipients)))
-            s.quit()
+            # @modified 20261019 - Alert dispatcher
+            # The SMTP connection is closed when the batch of alerts has been
+            # sent
+            # s.quit()
         else:
             logger.info(
                 'alert_smtp - send_email_alert was set to %s message was not sent to primary_recipient :: %s, cc_recipients :: %s' % (
@@ -1087,33 +965,35 @@ def alert_smtp(alert, metric, context):
         # buf.write('none')
         if LOCAL_DEBUG:
             logger.info('debug :: alert_smtp - Memory usage before del redis_image_data objects: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-        del raw_series
-        del unpacker
-        del timeseries[:]
-        del timeseries_x[:]
-        del timeseries_y[:]
-        del values
-        del datetimes[:]
+        # @modified 20261019 - Alert graph render pool
+        # The Redis data is unpacked and plotted in alert_smtp_redis_graph
+        # del raw_series
+        # del unpacker
+        # del timeseries[:]
+        # del timeseries_x[:]
+        # del timeseries_y[:]
+        # del values
+        # del datetimes[:]
         del msg_plot_attachment
         del redis_image_data
-        # We del all variables that are floats as they become unique objects and
-        # can result in what appears to be a memory leak, but is not, it is
-        # just the way Python handles floats
-        del mean
-        del array_amin
-        del array_amax
-        del stdDev
-        del sigma3
+        # # We del all variables that are floats as they become unique objects and
+        # # can result in what appears to be a memory leak, but is not, it is
+        # # just the way Python handles floats
+        # del mean
+        # del array_amin
+        # del array_amax
+        # del stdDev
+        # del sigma3
         if LOCAL_DEBUG:
             logger.info('debug :: alert_smtp - Memory usage after del redis_image_data objects: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
         if LOCAL_DEBUG:
             logger.info('debug :: alert_smtp - Memory usage before del fig object: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
-        # @added 20160814 - Bug #1558: Memory leak in Analyzer
-        #                   Issue #21 Memory leak in Analyzer - https://github.com/earthgecko/skyline/issues/21
-        # As per http://www.mail-archive.com/matplotlib-users@lists.sourceforge.net/msg13222.html
-        fig.clf()
-        plt.close(fig)
-        del fig
+        # # @added 20160814 - Bug #1558: Memory leak in Analyzer
+        # #                   Issue #21 Memory leak in Analyzer - https://github.com/earthgecko/skyline/issues/21
+        # # As per http://www.mail-archive.com/matplotlib-users@lists.sourceforge.net/msg13222.html
+        # fig.clf()
+        # plt.close(fig)
+        # del fig
         if LOCAL_DEBUG:
             logger.info('debug :: alert_smtp - Memory usage after del fig object: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
 
@@ -1370,7 +1250,9 @@ def alert_slack(alert, metric, context):
         logger.info('alert_slack - bot_user_oauth_access_token is not configured, not sending alert')
         return False
 
-    from slackclient import SlackClient
+    # @modified 20261019 - Alert dispatcher
+    # The SlackClient is imported by get_slack_client
+    # from slackclient import SlackClient
     import simplejson as json
 
     logger.info('alert_slack - anomalous metric :: alert: %s, metric: %s' % (str(alert), str(metric)))
@@ -1492,7 +1374,9 @@ def alert_slack(alert, metric, context):
 
     graphite_port = get_graphite_port(skyline_app)
     graphite_render_uri = get_graphite_render_uri(skyline_app)
-    graphite_custom_headers = get_graphite_custom_headers(skyline_app)
+    # @modified 20261019 - Alert graph render pool
+    # The GRAPHITE_CUSTOM_HEADERS are added by fetch_graphite_graph_image
+    # graphite_custom_headers = get_graphite_custom_headers(skyline_app)
 
     if known_derivative_metric:
 
@@ -1546,42 +1430,49 @@ def alert_slack(alert, metric, context):
 
     if not image_file:
         # Fetch the png from Graphite
-        try:
-            # @modified 20190520 - Branch #3002: docker
-            # image_data = urllib2.urlopen(link).read()  # nosec
-            if graphite_custom_headers:
-                # @modified 20191021 - Task #3290: Handle urllib2 in py3
-                #                      Branch #3262: py3
-                # request = urllib2.Request(link, headers=graphite_custom_headers)
-                if python_version == 2:
-                    request = urllib.Request(link, headers=graphite_custom_headers)
-                if python_version == 3:
-                    request = urllib.request(link, headers=graphite_custom_headers)
-            else:
-                # @modified 20191021 - Task #3290: Handle urllib2 in py3
-                #                      Branch #3262: py3
-                # request = urllib2.Request(link)
-                if python_version == 2:
-                    request = urllib2.Request(link)
-                if python_version == 3:
-                    request = urllib.request(link)
-            # @modified 20191021 - Task #3290: Handle urllib2 in py3
-            #                      Branch #3262: py3
-            # image_data = urllib2.urlopen(request).read()  # nosec
-            if python_version == 2:
-                image_data = urllib2.urlopen(request).read()  # nosec
-            if python_version == 3:
-                image_data = urllib.request.urlopen(request).read()  # nosec
-            if settings.ENABLE_DEBUG or LOCAL_DEBUG:
-                logger.info('debug :: alert_smtp - image data OK')
-        # @modified 20191021 - Task #3290: Handle urllib2 in py3
-        #                      Branch #3262: py3
-        # except urllib2.URLError:
-        except:
-            logger.error(traceback.format_exc())
+        # @modified 20261019 - Alert graph render pool
+        # Fetch the image with the pooled requests session with the Graphite
+        # timeouts
+        # try:
+        #     # @modified 20190520 - Branch #3002: docker
+        #     # image_data = urllib2.urlopen(link).read()  # nosec
+        #     if graphite_custom_headers:
+        #         # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #         #                      Branch #3262: py3
+        #         # request = urllib2.Request(link, headers=graphite_custom_headers)
+        #         if python_version == 2:
+        #             request = urllib.Request(link, headers=graphite_custom_headers)
+        #         if python_version == 3:
+        #             request = urllib.request(link, headers=graphite_custom_headers)
+        #     else:
+        #         # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #         #                      Branch #3262: py3
+        #         # request = urllib2.Request(link)
+        #         if python_version == 2:
+        #             request = urllib2.Request(link)
+        #         if python_version == 3:
+        #             request = urllib.request(link)
+        #     # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        #     #                      Branch #3262: py3
+        #     # image_data = urllib2.urlopen(request).read()  # nosec
+        #     if python_version == 2:
+        #         image_data = urllib2.urlopen(request).read()  # nosec
+        #     if python_version == 3:
+        #         image_data = urllib.request.urlopen(request).read()  # nosec
+        #     if settings.ENABLE_DEBUG or LOCAL_DEBUG:
+        #         logger.info('debug :: alert_smtp - image data OK')
+        # # @modified 20191021 - Task #3290: Handle urllib2 in py3
+        # #                      Branch #3262: py3
+        # # except urllib2.URLError:
+        # except:
+        #     logger.error(traceback.format_exc())
+        #     logger.error('error :: alert_slack - failed to get image graph')
+        #     logger.error('error :: alert_slack - %s' % str(link))
+        #     image_data = None
+        image_data = fetch_graphite_graph_image(skyline_app, link)
+        if image_data is None:
             logger.error('error :: alert_slack - failed to get image graph')
             logger.error('error :: alert_slack - %s' % str(link))
-            image_data = None
 
         if image_data:
             image_file = '%s/%s.%s.graphite.%sh.png' % (
@@ -1631,7 +1522,10 @@ def alert_slack(alert, metric, context):
         icon_emoji = ':chart_with_upwards_trend:'
 
     try:
-        sc = SlackClient(bot_user_oauth_access_token)
+        # @modified 20261019 - Alert dispatcher
+        # Reuse the SlackClient of the alerter process
+        # sc = SlackClient(bot_user_oauth_access_token)
+        sc = get_slack_client(bot_user_oauth_access_token)
     except:
         logger.info(traceback.format_exc())
         logger.error('error :: alert_slack - could not initiate SlackClient')
@@ -2036,7 +1930,11 @@ def alert_http(alert, metric, context):
             response = None
             try:
                 # response = requests.post(alerter_endpoint, data=alert_data, headers=headers, timeout=use_timeout)
-                response = requests.post(alerter_endpoint, json=alert_data_dict, timeout=use_timeout)
+                # @modified 20261019 - Alert dispatcher
+                # Use the requests session of the alerter process so that the
+                # keep-alive connection to the endpoint is reused
+                # response = requests.post(alerter_endpoint, json=alert_data_dict, timeout=use_timeout)
+                response = get_requests_session(alerter_endpoint).post(alerter_endpoint, json=alert_data_dict, timeout=use_timeout)
             except:
                 logger.error(traceback.format_exc())
                 logger.error('error :: failed to post alert to %s - %s' % (
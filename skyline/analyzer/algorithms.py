@@ -1,11 +1,13 @@
 from __future__ import division
 import logging
 from time import time
-from os import getpid
+# @modified 20261019 - Feature #4718: Metrics registry
+# from os import getpid
 from timeit import default_timer as timer
 
 # @added 20200117 - Feature #3400: Identify air gaps in the metric data
-from collections import Counter
+# @modified 20261019 - Feature #4730: Vectorised identify_airgaps
+# from collections import Counter
 from ast import literal_eval
 
 import pandas
@@ -26,7 +28,10 @@ from settings import (
     BOREDOM_SET_SIZE,
     PANDAS_VERSION,
     RUN_OPTIMIZED_WORKFLOW,
-    SKYLINE_TMP_DIR,
+    # @modified 20261019 - Feature #4718: Metrics registry
+    # SKYLINE_TMP_DIR is no longer used as the algorithm tmp files are replaced
+    # by the metrics registry
+    # SKYLINE_TMP_DIR,
     ENABLE_ALGORITHM_RUN_METRICS,
     ENABLE_ALL_ALGORITHMS_RUN_METRICS,
     REDIS_PASSWORD,
@@ -35,6 +40,10 @@ from settings import (
 )
 
 from algorithm_exceptions import TooShort, Stale, Boring
+# @added 20261019 - Feature #4718: Metrics registry
+from metrics_registry import metrics_registry
+# @added 20261019 - Feature #4720: Analyzer profiling
+from stage_profiler import stage_profiler
 
 if ENABLE_SECOND_ORDER:
     from redis import StrictRedis
@@ -490,33 +499,39 @@ def record_algorithm_error(algorithm_name, traceback_format_exc_string):
     errors.  The algorithm functions themselves we want to run super fast and
     without fail in terms of stopping the function returning and not reporting
     anything to the log, so the pythonic except is used to "sample" any
-    algorithm errors to a tmp file and report once per run rather than spewing
-    tons of errors into the log.
+    algorithm errors to the metrics registry of the process and report once per
+    run rather than spewing tons of errors into the log.
 
     .. note::
-        algorithm errors tmp file clean up
-            the algorithm error tmp files are handled and cleaned up in
-            :class:`Analyzer` after all the spawned processes are completed.
+        algorithm errors
+            the algorithm errors are sent to :class:`Analyzer` in the metrics
+            registry snapshot of each spawned process and reported after all
+            the spawned processes are completed.
 
     :param algorithm_name: the algoritm function name
     :type algorithm_name: str
     :param traceback_format_exc_string: the traceback_format_exc string
     :type traceback_format_exc_string: str
     :return:
-        - ``True`` the error string was written to the algorithm_error_file
-        - ``False`` the error string was not written to the algorithm_error_file
+        - ``True`` the error string was recorded in the metrics registry
+        - ``False`` the error string was not recorded in the metrics registry
 
     :rtype:
         - boolean
 
     """
 
-    current_process_pid = getpid()
-    algorithm_error_file = '%s/%s.%s.%s.algorithm.error' % (
-        SKYLINE_TMP_DIR, skyline_app, str(current_process_pid), algorithm_name)
+    # @modified 20261019 - Feature #4718: Metrics registry
+    # Sample the error in the metrics registry rather than writing a tmp file
+    # per error
+    # current_process_pid = getpid()
+    # algorithm_error_file = '%s/%s.%s.%s.algorithm.error' % (
+    #     SKYLINE_TMP_DIR, skyline_app, str(current_process_pid), algorithm_name)
     try:
-        with open(algorithm_error_file, 'w') as f:
-            f.write(str(traceback_format_exc_string))
+        # with open(algorithm_error_file, 'w') as f:
+        #     f.write(str(traceback_format_exc_string))
+        metrics_registry.record_error(algorithm_name, traceback_format_exc_string)
+        metrics_registry.increment('algorithm_breakdown.%s.errors' % algorithm_name)
         return True
     except:
         return False
@@ -560,6 +575,26 @@ def determine_array_median(array):
     return False
 
 
+# @added 20261019 - Feature #4730: Vectorised identify_airgaps
+def determine_airgap_resolution(timestamp_resolutions):
+    """
+    Determine the resolution of a metric from the differences between its
+    timestamps, the most common difference.  As per Counter.most_common, if
+    differences are equally common the difference that occurs first is the
+    resolution.
+
+    :param timestamp_resolutions: the differences between the timestamps
+    :type timestamp_resolutions: numpy.ndarray
+    :return: metric_resolution
+    :rtype: int
+
+    """
+    resolutions, first_indices, counts = np.unique(
+        timestamp_resolutions, return_index=True, return_counts=True)
+    most_common = counts == counts.max()
+    return int(resolutions[most_common][np.argmin(first_indices[most_common])])
+
+
 # @added 20200117 - Feature #3400: Identify air gaps in the metric data
 # The implementation of this feature bumped up analyzer.run_time from:
 # from ~2.5 to 3 seconds up to between 3.0 and 4.0 seconds on 608 metrics
@@ -601,59 +636,34 @@ def identify_airgaps(metric_name, timeseries, airgapped_metrics, airgapped_metri
     try:
         current_timestamp = int(time())
         max_airgap_timestamp = current_timestamp - MAX_AIRGAP_PERIOD
+
+        # @modified 20261019 - Feature #4730: Vectorised identify_airgaps
+        # The timestamps are converted to a numpy array once and the resolution,
+        # the air gaps and whether the time series is unordered are determined
+        # from the np.diff of the timestamps, rather than from Python lists and
+        # a Counter of the resolutions and a scan of every datapoint.  Only the
+        # datapoints where an air gap starts or ends are examined.
+        timestamps = np.fromiter(
+            (metric_datapoint[0] for metric_datapoint in timeseries),
+            dtype=np.float64, count=len(timeseries)).astype(np.int64)
         # Determine resolution from the data within the MAX_AIRGAP_PERIOD
-        resolution_timestamps = []
+        timestamp_resolutions = np.diff(timestamps[timestamps >= max_airgap_timestamp])
+        if not len(timestamp_resolutions):
+            # As per the original implementation, if there are no resolutions
+            # the time series is not considered unordered
+            return [], False
+        metric_resolution = determine_airgap_resolution(timestamp_resolutions)
         metric_resolution_determined = False
-        for metric_datapoint in timeseries:
-            timestamp = int(metric_datapoint[0])
-            if timestamp < max_airgap_timestamp:
-                continue
-            resolution_timestamps.append(timestamp)
-        timestamp_resolutions = []
-        if resolution_timestamps:
-            last_timestamp = None
-            for timestamp in resolution_timestamps:
-                if last_timestamp:
-                    resolution = timestamp - last_timestamp
-                    timestamp_resolutions.append(resolution)
-                    last_timestamp = timestamp
-                else:
-                    last_timestamp = timestamp
-        if resolution_timestamps:
-            del resolution_timestamps
-        timestamp_resolutions_count = None
-        ordered_timestamp_resolutions_count = None
-        metric_resolution = None
-        if timestamp_resolutions:
-            try:
-                timestamp_resolutions_count = Counter(timestamp_resolutions)
-                ordered_timestamp_resolutions_count = timestamp_resolutions_count.most_common()
-                metric_resolution = int(ordered_timestamp_resolutions_count[0][0])
-                if metric_resolution > 0:
-                    metric_resolution_determined = True
-            except:
-                traceback_format_exc_string = traceback.format_exc()
-                algorithm_name = str(get_function_name())
-                record_algorithm_error(algorithm_name, traceback_format_exc_string)
-                del timestamp_resolutions
-                # return None
-                return [], None
-        if timestamp_resolutions:
-            del timestamp_resolutions
+        if metric_resolution > 0:
+            metric_resolution_determined = True
         airgaps_present = False
-        if metric_resolution_determined and metric_resolution:
+        if metric_resolution_determined:
             if metric_resolution < 600:
                 airgap_duration = ((int(metric_resolution) * 2) + int(int(metric_resolution) / 2))
             else:
                 airgap_duration = ((int(metric_resolution) * 2) + 60)
-            for i in ordered_timestamp_resolutions_count:
-                resolution = i[0]
-                if resolution == metric_resolution:
-                    continue
-                if resolution > airgap_duration:
-                    airgaps_present = True
-        if timestamp_resolutions_count:
-            del timestamp_resolutions_count
+            if np.any((timestamp_resolutions != metric_resolution) & (timestamp_resolutions > airgap_duration)):
+                airgaps_present = True
 
         # @added 20200214 - Bug #3448: Repeated airgapped_metrics
         #                   Feature #3400: Identify air gaps in the metric data
@@ -662,111 +672,249 @@ def identify_airgaps(metric_name, timeseries, airgapped_metrics, airgapped_metri
         # data. If backfilling is being done via Flux then unordered time series
         # data can be expected from time to time.  Although these metrics are
         # identified via their flux.filled Redis key, this is an additional test
-        # just to catch any that slip through the gaps.  This operation fairly
-        # fast, testing on 657 metrics with loading all the time series data and
-        # running the below function took 0.43558645248413086 seconds.
-        unordered_timeseries = False
-        for resolution in ordered_timestamp_resolutions_count:
-            if resolution[0] < 0:
-                unordered_timeseries = True
-                break
-
-        if ordered_timestamp_resolutions_count:
-            del ordered_timestamp_resolutions_count
+        # just to catch any that slip through the gaps.
+        unordered_timeseries = bool(np.any(timestamp_resolutions < 0))
+        del timestamp_resolutions
 
         # @added 20200214 - Bug #3448: Repeated airgapped_metrics
         #                      Feature #3400: Identify air gaps in the metric data
         # Here if airgaps are not being identifying, return whether the time
         # series is unordered
         if not IDENTIFY_AIRGAPS:
-            del airgaps_present
             return [], unordered_timeseries
         if airgaps_present:
             base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
-            # logger.info('airgaps present in %s - %s' % (base_name, str(ordered_timestamp_resolutions_count)))
             airgaps = []
-            last_timestamp = None
-            start_airgap = None
-            for metric_datapoint in timeseries:
-                timestamp = int(metric_datapoint[0])
-                # Handle the first timestamp
-                if not last_timestamp:
-                    last_timestamp = timestamp
+            # Any period less than MAX_AIRGAP_PERIOD is discarded, an air gap
+            # starts at a difference greater than the airgap_duration and ends
+            # at the next difference less than the airgap_duration
+            last_timestamps = timestamps[:-1]
+            differences = np.diff(timestamps)
+            in_airgap_period = timestamps[1:] >= max_airgap_timestamp
+            airgap_starts = np.flatnonzero(in_airgap_period & (differences > airgap_duration))
+            airgap_ends = np.flatnonzero(in_airgap_period & (differences < airgap_duration))
+            del differences
+            del in_airgap_period
+            next_index = 0
+            while True:
+                start_position = np.searchsorted(airgap_starts, next_index)
+                if start_position == len(airgap_starts):
+                    break
+                start_index = airgap_starts[start_position]
+                end_position = np.searchsorted(airgap_ends, start_index)
+                if end_position == len(airgap_ends):
+                    # If there is a start_airgap timestamp and no end_airgap
+                    # is set then the metric will be in a current air gap
+                    # state and/or it will become stale.  If the netric
+                    # starts sending data again, it will have the end_airgap
+                    # set and be added to airgapped_metrics
+                    break
+                end_index = airgap_ends[end_position]
+                next_index = end_index + 1
+                start_airgap = int(last_timestamps[start_index]) + 1
+                end_airgap = int(last_timestamps[end_index]) - 1
+                airgap_known = False
+                if airgapped_metrics:
+                    for i in airgapped_metrics:
+                        # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
+                        # Only literal_eval if required
+                        if base_name in i:
+                            airgap = literal_eval(i)
+                        else:
+                            continue
+                        airgap_metric_resolution = int(airgap[1])
+                        if metric_resolution != airgap_metric_resolution:
+                            continue
+                        if start_airgap == int(airgap[2]) and end_airgap == int(airgap[3]):
+                            airgap_known = True
+                            break
+                if airgap_known:
                     continue
-                # Discard any period less than MAX_AIRGAP_PERIOD
-                if timestamp < max_airgap_timestamp:
-                    last_timestamp = timestamp
+                # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
+                if start_airgap < max_airgap_timestamp or end_airgap < max_airgap_timestamp:
                     continue
-                original_last_timestamp = last_timestamp
-                difference = timestamp - last_timestamp
-                last_timestamp = timestamp
-                if difference < airgap_duration:
-                    if start_airgap:
-                        end_airgap = original_last_timestamp - 1
-                        airgap_known = False
-                        if airgapped_metrics:
-                            for i in airgapped_metrics:
-                                # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
-                                # Only literal_eval if required
-                                # airgap = literal_eval(i)
-                                # airgap_metric = str(airgap[0])
-                                # if base_name != airgap_metric:
-                                if base_name in i:
-                                    airgap = literal_eval(i)
-                                else:
-                                    continue
-                                airgap_metric_resolution = int(airgap[1])
-                                if metric_resolution != airgap_metric_resolution:
-                                    continue
-                                start_timestamp_present = False
-                                airgap_metric_start_timestamp = int(airgap[2])
-                                if start_airgap == airgap_metric_start_timestamp:
-                                    start_timestamp_present = True
-                                end_timestamp_present = False
-                                airgap_metric_end_timestamp = int(airgap[3])
-                                if end_airgap == airgap_metric_end_timestamp:
-                                    end_timestamp_present = True
-                                if start_timestamp_present and end_timestamp_present:
-                                    airgap_known = True
-                                    start_airgap = None
-                                    end_airgap = None
-                                    break
-                        if not airgap_known:
-                            # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
-                            add_airgap = True
-                            if start_airgap < max_airgap_timestamp:
-                                add_airgap = False
-                            if end_airgap < max_airgap_timestamp:
-                                add_airgap = False
-                            # @added 20200501 - Feature #3400: Identify air gaps in the metric data
-                            # Check airgapped_metrics_filled and if present do
-                            # do not add even if there is an airgap as the
-                            # airgap filler has reported it has filled all it
-                            # can
-                            if airgapped_metrics_filled:
-                                current_airgap = str([base_name, metric_resolution, start_airgap, end_airgap, 0])
-                                for i in airgapped_metrics_filled:
-                                    filled_airgap = str(i)
-                                    if filled_airgap == current_airgap:
-                                        airgap_known = True
-                                        start_airgap = None
-                                        end_airgap = None
-                                        add_airgap = False
-                                        break
-
-                            if add_airgap:
-                                airgaps.append([base_name, metric_resolution, start_airgap, end_airgap, 0])
-                            start_airgap = None
-                            end_airgap = None
+                # @added 20200501 - Feature #3400: Identify air gaps in the metric data
+                # Check airgapped_metrics_filled and if present do
+                # do not add even if there is an airgap as the
+                # airgap filler has reported it has filled all it
+                # can
+                current_airgap = [base_name, metric_resolution, start_airgap, end_airgap, 0]
+                if airgapped_metrics_filled:
+                    if str(current_airgap) in [str(i) for i in airgapped_metrics_filled]:
                         continue
-                if difference > airgap_duration:
-                    if not start_airgap:
-                        # If there is a start_airgap timestamp and no end_airgap
-                        # is set then the metric will be in a current air gap
-                        # state and/or it will become stale.  If the netric
-                        # starts sending data again, it will have the end_airgap
-                        # set and be added to airgapped_metrics
-                        start_airgap = original_last_timestamp + 1
+                airgaps.append(current_airgap)
+            del airgap_starts
+            del airgap_ends
+        del timestamps
+
+        # current_timestamp = int(time())
+        # max_airgap_timestamp = current_timestamp - MAX_AIRGAP_PERIOD
+        # # Determine resolution from the data within the MAX_AIRGAP_PERIOD
+        # resolution_timestamps = []
+        # metric_resolution_determined = False
+        # for metric_datapoint in timeseries:
+        #     timestamp = int(metric_datapoint[0])
+        #     if timestamp < max_airgap_timestamp:
+        #         continue
+        #     resolution_timestamps.append(timestamp)
+        # timestamp_resolutions = []
+        # if resolution_timestamps:
+        #     last_timestamp = None
+        #     for timestamp in resolution_timestamps:
+        #         if last_timestamp:
+        #             resolution = timestamp - last_timestamp
+        #             timestamp_resolutions.append(resolution)
+        #             last_timestamp = timestamp
+        #         else:
+        #             last_timestamp = timestamp
+        # if resolution_timestamps:
+        #     del resolution_timestamps
+        # timestamp_resolutions_count = None
+        # ordered_timestamp_resolutions_count = None
+        # metric_resolution = None
+        # if timestamp_resolutions:
+        #     try:
+        #         timestamp_resolutions_count = Counter(timestamp_resolutions)
+        #         ordered_timestamp_resolutions_count = timestamp_resolutions_count.most_common()
+        #         metric_resolution = int(ordered_timestamp_resolutions_count[0][0])
+        #         if metric_resolution > 0:
+        #             metric_resolution_determined = True
+        #     except:
+        #         traceback_format_exc_string = traceback.format_exc()
+        #         algorithm_name = str(get_function_name())
+        #         record_algorithm_error(algorithm_name, traceback_format_exc_string)
+        #         del timestamp_resolutions
+        #         # return None
+        #         return [], None
+        # if timestamp_resolutions:
+        #     del timestamp_resolutions
+        # airgaps_present = False
+        # if metric_resolution_determined and metric_resolution:
+        #     if metric_resolution < 600:
+        #         airgap_duration = ((int(metric_resolution) * 2) + int(int(metric_resolution) / 2))
+        #     else:
+        #         airgap_duration = ((int(metric_resolution) * 2) + 60)
+        #     for i in ordered_timestamp_resolutions_count:
+        #         resolution = i[0]
+        #         if resolution == metric_resolution:
+        #             continue
+        #         if resolution > airgap_duration:
+        #             airgaps_present = True
+        # if timestamp_resolutions_count:
+        #     del timestamp_resolutions_count
+
+        # # @added 20200214 - Bug #3448: Repeated airgapped_metrics
+        # #                   Feature #3400: Identify air gaps in the metric data
+        # # Identify metrics that have time series that are not ordered, for
+        # # Analyser to order and replace the existing Redis metric key time
+        # # data. If backfilling is being done via Flux then unordered time series
+        # # data can be expected from time to time.  Although these metrics are
+        # # identified via their flux.filled Redis key, this is an additional test
+        # # just to catch any that slip through the gaps.  This operation fairly
+        # # fast, testing on 657 metrics with loading all the time series data and
+        # # running the below function took 0.43558645248413086 seconds.
+        # unordered_timeseries = False
+        # for resolution in ordered_timestamp_resolutions_count:
+        #     if resolution[0] < 0:
+        #         unordered_timeseries = True
+        #         break
+
+        # if ordered_timestamp_resolutions_count:
+        #     del ordered_timestamp_resolutions_count
+
+        # # @added 20200214 - Bug #3448: Repeated airgapped_metrics
+        # #                      Feature #3400: Identify air gaps in the metric data
+        # # Here if airgaps are not being identifying, return whether the time
+        # # series is unordered
+        # if not IDENTIFY_AIRGAPS:
+        #     del airgaps_present
+        #     return [], unordered_timeseries
+        # if airgaps_present:
+        #     base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
+        #     # logger.info('airgaps present in %s - %s' % (base_name, str(ordered_timestamp_resolutions_count)))
+        #     airgaps = []
+        #     last_timestamp = None
+        #     start_airgap = None
+        #     for metric_datapoint in timeseries:
+        #         timestamp = int(metric_datapoint[0])
+        #         # Handle the first timestamp
+        #         if not last_timestamp:
+        #             last_timestamp = timestamp
+        #             continue
+        #         # Discard any period less than MAX_AIRGAP_PERIOD
+        #         if timestamp < max_airgap_timestamp:
+        #             last_timestamp = timestamp
+        #             continue
+        #         original_last_timestamp = last_timestamp
+        #         difference = timestamp - last_timestamp
+        #         last_timestamp = timestamp
+        #         if difference < airgap_duration:
+        #             if start_airgap:
+        #                 end_airgap = original_last_timestamp - 1
+        #                 airgap_known = False
+        #                 if airgapped_metrics:
+        #                     for i in airgapped_metrics:
+        #                         # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
+        #                         # Only literal_eval if required
+        #                         # airgap = literal_eval(i)
+        #                         # airgap_metric = str(airgap[0])
+        #                         # if base_name != airgap_metric:
+        #                         if base_name in i:
+        #                             airgap = literal_eval(i)
+        #                         else:
+        #                             continue
+        #                         airgap_metric_resolution = int(airgap[1])
+        #                         if metric_resolution != airgap_metric_resolution:
+        #                             continue
+        #                         start_timestamp_present = False
+        #                         airgap_metric_start_timestamp = int(airgap[2])
+        #                         if start_airgap == airgap_metric_start_timestamp:
+        #                             start_timestamp_present = True
+        #                         end_timestamp_present = False
+        #                         airgap_metric_end_timestamp = int(airgap[3])
+        #                         if end_airgap == airgap_metric_end_timestamp:
+        #                             end_timestamp_present = True
+        #                         if start_timestamp_present and end_timestamp_present:
+        #                             airgap_known = True
+        #                             start_airgap = None
+        #                             end_airgap = None
+        #                             break
+        #                 if not airgap_known:
+        #                     # @modified 20200213 - Bug #3448: Repeated airgapped_metrics
+        #                     add_airgap = True
+        #                     if start_airgap < max_airgap_timestamp:
+        #                         add_airgap = False
+        #                     if end_airgap < max_airgap_timestamp:
+        #                         add_airgap = False
+        #                     # @added 20200501 - Feature #3400: Identify air gaps in the metric data
+        #                     # Check airgapped_metrics_filled and if present do
+        #                     # do not add even if there is an airgap as the
+        #                     # airgap filler has reported it has filled all it
+        #                     # can
+        #                     if airgapped_metrics_filled:
+        #                         current_airgap = str([base_name, metric_resolution, start_airgap, end_airgap, 0])
+        #                         for i in airgapped_metrics_filled:
+        #                             filled_airgap = str(i)
+        #                             if filled_airgap == current_airgap:
+        #                                 airgap_known = True
+        #                                 start_airgap = None
+        #                                 end_airgap = None
+        #                                 add_airgap = False
+        #                                 break
+
+        #                     if add_airgap:
+        #                         airgaps.append([base_name, metric_resolution, start_airgap, end_airgap, 0])
+        #                     start_airgap = None
+        #                     end_airgap = None
+        #                 continue
+        #         if difference > airgap_duration:
+        #             if not start_airgap:
+        #                 # If there is a start_airgap timestamp and no end_airgap
+        #                 # is set then the metric will be in a current air gap
+        #                 # state and/or it will become stale.  If the netric
+        #                 # starts sending data again, it will have the end_airgap
+        #                 # set and be added to airgapped_metrics
+        #                 start_airgap = original_last_timestamp + 1
     except:
         traceback_format_exc_string = traceback.format_exc()
         algorithm_name = str(get_function_name())
@@ -986,7 +1134,12 @@ def run_selected_algorithm(timeseries, metric_name, airgapped_metrics, airgapped
             # @modified 20200501 - Feature #3400: Identify air gaps in the metric data
             # Added airgapped_metrics_filled
             # airgaps, unordered_timeseries = identify_airgaps(metric_name, timeseries, airgapped_metrics)
+            # @modified 20261019 - Feature #4720: Analyzer profiling
+            if stage_profiler.enabled:
+                stage_start = stage_profiler.start()
             airgaps, unordered_timeseries = identify_airgaps(metric_name, timeseries, airgapped_metrics, airgapped_metrics_filled)
+            if stage_profiler.enabled:
+                stage_profiler.end('airgaps', stage_start)
         if airgaps or unordered_timeseries:
             try:
                 redis_conn.ping()
@@ -1063,14 +1216,17 @@ def run_selected_algorithm(timeseries, metric_name, airgapped_metrics, airgapped
     else:
         time_all_algorithms = False
 
-    algorithm_tmp_file_prefix = '%s/%s.' % (SKYLINE_TMP_DIR, skyline_app)
+    # @modified 20261019 - Feature #4718: Metrics registry
+    # The algorithm timings are recorded in the metrics registry rather than
+    # appended to the count and timings tmp files
+    # algorithm_tmp_file_prefix = '%s/%s.' % (SKYLINE_TMP_DIR, skyline_app)
 
     for algorithm in ALGORITHMS:
         if consensus_possible:
 
-            if send_algorithm_run_metrics:
-                algorithm_count_file = '%s%s.count' % (algorithm_tmp_file_prefix, algorithm)
-                algorithm_timings_file = '%s%s.timings' % (algorithm_tmp_file_prefix, algorithm)
+            # if send_algorithm_run_metrics:
+            #     algorithm_count_file = '%s%s.count' % (algorithm_tmp_file_prefix, algorithm)
+            #     algorithm_timings_file = '%s%s.timings' % (algorithm_tmp_file_prefix, algorithm)
 
             run_algorithm = []
             run_algorithm.append(algorithm)
@@ -1085,10 +1241,11 @@ def run_selected_algorithm(timeseries, metric_name, airgapped_metrics, airgapped
 
             if send_algorithm_run_metrics:
                 end = timer()
-                with open(algorithm_count_file, 'a') as f:
-                    f.write('1\n')
-                with open(algorithm_timings_file, 'a') as f:
-                    f.write('%.6f\n' % (end - start))
+                # with open(algorithm_count_file, 'a') as f:
+                #     f.write('1\n')
+                # with open(algorithm_timings_file, 'a') as f:
+                #     f.write('%.6f\n' % (end - start))
+                metrics_registry.record('algorithm_breakdown.%s.timing' % algorithm, (end - start))
         else:
             algorithm_result = [False]
             # logger.info('CONSENSUS NOT ACHIEVABLE - skipping %s' % (str(algorithm)))
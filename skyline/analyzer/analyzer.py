@@ -48,15 +48,27 @@ from skyline_functions import (
 from matched_or_regexed_in_list import matched_or_regexed_in_list
 
 from alerters import trigger_alert
+# @added 20261019 - Alert graph render pool
+from alerters import alert_smtp_redis_graph
+# @added 20261019 - Alert dispatcher
+from alert_dispatcher import AlertDispatcher
 from algorithms import run_selected_algorithm
 from algorithm_exceptions import TooShort, Stale, Boring
+# @added 20261019 - Feature #4718: Metrics registry
+from metrics_registry import metrics_registry
+# @added 20261019 - Feature #4720: Analyzer profiling
+from stage_profiler import stage_profiler, profile_cycle_dir
+# @added 20261019 - Feature #4728: Anomalies snapshots
+from anomalies_snapshot import write_anomalies_snapshot
 
 try:
     send_algorithm_run_metrics = settings.ENABLE_ALGORITHM_RUN_METRICS
 except:
     send_algorithm_run_metrics = False
-if send_algorithm_run_metrics:
-    from algorithms import determine_array_median
+# @modified 20261019 - Feature #4718: Metrics registry
+# The algorithm timings are aggregated in the metrics registry
+# if send_algorithm_run_metrics:
+#     from algorithms import determine_array_median
 
 # TODO if settings.ENABLE_CRUCIBLE: and ENABLE_PANORAMA
 #    from spectrum import push_to_crucible
@@ -180,6 +192,24 @@ try:
 except:
     inactive_after = settings.FULL_DURATION - 3600
 
+# @added 20261019 - Feature #4720: Analyzer profiling
+try:
+    ANALYZER_PROFILE = settings.ANALYZER_PROFILE
+except:
+    ANALYZER_PROFILE = False
+try:
+    ANALYZER_PROFILE_DIR = settings.ANALYZER_PROFILE_DIR
+except:
+    ANALYZER_PROFILE_DIR = '%s/profiles' % settings.SKYLINE_TMP_DIR
+try:
+    ANALYZER_PROFILE_CYCLES = int(settings.ANALYZER_PROFILE_CYCLES)
+except:
+    ANALYZER_PROFILE_CYCLES = 10
+try:
+    ANALYZER_PROFILE_PROCESS = int(settings.ANALYZER_PROFILE_PROCESS)
+except:
+    ANALYZER_PROFILE_PROCESS = 1
+
 # @added 20190522 - Feature #2580: illuminance
 # Disabled for now as in concept phase.  This would work better if
 # the illuminance_datapoint was determined from the time series
@@ -206,6 +236,7 @@ class Analyzer(Thread):
 
         Create the :obj:`self.exceptions_q` queue
         Create the :obj:`self.anomaly_breakdown_q` queue
+        Create the :obj:`self.metrics_registry_q` queue
 
         """
         super(Analyzer, self).__init__()
@@ -240,6 +271,12 @@ class Analyzer(Thread):
         # self.anomalous_metrics = Manager().list()
         self.exceptions_q = Queue()
         self.anomaly_breakdown_q = Queue()
+        # @added 20261019 - Feature #4718: Metrics registry
+        # The metrics registry snapshot of each spin_process
+        self.metrics_registry_q = Queue()
+        # @added 20261019 - Feature #4720: Analyzer profiling
+        # The profile directory of the run when ANALYZER_PROFILE is enabled
+        self.profile_cycle_dir = None
         # @modified 20160813 - Bug #1558: Memory leak in Analyzer
         # Not used
         # self.mirage_metrics = Manager().list()
@@ -336,6 +373,19 @@ class Analyzer(Thread):
 
         spin_start = time()
         logger.info('spin_process started')
+
+        # @added 20261019 - Feature #4718: Metrics registry
+        #                   Feature #4720: Analyzer profiling
+        # Time the stages in the metrics registry and, if ANALYZER_PROFILE is
+        # enabled, trace the stages and cProfile the ANALYZER_PROFILE_PROCESS
+        stage_registry = None
+        if send_algorithm_run_metrics:
+            stage_registry = metrics_registry
+        stage_profiler.configure(
+            skyline_app, i, registry=stage_registry,
+            cycle_dir=self.profile_cycle_dir,
+            cprofile=(i == ANALYZER_PROFILE_PROCESS))
+        stage_profiler.enable()
         if LOCAL_DEBUG:
             logger.info('debug :: Memory usage spin_process start: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
 
@@ -387,7 +437,14 @@ class Analyzer(Thread):
         # @modified 20160801 - Adding additional exception handling to Analyzer
         raw_assigned_failed = True
         try:
+            # @added 20261019 - Feature #4718: Metrics registry
+            #                   Feature #4720: Analyzer profiling
+            # Record the time taken by each stage
+            if stage_profiler.enabled:
+                stage_start = stage_profiler.start()
             raw_assigned = self.redis_conn.mget(assigned_metrics)
+            if stage_profiler.enabled:
+                stage_profiler.end('redis_read', stage_start)
             raw_assigned_failed = False
             if LOCAL_DEBUG:
                 logger.info('debug :: Memory usage spin_process after raw_assigned: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -725,6 +782,10 @@ class Analyzer(Thread):
             if LOCAL_DEBUG:
                 logger.info('debug :: checking %s' % str(metric_name))
 
+            # @added 20261019 - Feature #4718: Metrics registry
+            #                   Feature #4720: Analyzer profiling
+            if stage_profiler.enabled:
+                stage_start = stage_profiler.start()
             try:
                 raw_series = raw_assigned[i]
                 unpacker = Unpacker(use_list=False)
@@ -732,6 +793,10 @@ class Analyzer(Thread):
                 timeseries = list(unpacker)
             except:
                 timeseries = []
+            # @added 20261019 - Feature #4718: Metrics registry
+            #                   Feature #4720: Analyzer profiling
+            if stage_profiler.enabled:
+                stage_profiler.end('decode', stage_start)
 
             # @added 20200506 - Feature #3532: Sort all time series
             # To ensure that there are no unordered timestamps in the time
@@ -739,7 +804,13 @@ class Analyzer(Thread):
             # all time series by timestamp before analysis.
             original_timeseries = timeseries
             if original_timeseries:
+                # @added 20261019 - Feature #4718: Metrics registry
+                #                   Feature #4720: Analyzer profiling
+                if stage_profiler.enabled:
+                    stage_start = stage_profiler.start()
                 timeseries = sort_timeseries(original_timeseries)
+                if stage_profiler.enabled:
+                    stage_profiler.end('sort', stage_start)
                 del original_timeseries
 
             base_name = metric_name.replace(settings.FULL_NAMESPACE, '', 1)
@@ -796,6 +867,9 @@ class Analyzer(Thread):
             # @added 20200501 -
             # Added get_updated_redis_timeseries
             get_updated_redis_timeseries = False
+            # @added 20261019 - Feature #4720: Analyzer profiling
+            if stage_profiler.enabled and IDENTIFY_AIRGAPS and flux_filled_keys:
+                flux_resort_start = stage_profiler.start()
             if IDENTIFY_AIRGAPS and flux_filled_keys:
                 metric_flux_filled_key = 'flux.filled.%s' % str(base_name)
                 sorted_and_deduplicated_timeseries = None
@@ -1041,6 +1115,10 @@ class Analyzer(Thread):
 
                     timeseries = updated_timeseries
 
+            # @added 20261019 - Feature #4720: Analyzer profiling
+            if stage_profiler.enabled and IDENTIFY_AIRGAPS and flux_filled_keys:
+                stage_profiler.end('flux_resort', flux_resort_start)
+
             # @added 20200411 - Feature #3480: batch_processing
             batch_metric = False
             check_for_airgaps_only = False
@@ -1394,7 +1472,15 @@ class Analyzer(Thread):
                 # @modified 20200501 - Feature #3400: Identify air gaps in the metric data
                 # Added metric_airgaps_filled and check_for_airgaps_only
                 # anomalous, ensemble, datapoint, negatives_found = run_selected_algorithm(timeseries, metric_name, metric_airgaps, run_negatives_present)
+                # @added 20261019 - Feature #4718: Metrics registry
+                #                   Feature #4720: Analyzer profiling
+                # The airgaps stage is nested in the algorithms stage, the
+                # stage profiler records the algorithms self time without it
+                if stage_profiler.enabled:
+                    stage_start = stage_profiler.start()
                 anomalous, ensemble, datapoint, negatives_found = run_selected_algorithm(timeseries, metric_name, metric_airgaps, metric_airgaps_filled, run_negatives_present, check_for_airgaps_only)
+                if stage_profiler.enabled:
+                    stage_profiler.end('algorithms', stage_start)
                 del metric_airgaps
                 del metric_airgaps_filled
 
@@ -1434,7 +1520,13 @@ class Analyzer(Thread):
                             try:
                                 base_name = metric_name.replace(settings.FULL_NAMESPACE, '', 1)
                                 data = [base_name, int(metric_timestamp)]
+                                # @modified 20261019 - Feature #4718: Metrics registry
+                                #                      Feature #4720: Analyzer profiling
+                                if stage_profiler.enabled:
+                                    stage_start = stage_profiler.start()
                                 self.redis_conn.sadd(redis_set, str(data))
+                                if stage_profiler.enabled:
+                                    stage_profiler.end('redis_writes', stage_start)
                             except Exception as e:
                                 logger.info(traceback.format_exc())
                                 logger.error('error :: failed to add %s to Redis set %s: %s' % (
@@ -1460,7 +1552,13 @@ class Analyzer(Thread):
                     redis_set = 'analyzer.real_anomalous_metrics'
                     data = str(metric)
                     try:
+                        # @modified 20261019 - Feature #4718: Metrics registry
+                        #                      Feature #4720: Analyzer profiling
+                        if stage_profiler.enabled:
+                            stage_start = stage_profiler.start()
                         self.redis_conn.sadd(redis_set, data)
+                        if stage_profiler.enabled:
+                            stage_profiler.end('redis_writes', stage_start)
                     except:
                         logger.info(traceback.format_exc())
                         logger.error('error :: failed to add %s to Redis set %s' % (
@@ -1899,7 +1997,12 @@ class Analyzer(Thread):
             except TooShort:
                 exceptions['TooShort'] += 1
                 try:
+                    # @modified 20261019 - Feature #4720: Analyzer profiling
+                    if stage_profiler.enabled:
+                        stage_start = stage_profiler.start()
                     self.redis_conn.sadd('analyzer.too_short', base_name)
+                    if stage_profiler.enabled:
+                        stage_profiler.end('redis_writes', stage_start)
                 except:
                     redis_set_errors += 1
                 # @added 20200423 - Feature #3504: Handle airgaps in batch metrics
@@ -1928,7 +2031,12 @@ class Analyzer(Thread):
             except Stale:
                 exceptions['Stale'] += 1
                 try:
+                    # @modified 20261019 - Feature #4720: Analyzer profiling
+                    if stage_profiler.enabled:
+                        stage_start = stage_profiler.start()
                     self.redis_conn.sadd('analyzer.stale', base_name)
+                    if stage_profiler.enabled:
+                        stage_profiler.end('redis_writes', stage_start)
                 except:
                     redis_set_errors += 1
                 # @added 20200423 - Feature #3504: Handle airgaps in batch metrics
@@ -1951,7 +2059,12 @@ class Analyzer(Thread):
             except Boring:
                 exceptions['Boring'] += 1
                 try:
+                    # @modified 20261019 - Feature #4720: Analyzer profiling
+                    if stage_profiler.enabled:
+                        stage_start = stage_profiler.start()
                     self.redis_conn.sadd('analyzer.boring', base_name)
+                    if stage_profiler.enabled:
+                        stage_profiler.end('redis_writes', stage_start)
                 except:
                     redis_set_errors += 1
                 # @added 20200423 - Feature #3504: Handle airgaps in batch metrics
@@ -2023,6 +2136,27 @@ class Analyzer(Thread):
         for key, value in exceptions.items():
             self.exceptions_q.put((key, value))
 
+        # @added 20261019 - Feature #4720: Analyzer profiling
+        # Write the stage trace and pstats of the process to the profile cycle
+        # directory
+        if self.profile_cycle_dir:
+            try:
+                profile_files = stage_profiler.write()
+                logger.info('spin_process %s :: profile files written - %s' % (
+                    str(stage_profiler.process_number), str(profile_files)))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to write the profile files of the spin_process')
+
+        # @added 20261019 - Feature #4718: Metrics registry
+        # Send the algorithm and stage timings and the algorithm errors of the
+        # process to the parent to merge
+        try:
+            self.metrics_registry_q.put(metrics_registry.snapshot())
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to add the metrics_registry snapshot to metrics_registry_q')
+
         if LOCAL_DEBUG:
             logger.info('debug :: Memory usage spin_process end: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
 
@@ -2124,46 +2258,75 @@ class Analyzer(Thread):
                 logger.error('error :: failed to create %s' % settings.SKYLINE_TMP_DIR)
                 logger.info(traceback.format_exc())
 
+        # @added 20261019 - Alert dispatcher
+        # Alerts are added to the queue of the alert dispatcher thread which
+        # sends them in alerter processes, Analyzer does not wait on them
+        # @modified 20261019 - Alert graph render pool
+        # The Redis data graphs of smtp alerts are rendered by the render pool
+        # of the alert dispatcher while the alerts are queued
+        # alert_dispatcher = AlertDispatcher(skyline_app, trigger_alert)
+        try:
+            plot_redis_data = settings.PLOT_REDIS_DATA
+        except:
+            plot_redis_data = False
+        alert_graph_render_function = None
+        if settings.SMTP_OPTS.get('embed-images') and plot_redis_data:
+            alert_graph_render_function = alert_smtp_redis_graph
+        alert_dispatcher = AlertDispatcher(
+            skyline_app, trigger_alert, alert_graph_render_function)
+        alert_dispatcher.start()
+
+        def dispatch_alert(alert, metric, context):
+            cache_key = 'last_alert.%s.%s' % (alert[1], metric[1])
+            alert_dispatcher.enqueue(alert[1], cache_key, (alert, metric, context))
+
         def smtp_trigger_alert(alert, metric, context):
-            # Spawn processes
-            pids = []
-            spawned_pids = []
-            pid_count = 0
-            try:
-                p = Process(target=self.spawn_alerter_process, args=(alert, metric, context))
-                pids.append(p)
-                pid_count += 1
-                p.start()
-                spawned_pids.append(p.pid)
-            except:
-                logger.error('error :: failed to spawn_alerter_process')
-                logger.info(traceback.format_exc())
-            p_starts = time()
-            while time() - p_starts <= 15:
-                if any(p.is_alive() for p in pids):
-                    # Just to avoid hogging the CPU
-                    sleep(.1)
-                else:
-                    # All the processes are done, break now.
-                    break
-            else:
-                # We only enter this if we didn't 'break' above.
-                logger.info('%s :: timed out, killing the spawn_trigger_alert process' % (skyline_app))
-                for p in pids:
-                    p.terminate()
-                    # p.join()
+            # @modified 20261019 - Alert dispatcher
+            # Add the alert to the alert dispatcher queue rather than spawning a
+            # spawn_alerter_process and waiting up to 15 seconds for it, so that
+            # the alerts do not stall the Analyzer run
+            # # Spawn processes
+            # pids = []
+            # spawned_pids = []
+            # pid_count = 0
+            # try:
+            #     p = Process(target=self.spawn_alerter_process, args=(alert, metric, context))
+            #     pids.append(p)
+            #     pid_count += 1
+            #     p.start()
+            #     spawned_pids.append(p.pid)
+            # except:
+            #     logger.error('error :: failed to spawn_alerter_process')
+            #     logger.info(traceback.format_exc())
+            # p_starts = time()
+            # while time() - p_starts <= 15:
+            #     if any(p.is_alive() for p in pids):
+            #         # Just to avoid hogging the CPU
+            #         sleep(.1)
+            #     else:
+            #         # All the processes are done, break now.
+            #         break
+            # else:
+            #     # We only enter this if we didn't 'break' above.
+            #     logger.info('%s :: timed out, killing the spawn_trigger_alert process' % (skyline_app))
+            #     for p in pids:
+            #         p.terminate()
+            #         # p.join()
 
-            for p in pids:
-                if p.is_alive():
-                    logger.info('%s :: stopping spawn_trigger_alert - %s' % (skyline_app, str(p.is_alive())))
-                    p.join()
+            # for p in pids:
+            #     if p.is_alive():
+            #         logger.info('%s :: stopping spawn_trigger_alert - %s' % (skyline_app, str(p.is_alive())))
+            #         p.join()
+            dispatch_alert(alert, metric, context)
 
         # Initiate the algorithm timings if Analyzer is configured to send the
         # algorithm_breakdown metrics with ENABLE_ALGORITHM_RUN_METRICS
-        algorithm_tmp_file_prefix = settings.SKYLINE_TMP_DIR + '/' + skyline_app + '.'
-        algorithms_to_time = []
-        if send_algorithm_run_metrics:
-            algorithms_to_time = settings.ALGORITHMS
+        # @modified 20261019 - Feature #4718: Metrics registry
+        # The algorithm timings are recorded in the metrics registry
+        # algorithm_tmp_file_prefix = settings.SKYLINE_TMP_DIR + '/' + skyline_app + '.'
+        # algorithms_to_time = []
+        # if send_algorithm_run_metrics:
+        #     algorithms_to_time = settings.ALGORITHMS
 
         if LOCAL_DEBUG:
             logger.info('debug :: Memory usage in run after algorithms_to_time: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -2551,26 +2714,46 @@ class Analyzer(Thread):
             except:
                 pass
 
-            # Using count files rather that multiprocessing.Value to enable metrics for
-            # metrics for algorithm run times, etc
-            for algorithm in algorithms_to_time:
-                algorithm_count_file = algorithm_tmp_file_prefix + algorithm + '.count'
-                algorithm_timings_file = algorithm_tmp_file_prefix + algorithm + '.timings'
-                # with open(algorithm_count_file, 'a') as f:
-                # @modified 20160803 - Adding additional exception handling to Analyzer
-                try:
-                    with open(algorithm_count_file, 'w') as f:
-                        pass
-                except:
-                    logger.error('error :: could not create file %s' % algorithm_count_file)
-                    logger.info(traceback.format_exc())
-
+            # @modified 20261019 - Feature #4718: Metrics registry
+            # The algorithm timings are recorded in the metrics registry of each
+            # spin_process and merged from the metrics_registry_q rather than
+            # using count files.  Reset the metrics registry so that the
+            # spawned processes start with an empty registry
+            metrics_registry.reset()
+
+            # @added 20261019 - Feature #4720: Analyzer profiling
+            # Create the profile directory of the run, the spawned processes
+            # write their stage traces and pstats to it
+            self.profile_cycle_dir = None
+            if ANALYZER_PROFILE:
                 try:
-                    with open(algorithm_timings_file, 'w') as f:
-                        pass
+                    self.profile_cycle_dir = profile_cycle_dir(
+                        ANALYZER_PROFILE_DIR, skyline_app, ANALYZER_PROFILE_CYCLES)
+                    logger.info('profiling the run to %s' % self.profile_cycle_dir)
                 except:
-                    logger.error('error :: could not create file %s' % algorithm_timings_file)
-                    logger.info(traceback.format_exc())
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to create the profile directory in %s' % ANALYZER_PROFILE_DIR)
+
+            # # Using count files rather that multiprocessing.Value to enable metrics for
+            # # metrics for algorithm run times, etc
+            # for algorithm in algorithms_to_time:
+            #     algorithm_count_file = algorithm_tmp_file_prefix + algorithm + '.count'
+            #     algorithm_timings_file = algorithm_tmp_file_prefix + algorithm + '.timings'
+            #     # with open(algorithm_count_file, 'a') as f:
+            #     # @modified 20160803 - Adding additional exception handling to Analyzer
+            #     try:
+            #         with open(algorithm_count_file, 'w') as f:
+            #             pass
+            #     except:
+            #         logger.error('error :: could not create file %s' % algorithm_count_file)
+            #         logger.info(traceback.format_exc())
+
+            #     try:
+            #         with open(algorithm_timings_file, 'w') as f:
+            #             pass
+            #     except:
+            #         logger.error('error :: could not create file %s' % algorithm_timings_file)
+            #         logger.info(traceback.format_exc())
 
             if LOCAL_DEBUG:
                 logger.info('debug :: Memory usage in run before removing algorithm_count_files and algorithm_timings_files: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -2657,28 +2840,53 @@ class Analyzer(Thread):
                     logger.info('%s :: stopping spin_process - %s' % (skyline_app, str(p.is_alive())))
                     p.join()
 
-            # Log the last reported error by any algorithms that errored in the
-            # spawned processes from algorithms.py
+            # @modified 20261019 - Feature #4718: Metrics registry
+            # The algorithm errors are sampled in the metrics registry snapshots
+            # rather than in algorithm.error files
+            # # Log the last reported error by any algorithms that errored in the
+            # # spawned processes from algorithms.py
+            # for completed_pid in spawned_pids:
+            #     logger.info('spin_process with pid %s completed' % (str(completed_pid)))
+            #     for algorithm in settings.ALGORITHMS:
+            #         algorithm_error_file = '%s/%s.%s.%s.algorithm.error' % (
+            #             settings.SKYLINE_TMP_DIR, skyline_app,
+            #             str(completed_pid), algorithm)
+            #         if os.path.isfile(algorithm_error_file):
+            #             logger.info(
+            #                 'error :: spin_process with pid %s has reported an error with the %s algorithm' % (
+            #                     str(completed_pid), algorithm))
+            #             try:
+            #                 with open(algorithm_error_file, 'r') as f:
+            #                     error_string = f.read()
+            #                 logger.error('%s' % str(error_string))
+            #             except:
+            #                 logger.error('error :: failed to read %s error file' % algorithm)
+            #             try:
+            #                 os.remove(algorithm_error_file)
+            #             except OSError:
+            #                 pass
+
+            # @added 20261019 - Feature #4718: Metrics registry
+            # Merge the metrics registry snapshots of the spawned processes
             for completed_pid in spawned_pids:
                 logger.info('spin_process with pid %s completed' % (str(completed_pid)))
-                for algorithm in settings.ALGORITHMS:
-                    algorithm_error_file = '%s/%s.%s.%s.algorithm.error' % (
-                        settings.SKYLINE_TMP_DIR, skyline_app,
-                        str(completed_pid), algorithm)
-                    if os.path.isfile(algorithm_error_file):
-                        logger.info(
-                            'error :: spin_process with pid %s has reported an error with the %s algorithm' % (
-                                str(completed_pid), algorithm))
-                        try:
-                            with open(algorithm_error_file, 'r') as f:
-                                error_string = f.read()
-                            logger.error('%s' % str(error_string))
-                        except:
-                            logger.error('error :: failed to read %s error file' % algorithm)
-                        try:
-                            os.remove(algorithm_error_file)
-                        except OSError:
-                            pass
+            while 1:
+                try:
+                    metrics_registry_snapshot = self.metrics_registry_q.get_nowait()
+                    metrics_registry.merge(metrics_registry_snapshot)
+                except Empty:
+                    break
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to merge a metrics_registry snapshot')
+            # Log the last reported error by any algorithms that errored in the
+            # spawned processes from algorithms.py
+            for algorithm in sorted(metrics_registry.errors):
+                error_count, error_string = metrics_registry.errors[algorithm]
+                logger.info(
+                    'error :: spin_process/es reported %s errors with the %s algorithm' % (
+                        str(error_count), algorithm))
+                logger.error('%s' % str(error_string))
 
             if LOCAL_DEBUG:
                 logger.info('debug :: Memory usage after spin_process spawned processes finish: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -3112,10 +3320,12 @@ class Analyzer(Thread):
                                 self.redis_conn.setex(cache_key, alert[2], int(metric[2]))
                                 logger.info('triggering alert ENABLE_FULL_DURATION_ALERTS :: %s %s via %s' % (metric[1], metric[0], alert[1]))
                                 try:
-                                    if alert[1] != 'smtp':
-                                        trigger_alert(alert, metric, context)
-                                    else:
-                                        smtp_trigger_alert(alert, metric, context)
+                                    # @modified 20261019 - Alert dispatcher
+                                    # if alert[1] != 'smtp':
+                                    #     trigger_alert(alert, metric, context)
+                                    # else:
+                                    #     smtp_trigger_alert(alert, metric, context)
+                                    dispatch_alert(alert, metric, context)
                                 except:
                                     logger.error(
                                         'error :: failed to trigger_alert ENABLE_FULL_DURATION_ALERTS :: %s %s via %s' %
@@ -3303,16 +3513,22 @@ class Analyzer(Thread):
                                     'debug :: Memory usage in run before triggering alert: %s (kb)' %
                                     resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
                             try:
-                                if alert[1] != 'smtp':
-                                    trigger_alert(alert, metric, context)
-                                    logger.info('trigger_alert :: alert: %s, metric: %s, context: %s' % (
-                                        str(alert), str(metric), str(context)))
-                                else:
-                                    smtp_trigger_alert(alert, metric, context)
-                                    logger.info('smtp_trigger_alert :: alert: %s, metric: %s, context: %s' % (
-                                        str(alert), str(metric), str(context)))
-                                    if LOCAL_DEBUG:
-                                        logger.info('debug :: smtp_trigger_alert spawned')
+                                # @modified 20261019 - Alert dispatcher
+                                # All alerters are dispatched by the alert
+                                # dispatcher
+                                # if alert[1] != 'smtp':
+                                #     trigger_alert(alert, metric, context)
+                                #     logger.info('trigger_alert :: alert: %s, metric: %s, context: %s' % (
+                                #         str(alert), str(metric), str(context)))
+                                # else:
+                                #     smtp_trigger_alert(alert, metric, context)
+                                #     logger.info('smtp_trigger_alert :: alert: %s, metric: %s, context: %s' % (
+                                #         str(alert), str(metric), str(context)))
+                                #     if LOCAL_DEBUG:
+                                #         logger.info('debug :: smtp_trigger_alert spawned')
+                                dispatch_alert(alert, metric, context)
+                                logger.info('dispatch_alert :: alert: %s, metric: %s, context: %s' % (
+                                    str(alert), str(metric), str(context)))
                                 if LOCAL_DEBUG:
                                     logger.info(
                                         'debug :: Memory usage in run after triggering alert: %s (kb)' %
@@ -3358,27 +3574,37 @@ class Analyzer(Thread):
                 if real_anomalous_metrics_count > 0:
                     filename = path.abspath(path.join(path.dirname(__file__), '..', settings.ANOMALY_DUMP))
                     try:
-                        with open(filename, 'w') as fh:
-                            # Make it JSONP with a handle_data() function
-                            # @modified 20190408 - Feature #2882: Mirage - periodic_check
-                            # Do not count Mirage periodic checks
-                            # anomalous_metrics = list(self.anomalous_metrics)
-                            # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
-                            # anomalous_metrics = list(self.real_anomalous_metrics)
-                            real_anomalous_metrics = []
-                            try:
-                                # @modified 20191014 - Bug #3266: py3 Redis binary objects not strings
-                                #                      Branch #3262: py3
-                                # literal_real_anomalous_metrics = list(self.redis_conn.smembers('analyzer.real_anomalous_metrics'))
-                                literal_real_anomalous_metrics = list(self.redis_conn_decoded.smembers('analyzer.real_anomalous_metrics'))
-                                for metric_list_string in literal_real_anomalous_metrics:
-                                    metric = literal_eval(metric_list_string)
-                                    real_anomalous_metrics.append(metric)
-                            except:
-                                logger.info(traceback.format_exc())
-                                logger.error('error :: failed to generate list from Redis set analyzer.real_anomalous_metrics')
-                            real_anomalous_metrics.sort(key=operator.itemgetter(1))
-                            fh.write('handle_data(%s)' % real_anomalous_metrics)
+                        # @modified 20261019 - Feature #4728: Anomalies snapshots
+                        # The ANOMALY_DUMP is written with a versioned, gzipped
+                        # snapshot of the anomalies for the webapp by
+                        # write_anomalies_snapshot
+                        # with open(filename, 'w') as fh:
+                        # Make it JSONP with a handle_data() function
+                        # @modified 20190408 - Feature #2882: Mirage - periodic_check
+                        # Do not count Mirage periodic checks
+                        # anomalous_metrics = list(self.anomalous_metrics)
+                        # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
+                        # anomalous_metrics = list(self.real_anomalous_metrics)
+                        real_anomalous_metrics = []
+                        try:
+                            # @modified 20191014 - Bug #3266: py3 Redis binary objects not strings
+                            #                      Branch #3262: py3
+                            # literal_real_anomalous_metrics = list(self.redis_conn.smembers('analyzer.real_anomalous_metrics'))
+                            literal_real_anomalous_metrics = list(self.redis_conn_decoded.smembers('analyzer.real_anomalous_metrics'))
+                            for metric_list_string in literal_real_anomalous_metrics:
+                                metric = literal_eval(metric_list_string)
+                                real_anomalous_metrics.append(metric)
+                        except:
+                            logger.info(traceback.format_exc())
+                            logger.error('error :: failed to generate list from Redis set analyzer.real_anomalous_metrics')
+                        real_anomalous_metrics.sort(key=operator.itemgetter(1))
+                        # fh.write('handle_data(%s)' % real_anomalous_metrics)
+                        # @modified 20261019 - Feature #4728: Anomalies snapshots
+                        # Each app publishes to its own snapshots directory
+                        snapshot_version, snapshot_etag = write_anomalies_snapshot(
+                            filename, real_anomalous_metrics, skyline_app)
+                        logger.info('anomalies snapshot version %s - %s' % (
+                            str(snapshot_version), snapshot_etag))
                     except:
                         logger.info(traceback.format_exc())
                         logger.error(
@@ -3423,104 +3649,118 @@ class Analyzer(Thread):
             if LOCAL_DEBUG:
                 logger.info('debug :: Memory usage in run before algorithm test run times: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
 
-            for algorithm in algorithms_to_time:
-                algorithm_count_file = algorithm_tmp_file_prefix + algorithm + '.count'
-                algorithm_timings_file = algorithm_tmp_file_prefix + algorithm + '.timings'
-
-                try:
-                    algorithm_count_array = []
-                    with open(algorithm_count_file, 'r') as f:
-                        for line in f:
-                            value_string = line.replace('\n', '')
-                            unquoted_value_string = value_string.replace("'", '')
-                            float_value = float(unquoted_value_string)
-                            algorithm_count_array.append(float_value)
-                except:
-                    algorithm_count_array = False
-
-                if not algorithm_count_array:
-                    continue
-
-                number_of_times_algorithm_run = len(algorithm_count_array)
-                logger.info(
-                    'algorithm run count - %s run %s times' % (
-                        algorithm, str(number_of_times_algorithm_run)))
-                if number_of_times_algorithm_run == 0:
-                    continue
-
-                try:
-                    algorithm_timings_array = []
-                    with open(algorithm_timings_file, 'r') as f:
-                        for line in f:
-                            value_string = line.replace('\n', '')
-                            unquoted_value_string = value_string.replace("'", '')
-                            float_value = float(unquoted_value_string)
-                            algorithm_timings_array.append(float_value)
-                except:
-                    algorithm_timings_array = False
-
-                if not algorithm_timings_array:
-                    continue
-
-                number_of_algorithm_timings = len(algorithm_timings_array)
-                logger.info(
-                    'algorithm timings count - %s has %s timings' % (
-                        algorithm, str(number_of_algorithm_timings)))
-
-                if number_of_algorithm_timings == 0:
-                    continue
-
-                try:
-                    _sum_of_algorithm_timings = sum(algorithm_timings_array)
-                except:
-                    logger.error("sum error: " + traceback.format_exc())
-                    _sum_of_algorithm_timings = round(0.0, 6)
-                    logger.error('error - sum_of_algorithm_timings - %s' % (algorithm))
-                    continue
-
-                sum_of_algorithm_timings = round(_sum_of_algorithm_timings, 6)
-                # logger.info('sum_of_algorithm_timings - %s - %.16f seconds' % (algorithm, sum_of_algorithm_timings))
-
-                try:
-                    _median_algorithm_timing = determine_array_median(algorithm_timings_array)
-                except:
-                    _median_algorithm_timing = round(0.0, 6)
-                    logger.error('error - _median_algorithm_timing - %s' % (algorithm))
-                    continue
-                median_algorithm_timing = round(_median_algorithm_timing, 6)
-                # logger.info('median_algorithm_timing - %s - %.16f seconds' % (algorithm, median_algorithm_timing))
-
-                logger.info(
-                    'algorithm timing - %s - total: %.6f - median: %.6f' % (
-                        algorithm, sum_of_algorithm_timings,
-                        median_algorithm_timing))
-                use_namespace = skyline_app_graphite_namespace + '.algorithm_breakdown.' + algorithm
-                send_metric_name = use_namespace + '.timing.times_run'
-                send_graphite_metric(skyline_app, send_metric_name, str(number_of_algorithm_timings))
-                send_metric_name = use_namespace + '.timing.total_time'
-                send_graphite_metric(skyline_app, send_metric_name, str(sum_of_algorithm_timings))
-                send_metric_name = use_namespace + '.timing.median_time'
-                send_graphite_metric(skyline_app, send_metric_name, str(median_algorithm_timing))
-
-                # We del all variables that are floats as they become unique objects and
-                # can result in what appears to be a memory leak, but is not, just the
-                # way Python handles floats
-                try:
-                    del _sum_of_algorithm_timings
-                except:
-                    logger.error('error :: failed to del _sum_of_algorithm_timings')
-                try:
-                    del _median_algorithm_timing
-                except:
-                    logger.error('error :: failed to del _median_algorithm_timing')
-                try:
-                    del sum_of_algorithm_timings
-                except:
-                    logger.error('error :: failed to del sum_of_algorithm_timings')
-                try:
-                    del median_algorithm_timing
-                except:
-                    logger.error('error :: failed to del median_algorithm_timing')
+            # @modified 20261019 - Feature #4718: Metrics registry
+            # Send the algorithm timings, stage timings and algorithm error
+            # counts merged from the metrics registries of the spin_process/es
+            # once per run rather than reading the count and timings files
+            # for algorithm in algorithms_to_time:
+            #     algorithm_count_file = algorithm_tmp_file_prefix + algorithm + '.count'
+            #     algorithm_timings_file = algorithm_tmp_file_prefix + algorithm + '.timings'
+
+            #     try:
+            #         algorithm_count_array = []
+            #         with open(algorithm_count_file, 'r') as f:
+            #             for line in f:
+            #                 value_string = line.replace('\n', '')
+            #                 unquoted_value_string = value_string.replace("'", '')
+            #                 float_value = float(unquoted_value_string)
+            #                 algorithm_count_array.append(float_value)
+            #     except:
+            #         algorithm_count_array = False
+
+            #     if not algorithm_count_array:
+            #         continue
+
+            #     number_of_times_algorithm_run = len(algorithm_count_array)
+            #     logger.info(
+            #         'algorithm run count - %s run %s times' % (
+            #             algorithm, str(number_of_times_algorithm_run)))
+            #     if number_of_times_algorithm_run == 0:
+            #         continue
+
+            #     try:
+            #         algorithm_timings_array = []
+            #         with open(algorithm_timings_file, 'r') as f:
+            #             for line in f:
+            #                 value_string = line.replace('\n', '')
+            #                 unquoted_value_string = value_string.replace("'", '')
+            #                 float_value = float(unquoted_value_string)
+            #                 algorithm_timings_array.append(float_value)
+            #     except:
+            #         algorithm_timings_array = False
+
+            #     if not algorithm_timings_array:
+            #         continue
+
+            #     number_of_algorithm_timings = len(algorithm_timings_array)
+            #     logger.info(
+            #         'algorithm timings count - %s has %s timings' % (
+            #             algorithm, str(number_of_algorithm_timings)))
+
+            #     if number_of_algorithm_timings == 0:
+            #         continue
+
+            #     try:
+            #         _sum_of_algorithm_timings = sum(algorithm_timings_array)
+            #     except:
+            #         logger.error("sum error: " + traceback.format_exc())
+            #         _sum_of_algorithm_timings = round(0.0, 6)
+            #         logger.error('error - sum_of_algorithm_timings - %s' % (algorithm))
+            #         continue
+
+            #     sum_of_algorithm_timings = round(_sum_of_algorithm_timings, 6)
+            #     # logger.info('sum_of_algorithm_timings - %s - %.16f seconds' % (algorithm, sum_of_algorithm_timings))
+
+            #     try:
+            #         _median_algorithm_timing = determine_array_median(algorithm_timings_array)
+            #     except:
+            #         _median_algorithm_timing = round(0.0, 6)
+            #         logger.error('error - _median_algorithm_timing - %s' % (algorithm))
+            #         continue
+            #     median_algorithm_timing = round(_median_algorithm_timing, 6)
+            #     # logger.info('median_algorithm_timing - %s - %.16f seconds' % (algorithm, median_algorithm_timing))
+
+            #     logger.info(
+            #         'algorithm timing - %s - total: %.6f - median: %.6f' % (
+            #             algorithm, sum_of_algorithm_timings,
+            #             median_algorithm_timing))
+            #     use_namespace = skyline_app_graphite_namespace + '.algorithm_breakdown.' + algorithm
+            #     send_metric_name = use_namespace + '.timing.times_run'
+            #     send_graphite_metric(skyline_app, send_metric_name, str(number_of_algorithm_timings))
+            #     send_metric_name = use_namespace + '.timing.total_time'
+            #     send_graphite_metric(skyline_app, send_metric_name, str(sum_of_algorithm_timings))
+            #     send_metric_name = use_namespace + '.timing.median_time'
+            #     send_graphite_metric(skyline_app, send_metric_name, str(median_algorithm_timing))
+
+            #     # We del all variables that are floats as they become unique objects and
+            #     # can result in what appears to be a memory leak, but is not, just the
+            #     # way Python handles floats
+            #     try:
+            #         del _sum_of_algorithm_timings
+            #     except:
+            #         logger.error('error :: failed to del _sum_of_algorithm_timings')
+            #     try:
+            #         del _median_algorithm_timing
+            #     except:
+            #         logger.error('error :: failed to del _median_algorithm_timing')
+            #     try:
+            #         del sum_of_algorithm_timings
+            #     except:
+            #         logger.error('error :: failed to del sum_of_algorithm_timings')
+            #     try:
+            #         del median_algorithm_timing
+            #     except:
+            #         logger.error('error :: failed to del median_algorithm_timing')
+            try:
+                for registry_metric, registry_value in metrics_registry.graphite_metrics():
+                    if registry_metric.endswith('.median_time'):
+                        logger.info('metrics_registry :: %s - %s' % (registry_metric, str(registry_value)))
+                    send_metric_name = '%s.%s' % (skyline_app_graphite_namespace, registry_metric)
+                    send_graphite_metric(skyline_app, send_metric_name, str(registry_value))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to send the metrics_registry metrics')
+            metrics_registry.reset()
 
             if LOCAL_DEBUG:
                 logger.info('debug :: Memory usage in run after algorithm run times: %s (kb)' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -3657,8 +3897,10 @@ class Analyzer(Thread):
                             str(resend_metric_alert_dict)))
                         resend_context = resend_metric_alert_dict['source']
                         try:
-                            trigger_alert(resend_alert, resend_metric, resend_context)
-                            logger.info('trigger_alert :: alert: %s, metric: %s, context: %s' % (
+                            # @modified 20261019 - Alert dispatcher
+                            # trigger_alert(resend_alert, resend_metric, resend_context)
+                            dispatch_alert(resend_alert, resend_metric, resend_context)
+                            logger.info('dispatch_alert :: alert: %s, metric: %s, context: %s' % (
                                 str(resend_alert), str(resend_metric), str(resend_context)))
                         except:
                             logger.error(traceback.format_exc())
@@ -3739,6 +3981,18 @@ class Analyzer(Thread):
             send_metric_name = skyline_app_graphite_namespace + '.total_metrics'
             send_graphite_metric(skyline_app, send_metric_name, total_metrics)
 
+            # @added 20261019 - Alert dispatcher
+            # Send the alert dispatcher back pressure metrics
+            try:
+                alert_dispatcher_metrics = alert_dispatcher.metrics()
+                logger.info('alert_dispatcher   :: %s' % str(alert_dispatcher_metrics))
+                for key, value in alert_dispatcher_metrics.items():
+                    send_metric_name = '%s.alert_dispatcher.%s' % (skyline_app_graphite_namespace, key)
+                    send_graphite_metric(skyline_app, send_metric_name, str(value))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to send the alert_dispatcher metrics')
+
             # @added 20191021 - Bug #3288: Always send anomaly_breakdown and exception metrics
 
             for key, value in exceptions.items():
@@ -0,0 +1,227 @@
+"""
+The anomalies snapshots.
+
+At the end of each run Analyzer and Boundary publish the anomalous metrics as
+the settings.ANOMALY_DUMP JSONP file, which the static dashboard loads.  They
+are also published as a versioned, gzipped snapshot that the webapp serves as
+is, with an ETag for conditional GETs and deltas since a version.  A new
+version is only published if the anomalous metrics have changed and the last
+SNAPSHOT_HISTORY versions are kept in the snapshots directory next to the
+ANOMALY_DUMP file, so that the delta since any of those versions can be
+determined.  Analyzer and Boundary each have their own snapshots directory, as
+each publishes its own anomalous metrics and sharing versions would change the
+ETag every run.
+
+Each snapshot is the gzipped JSON of
+{'version': version, 'etag': etag, 'timestamp': timestamp,
+'anomalies': anomalous_metrics}.
+"""
+from __future__ import division
+import os
+import errno
+import gzip
+import json
+import hashlib
+from io import BytesIO
+from time import time
+
+# The number of snapshot versions to keep
+SNAPSHOT_HISTORY = 60
+
+SNAPSHOT_FILE_SUFFIX = '.json.gz'
+
+# The apps that publish snapshots
+SNAPSHOT_APPS = ['analyzer', 'boundary']
+
+# The number of times to try and publish a version if another process
+# publishes the same version first
+SNAPSHOT_PUBLISH_ATTEMPTS = 5
+
+
+def snapshots_dir(anomaly_dump, app):
+    """
+    The snapshots directory of an app for an ANOMALY_DUMP file, e.g.
+    webapp/static/dump/anomalies.json has the analyzer snapshots directory
+    webapp/static/dump/anomalies.analyzer.snapshots
+
+    :param anomaly_dump: the absolute path of the settings.ANOMALY_DUMP file
+    :param app: the app that publishes the snapshots
+    :type anomaly_dump: str
+    :type app: str
+    :return: the snapshots directory
+    :rtype: str
+    """
+    return '%s.%s.snapshots' % (os.path.splitext(anomaly_dump)[0], app)
+
+
+def snapshot_versions(snapshot_dir):
+    """
+    The snapshot versions in the snapshots directory, oldest first.
+
+    :param snapshot_dir: the snapshots directory
+    :type snapshot_dir: str
+    :return: versions
+    :rtype: list
+    """
+    if not os.path.isdir(snapshot_dir):
+        return []
+    versions = []
+    for snapshot_file in os.listdir(snapshot_dir):
+        if not snapshot_file.endswith(SNAPSHOT_FILE_SUFFIX):
+            continue
+        version = snapshot_file[:-len(SNAPSHOT_FILE_SUFFIX)]
+        if version.isdigit():
+            versions.append(int(version))
+    return sorted(versions)
+
+
+def snapshot_file(snapshot_dir, version):
+    return os.path.join(snapshot_dir, '%s%s' % (str(version), SNAPSHOT_FILE_SUFFIX))
+
+
+def anomalies_etag(anomalies_json):
+    """
+    The ETag of the anomalies JSON.
+
+    :param anomalies_json: the JSON of the anomalous metrics
+    :type anomalies_json: str
+    :return: etag
+    :rtype: str
+    """
+    return hashlib.sha1(anomalies_json.encode('utf-8')).hexdigest()
+
+
+def read_snapshot(snapshot_dir, version):
+    """
+    Read a snapshot.
+
+    :param snapshot_dir: the snapshots directory
+    :param version: the snapshot version
+    :type snapshot_dir: str
+    :type version: int
+    :return: (snapshot, gzipped_snapshot) or (None, None) if the version does
+        not exist
+    :rtype: tuple
+    """
+    try:
+        with open(snapshot_file(snapshot_dir, version), 'rb') as f:
+            gzipped_snapshot = f.read()
+    except (IOError, OSError):
+        return None, None
+    snapshot = json.loads(gzip.GzipFile(fileobj=BytesIO(gzipped_snapshot)).read().decode('utf-8'))
+    return snapshot, gzipped_snapshot
+
+
+def publish_snapshot_file(tmp_snapshot_file, new_snapshot_file):
+    """
+    Publish a snapshot file by hard linking it to the version file, which
+    fails if the version file already exists, so that a version that has been
+    published is never overwritten.
+
+    :param tmp_snapshot_file: the written snapshot tmp file
+    :param new_snapshot_file: the version file
+    :type tmp_snapshot_file: str
+    :type new_snapshot_file: str
+    :return: whether the version file was published
+    :rtype: boolean
+    """
+    try:
+        os.link(tmp_snapshot_file, new_snapshot_file)
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            return False
+        raise
+    finally:
+        try:
+            os.remove(tmp_snapshot_file)
+        except OSError:
+            pass
+    return True
+
+
+def write_anomalies_snapshot(anomaly_dump, anomalous_metrics, app):
+    """
+    Write the anomalous metrics to the ANOMALY_DUMP JSONP file and publish a new
+    snapshot version to the app snapshots directory if they have changed since
+    the last snapshot.  The files are written to a tmp file and renamed or
+    linked so that the webapp never serves a partially written file.
+
+    :param anomaly_dump: the absolute path of the settings.ANOMALY_DUMP file
+    :param anomalous_metrics: the sorted anomalous metrics
+    :param app: the app that publishes the snapshot
+    :type anomaly_dump: str
+    :type anomalous_metrics: list
+    :type app: str
+    :return: (version, etag)
+    :rtype: tuple
+    """
+    tmp_anomaly_dump = '%s.%s.tmp' % (anomaly_dump, str(os.getpid()))
+    with open(tmp_anomaly_dump, 'w') as fh:
+        # Make it JSONP with a handle_data() function
+        fh.write('handle_data(%s)' % anomalous_metrics)
+    os.rename(tmp_anomaly_dump, anomaly_dump)
+
+    anomalies_json = json.dumps(anomalous_metrics, sort_keys=True)
+    etag = anomalies_etag(anomalies_json)
+    snapshot_dir = snapshots_dir(anomaly_dump, app)
+    if not os.path.isdir(snapshot_dir):
+        try:
+            os.makedirs(snapshot_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    for attempt in range(SNAPSHOT_PUBLISH_ATTEMPTS):
+        versions = snapshot_versions(snapshot_dir)
+        if versions:
+            last_snapshot, gzipped_snapshot = read_snapshot(snapshot_dir, versions[-1])
+            if last_snapshot and last_snapshot['etag'] == etag:
+                return versions[-1], etag
+            version = versions[-1] + 1
+        else:
+            version = 1
+
+        snapshot = {
+            'version': version, 'etag': etag, 'timestamp': int(time()),
+            'anomalies': anomalous_metrics}
+        new_snapshot_file = snapshot_file(snapshot_dir, version)
+        tmp_snapshot_file = '%s.%s.tmp' % (new_snapshot_file, str(os.getpid()))
+        gzip_file = gzip.GzipFile(tmp_snapshot_file, mode='wb')
+        try:
+            gzip_file.write(json.dumps(snapshot, sort_keys=True).encode('utf-8'))
+        finally:
+            gzip_file.close()
+        if publish_snapshot_file(tmp_snapshot_file, new_snapshot_file):
+            break
+    else:
+        raise OSError(errno.EEXIST, 'failed to publish a snapshot version after %s attempts' % str(SNAPSHOT_PUBLISH_ATTEMPTS), snapshot_dir)
+
+    for old_version in (versions + [version])[:-SNAPSHOT_HISTORY]:
+        try:
+            os.remove(snapshot_file(snapshot_dir, old_version))
+        except OSError:
+            pass
+    return version, etag
+
+
+def anomalies_delta(snapshot, since_snapshot):
+    """
+    The anomalous metrics added and removed between two snapshots.
+
+    :param snapshot: the current snapshot
+    :param since_snapshot: the snapshot of the version the delta is since
+    :type snapshot: dict
+    :type since_snapshot: dict
+    :return: {'version': version, 'etag': etag, 'since': since_version,
+        'added': added_anomalies, 'removed': removed_anomalies}
+    :rtype: dict
+    """
+    since_anomalies = set(json.dumps(x, sort_keys=True) for x in since_snapshot['anomalies'])
+    current_anomalies = set(json.dumps(x, sort_keys=True) for x in snapshot['anomalies'])
+    return {
+        'version': snapshot['version'],
+        'etag': snapshot['etag'],
+        'since': since_snapshot['version'],
+        'added': [x for x in snapshot['anomalies'] if json.dumps(x, sort_keys=True) not in since_anomalies],
+        'removed': [x for x in since_snapshot['anomalies'] if json.dumps(x, sort_keys=True) not in current_anomalies],
+    }
@@ -18,7 +18,9 @@ from os import path, kill, getpid
 from math import ceil
 import traceback
 import operator
-import re
+# @modified 20261019 - Feature #4722: Boundary rule index
+# The patterns are compiled in boundary_rules
+# import re
 import os
 import errno
 import sys
@@ -44,7 +46,17 @@ from skyline_functions import (
     sort_timeseries)
 
 from boundary_alerters import trigger_alert
-from boundary_algorithms import run_selected_algorithm
+# @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+# Added timeseries_to_array
+from boundary_algorithms import run_selected_algorithm, timeseries_to_array
+# @added 20261019 - Feature #4722: Boundary rule index
+from boundary_rules import BoundaryRuleIndex
+# @added 20261019 - Feature #4726: Boundary low latency mode
+from boundary_low_latency import (
+    TailWindows, LOW_LATENCY_METRICS_SET, LOW_LATENCY_CHANNEL,
+    LOW_LATENCY_MIN_DATAPOINTS, LOW_LATENCY_ANOMALY_SEEN_PREFIX)
+# @added 20261019 - Feature #4728: Anomalies snapshots
+from anomalies_snapshot import write_anomalies_snapshot
 from algorithm_exceptions import (TooShort, Stale, Boring)
 
 skyline_app = 'boundary'
@@ -80,6 +92,15 @@ except:
     BOUNDARY_AUTOAGGRERATION_METRICS = (
         ("auotaggeration_metrics_not_declared", 60)
     )
+# @added 20261019 - Feature #4726: Boundary low latency mode
+try:
+    BOUNDARY_LOW_LATENCY = settings.BOUNDARY_LOW_LATENCY
+except:
+    BOUNDARY_LOW_LATENCY = False
+try:
+    BOUNDARY_LOW_LATENCY_WINDOW = int(settings.BOUNDARY_LOW_LATENCY_WINDOW)
+except:
+    BOUNDARY_LOW_LATENCY_WINDOW = 3600
 # @added 20191107 - Branch #3262: py3
 alert_test_file = '%s/%s_alert_test.txt' % (settings.SKYLINE_TMP_DIR, skyline_app)
 
@@ -126,6 +147,12 @@ class Boundary(Thread):
         # @added 20171214 - Bug #2232: Expiry boundary last_seen keys appropriately
         # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
         # self.not_anomalous_metrics = Manager().list()
+        # @added 20261019 - Feature #4722: Boundary rule index
+        # The BOUNDARY_METRICS rule index, created in run
+        self.boundary_rule_index = None
+        # @added 20261019 - Feature #4726: Boundary low latency mode
+        # The long lived low latency process, started in run
+        self.low_latency_p = None
 
     def check_if_parent_is_alive(self):
         """
@@ -218,15 +245,17 @@ class Boundary(Thread):
         exceptions = defaultdict(int)
         anomaly_breakdown = defaultdict(int)
 
-        # Reset boundary_algortims
-        all_boundary_algorithms = []
-        for metric in BOUNDARY_METRICS:
-            all_boundary_algorithms.append(metric[1])
+        # @modified 20261019 - Feature #4722: Boundary rule index
+        # The rules of each metric are resolved from the boundary_rule_index
+        # # Reset boundary_algortims
+        # all_boundary_algorithms = []
+        # for metric in BOUNDARY_METRICS:
+        #     all_boundary_algorithms.append(metric[1])
 
-        # The unique algorithms that are being used
-        boundary_algorithms = unique_noHash(all_boundary_algorithms)
-        if ENABLE_BOUNDARY_DEBUG:
-            logger.info('debug :: boundary_algorithms - %s' % str(boundary_algorithms))
+        # # The unique algorithms that are being used
+        # boundary_algorithms = unique_noHash(all_boundary_algorithms)
+        # if ENABLE_BOUNDARY_DEBUG:
+        #     logger.info('debug :: boundary_algorithms - %s' % str(boundary_algorithms))
 
         discover_run_metrics = []
 
@@ -234,87 +263,102 @@ class Boundary(Thread):
         for i, metric_name, in enumerate(unique_assigned_metrics):
             self.check_if_parent_is_alive()
 
-            try:
-                if ENABLE_BOUNDARY_DEBUG:
-                    logger.info('debug :: unpacking timeseries for %s - %s' % (metric_name, str(i)))
-                raw_series = raw_assigned[i]
-                unpacker = Unpacker(use_list=False)
-                unpacker.feed(raw_series)
-                timeseries = list(unpacker)
-            except Exception as e:
-                exceptions['Other'] += 1
-                logger.error('error :: redis data error: ' + traceback.format_exc())
-                logger.error('error :: %e' % e)
-
-            # @added 20200506 - Feature #3532: Sort all time series
-            # To ensure that there are no unordered timestamps in the time
-            # series which are artefacts of the collector or carbon-relay, sort
-            # all time series by timestamp before analysis.
-            original_timeseries = timeseries
-            if original_timeseries:
-                timeseries = sort_timeseries(original_timeseries)
-                del original_timeseries
+            # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+            # The rules of the metric are resolved from the metric name so the
+            # timeseries is not decoded here, it is decoded once per metric
+            # when the metric is analysed below
+            # try:
+            #     if ENABLE_BOUNDARY_DEBUG:
+            #         logger.info('debug :: unpacking timeseries for %s - %s' % (metric_name, str(i)))
+            #     raw_series = raw_assigned[i]
+            #     unpacker = Unpacker(use_list=False)
+            #     unpacker.feed(raw_series)
+            #     timeseries = list(unpacker)
+            # except Exception as e:
+            #     exceptions['Other'] += 1
+            #     logger.error('error :: redis data error: ' + traceback.format_exc())
+            #     logger.error('error :: %e' % e)
+
+            # # @added 20200506 - Feature #3532: Sort all time series
+            # # To ensure that there are no unordered timestamps in the time
+            # # series which are artefacts of the collector or carbon-relay, sort
+            # # all time series by timestamp before analysis.
+            # original_timeseries = timeseries
+            # if original_timeseries:
+            #     timeseries = sort_timeseries(original_timeseries)
+            #     del original_timeseries
 
             base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
 
-            # Determine the metrics BOUNDARY_METRICS metric tuple settings
-            for metrick in BOUNDARY_METRICS:
-                CHECK_MATCH_PATTERN = metrick[0]
-                check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
-                pattern_match = check_match_pattern.match(base_name)
-                metric_pattern_matched = False
-                if pattern_match:
-                    metric_pattern_matched = True
-                    algo_pattern_matched = False
-                    for algo in boundary_algorithms:
-                        for metric in BOUNDARY_METRICS:
-                            CHECK_MATCH_PATTERN = metric[0]
-                            check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
-                            pattern_match = check_match_pattern.match(base_name)
-                            if pattern_match:
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: metric and algo pattern MATCHED - " + metric[0] + " | " + base_name + " | " + str(metric[1]))
-                                metric_expiration_time = False
-                                metric_min_average = False
-                                metric_min_average_seconds = False
-                                metric_trigger = False
-                                algorithm = False
-                                algo_pattern_matched = True
-                                algorithm = metric[1]
-                                try:
-                                    if metric[2]:
-                                        metric_expiration_time = metric[2]
-                                except:
-                                    metric_expiration_time = False
-                                try:
-                                    if metric[3]:
-                                        metric_min_average = metric[3]
-                                except:
-                                    metric_min_average = False
-                                try:
-                                    if metric[4]:
-                                        metric_min_average_seconds = metric[4]
-                                except:
-                                    metric_min_average_seconds = 1200
-                                try:
-                                    if metric[5]:
-                                        metric_trigger = metric[5]
-                                except:
-                                    metric_trigger = False
-                                try:
-                                    if metric[6]:
-                                        alert_threshold = metric[6]
-                                except:
-                                    alert_threshold = False
-                                try:
-                                    if metric[7]:
-                                        metric_alerters = metric[7]
-                                except:
-                                    metric_alerters = False
-                            if metric_pattern_matched and algo_pattern_matched:
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info('debug :: added metric - %s, %s, %s, %s, %s, %s, %s, %s, %s' % (str(i), metric_name, str(metric_expiration_time), str(metric_min_average), str(metric_min_average_seconds), str(metric_trigger), str(alert_threshold), metric_alerters, algorithm))
-                                discover_run_metrics.append([i, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm])
+            # @modified 20261019 - Feature #4722: Boundary rule index
+            # Rather than compiling and matching every BOUNDARY_METRICS pattern
+            # for every BOUNDARY_METRICS pattern for every algorithm, use the
+            # rules of the metric resolved by the boundary_rule_index, the
+            # rules are resolved in run so the resolved rules are cached across
+            # runs
+            # # Determine the metrics BOUNDARY_METRICS metric tuple settings
+            # for metrick in BOUNDARY_METRICS:
+            #     CHECK_MATCH_PATTERN = metrick[0]
+            #     check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
+            #     pattern_match = check_match_pattern.match(base_name)
+            #     metric_pattern_matched = False
+            #     if pattern_match:
+            #         metric_pattern_matched = True
+            #         algo_pattern_matched = False
+            #         for algo in boundary_algorithms:
+            #             for metric in BOUNDARY_METRICS:
+            #                 CHECK_MATCH_PATTERN = metric[0]
+            #                 check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
+            #                 pattern_match = check_match_pattern.match(base_name)
+            #                 if pattern_match:
+            #                     if ENABLE_BOUNDARY_DEBUG:
+            #                         logger.info("debug :: metric and algo pattern MATCHED - " + metric[0] + " | " + base_name + " | " + str(metric[1]))
+            #                     metric_expiration_time = False
+            #                     metric_min_average = False
+            #                     metric_min_average_seconds = False
+            #                     metric_trigger = False
+            #                     algorithm = False
+            #                     algo_pattern_matched = True
+            #                     algorithm = metric[1]
+            #                     try:
+            #                         if metric[2]:
+            #                             metric_expiration_time = metric[2]
+            #                     except:
+            #                         metric_expiration_time = False
+            #                     try:
+            #                         if metric[3]:
+            #                             metric_min_average = metric[3]
+            #                     except:
+            #                         metric_min_average = False
+            #                     try:
+            #                         if metric[4]:
+            #                             metric_min_average_seconds = metric[4]
+            #                     except:
+            #                         metric_min_average_seconds = 1200
+            #                     try:
+            #                         if metric[5]:
+            #                             metric_trigger = metric[5]
+            #                     except:
+            #                         metric_trigger = False
+            #                     try:
+            #                         if metric[6]:
+            #                             alert_threshold = metric[6]
+            #                     except:
+            #                         alert_threshold = False
+            #                     try:
+            #                         if metric[7]:
+            #                             metric_alerters = metric[7]
+            #                     except:
+            #                         metric_alerters = False
+            #                 if metric_pattern_matched and algo_pattern_matched:
+            #                     if ENABLE_BOUNDARY_DEBUG:
+            #                         logger.info('debug :: added metric - %s, %s, %s, %s, %s, %s, %s, %s, %s' % (str(i), metric_name, str(metric_expiration_time), str(metric_min_average), str(metric_min_average_seconds), str(metric_trigger), str(alert_threshold), metric_alerters, algorithm))
+            #                     discover_run_metrics.append([i, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm])
+            boundary_rules = self.boundary_rule_index.resolve(base_name)
+            for rule in boundary_rules['rules']:
+                if ENABLE_BOUNDARY_DEBUG:
+                    logger.info('debug :: added metric - %s, %s, %s' % (str(i), metric_name, str(rule)))
+                discover_run_metrics.append([i, metric_name] + rule)
 
         if ENABLE_BOUNDARY_DEBUG:
             logger.info('debug :: printing discover_run_metrics')
@@ -330,6 +374,14 @@ class Boundary(Thread):
             for run_metric in run_metrics:
                 logger.info('debug :: run_metrics - %s' % str(run_metric))
 
+        # @added 20261019 - Feature #4724: Vectorised boundary algorithms
+        # The run_metrics of a metric are consecutive, the timeseries and the
+        # timeseries_array of the metric being analysed are decoded and
+        # converted once and used for all the algorithms of the metric
+        decoded_raw_assigned_id = None
+        decoded_timeseries = None
+        timeseries_arrays = {}
+
         # Distill timeseries strings and submit to run_selected_algorithm
         for metric_and_algo in run_metrics:
             self.check_if_parent_is_alive()
@@ -349,19 +401,28 @@ class Boundary(Thread):
                 if ENABLE_BOUNDARY_DEBUG:
                     logger.info('debug :: unpacking timeseries for %s - %s' % (metric_name, str(raw_assigned_id)))
 
-                raw_series = raw_assigned[metric_and_algo[0]]
-                unpacker = Unpacker(use_list=False)
-                unpacker.feed(raw_series)
-                timeseries = list(unpacker)
-
-                # @added 20200507 - Feature #3532: Sort all time series
-                # To ensure that there are no unordered timestamps in the time
-                # series which are artefacts of the collector or carbon-relay, sort
-                # all time series by timestamp before analysis.
-                original_timeseries = timeseries
-                if original_timeseries:
-                    timeseries = sort_timeseries(original_timeseries)
-                    del original_timeseries
+                # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+                # Only decode the timeseries once per metric
+                if raw_assigned_id == decoded_raw_assigned_id:
+                    timeseries = decoded_timeseries
+                else:
+                    decoded_raw_assigned_id = None
+                    timeseries_arrays = {}
+                    raw_series = raw_assigned[metric_and_algo[0]]
+                    unpacker = Unpacker(use_list=False)
+                    unpacker.feed(raw_series)
+                    timeseries = list(unpacker)
+
+                    # @added 20200507 - Feature #3532: Sort all time series
+                    # To ensure that there are no unordered timestamps in the time
+                    # series which are artefacts of the collector or carbon-relay, sort
+                    # all time series by timestamp before analysis.
+                    original_timeseries = timeseries
+                    if original_timeseries:
+                        timeseries = sort_timeseries(original_timeseries)
+                        del original_timeseries
+                    decoded_raw_assigned_id = raw_assigned_id
+                    decoded_timeseries = timeseries
 
                 if ENABLE_BOUNDARY_DEBUG:
                     logger.info('debug :: unpacked OK - %s - %s' % (metric_name, str(raw_assigned_id)))
@@ -369,18 +430,24 @@ class Boundary(Thread):
                 autoaggregate = False
                 autoaggregate_value = 0
 
-                # Determine if the namespace is to be aggregated
-                if BOUNDARY_AUTOAGGRERATION:
-                    for autoaggregate_metric in BOUNDARY_AUTOAGGRERATION_METRICS:
-                        autoaggregate = False
-                        autoaggregate_value = 0
-                        CHECK_MATCH_PATTERN = autoaggregate_metric[0]
-                        base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
-                        check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
-                        pattern_match = check_match_pattern.match(base_name)
-                        if pattern_match:
-                            autoaggregate = True
-                            autoaggregate_value = autoaggregate_metric[1]
+                # @modified 20261019 - Feature #4722: Boundary rule index
+                # The autoaggregation of the metric is resolved by the
+                # boundary_rule_index
+                # # Determine if the namespace is to be aggregated
+                # if BOUNDARY_AUTOAGGRERATION:
+                #     for autoaggregate_metric in BOUNDARY_AUTOAGGRERATION_METRICS:
+                #         autoaggregate = False
+                #         autoaggregate_value = 0
+                #         CHECK_MATCH_PATTERN = autoaggregate_metric[0]
+                #         base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
+                #         check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
+                #         pattern_match = check_match_pattern.match(base_name)
+                #         if pattern_match:
+                #             autoaggregate = True
+                #             autoaggregate_value = autoaggregate_metric[1]
+                boundary_rules = self.boundary_rule_index.resolve(base_name)
+                autoaggregate = boundary_rules['autoaggregate']
+                autoaggregate_value = boundary_rules['autoaggregate_value']
 
                 if ENABLE_BOUNDARY_DEBUG:
                     logger.info('debug :: BOUNDARY_AUTOAGGRERATION passed - %s - %s' % (metric_name, str(autoaggregate)))
@@ -405,41 +472,46 @@ class Boundary(Thread):
                         f.write(str(timeseries))
                         f.close()
 
-                # Check if a metric has its own unique BOUNDARY_METRICS alert
-                # tuple, this allows us to paint an entire metric namespace with
-                # the same brush AND paint a unique metric or namespace with a
-                # different brush or scapel
-                has_unique_tuple = False
-                run_tupple = False
-                boundary_metric_tuple = (base_name, algorithm, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters)
-                wildcard_namespace = True
-                for metric_tuple in BOUNDARY_METRICS:
-                    if not has_unique_tuple:
-                        CHECK_MATCH_PATTERN = metric_tuple[0]
-                        check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
-                        pattern_match = check_match_pattern.match(base_name)
-                        if pattern_match:
-                            if metric_tuple[0] == base_name:
-                                wildcard_namespace = False
-                            if not has_unique_tuple:
-                                if boundary_metric_tuple == metric_tuple:
-                                    has_unique_tuple = True
-                                    run_tupple = True
-                                    if ENABLE_BOUNDARY_DEBUG:
-                                        logger.info('unique_tuple:')
-                                        logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
-                                        logger.info('metric_tuple: %s' % str(metric_tuple))
-
-                if not has_unique_tuple:
-                    if wildcard_namespace:
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info('wildcard_namespace:')
-                            logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
-                        run_tupple = True
-                    else:
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info('wildcard_namespace: BUT WOULD NOT RUN')
-                            logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
+                # @modified 20261019 - Feature #4722: Boundary rule index
+                # Whether the metric has its own unique BOUNDARY_METRICS alert
+                # tuple is determined when the rules of the metric are resolved
+                # by the boundary_rule_index
+                # # Check if a metric has its own unique BOUNDARY_METRICS alert
+                # # tuple, this allows us to paint an entire metric namespace with
+                # # the same brush AND paint a unique metric or namespace with a
+                # # different brush or scapel
+                # has_unique_tuple = False
+                # run_tupple = False
+                # boundary_metric_tuple = (base_name, algorithm, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters)
+                # wildcard_namespace = True
+                # for metric_tuple in BOUNDARY_METRICS:
+                #     if not has_unique_tuple:
+                #         CHECK_MATCH_PATTERN = metric_tuple[0]
+                #         check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
+                #         pattern_match = check_match_pattern.match(base_name)
+                #         if pattern_match:
+                #             if metric_tuple[0] == base_name:
+                #                 wildcard_namespace = False
+                #             if not has_unique_tuple:
+                #                 if boundary_metric_tuple == metric_tuple:
+                #                     has_unique_tuple = True
+                #                     run_tupple = True
+                #                     if ENABLE_BOUNDARY_DEBUG:
+                #                         logger.info('unique_tuple:')
+                #                         logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
+                #                         logger.info('metric_tuple: %s' % str(metric_tuple))
+
+                # if not has_unique_tuple:
+                #     if wildcard_namespace:
+                #         if ENABLE_BOUNDARY_DEBUG:
+                #             logger.info('wildcard_namespace:')
+                #             logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
+                #         run_tupple = True
+                #     else:
+                #         if ENABLE_BOUNDARY_DEBUG:
+                #             logger.info('wildcard_namespace: BUT WOULD NOT RUN')
+                #             logger.info('boundary_metric_tuple: %s' % str(boundary_metric_tuple))
+                run_tupple = metric_and_algo[9]
 
                 if ENABLE_BOUNDARY_DEBUG:
                     logger.info('WOULD RUN run_selected_algorithm = %s' % run_tupple)
@@ -468,12 +540,21 @@ class Boundary(Thread):
                         skip_derivative = in_list(redis_metric_name, non_derivative_monotonic_metrics)
                         if skip_derivative:
                             known_derivative_metric = False
-                    if known_derivative_metric:
-                        try:
-                            derivative_timeseries = nonNegativeDerivative(timeseries)
-                            timeseries = derivative_timeseries
-                        except:
-                            logger.error('error :: nonNegativeDerivative failed')
+                    # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+                    # Convert the timeseries of the metric to a timeseries_array
+                    # once and use it for all the algorithms of the metric
+                    timeseries_array_key = str(known_derivative_metric)
+                    if timeseries_array_key in timeseries_arrays:
+                        timeseries, timeseries_array = timeseries_arrays[timeseries_array_key]
+                    else:
+                        if known_derivative_metric:
+                            try:
+                                derivative_timeseries = nonNegativeDerivative(timeseries)
+                                timeseries = derivative_timeseries
+                            except:
+                                logger.error('error :: nonNegativeDerivative failed')
+                        timeseries_array = timeseries_to_array(timeseries)
+                        timeseries_arrays[timeseries_array_key] = (timeseries, timeseries_array)
 
                     # Submit the timeseries and settings to run_selected_algorithm
                     anomalous, ensemble, datapoint, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm = run_selected_algorithm(
@@ -486,7 +567,9 @@ class Boundary(Thread):
                         metric_alerters,
                         autoaggregate,
                         autoaggregate_value,
-                        algorithm
+                        algorithm,
+                        # @added 20261019 - Feature #4724: Vectorised boundary algorithms
+                        timeseries_array=timeseries_array
                     )
                     if ENABLE_BOUNDARY_DEBUG:
                         logger.info('debug :: analysed - %s' % (metric_name))
@@ -703,6 +786,444 @@ class Boundary(Thread):
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info('debug :: exceptions.item - %s, %s' % (str(key), str(value)))
 
+    # @added 20261019 - Feature #4726: Boundary low latency mode
+    def alert_anomalous_metric(self, anomalous_metric, added_at, anomaly_seen_prefix='anomaly_seen'):
+        """
+        Alert on an anomalous_metric as per its alert_threshold, alerters and
+        the alerter limits.  The anomalous_metrics of a run are alerted on in
+        run and the anomalous_metrics detected by the low latency process are
+        alerted on as they are detected.
+
+        :param anomalous_metric: [datapoint, metric_name,
+            metric_expiration_time, metric_min_average,
+            metric_min_average_seconds, metric_trigger, alert_threshold,
+            metric_alerters, algorithm, metric_timestamp]
+        :param added_at: the added_at of the run that detected the
+            anomalous_metric, used to move its Panorama anomaly file, the
+            low latency process passes None as the Panorama anomaly file is
+            added by the run
+        :param anomaly_seen_prefix: the prefix of the Redis key that counts
+            the times the anomaly has been seen towards the alert_threshold.
+            The runs count anomalous runs in the anomaly_seen keys and the low
+            latency process counts consecutive anomalous datapoints in its own
+            LOW_LATENCY_ANOMALY_SEEN_PREFIX keys, so that neither counts
+            towards the alert_threshold of the other.
+        :type anomalous_metric: list
+        :type added_at: str
+        :type anomaly_seen_prefix: str
+        """
+        datapoint = str(anomalous_metric[0])
+        metric_name = anomalous_metric[1]
+        base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
+        expiration_time = str(anomalous_metric[2])
+        metric_trigger = str(anomalous_metric[5])
+        alert_threshold = int(anomalous_metric[6])
+        metric_alerters = anomalous_metric[7]
+        algorithm = anomalous_metric[8]
+        # @added 20200122 - Feature #3396: http_alerter
+        # Add the metric timestamp for the http_alerter resend queue
+        metric_timestamp = anomalous_metric[9]
+
+        if ENABLE_BOUNDARY_DEBUG:
+            logger.info("debug :: anomalous_metric - " + str(anomalous_metric))
+
+        # Determine how many times has the anomaly been seen if the
+        # ALERT_THRESHOLD is set to > 1 and create a cache key in
+        # redis to keep count so that alert_threshold can be honored
+        if alert_threshold == 0:
+            times_seen = 1
+            if ENABLE_BOUNDARY_DEBUG:
+                logger.info("debug :: alert_threshold - " + str(alert_threshold))
+
+        if alert_threshold == 1:
+            times_seen = 1
+            if ENABLE_BOUNDARY_DEBUG:
+                logger.info("debug :: alert_threshold - " + str(alert_threshold))
+
+        if alert_threshold > 1:
+            if ENABLE_BOUNDARY_DEBUG:
+                logger.info('debug :: alert_threshold - ' + str(alert_threshold))
+            anomaly_cache_key_count_set = False
+            anomaly_cache_key_expiration_time = (int(alert_threshold) + 1) * 60
+            # @modified 20261019 - Feature #4726: Boundary low latency mode
+            # anomaly_cache_key = 'anomaly_seen.%s.%s' % (algorithm, base_name)
+            anomaly_cache_key = '%s.%s.%s' % (anomaly_seen_prefix, algorithm, base_name)
+            try:
+                anomaly_cache_key_count = self.redis_conn.get(anomaly_cache_key)
+                if not anomaly_cache_key_count:
+                    try:
+                        if ENABLE_BOUNDARY_DEBUG:
+                            logger.info('debug :: redis no anomaly_cache_key - ' + str(anomaly_cache_key))
+                        times_seen = 1
+                        if ENABLE_BOUNDARY_DEBUG:
+                            logger.info('debug :: redis setex anomaly_cache_key - ' + str(anomaly_cache_key))
+                        self.redis_conn.setex(anomaly_cache_key, anomaly_cache_key_expiration_time, packb(int(times_seen)))
+                        logger.info('set anomaly seen key :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
+                    except Exception as e:
+                        logger.error('error :: redis setex failed :: %s' % str(anomaly_cache_key))
+                        logger.error('error :: could not set key: %s' % e)
+                else:
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info('debug :: redis anomaly_cache_key retrieved OK - ' + str(anomaly_cache_key))
+                    anomaly_cache_key_count_set = True
+            except:
+                if ENABLE_BOUNDARY_DEBUG:
+                    logger.info('debug :: redis failed - anomaly_cache_key retrieval failed - ' + str(anomaly_cache_key))
+                anomaly_cache_key_count_set = False
+
+            if anomaly_cache_key_count_set:
+                unpacker = Unpacker(use_list=False)
+                unpacker.feed(anomaly_cache_key_count)
+                raw_times_seen = list(unpacker)
+                times_seen = int(raw_times_seen[0]) + 1
+                try:
+                    self.redis_conn.setex(anomaly_cache_key, anomaly_cache_key_expiration_time, packb(int(times_seen)))
+                    logger.info('set anomaly seen key :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
+                except:
+                    times_seen = 1
+                    logger.error('error :: set anomaly seen key failed :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
+
+        # Alert the alerters if times_seen > alert_threshold
+        if times_seen >= alert_threshold:
+            if ENABLE_BOUNDARY_DEBUG:
+                logger.info('debug :: times_seen %s is greater than or equal to alert_threshold %s' % (str(times_seen), str(alert_threshold)))
+
+            # @added 20171216 - Task #2236: Change Boundary to only send to Panorama on alert
+            tmp_panaroma_anomaly_file = '%s/%s.%s.%s.panorama_anomaly.txt' % (
+                settings.SKYLINE_TMP_DIR, added_at,
+                # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
+                # Added algorithm as it is required if the metric has
+                # multiple rules covering a number of algorithms
+                algorithm, base_name)
+            if ENABLE_BOUNDARY_DEBUG:
+                logger.info('debug :: tmp_panaroma_anomaly_file - %s' % (str(tmp_panaroma_anomaly_file)))
+            # @modified 20261019 - Feature #4726: Boundary low latency mode
+            # The low latency process does not add Panorama anomaly files
+            # if os.path.isfile(tmp_panaroma_anomaly_file):
+            if added_at and os.path.isfile(tmp_panaroma_anomaly_file):
+                panaroma_anomaly_file = '%s/%s.%s.txt' % (
+                    settings.PANORAMA_CHECK_PATH, added_at, base_name)
+                logger.info('moving tmp_panaroma_anomaly_file - %s to panaroma_anomaly_file %s' % (str(tmp_panaroma_anomaly_file), str(panaroma_anomaly_file)))
+                # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
+                # Added skyline_app
+                try:
+                    # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
+                    # Correct move
+                    # move_file(skyline_app, tmp_panaroma_anomaly_file, panaroma_anomaly_file)
+                    move_file(skyline_app, settings.PANORAMA_CHECK_PATH, tmp_panaroma_anomaly_file)
+                except:
+                    logger.info(traceback.format_exc())
+                    logger.error('error :: failed to move tmp_panaroma_anomaly_file to panaroma_anomaly_file')
+                # @added 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
+                # Rename moved file as the filename is used in Panorama
+                try:
+                    tmp_panaroma_anomaly_file_to_rename = '%s/%s.%s.%s.panorama_anomaly.txt' % (
+                        settings.PANORAMA_CHECK_PATH, added_at,
+                        algorithm, base_name)
+                    os.rename(tmp_panaroma_anomaly_file_to_rename, panaroma_anomaly_file)
+                except:
+                    logger.info(traceback.format_exc())
+                    logger.error('error :: failed to rename tmp_panaroma_anomaly_filename to panaroma_anomaly_filename')
+            # @modified 20261019 - Feature #4726: Boundary low latency mode
+            # else:
+            elif added_at:
+                logger.error('error :: tmp_panaroma_anomaly_file does not exist')
+
+            for alerter in metric_alerters.split("|"):
+                # Determine alerter limits
+                send_alert = False
+                alerts_sent = 0
+                if ENABLE_BOUNDARY_DEBUG:
+                    logger.info('debug :: checking alerter - %s' % alerter)
+                try:
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info('debug :: determining alerter_expiration_time for settings')
+                    alerter_expiration_time_setting = settings.BOUNDARY_ALERTER_OPTS['alerter_expiration_time'][alerter]
+                    alerter_expiration_time = int(alerter_expiration_time_setting)
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info('debug :: determined alerter_expiration_time from settings - %s' % str(alerter_expiration_time))
+                except:
+                    # Set an arbitrary expiry time if not set
+                    alerter_expiration_time = 160
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info("debug :: could not determine alerter_expiration_time from settings")
+                try:
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info("debug :: determining alerter_limit from settings")
+                    alerter_limit_setting = settings.BOUNDARY_ALERTER_OPTS['alerter_limit'][alerter]
+                    alerter_limit = int(alerter_limit_setting)
+                    alerter_limit_set = True
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info("debug :: determined alerter_limit from settings - %s" % str(alerter_limit))
+                except:
+                    alerter_limit_set = False
+                    send_alert = True
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info("debug :: could not determine alerter_limit from settings")
+
+                # If the alerter_limit is set determine how many
+                # alerts the alerter has sent
+                if alerter_limit_set:
+                    alerter_sent_count_key = 'alerts_sent.%s' % (alerter)
+                    try:
+                        alerter_sent_count_key_data = self.redis_conn.get(alerter_sent_count_key)
+                        if not alerter_sent_count_key_data:
+                            if ENABLE_BOUNDARY_DEBUG:
+                                logger.info("debug :: redis no alerter key, no alerts sent for - " + str(alerter_sent_count_key))
+                            alerts_sent = 0
+                            send_alert = True
+                            if ENABLE_BOUNDARY_DEBUG:
+                                logger.info("debug :: alerts_sent set to %s" % str(alerts_sent))
+                                logger.info("debug :: send_alert set to %s" % str(send_alert))
+                        else:
+                            if ENABLE_BOUNDARY_DEBUG:
+                                logger.info('debug :: redis alerter key retrieved, unpacking %s' % str(alerter_sent_count_key))
+                            unpacker = Unpacker(use_list=False)
+                            unpacker.feed(alerter_sent_count_key_data)
+                            raw_alerts_sent = list(unpacker)
+                            alerts_sent = int(raw_alerts_sent[0])
+                            if ENABLE_BOUNDARY_DEBUG:
+                                logger.info("debug :: alerter %s alerts sent %s " % (str(alerter), str(alerts_sent)))
+                    except:
+                        logger.info("No key set - %s" % alerter_sent_count_key)
+                        alerts_sent = 0
+                        send_alert = True
+                        if ENABLE_BOUNDARY_DEBUG:
+                            logger.info("debug :: alerts_sent set to %s" % str(alerts_sent))
+                            logger.info("debug :: send_alert set to %s" % str(send_alert))
+
+                    if alerts_sent < alerter_limit:
+                        send_alert = True
+                        if ENABLE_BOUNDARY_DEBUG:
+                            logger.info("debug :: alerts_sent %s is less than alerter_limit %s" % (str(alerts_sent), str(alerter_limit)))
+                            logger.info("debug :: send_alert set to %s" % str(send_alert))
+
+                # Send alert
+                alerter_alert_sent = False
+                if send_alert:
+                    cache_key = 'last_alert.boundary.%s.%s.%s' % (alerter, base_name, algorithm)
+                    if ENABLE_BOUNDARY_DEBUG:
+                        logger.info("debug :: checking cache_key - %s" % cache_key)
+                    try:
+                        last_alert = self.redis_conn.get(cache_key)
+                        if not last_alert:
+                            try:
+                                self.redis_conn.setex(cache_key, int(anomalous_metric[2]), packb(int(anomalous_metric[0])))
+                                if ENABLE_BOUNDARY_DEBUG:
+                                    logger.info('debug :: key setex OK - %s' % (cache_key))
+                                # @modified 20200122 - Feature #3396: http_alerter
+                                # Add the metric timestamp for the http_alerter resend queue
+                                # trigger_alert(alerter, datapoint, base_name, expiration_time, metric_trigger, algorithm)
+                                trigger_alert(alerter, datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                                logger.info('alert sent :: %s - %s - via %s - %s' % (base_name, datapoint, alerter, algorithm))
+                                trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                                logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
+                                alerter_alert_sent = True
+                            except Exception as e:
+                                logger.error('error :: alert failed :: %s - %s - via %s - %s' % (base_name, datapoint, alerter, algorithm))
+                                logger.error('error :: could not send alert: %s' % str(e))
+                                trigger_alert('syslog', datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                        else:
+                            if ENABLE_BOUNDARY_DEBUG:
+                                logger.info("debug :: cache_key exists not alerting via %s for %s is less than alerter_limit %s" % (alerter, cache_key))
+                            trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                            logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
+                    except:
+                        trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                        logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
+                else:
+                    trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+                    logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
+
+                # Update the alerts sent for the alerter cache key,
+                # to allow for alert limiting
+                if alerter_alert_sent and alerter_limit_set:
+                    try:
+                        alerter_sent_count_key = 'alerts_sent.%s' % (alerter)
+                        new_alerts_sent = int(alerts_sent) + 1
+                        self.redis_conn.setex(alerter_sent_count_key, alerter_expiration_time, packb(int(new_alerts_sent)))
+                        logger.info('set %s - %s' % (alerter_sent_count_key, str(new_alerts_sent)))
+                    except:
+                        logger.error('error :: failed to set %s - %s' % (alerter_sent_count_key, str(new_alerts_sent)))
+        else:
+            # Always alert to syslog, even if alert_threshold is not
+            # breached or if send_alert is not True
+            trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
+            logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
+
+        # @added 20171216 - Task #2236: Change Boundary to only send to Panorama on alert
+        # Remove tmp_panaroma_anomaly_file
+        tmp_panaroma_anomaly_file = '%s/%s.%s.%s.panorama_anomaly.txt' % (
+            # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
+            # Added algorithm
+            settings.SKYLINE_TMP_DIR, added_at, algorithm, base_name)
+        if os.path.isfile(tmp_panaroma_anomaly_file):
+            try:
+                os.remove(str(tmp_panaroma_anomaly_file))
+                logger.info('removed - %s' % str(tmp_panaroma_anomaly_file))
+            except OSError:
+                pass
+
+    # @added 20261019 - Feature #4726: Boundary low latency mode
+    def low_latency_process(self):
+        """
+        The long lived low latency process.  Subscribes to the
+        LOW_LATENCY_CHANNEL that the Horizon workers publish the datapoints of
+        the Boundary metrics to, keeps a tail window of each metric and
+        evaluates the BOUNDARY_METRICS rules of the metric on every new
+        datapoint, alerting on anomalies as they are detected rather than on
+        the next run.
+        """
+        logger.info('low latency process :: started with a %s second tail window' % str(BOUNDARY_LOW_LATENCY_WINDOW))
+        redis_conn = get_redis_conn(skyline_app)
+        try:
+            pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(LOW_LATENCY_CHANNEL)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: low latency process :: failed to subscribe to %s' % LOW_LATENCY_CHANNEL)
+            return
+
+        tail_windows = TailWindows(
+            BOUNDARY_LOW_LATENCY_WINDOW,
+            max(LOW_LATENCY_MIN_DATAPOINTS, settings.MAX_TOLERABLE_BOREDOM))
+        derivative_metrics = []
+        # The LOW_LATENCY_ANOMALY_SEEN_PREFIX keys that have been counted, so
+        # that they are reset when the next datapoint is not anomalous
+        anomaly_seen_keys = set()
+        last_refresh = 0
+        running = True
+        while running:
+            self.check_if_parent_is_alive()
+
+            # Refresh the derivative_metrics and drop the windows of the
+            # metrics that are no longer Boundary metrics every minute
+            if int(time()) - last_refresh >= 60:
+                last_refresh = int(time())
+                try:
+                    derivative_metrics = list(self.redis_conn_decoded.smembers('derivative_metrics'))
+                except:
+                    derivative_metrics = []
+                try:
+                    low_latency_metrics = list(self.redis_conn_decoded.smembers(LOW_LATENCY_METRICS_SET))
+                    tail_windows.prune(low_latency_metrics)
+                    self.boundary_rule_index.prune([
+                        metric_name.replace(FULL_NAMESPACE, '', 1) for metric_name in low_latency_metrics])
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: low latency process :: failed to prune the tail windows')
+
+            try:
+                message = pubsub.get_message(timeout=1)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: low latency process :: failed to get message from %s' % LOW_LATENCY_CHANNEL)
+                sleep(10)
+                try:
+                    redis_conn = get_redis_conn(skyline_app)
+                    pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(LOW_LATENCY_CHANNEL)
+                except:
+                    logger.error('error :: low latency process :: failed to resubscribe to %s' % LOW_LATENCY_CHANNEL)
+                continue
+            if not message:
+                continue
+
+            try:
+                unpacker = Unpacker(use_list=False)
+                unpacker.feed(message['data'])
+                metric_name, datapoint = list(unpacker)[0]
+                if isinstance(metric_name, bytes):
+                    metric_name = metric_name.decode('utf-8')
+                metric_name = str(metric_name)
+                base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
+                metric_timestamp = int(datapoint[0])
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: low latency process :: failed to unpack message - %s' % str(message))
+                continue
+
+            try:
+                if not tail_windows.has(metric_name):
+                    # Seed the window with the timeseries from Redis, which
+                    # includes the datapoint as Horizon publishes it after
+                    # it is appended
+                    raw_series = redis_conn.get(metric_name)
+                    unpacker = Unpacker(use_list=False)
+                    unpacker.feed(raw_series)
+                    tail_windows.seed(metric_name, sort_timeseries(list(unpacker)))
+                elif not tail_windows.append(metric_name, metric_timestamp, datapoint[1]):
+                    continue
+                timeseries = tail_windows.timeseries(metric_name)
+                if not timeseries:
+                    continue
+
+                known_derivative_metric = False
+                if metric_name in derivative_metrics:
+                    known_derivative_metric = True
+                    try:
+                        non_derivative_monotonic_metrics = settings.NON_DERIVATIVE_MONOTONIC_METRICS
+                    except:
+                        non_derivative_monotonic_metrics = []
+                    if in_list(metric_name, non_derivative_monotonic_metrics):
+                        known_derivative_metric = False
+                if known_derivative_metric:
+                    timeseries = nonNegativeDerivative(timeseries)
+                timeseries_array = timeseries_to_array(timeseries)
+                boundary_rules = self.boundary_rule_index.resolve(base_name)
+            except TypeError:
+                # It could have been deleted by the Roomba
+                continue
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: low latency process :: failed to determine the timeseries of %s' % metric_name)
+                continue
+
+            for rule in boundary_rules['rules']:
+                metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm, run_tupple = rule
+                if not run_tupple:
+                    continue
+                try:
+                    anomalous, ensemble, datapoint_value, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm = run_selected_algorithm(
+                        timeseries, metric_name, metric_expiration_time,
+                        metric_min_average, metric_min_average_seconds,
+                        metric_trigger, alert_threshold, metric_alerters,
+                        boundary_rules['autoaggregate'],
+                        boundary_rules['autoaggregate_value'], algorithm,
+                        timeseries_array=timeseries_array)
+                except (TooShort, Stale, Boring):
+                    continue
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: low latency process :: run_selected_algorithm failed for %s - %s' % (metric_name, algorithm))
+                    continue
+                # The alert_threshold is honoured as the number of consecutive
+                # anomalous datapoints, so the count is reset on a datapoint
+                # that is not anomalous
+                anomaly_seen_key = '%s.%s.%s' % (LOW_LATENCY_ANOMALY_SEEN_PREFIX, algorithm, base_name)
+                if not anomalous:
+                    if anomaly_seen_key in anomaly_seen_keys:
+                        anomaly_seen_keys.discard(anomaly_seen_key)
+                        try:
+                            self.redis_conn.delete(anomaly_seen_key)
+                        except:
+                            logger.error('error :: low latency process :: failed to delete %s' % anomaly_seen_key)
+                    continue
+                if int(alert_threshold) > 1:
+                    anomaly_seen_keys.add(anomaly_seen_key)
+                anomalous_metric = [datapoint_value, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm, int(timeseries[-1][0])]
+                logger.info('low latency process :: anomalous - %s, %s, %s, detected %s seconds after the datapoint' % (
+                    base_name, str(datapoint_value), algorithm,
+                    str(int(time()) - metric_timestamp)))
+                if settings.BOUNDARY_ENABLE_ALERTS:
+                    try:
+                        self.alert_anomalous_metric(
+                            anomalous_metric, None,
+                            anomaly_seen_prefix=LOW_LATENCY_ANOMALY_SEEN_PREFIX)
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: low latency process :: failed to alert on %s' % str(anomalous_metric))
+
     def run(self):
         """
         Called when the process intializes.
@@ -781,6 +1302,14 @@ class Boundary(Thread):
             logger.info('warning :: BOUNDARY_AUTOAGGRERATION_METRICS is not declared in settings.py, defaults to %s' % (
                 str(BOUNDARY_AUTOAGGRERATION_METRICS[0])))
 
+        # @added 20261019 - Feature #4722: Boundary rule index
+        # Compile the BOUNDARY_METRICS and BOUNDARY_AUTOAGGRERATION_METRICS
+        # patterns once into the rule index
+        self.boundary_rule_index = BoundaryRuleIndex(
+            BOUNDARY_METRICS, BOUNDARY_AUTOAGGRERATION,
+            BOUNDARY_AUTOAGGRERATION_METRICS)
+        logger.info('boundary_rule_index created with %s patterns' % str(len(self.boundary_rule_index.patterns)))
+
         # @modified 20191022 - Branch #3262: py3
         # python-2.x and python3.x handle while 1 and while True differently
         # while 1:
@@ -830,29 +1359,75 @@ class Boundary(Thread):
             # Reset boundary_metrics
             boundary_metrics = []
 
-            # Build boundary metrics
+            # @modified 20261019 - Feature #4722: Boundary rule index
+            # Resolve the metrics from the boundary_rule_index rather than
+            # compiling and matching every BOUNDARY_METRICS pattern for every
+            # metric every run, the rules of each metric are only resolved the
+            # first time the metric is seen and the spawned processes use the
+            # resolved rules
+            # # Build boundary metrics
+            # for metric_name in unique_metrics:
+            #     for metric in BOUNDARY_METRICS:
+            #         if ENABLE_BOUNDARY_DEBUG:
+            #             logger.debug('debug :: pattern matching %s against BOUNDARY_METRICS %s' % (
+            #                 str(metric_name), str(metric)))
+            #         try:
+            #             CHECK_MATCH_PATTERN = metric[0]
+            #             check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
+
+            #             # @added 20191021 - Branch #3262: py3
+            #             metric_name = str(metric_name)
+
+            #             base_name = metric_name.replace(settings.FULL_NAMESPACE, '', 1)
+            #             pattern_match = check_match_pattern.match(base_name)
+            #         except:
+            #             logger.error(traceback.format_exc())
+            #             logger.error('error :: pattern matching - %s, %s' % (str(metric_name), str(metric)))
+
+            #         if pattern_match:
+            #             if ENABLE_BOUNDARY_DEBUG:
+            #                 logger.debug('debug :: boundary metric - pattern MATCHED - ' + metric[0] + " | " + base_name)
+            #             boundary_metrics.append([metric_name, metric[1]])
+            base_names = []
             for metric_name in unique_metrics:
-                for metric in BOUNDARY_METRICS:
+                metric_name = str(metric_name)
+                base_name = metric_name.replace(settings.FULL_NAMESPACE, '', 1)
+                base_names.append(base_name)
+                try:
+                    boundary_rules = self.boundary_rule_index.resolve(base_name)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to resolve the boundary rules of %s' % str(metric_name))
+                    continue
+                for rule in boundary_rules['rules']:
                     if ENABLE_BOUNDARY_DEBUG:
-                        logger.debug('debug :: pattern matching %s against BOUNDARY_METRICS %s' % (
-                            str(metric_name), str(metric)))
-                    try:
-                        CHECK_MATCH_PATTERN = metric[0]
-                        check_match_pattern = re.compile(CHECK_MATCH_PATTERN)
-
-                        # @added 20191021 - Branch #3262: py3
-                        metric_name = str(metric_name)
-
-                        base_name = metric_name.replace(settings.FULL_NAMESPACE, '', 1)
-                        pattern_match = check_match_pattern.match(base_name)
-                    except:
-                        logger.error(traceback.format_exc())
-                        logger.error('error :: pattern matching - %s, %s' % (str(metric_name), str(metric)))
-
-                    if pattern_match:
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.debug('debug :: boundary metric - pattern MATCHED - ' + metric[0] + " | " + base_name)
-                        boundary_metrics.append([metric_name, metric[1]])
+                        logger.debug('debug :: boundary metric - pattern MATCHED - %s | %s' % (str(rule[6]), base_name))
+                    boundary_metrics.append([metric_name, rule[6]])
+            self.boundary_rule_index.prune(base_names)
+
+            # @added 20261019 - Feature #4726: Boundary low latency mode
+            # Publish the Boundary metrics for the Horizon workers to publish
+            # the datapoints of and ensure the low latency process is running
+            if BOUNDARY_LOW_LATENCY:
+                low_latency_metrics = set([item[0] for item in boundary_metrics])
+                new_low_latency_metrics_set = '%s.new' % LOW_LATENCY_METRICS_SET
+                try:
+                    self.redis_conn.delete(new_low_latency_metrics_set)
+                    if low_latency_metrics:
+                        self.redis_conn.sadd(new_low_latency_metrics_set, *low_latency_metrics)
+                        self.redis_conn.rename(new_low_latency_metrics_set, LOW_LATENCY_METRICS_SET)
+                    else:
+                        self.redis_conn.delete(LOW_LATENCY_METRICS_SET)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to update the Redis set %s' % LOW_LATENCY_METRICS_SET)
+                if self.low_latency_p is None or not self.low_latency_p.is_alive():
+                    if self.low_latency_p is not None:
+                        logger.error('error :: the low latency process is not running, restarting it')
+                    self.low_latency_p = Process(target=self.low_latency_process)
+                    self.low_latency_p.daemon = True
+                    self.low_latency_p.start()
+                    logger.info('started the low latency process - pid %s' % str(self.low_latency_p.pid))
 
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info('debug :: boundary metrics - ' + str(boundary_metrics))
@@ -1030,263 +1605,40 @@ class Boundary(Thread):
                 # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
                 # for anomalous_metric in self.anomalous_metrics:
                 for anomalous_metric in boundary_anomalous_metrics:
-                    datapoint = str(anomalous_metric[0])
-                    metric_name = anomalous_metric[1]
-                    base_name = metric_name.replace(FULL_NAMESPACE, '', 1)
-                    expiration_time = str(anomalous_metric[2])
-                    metric_trigger = str(anomalous_metric[5])
-                    alert_threshold = int(anomalous_metric[6])
-                    metric_alerters = anomalous_metric[7]
-                    algorithm = anomalous_metric[8]
-                    # @added 20200122 - Feature #3396: http_alerter
-                    # Add the metric timestamp for the http_alerter resend queue
-                    metric_timestamp = anomalous_metric[9]
-
-                    if ENABLE_BOUNDARY_DEBUG:
-                        logger.info("debug :: anomalous_metric - " + str(anomalous_metric))
-
-                    # Determine how many times has the anomaly been seen if the
-                    # ALERT_THRESHOLD is set to > 1 and create a cache key in
-                    # redis to keep count so that alert_threshold can be honored
-                    if alert_threshold == 0:
-                        times_seen = 1
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info("debug :: alert_threshold - " + str(alert_threshold))
-
-                    if alert_threshold == 1:
-                        times_seen = 1
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info("debug :: alert_threshold - " + str(alert_threshold))
-
-                    if alert_threshold > 1:
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info('debug :: alert_threshold - ' + str(alert_threshold))
-                        anomaly_cache_key_count_set = False
-                        anomaly_cache_key_expiration_time = (int(alert_threshold) + 1) * 60
-                        anomaly_cache_key = 'anomaly_seen.%s.%s' % (algorithm, base_name)
-                        try:
-                            anomaly_cache_key_count = self.redis_conn.get(anomaly_cache_key)
-                            if not anomaly_cache_key_count:
-                                try:
-                                    if ENABLE_BOUNDARY_DEBUG:
-                                        logger.info('debug :: redis no anomaly_cache_key - ' + str(anomaly_cache_key))
-                                    times_seen = 1
-                                    if ENABLE_BOUNDARY_DEBUG:
-                                        logger.info('debug :: redis setex anomaly_cache_key - ' + str(anomaly_cache_key))
-                                    self.redis_conn.setex(anomaly_cache_key, anomaly_cache_key_expiration_time, packb(int(times_seen)))
-                                    logger.info('set anomaly seen key :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
-                                except Exception as e:
-                                    logger.error('error :: redis setex failed :: %s' % str(anomaly_cache_key))
-                                    logger.error('error :: could not set key: %s' % e)
-                            else:
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info('debug :: redis anomaly_cache_key retrieved OK - ' + str(anomaly_cache_key))
-                                anomaly_cache_key_count_set = True
-                        except:
-                            if ENABLE_BOUNDARY_DEBUG:
-                                logger.info('debug :: redis failed - anomaly_cache_key retrieval failed - ' + str(anomaly_cache_key))
-                            anomaly_cache_key_count_set = False
-
-                        if anomaly_cache_key_count_set:
-                            unpacker = Unpacker(use_list=False)
-                            unpacker.feed(anomaly_cache_key_count)
-                            raw_times_seen = list(unpacker)
-                            times_seen = int(raw_times_seen[0]) + 1
-                            try:
-                                self.redis_conn.setex(anomaly_cache_key, anomaly_cache_key_expiration_time, packb(int(times_seen)))
-                                logger.info('set anomaly seen key :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
-                            except:
-                                times_seen = 1
-                                logger.error('error :: set anomaly seen key failed :: %s seen %s' % (anomaly_cache_key, str(times_seen)))
-
-                    # Alert the alerters if times_seen > alert_threshold
-                    if times_seen >= alert_threshold:
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info('debug :: times_seen %s is greater than or equal to alert_threshold %s' % (str(times_seen), str(alert_threshold)))
-
-                        # @added 20171216 - Task #2236: Change Boundary to only send to Panorama on alert
-                        tmp_panaroma_anomaly_file = '%s/%s.%s.%s.panorama_anomaly.txt' % (
-                            settings.SKYLINE_TMP_DIR, added_at,
-                            # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
-                            # Added algorithm as it is required if the metric has
-                            # multiple rules covering a number of algorithms
-                            algorithm, base_name)
-                        if ENABLE_BOUNDARY_DEBUG:
-                            logger.info('debug :: tmp_panaroma_anomaly_file - %s' % (str(tmp_panaroma_anomaly_file)))
-                        if os.path.isfile(tmp_panaroma_anomaly_file):
-                            panaroma_anomaly_file = '%s/%s.%s.txt' % (
-                                settings.PANORAMA_CHECK_PATH, added_at, base_name)
-                            logger.info('moving tmp_panaroma_anomaly_file - %s to panaroma_anomaly_file %s' % (str(tmp_panaroma_anomaly_file), str(panaroma_anomaly_file)))
-                            # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
-                            # Added skyline_app
-                            try:
-                                # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
-                                # Correct move
-                                # move_file(skyline_app, tmp_panaroma_anomaly_file, panaroma_anomaly_file)
-                                move_file(skyline_app, settings.PANORAMA_CHECK_PATH, tmp_panaroma_anomaly_file)
-                            except:
-                                logger.info(traceback.format_exc())
-                                logger.error('error :: failed to move tmp_panaroma_anomaly_file to panaroma_anomaly_file')
-                            # @added 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
-                            # Rename moved file as the filename is used in Panorama
-                            try:
-                                tmp_panaroma_anomaly_file_to_rename = '%s/%s.%s.%s.panorama_anomaly.txt' % (
-                                    settings.PANORAMA_CHECK_PATH, added_at,
-                                    algorithm, base_name)
-                                os.rename(tmp_panaroma_anomaly_file_to_rename, panaroma_anomaly_file)
-                            except:
-                                logger.info(traceback.format_exc())
-                                logger.error('error :: failed to rename tmp_panaroma_anomaly_filename to panaroma_anomaly_filename')
-                        else:
-                            logger.error('error :: tmp_panaroma_anomaly_file does not exist')
-
-                        for alerter in metric_alerters.split("|"):
-                            # Determine alerter limits
-                            send_alert = False
-                            alerts_sent = 0
-                            if ENABLE_BOUNDARY_DEBUG:
-                                logger.info('debug :: checking alerter - %s' % alerter)
-                            try:
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info('debug :: determining alerter_expiration_time for settings')
-                                alerter_expiration_time_setting = settings.BOUNDARY_ALERTER_OPTS['alerter_expiration_time'][alerter]
-                                alerter_expiration_time = int(alerter_expiration_time_setting)
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info('debug :: determined alerter_expiration_time from settings - %s' % str(alerter_expiration_time))
-                            except:
-                                # Set an arbitrary expiry time if not set
-                                alerter_expiration_time = 160
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: could not determine alerter_expiration_time from settings")
-                            try:
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: determining alerter_limit from settings")
-                                alerter_limit_setting = settings.BOUNDARY_ALERTER_OPTS['alerter_limit'][alerter]
-                                alerter_limit = int(alerter_limit_setting)
-                                alerter_limit_set = True
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: determined alerter_limit from settings - %s" % str(alerter_limit))
-                            except:
-                                alerter_limit_set = False
-                                send_alert = True
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: could not determine alerter_limit from settings")
-
-                            # If the alerter_limit is set determine how many
-                            # alerts the alerter has sent
-                            if alerter_limit_set:
-                                alerter_sent_count_key = 'alerts_sent.%s' % (alerter)
-                                try:
-                                    alerter_sent_count_key_data = self.redis_conn.get(alerter_sent_count_key)
-                                    if not alerter_sent_count_key_data:
-                                        if ENABLE_BOUNDARY_DEBUG:
-                                            logger.info("debug :: redis no alerter key, no alerts sent for - " + str(alerter_sent_count_key))
-                                        alerts_sent = 0
-                                        send_alert = True
-                                        if ENABLE_BOUNDARY_DEBUG:
-                                            logger.info("debug :: alerts_sent set to %s" % str(alerts_sent))
-                                            logger.info("debug :: send_alert set to %s" % str(send_alert))
-                                    else:
-                                        if ENABLE_BOUNDARY_DEBUG:
-                                            logger.info('debug :: redis alerter key retrieved, unpacking %s' % str(alerter_sent_count_key))
-                                        unpacker = Unpacker(use_list=False)
-                                        unpacker.feed(alerter_sent_count_key_data)
-                                        raw_alerts_sent = list(unpacker)
-                                        alerts_sent = int(raw_alerts_sent[0])
-                                        if ENABLE_BOUNDARY_DEBUG:
-                                            logger.info("debug :: alerter %s alerts sent %s " % (str(alerter), str(alerts_sent)))
-                                except:
-                                    logger.info("No key set - %s" % alerter_sent_count_key)
-                                    alerts_sent = 0
-                                    send_alert = True
-                                    if ENABLE_BOUNDARY_DEBUG:
-                                        logger.info("debug :: alerts_sent set to %s" % str(alerts_sent))
-                                        logger.info("debug :: send_alert set to %s" % str(send_alert))
-
-                                if alerts_sent < alerter_limit:
-                                    send_alert = True
-                                    if ENABLE_BOUNDARY_DEBUG:
-                                        logger.info("debug :: alerts_sent %s is less than alerter_limit %s" % (str(alerts_sent), str(alerter_limit)))
-                                        logger.info("debug :: send_alert set to %s" % str(send_alert))
-
-                            # Send alert
-                            alerter_alert_sent = False
-                            if send_alert:
-                                cache_key = 'last_alert.boundary.%s.%s.%s' % (alerter, base_name, algorithm)
-                                if ENABLE_BOUNDARY_DEBUG:
-                                    logger.info("debug :: checking cache_key - %s" % cache_key)
-                                try:
-                                    last_alert = self.redis_conn.get(cache_key)
-                                    if not last_alert:
-                                        try:
-                                            self.redis_conn.setex(cache_key, int(anomalous_metric[2]), packb(int(anomalous_metric[0])))
-                                            if ENABLE_BOUNDARY_DEBUG:
-                                                logger.info('debug :: key setex OK - %s' % (cache_key))
-                                            # @modified 20200122 - Feature #3396: http_alerter
-                                            # Add the metric timestamp for the http_alerter resend queue
-                                            # trigger_alert(alerter, datapoint, base_name, expiration_time, metric_trigger, algorithm)
-                                            trigger_alert(alerter, datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                            logger.info('alert sent :: %s - %s - via %s - %s' % (base_name, datapoint, alerter, algorithm))
-                                            trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                            logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
-                                            alerter_alert_sent = True
-                                        except Exception as e:
-                                            logger.error('error :: alert failed :: %s - %s - via %s - %s' % (base_name, datapoint, alerter, algorithm))
-                                            logger.error('error :: could not send alert: %s' % str(e))
-                                            trigger_alert('syslog', datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                    else:
-                                        if ENABLE_BOUNDARY_DEBUG:
-                                            logger.info("debug :: cache_key exists not alerting via %s for %s is less than alerter_limit %s" % (alerter, cache_key))
-                                        trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                        logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
-                                except:
-                                    trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                    logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
-                            else:
-                                trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                                logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
-
-                            # Update the alerts sent for the alerter cache key,
-                            # to allow for alert limiting
-                            if alerter_alert_sent and alerter_limit_set:
-                                try:
-                                    alerter_sent_count_key = 'alerts_sent.%s' % (alerter)
-                                    new_alerts_sent = int(alerts_sent) + 1
-                                    self.redis_conn.setex(alerter_sent_count_key, alerter_expiration_time, packb(int(new_alerts_sent)))
-                                    logger.info('set %s - %s' % (alerter_sent_count_key, str(new_alerts_sent)))
-                                except:
-                                    logger.error('error :: failed to set %s - %s' % (alerter_sent_count_key, str(new_alerts_sent)))
-                    else:
-                        # Always alert to syslog, even if alert_threshold is not
-                        # breached or if send_alert is not True
-                        trigger_alert("syslog", datapoint, base_name, expiration_time, metric_trigger, algorithm, metric_timestamp)
-                        logger.info('alert sent :: %s - %s - via syslog - %s' % (base_name, datapoint, algorithm))
-
-                    # @added 20171216 - Task #2236: Change Boundary to only send to Panorama on alert
-                    # Remove tmp_panaroma_anomaly_file
-                    tmp_panaroma_anomaly_file = '%s/%s.%s.%s.panorama_anomaly.txt' % (
-                        # @modified 20171228 - Task #2236: Change Boundary to only send to Panorama on alert
-                        # Added algorithm
-                        settings.SKYLINE_TMP_DIR, added_at, algorithm, base_name)
-                    if os.path.isfile(tmp_panaroma_anomaly_file):
-                        try:
-                            os.remove(str(tmp_panaroma_anomaly_file))
-                            logger.info('removed - %s' % str(tmp_panaroma_anomaly_file))
-                        except OSError:
-                            pass
+                    # @modified 20261019 - Feature #4726: Boundary low latency mode
+                    # The alerting of an anomalous_metric is done in
+                    # alert_anomalous_metric so that the low latency process
+                    # can alert on the anomalous metrics it detects
+                    self.alert_anomalous_metric(anomalous_metric, added_at)
 
             # Write anomalous_metrics to static webapp directory
             # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
             # if len(self.anomalous_metrics) > 0:
             if len(boundary_anomalous_metrics) > 0:
                 filename = path.abspath(path.join(path.dirname(__file__), '..', settings.ANOMALY_DUMP))
-                with open(filename, 'w') as fh:
-                    # Make it JSONP with a handle_data() function
-                    # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
-                    # anomalous_metrics = list(self.anomalous_metrics)
-                    anomalous_metrics = boundary_anomalous_metrics
-                    anomalous_metrics.sort(key=operator.itemgetter(1))
-                    fh.write('handle_data(%s)' % anomalous_metrics)
+                # @modified 20261019 - Feature #4728: Anomalies snapshots
+                # The ANOMALY_DUMP is written with a versioned, gzipped
+                # snapshot of the anomalies for the webapp by
+                # write_anomalies_snapshot
+                # with open(filename, 'w') as fh:
+                #     # Make it JSONP with a handle_data() function
+                #     # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
+                #     # anomalous_metrics = list(self.anomalous_metrics)
+                #     anomalous_metrics = boundary_anomalous_metrics
+                #     anomalous_metrics.sort(key=operator.itemgetter(1))
+                #     fh.write('handle_data(%s)' % anomalous_metrics)
+                anomalous_metrics = boundary_anomalous_metrics
+                anomalous_metrics.sort(key=operator.itemgetter(1))
+                try:
+                    # @modified 20261019 - Feature #4728: Anomalies snapshots
+                    # Each app publishes to its own snapshots directory
+                    snapshot_version, snapshot_etag = write_anomalies_snapshot(
+                        filename, anomalous_metrics, skyline_app)
+                    logger.info('anomalies snapshot version %s - %s' % (
+                        str(snapshot_version), snapshot_etag))
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to write anomalies to %s' % str(filename))
 
             # @added 20200121 - Feature #3396: http_alerter
             full_resend_queue = []
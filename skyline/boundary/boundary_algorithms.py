@@ -1,6 +1,7 @@
 from __future__ import division
 import numpy as np
-import scipy
+# @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+# import scipy
 import traceback
 import logging
 from time import time
@@ -46,16 +47,45 @@ def boundary_no_mans_land():
     return True
 
 
+# @added 20261019 - Feature #4724: Vectorised boundary algorithms
+def timeseries_to_array(timeseries):
+    """
+    Convert a timeseries list of (timestamp, value) items to a 2 dimensional
+    float64 numpy array, so that a metric timeseries is converted once and the
+    algorithms are evaluated on the array.
+
+    :param timeseries: the timeseries
+    :type timeseries: list
+    :return: timeseries_array
+    :rtype: numpy.ndarray
+    """
+    if isinstance(timeseries, np.ndarray):
+        return timeseries
+    return np.array(timeseries, dtype=np.float64).reshape(-1, 2)
+
+
 def autoaggregate_ts(timeseries, autoaggregate_value):
     """
     This is a utility function used to autoaggregate a timeseries.  If a
     timeseries data set has 6 datapoints per minute but only one data value
     every minute then autoaggregate will aggregate every autoaggregate_value.
+
+    The last hour of the timeseries is aggregated into autoaggregate_value
+    buckets, the (int) values in each bucket are summed.
+
+    :param timeseries: the timeseries list or timeseries_array
+    :param autoaggregate_value: the bucket size in seconds
+    :type timeseries: list or numpy.ndarray
+    :type autoaggregate_value: int
+    :return: aggregated timeseries_array
+    :rtype: numpy.ndarray
     """
     if ENABLE_BOUNDARY_DEBUG:
         logger.info('debug :: autoaggregate_ts at %s seconds' % str(autoaggregate_value))
 
-    aggregated_timeseries = []
+    # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+    # aggregated_timeseries = []
+    aggregated_timeseries = np.empty((0, 2))
 
     if len(timeseries) < 60:
         if ENABLE_BOUNDARY_DEBUG:
@@ -79,27 +109,51 @@ def autoaggregate_ts(timeseries, autoaggregate_value):
     except Exception as e:
         logger.error('Algorithm error: %s' % traceback.format_exc())
         logger.error('error: %e' % e)
-        aggregated_timeseries = []
         return aggregated_timeseries
 
     if valid_timestamps:
         try:
+            # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+            # Rather than building an array with a list comprehension over the
+            # whole timeseries for every bucket, determine the bucket of every
+            # datapoint with searchsorted and sum the buckets with bincount
+            # # Check sane variables otherwise we can just hang here in a while loop
+            # while int(next_timestamp) > int(start_timestamp):
+            #     value = np.sum(scipy.array([int(x[1]) for x in timeseries if x[0] <= last_timestamp and x[0] > next_timestamp]))
+            #     aggregated_timeseries += ((last_timestamp, value),)
+            #     last_timestamp = next_timestamp
+            #     next_timestamp = last_timestamp - autoaggregate_value
+            # aggregated_timeseries.reverse()
+            # return aggregated_timeseries
+            bucket_edges = [last_timestamp]
             # Check sane variables otherwise we can just hang here in a while loop
             while int(next_timestamp) > int(start_timestamp):
-                value = np.sum(scipy.array([int(x[1]) for x in timeseries if x[0] <= last_timestamp and x[0] > next_timestamp]))
-                aggregated_timeseries += ((last_timestamp, value),)
-                last_timestamp = next_timestamp
-                next_timestamp = last_timestamp - autoaggregate_value
-            aggregated_timeseries.reverse()
+                bucket_edges.append(next_timestamp)
+                next_timestamp = next_timestamp - autoaggregate_value
+            if len(bucket_edges) < 2:
+                return aggregated_timeseries
+            # Ascending edges, bucket n is the (edges[n - 1], edges[n]] period
+            bucket_edges = np.array(bucket_edges[::-1], dtype=np.float64)
+            timeseries_array = timeseries_to_array(timeseries)
+            buckets = np.searchsorted(bucket_edges, timeseries_array[:, 0], side='left')
+            in_buckets = (buckets > 0) & (buckets < len(bucket_edges))
+            values = timeseries_array[in_buckets, 1]
+            if not np.all(np.isfinite(values)):
+                logger.error('Algorithm error: autoaggregate_ts - the timeseries has non numeric values')
+                return aggregated_timeseries
+            # The values are aggregated as ints
+            bucket_values = np.bincount(
+                buckets[in_buckets], weights=np.trunc(values),
+                minlength=len(bucket_edges))[1:]
+            aggregated_timeseries = np.column_stack((bucket_edges[1:], bucket_values))
             return aggregated_timeseries
         except Exception as e:
             logger.error('Algorithm error: %s' % traceback.format_exc())
             logger.error('error: %e' % e)
-            aggregated_timeseries = []
+            aggregated_timeseries = np.empty((0, 2))
             return aggregated_timeseries
     else:
         logger.error('could not aggregate - timestamps not valid for aggregation')
-        aggregated_timeseries = []
         return aggregated_timeseries
 
 
@@ -109,6 +163,8 @@ def less_than(timeseries, metric_name, metric_expiration_time, metric_min_averag
         # autoaggregate_value):
     """
     A timeseries is anomalous if the datapoint is less than metric_trigger
+
+    The timeseries is a timeseries_array, only the last datapoint is evaluated.
     """
     # @modified 20190312 - Task #2862: Allow Boundary to analyse short time series
     #                      https://github.com/earthgecko/skyline/issues/88
@@ -128,6 +184,8 @@ def less_than(timeseries, metric_name, metric_expiration_time, metric_min_averag
 def greater_than(timeseries, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger):
     """
     A timeseries is anomalous if the datapoint is greater than metric_trigger
+
+    The timeseries is a timeseries_array, only the last datapoint is evaluated.
     """
     # @modified 20190312 - Task #2862: Allow Boundary to analyse short time series
     #                      https://github.com/earthgecko/skyline/issues/88
@@ -155,12 +213,20 @@ def detect_drop_off_cliff(timeseries, metric_name, metric_expiration_time, metri
     This algorithm is most suited to timeseries with most datapoints being > 100
     (e.g high rate).  The arbitrary <trigger> values become more noisy with
     lower value datapoints, but it still matches drops off cliffs.
+
+    The timeseries is a timeseries_array, the periods are selected with
+    vectorised timestamp masks.
     """
 
     if len(timeseries) < 30:
         return False
 
     try:
+        # @added 20261019 - Feature #4724: Vectorised boundary algorithms
+        timeseries_array = timeseries_to_array(timeseries)
+        timestamps = timeseries_array[:, 0]
+        values = timeseries_array[:, 1]
+
         int_end_timestamp = int(timeseries[-1][0])
         # Determine resolution of the data set
         int_second_last_end_timestamp = int(timeseries[-2][0])
@@ -168,7 +234,10 @@ def detect_drop_off_cliff(timeseries, metric_name, metric_expiration_time, metri
         ten_data_point_seconds = resolution * 10
         ten_datapoints_ago = int_end_timestamp - ten_data_point_seconds
 
-        ten_datapoint_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > ten_datapoints_ago])
+        # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+        # ten_datapoint_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > ten_datapoints_ago])
+        up_to_end = timestamps <= int_end_timestamp
+        ten_datapoint_array = values[up_to_end & (timestamps > ten_datapoints_ago)]
         ten_datapoint_array_len = len(ten_datapoint_array)
     except:
         return None
@@ -224,7 +293,9 @@ def detect_drop_off_cliff(timeseries, metric_name, metric_expiration_time, metri
         try:
             twenty_data_point_seconds = resolution * 20
             twenty_datapoints_ago = int_end_timestamp - twenty_data_point_seconds
-            twenty_datapoint_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > twenty_datapoints_ago])
+            # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+            # twenty_datapoint_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > twenty_datapoints_ago])
+            twenty_datapoint_array = values[up_to_end & (timestamps > twenty_datapoints_ago)]
             number_of_similar_datapoints_in_twenty = len(np.where(twenty_datapoint_array <= ten_datapoint_min_value))
             if number_of_similar_datapoints_in_twenty > 2:
                 return False
@@ -248,7 +319,9 @@ def detect_drop_off_cliff(timeseries, metric_name, metric_expiration_time, metri
                 min_average_data_point_seconds = resolution * min_average_seconds
     #            min_average_datapoints_ago = int_end_timestamp - (resolution * min_average_seconds)
                 min_average_datapoints_ago = int_end_timestamp - min_average_seconds
-                min_average_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > min_average_datapoints_ago])
+                # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+                # min_average_array = scipy.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > min_average_datapoints_ago])
+                min_average_array = values[up_to_end & (timestamps > min_average_datapoints_ago)]
                 min_average_array_average = np.sum(min_average_array) / len(min_average_array)
                 if min_average_array_average < min_average:
                     return False
@@ -286,12 +359,20 @@ def detect_drop_off_cliff(timeseries, metric_name, metric_expiration_time, metri
     return False
 
 
+# @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+# Added timeseries_array
 def run_selected_algorithm(
         timeseries, metric_name, metric_expiration_time, metric_min_average,
         metric_min_average_seconds, metric_trigger, alert_threshold,
-        metric_alerters, autoaggregate, autoaggregate_value, algorithm):
+        metric_alerters, autoaggregate, autoaggregate_value, algorithm,
+        timeseries_array=None):
     """
     Filter timeseries and run selected algorithm.
+
+    The algorithms are evaluated on the timeseries_array, pass the
+    timeseries_array of the timeseries so that a metric that is analysed by
+    more than one algorithm is only converted once.  If it is not passed it is
+    converted from the timeseries.
     """
 
     if ENABLE_BOUNDARY_DEBUG:
@@ -315,9 +396,17 @@ def run_selected_algorithm(
             logger.info('debug :: Stale - %s, %s' % (metric_name, algorithm))
         raise Stale()
 
+    # @added 20261019 - Feature #4724: Vectorised boundary algorithms
+    if timeseries_array is None:
+        timeseries_array = timeseries_to_array(timeseries)
+    # The datapoint is returned as per the timeseries, not as a numpy type
+    datapoint = timeseries[-1][1]
+
     # Get rid of boring series
     if algorithm == 'detect_drop_off_cliff' or algorithm == 'less_than':
-        if len(set(item[1] for item in timeseries[-MAX_TOLERABLE_BOREDOM:])) == BOREDOM_SET_SIZE:
+        # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+        # if len(set(item[1] for item in timeseries[-MAX_TOLERABLE_BOREDOM:])) == BOREDOM_SET_SIZE:
+        if len(np.unique(timeseries_array[-MAX_TOLERABLE_BOREDOM:, 1])) == BOREDOM_SET_SIZE:
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info('debug :: Boring - %s, %s' % (metric_name, algorithm))
             raise Boring()
@@ -332,14 +421,21 @@ def run_selected_algorithm(
                     'debug :: aggregated_timeseries returned %s for %s' % (
                         metric_name, algorithm))
         except Exception as e:
-            agg_timeseries = []
+            # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+            # agg_timeseries = []
+            agg_timeseries = np.empty((0, 2))
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info('debug error - autoaggregate excpection %s for %s' % (metric_name, algorithm))
                 logger.error('Algorithm error: %s' % traceback.format_exc())
                 logger.error('error: %e' % e)
 
         if len(agg_timeseries) > 10:
+            # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+            # timeseries = agg_timeseries
             timeseries = agg_timeseries
+            timeseries_array = agg_timeseries
+            # The aggregated values are sums of int values
+            datapoint = int(agg_timeseries[-1][1])
         else:
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info('debug :: TooShort - %s, %s' % (metric_name, algorithm))
@@ -356,31 +452,35 @@ def run_selected_algorithm(
         raise TooShort()
 
     try:
-        ensemble = [globals()[algorithm](timeseries, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger)]
+        # @modified 20261019 - Feature #4724: Vectorised boundary algorithms
+        # Evaluate the algorithm on the timeseries_array and return the
+        # datapoint
+        # ensemble = [globals()[algorithm](timeseries, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger)]
+        ensemble = [bool(globals()[algorithm](timeseries_array, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger))]
         if ensemble.count(True) == 1:
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info(
                     'debug :: anomalous datapoint = %s - %s, %s, %s, %s, %s, %s, %s, %s' % (
-                        str(timeseries[-1][1]),
+                        str(datapoint),
                         str(metric_name), str(metric_expiration_time),
                         str(metric_min_average),
                         str(metric_min_average_seconds),
                         str(metric_trigger), str(alert_threshold),
                         str(metric_alerters), str(algorithm))
                 )
-            return True, ensemble, timeseries[-1][1], metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm
+            return True, ensemble, datapoint, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm
         else:
             if ENABLE_BOUNDARY_DEBUG:
                 logger.info(
                     'debug :: not anomalous datapoint = %s - %s, %s, %s, %s, %s, %s, %s, %s' % (
-                        str(timeseries[-1][1]),
+                        str(datapoint),
                         str(metric_name), str(metric_expiration_time),
                         str(metric_min_average),
                         str(metric_min_average_seconds),
                         str(metric_trigger), str(alert_threshold),
                         str(metric_alerters), str(algorithm))
                 )
-            return False, ensemble, timeseries[-1][1], metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm
+            return False, ensemble, datapoint, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm
     except:
         logger.error('Algorithm error: %s' % traceback.format_exc())
         return False, [], 1, metric_name, metric_expiration_time, metric_min_average, metric_min_average_seconds, metric_trigger, alert_threshold, metric_alerters, algorithm
@@ -0,0 +1,120 @@
+"""
+The Boundary low latency mode.
+
+When settings.BOUNDARY_LOW_LATENCY is enabled Boundary publishes the Redis keys
+of the metrics that have BOUNDARY_METRICS rules to the
+LOW_LATENCY_METRICS_SET Redis set every run and the Horizon workers publish the
+datapoints of those metrics to the LOW_LATENCY_CHANNEL as they are appended to
+Redis.  A long lived Boundary low latency process subscribes to the channel and
+keeps a tail window of each metric in memory, so that the Boundary algorithms
+are evaluated on every new datapoint as soon as it is appended, rather than on
+the next Boundary run.
+"""
+from __future__ import division
+from collections import deque
+
+# The Redis set of the metrics that Horizon publishes the datapoints of
+LOW_LATENCY_METRICS_SET = 'boundary.low_latency_metrics'
+
+# The Redis pub/sub channel that Horizon publishes the datapoints to
+LOW_LATENCY_CHANNEL = 'boundary.low_latency'
+
+# The prefix of the Redis keys that count the consecutive anomalous datapoints
+# of a metric and algorithm in the low latency process, separate from the
+# anomaly_seen keys that count the anomalous runs
+LOW_LATENCY_ANOMALY_SEEN_PREFIX = 'boundary.low_latency.anomaly_seen'
+
+# detect_drop_off_cliff requires at least 30 datapoints
+LOW_LATENCY_MIN_DATAPOINTS = 30
+
+
+class TailWindows(object):
+    """
+    The tail windows of the low latency metrics.  Each window holds the last
+    window_seconds of datapoints of a metric, but never less than
+    min_datapoints if the metric has them.
+    """
+
+    def __init__(self, window_seconds=3600, min_datapoints=LOW_LATENCY_MIN_DATAPOINTS):
+        """
+        :param window_seconds: settings.BOUNDARY_LOW_LATENCY_WINDOW
+        :param min_datapoints: the minimum number of datapoints to keep
+        :type window_seconds: int
+        :type min_datapoints: int
+        """
+        self.window_seconds = int(window_seconds)
+        self.min_datapoints = int(min_datapoints)
+        self.windows = {}
+
+    def has(self, metric_name):
+        return metric_name in self.windows
+
+    def trim(self, window):
+        oldest_timestamp = window[-1][0] - self.window_seconds
+        while len(window) > self.min_datapoints and window[0][0] < oldest_timestamp:
+            window.popleft()
+
+    def seed(self, metric_name, timeseries):
+        """
+        Seed the window of a metric from its timeseries.
+
+        :param metric_name: the metric Redis key
+        :param timeseries: the sorted timeseries of the metric
+        :type metric_name: str
+        :type timeseries: list
+        """
+        window = deque([float(x[0]), x[1]] for x in timeseries)
+        if window:
+            self.trim(window)
+        self.windows[metric_name] = window
+
+    def append(self, metric_name, timestamp, value):
+        """
+        Append a datapoint to the window of a metric.  A datapoint that is
+        older than the last datapoint in the window is not added, a datapoint
+        with the same timestamp as the last datapoint replaces it.
+
+        :param metric_name: the metric Redis key
+        :param timestamp: the datapoint timestamp
+        :param value: the datapoint value
+        :type metric_name: str
+        :type timestamp: int
+        :type value: float
+        :return: whether the datapoint is the new last datapoint of the window
+        :rtype: boolean
+        """
+        window = self.windows.setdefault(metric_name, deque())
+        timestamp = float(timestamp)
+        if window:
+            if timestamp < window[-1][0]:
+                return False
+            if timestamp == window[-1][0]:
+                window[-1][1] = value
+                return True
+        window.append([timestamp, value])
+        self.trim(window)
+        return True
+
+    def timeseries(self, metric_name):
+        """
+        The timeseries of the window of a metric.
+
+        :param metric_name: the metric Redis key
+        :type metric_name: str
+        :return: timeseries
+        :rtype: list
+        """
+        return [(x[0], x[1]) for x in self.windows.get(metric_name, [])]
+
+    def prune(self, metric_names):
+        """
+        Remove the windows of the metrics that are no longer low latency
+        metrics.
+
+        :param metric_names: the current low latency metric Redis keys
+        :type metric_names: list
+        """
+        current = set(metric_names)
+        for metric_name in list(self.windows.keys()):
+            if metric_name not in current:
+                del self.windows[metric_name]
@@ -0,0 +1,140 @@
+from __future__ import division
+import logging
+import re
+import traceback
+
+skyline_app = 'boundary'
+skyline_app_logger = '%sLog' % skyline_app
+logger = logging.getLogger(skyline_app_logger)
+
+
+def boundary_rule_settings(metric):
+    """
+    Determine the settings of a BOUNDARY_METRICS tuple, the elements that are
+    not declared or are declared as a falsy value default to False, apart from
+    the min_average_seconds which defaults to 1200 if not declared.
+
+    :param metric: the BOUNDARY_METRICS tuple
+    :type metric: tuple
+    :return: [metric_expiration_time, metric_min_average,
+        metric_min_average_seconds, metric_trigger, alert_threshold,
+        metric_alerters, algorithm]
+    :rtype: list
+    """
+    rule_settings = []
+    for index in range(2, 8):
+        try:
+            value = metric[index] if metric[index] else False
+        except:
+            if index == 4:
+                value = 1200
+            else:
+                value = False
+        rule_settings.append(value)
+    rule_settings.append(metric[1])
+    return rule_settings
+
+
+class BoundaryRuleIndex(object):
+    """
+    An index of the BOUNDARY_METRICS rules.  The BOUNDARY_METRICS and
+    BOUNDARY_AUTOAGGRERATION_METRICS patterns are compiled once when the index
+    is created and each metric is resolved to the rules that apply to it the
+    first time it is seen, the resolved rules of each metric are cached in the
+    index across runs.
+    """
+
+    def __init__(self, boundary_metrics, autoaggregation=False, autoaggregation_metrics=()):
+        """
+        :param boundary_metrics: settings.BOUNDARY_METRICS
+        :param autoaggregation: settings.BOUNDARY_AUTOAGGRERATION
+        :param autoaggregation_metrics: settings.BOUNDARY_AUTOAGGRERATION_METRICS
+        :type boundary_metrics: tuple
+        :type autoaggregation: boolean
+        :type autoaggregation_metrics: tuple
+        """
+        self.boundary_metrics = boundary_metrics
+        self.patterns = []
+        for metric in boundary_metrics:
+            try:
+                self.patterns.append((re.compile(metric[0]), metric))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: boundary_rules :: failed to compile the BOUNDARY_METRICS pattern - %s' % str(metric))
+        self.autoaggregation = autoaggregation
+        self.autoaggregation_patterns = []
+        if autoaggregation:
+            for autoaggregate_metric in autoaggregation_metrics:
+                try:
+                    self.autoaggregation_patterns.append(
+                        (re.compile(autoaggregate_metric[0]), autoaggregate_metric[1]))
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: boundary_rules :: failed to compile the BOUNDARY_AUTOAGGRERATION_METRICS pattern - %s' % str(autoaggregate_metric))
+        self.resolved = {}
+
+    def resolve(self, base_name):
+        """
+        The rules that apply to a metric.  Each rule is a list of the
+        metric_expiration_time, metric_min_average, metric_min_average_seconds,
+        metric_trigger, alert_threshold, metric_alerters, algorithm and whether
+        the rule is run.  If a metric has its own unique BOUNDARY_METRICS tuple
+        only the unique tuples of the metric are run, otherwise all the wildcard
+        namespace tuples that match the metric are run.
+
+        :param base_name: the metric base_name
+        :type base_name: str
+        :return: {'rules': rules, 'autoaggregate': autoaggregate,
+            'autoaggregate_value': autoaggregate_value}
+        :rtype: dict
+        """
+        if base_name in self.resolved:
+            return self.resolved[base_name]
+
+        matched_metrics = [
+            metric for check_match_pattern, metric in self.patterns
+            if check_match_pattern.match(base_name)]
+        wildcard_namespace = True
+        for metric in matched_metrics:
+            if metric[0] == base_name:
+                wildcard_namespace = False
+        rules = []
+        seen = set()
+        for metric in matched_metrics:
+            rule_settings = boundary_rule_settings(metric)
+            if str(rule_settings) in seen:
+                continue
+            seen.add(str(rule_settings))
+            algorithm = rule_settings[6]
+            boundary_metric_tuple = tuple([base_name, algorithm] + rule_settings[:6])
+            has_unique_tuple = boundary_metric_tuple in matched_metrics
+            rules.append(rule_settings + [(has_unique_tuple or wildcard_namespace)])
+
+        # As per the original BOUNDARY_AUTOAGGRERATION_METRICS evaluation, the
+        # last autoaggregation pattern determines the autoaggregation
+        autoaggregate = False
+        autoaggregate_value = 0
+        for check_match_pattern, value in self.autoaggregation_patterns:
+            autoaggregate = False
+            autoaggregate_value = 0
+            if check_match_pattern.match(base_name):
+                autoaggregate = True
+                autoaggregate_value = value
+
+        resolved = {
+            'rules': rules, 'autoaggregate': autoaggregate,
+            'autoaggregate_value': autoaggregate_value}
+        self.resolved[base_name] = resolved
+        return resolved
+
+    def prune(self, base_names):
+        """
+        Remove the resolved rules of the metrics that are no longer in Redis.
+
+        :param base_names: the current metric base_names
+        :type base_names: list
+        """
+        current = set(base_names)
+        for base_name in list(self.resolved.keys()):
+            if base_name not in current:
+                del self.resolved[base_name]
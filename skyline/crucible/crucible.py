@@ -66,7 +66,10 @@ from skyline_functions import (
     # @added 20200506 - Feature #3532: Sort all time series
     sort_timeseries)
 
-from crucible_algorithms import run_algorithms
+# @modified 20261019 - Crucible parallel algorithms and deferred plots
+# from crucible_algorithms import run_algorithms
+from crucible_algorithms import (
+    run_algorithms, render_deferred_plots, CRUCIBLE_DEFER_PLOTS)
 
 skyline_app = 'crucible'
 skyline_app_logger = skyline_app + 'Log'
@@ -1182,6 +1185,16 @@ class Crucible(Thread):
 
         logger.info('run_algorithms took %s seconds' % str(run_algorithms_seconds))
 
+        # @added 20261019 - Crucible parallel algorithms and deferred plots
+        # Add the results directory to the Redis set of results that have
+        # deferred plots to create when there are no checks to process
+        if CRUCIBLE_DEFER_PLOTS:
+            try:
+                self.redis_conn.sadd('crucible.deferred_plots', os.path.dirname(anomaly_json))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to add %s to crucible.deferred_plots Redis set' % os.path.dirname(anomaly_json))
+
         # Update anomaly file
         # @modified 20200421 - Feature #3500: webapp - crucible_process_metrics
         #                      Feature #1448: Crucible web UI
@@ -1334,6 +1347,42 @@ class Crucible(Thread):
         except OSError:
             pass
 
+    # @added 20261019 - Crucible parallel algorithms and deferred plots
+    def render_deferred_plots(self, max_seconds):
+        """
+        Create the deferred plots for the results directories in the
+        crucible.deferred_plots Redis set for up to max_seconds, stopping if
+        a check file is added.
+
+        :param max_seconds: the maximum number of seconds to spend
+        :type max_seconds: int
+        :return: the number of results directories that had plots created
+        :rtype: int
+        """
+        plots_rendered = 0
+        render_until = time() + max_seconds
+        while time() < render_until:
+            try:
+                results_dir = self.redis_conn.spop('crucible.deferred_plots')
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to spop from crucible.deferred_plots Redis set')
+                break
+            if not results_dir:
+                break
+            if python_version == 3 and isinstance(results_dir, bytes):
+                results_dir = results_dir.decode('utf-8')
+            try:
+                if render_deferred_plots(results_dir):
+                    plots_rendered += 1
+                    logger.info('created deferred plots in %s' % results_dir)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to create deferred plots in %s' % results_dir)
+            if [f for f in listdir(settings.CRUCIBLE_CHECK_PATH) if isfile(join(settings.CRUCIBLE_CHECK_PATH, f))]:
+                break
+        return plots_rendered
+
     def run(self):
         """
         Called when the process intializes.
@@ -1438,8 +1487,17 @@ class Crucible(Thread):
 
 #                if len(metric_var_files) == 0:
                 if not metric_var_files:
-                    logger.info('sleeping 10 no metric check files')
-                    sleep(10)
+                    # @modified 20261019 - Crucible parallel algorithms and deferred plots
+                    # Create any deferred plots when there are no checks to
+                    # process, rather than sleeping
+                    # logger.info('sleeping 10 no metric check files')
+                    # sleep(10)
+                    plots_rendered = 0
+                    if CRUCIBLE_DEFER_PLOTS and not pause_for_log_rotation:
+                        plots_rendered = self.render_deferred_plots(10)
+                    if not plots_rendered:
+                        logger.info('sleeping 10 no metric check files')
+                        sleep(10)
 
                 # Discover metric to analyze
                 metric_var_files = ''
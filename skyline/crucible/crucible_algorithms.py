@@ -37,6 +37,14 @@ if True:
         CONSENSUS,
     )
     from skyline_functions import write_data_to_file
+    # @added 20261019 - Crucible parallel algorithms and deferred plots
+    import settings
+    import json
+    from collections import OrderedDict
+    from multiprocessing import Pool
+    # @added 20261019 - Crucible parallel algorithms and deferred plots
+    # Time out the algorithms process pool
+    from multiprocessing import TimeoutError as PoolTimeoutError
 
 skyline_app = 'crucible'
 skyline_app_logger = '%sLog' % skyline_app
@@ -44,6 +52,21 @@ logger = logging.getLogger(skyline_app_logger)
 
 python_version = int(version_info[0])
 
+# @added 20261019 - Crucible parallel algorithms and deferred plots
+try:
+    CRUCIBLE_ALGORITHM_PROCESSES = int(settings.CRUCIBLE_ALGORITHM_PROCESSES)
+except:
+    CRUCIBLE_ALGORITHM_PROCESSES = 1
+try:
+    CRUCIBLE_DEFER_PLOTS = settings.CRUCIBLE_DEFER_PLOTS
+except:
+    CRUCIBLE_DEFER_PLOTS = False
+try:
+    CRUCIBLE_TESTS_TIMEOUT = int(settings.CRUCIBLE_TESTS_TIMEOUT)
+except:
+    CRUCIBLE_TESTS_TIMEOUT = 60
+DEFERRED_PLOTS_FILENAME = 'skyline.deferred_plots.json'
+
 """
 This is no man's land. Do anything you want in here,
 as long as you return a boolean that determines whether the input
@@ -472,11 +495,520 @@ def detect_drop_off_cliff(timeseries, end_timestamp, full_duration):
     return False
 
 
+# @added 20261019 - Crucible sweep mode
+"""
+Sweep mode
+
+Crucible evaluates each algorithm against every prefix of the time series,
+timeseries[:index] for index in range(default_range, len(timeseries)), to
+determine where in the time series each algorithm would have triggered.
+Calling each algorithm on every prefix is O(n^2) and copies the prefix on every
+data point.  The sweep functions below determine the result of an algorithm for
+every prefix in a single pass over the time series, using running means and
+sample variances (Welford), the EWMA recursion over the whole series,
+incremental least squares sums and timestamp windows, and return the same
+results as calling the algorithm on each prefix.
+
+Each sweep function takes the timestamps and values as numpy arrays and
+returns a numpy boolean array where element index is the result of the
+algorithm on timeseries[:index].
+"""
+
+
+def sweep_running_mean_std(values):
+    """
+    The mean and sample standard deviation of every prefix of values, calculated
+    with Welford's online algorithm so that the variance of a constant prefix is
+    exactly 0.
+
+    :param values: the values
+    :type values: numpy.array
+    :return: (means, stds) where means[L] and stds[L] are the mean and sample
+        standard deviation of values[:L], nan where undefined
+    :rtype: tuple
+    """
+    values_count = len(values)
+    means = np.full(values_count + 1, np.nan)
+    stds = np.full(values_count + 1, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    for i in range(values_count):
+        value = float(values[i])
+        delta = value - mean
+        mean += delta / (i + 1)
+        m2 += delta * (value - mean)
+        means[i + 1] = mean
+        if i > 0:
+            stds[i + 1] = np.sqrt(m2 / i)
+    return means, stds
+
+
+def sweep_tail_avgs(values):
+    """
+    The tail_avg of every prefix of values.
+
+    :param values: the values
+    :type values: numpy.array
+    :return: tail_avgs where tail_avgs[L] is the tail_avg of values[:L], nan
+        for the empty prefix
+    :rtype: numpy.array
+    """
+    tail_avgs = np.full(len(values) + 1, np.nan)
+    tail_avgs[1:] = values
+    if len(values) > 2:
+        tail_avgs[3:] = (values[2:] + values[1:-1] + values[:-2]) / 3
+    return tail_avgs
+
+
+def sweep_stddev_from_average(timestamps, values, stats):
+    """
+    stddev_from_average for every prefix, using the running mean and
+    sample standard deviation.
+    """
+    means, stds, tail_avgs = stats['means'], stats['stds'], stats['tail_avgs']
+    with np.errstate(invalid='ignore'):
+        results = np.abs(tail_avgs - means) > 3 * stds
+    return results[:len(values)]
+
+
+def sweep_grubbs(timestamps, values, stats):
+    """
+    grubbs for every prefix, using the running mean and sample standard
+    deviation and the Student t threshold for each prefix length.
+    """
+    means, stds, tail_avgs = stats['means'], stats['stds'], stats['tail_avgs']
+    lengths = np.arange(len(values) + 1, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_scores = (tail_avgs - means) / stds
+        threshold = scipy.stats.t.isf(.05 / (2 * lengths), lengths - 2)
+        threshold_squared = threshold * threshold
+        grubbs_scores = ((lengths - 1) / np.sqrt(lengths)) * np.sqrt(threshold_squared / (lengths - 2 + threshold_squared))
+        results = (z_scores > grubbs_scores) & (stds != 0)
+    return results[:len(values)]
+
+
+def sweep_first_hour_average(timestamps, values, stats):
+    """
+    first_hour_average for every prefix, the data points before the
+    last_hour_threshold are a prefix of the time series so their mean and
+    standard deviation are the running mean and standard deviation of that
+    prefix.
+    """
+    means, stds, tail_avgs = stats['means'], stats['stds'], stats['tail_avgs']
+    results = np.zeros(len(values), dtype=bool)
+    int_start_timestamp = int(timestamps[0])
+    for length in range(2, len(values)):
+        int_end_timestamp = int(timestamps[length - 1])
+        int_full_duration = int_end_timestamp - int_start_timestamp
+        resolution = int_end_timestamp - int(timestamps[length - 2])
+        sixty_datapoints_ago = int_end_timestamp - (resolution * 60)
+        last_hour_threshold = int_end_timestamp - (int_full_duration - sixty_datapoints_ago)
+        # The number of data points in the prefix before last_hour_threshold
+        first_hour_length = min(int(np.searchsorted(timestamps, last_hour_threshold, side='left')), length)
+        with np.errstate(invalid='ignore'):
+            results[length] = abs(tail_avgs[length] - means[first_hour_length]) > 3 * stds[first_hour_length]
+    return results
+
+
+def sweep_stddev_from_moving_average(timestamps, values, stats):
+    """
+    stddev_from_moving_average for every prefix.
+    """
+    # The EWMA is a recursion over the series, so the value at the last data
+    # point of each prefix is the same as the value at that data point over the
+    # whole series and only needs to be calculated once
+    series = pandas.Series(values)
+    if PANDAS_VERSION < '0.18.0':
+        expAverage = pandas.stats.moments.ewma(series, com=50)
+        stdDev = pandas.stats.moments.ewmstd(series, com=50)
+    else:
+        expAverage = pandas.Series.ewm(series, ignore_na=False, min_periods=0, adjust=True, com=50).mean()
+        stdDev = pandas.Series.ewm(series, ignore_na=False, min_periods=0, adjust=True, com=50).std(bias=False)
+    results = np.zeros(len(values), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        results[1:] = (np.abs(values - expAverage.values) > 3 * stdDev.values)[:-1]
+    return results
+
+
+def sweep_mean_subtraction_cumulation(timestamps, values, stats):
+    """
+    mean_subtraction_cumulation for every prefix, subtracting the mean
+    does not change the standard deviation so the running mean and sample
+    standard deviation of the prefix excluding the last value are used.
+    """
+    means, stds = stats['means'], stats['stds']
+    results = np.zeros(len(values), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        # The last value of the prefix less the mean of the prefix excluding
+        # the last value, against the std of the prefix excluding the last value
+        results[1:] = (np.abs(values[:-1] - means[:len(values) - 1]) > 3 * stds[:len(values) - 1])
+    return results
+
+
+def sweep_least_squares(timestamps, values, stats):
+    """
+    least_squares for every prefix, using the running centred sums of
+    the timestamps and values to determine the fit and the residual sum of
+    squares.
+    """
+    results = np.zeros(len(values), dtype=bool)
+    # The timestamps relative to the first timestamp, a least squares fit is
+    # invariant to this shift and it keeps the sums well conditioned
+    x = timestamps - timestamps[0]
+    y = values
+    mean_x = 0.0
+    mean_y = 0.0
+    m2_x = 0.0
+    m2_y = 0.0
+    c_xy = 0.0
+    for i in range(len(values) - 1):
+        length = i + 1
+        delta_x = x[i] - mean_x
+        delta_y = y[i] - mean_y
+        mean_x += delta_x / length
+        mean_y += delta_y / length
+        m2_x += delta_x * (x[i] - mean_x)
+        m2_y += delta_y * (y[i] - mean_y)
+        c_xy += delta_x * (y[i] - mean_y)
+        # The sums are now for the data points up to and including i, which
+        # is the prefix timeseries[:length]
+        if length < 3 or m2_x == 0:
+            continue
+        m = c_xy / m2_x
+        c = mean_y - (m * mean_x)
+        sum_squared_errors = max(m2_y - ((c_xy * c_xy) / m2_x), 0.0)
+        std_dev = np.sqrt(sum_squared_errors / (length - 1))
+        errors = y[i - 2:i + 1] - ((m * x[i - 2:i + 1]) + c)
+        t = (errors[2] + errors[1] + errors[0]) / 3
+        results[length] = abs(t) > std_dev * 3 and round(std_dev) != 0 and round(t) != 0
+    return results
+
+
+def sweep_median_absolute_deviation(timestamps, values, stats):
+    """
+    median_absolute_deviation for every prefix.
+    """
+    # The median of every prefix is not incremental, but the prefix is
+    # evaluated as an array view rather than a copied list and Series
+    results = np.zeros(len(values), dtype=bool)
+    for length in range(1, len(values)):
+        prefix = values[:length]
+        demedianed = np.abs(prefix - np.median(prefix))
+        median_deviation = np.median(demedianed)
+        if median_deviation == 0:
+            continue
+        results[length] = (demedianed[-1] / median_deviation) > 6
+    return results
+
+
+def sweep_histogram_bins(timestamps, values, stats):
+    """
+    histogram_bins for every prefix.
+    """
+    tail_avgs = stats['tail_avgs']
+    results = np.zeros(len(values), dtype=bool)
+    for length in range(1, len(values)):
+        t = tail_avgs[length]
+        h = np.histogram(values[:length], bins=15)
+        bins = h[1]
+        for index, bin_size in enumerate(h[0]):
+            if bin_size <= 20:
+                # Is it in the first bin?
+                if index == 0:
+                    if t <= bins[0]:
+                        results[length] = True
+                        break
+                # Is it in the current bin?
+                elif t >= bins[index] and t < bins[index + 1]:
+                    results[length] = True
+                    break
+    return results
+
+
+def sweep_ks_test(timestamps, values, stats):
+    """
+    ks_test for every prefix, the reference and probe windows are
+    determined from the timestamps with searchsorted.
+    """
+    results = np.zeros(len(values), dtype=bool)
+    for length in range(2, len(values)):
+        int_end_timestamp = int(timestamps[length - 1])
+        resolution = int_end_timestamp - int(timestamps[length - 2])
+        ten_datapoints_ago = int_end_timestamp - (resolution * 10)
+        sixty_datapoints_ago = int_end_timestamp - (resolution * 60)
+        reference_start = int(np.searchsorted(timestamps[:length], sixty_datapoints_ago, side='left'))
+        probe_start = max(int(np.searchsorted(timestamps[:length], ten_datapoints_ago, side='left')), reference_start)
+        reference = values[reference_start:probe_start]
+        probe = values[probe_start:length]
+        if reference.size < 20 or probe.size < 20:
+            continue
+        try:
+            ks_d, ks_p_value = scipy.stats.ks_2samp(reference, probe)
+            if ks_p_value < 0.05 and ks_d > 0.5:
+                adf = sm.tsa.stattools.adfuller(reference, 10)
+                if adf[1] < 0.05:
+                    results[length] = True
+        except:
+            continue
+    return results
+
+
+def sweep_detect_drop_off_cliff(timestamps, values, stats):
+    """
+    detect_drop_off_cliff for every prefix, using the running maximum for
+    the maximum of all the data points.
+    """
+    results = np.zeros(len(values), dtype=bool)
+    max_values = np.maximum.accumulate(values)
+    for length in range(21, len(values)):
+        int_end_timestamp = int(timestamps[length - 1])
+        resolution = int_end_timestamp - int(timestamps[length - 2])
+        ten_datapoints_ago = int_end_timestamp - (resolution * 10)
+        window_start = int(np.searchsorted(timestamps[:length], ten_datapoints_ago, side='right'))
+        ten_datapoint_array = values[window_start:length]
+        ten_datapoint_array_len = len(ten_datapoint_array)
+        if ten_datapoint_array_len <= 3:
+            continue
+        # As per detect_drop_off_cliff
+        try:
+            if np.amin(ten_datapoint_array) < 0:
+                continue
+            ten_datapoint_max_value = np.amax(ten_datapoint_array)
+            if ten_datapoint_max_value < 10:
+                continue
+            ten_datapoint_array_sum = np.sum(ten_datapoint_array)
+            ten_datapoint_average = ten_datapoint_array_sum / ten_datapoint_array_len
+            ten_datapoint_value = int(ten_datapoint_array[-1])
+            if ten_datapoint_max_value < 101:
+                trigger = 15
+            if ten_datapoint_max_value < 20:
+                trigger = ten_datapoint_average / 2
+            if ten_datapoint_max_value > 100:
+                trigger = 100
+            if ten_datapoint_value == 0:
+                ten_datapoint_value = 0.1
+            if ten_datapoint_value == 1:
+                trigger = 1
+            if ten_datapoint_value == 0.1 and ten_datapoint_average < 1 and ten_datapoint_array_sum < 7:
+                trigger = 7
+            # Filter low rate and variable between 0 and 100 metrics
+            if ten_datapoint_value <= 1 and ten_datapoint_array_sum < 100 and ten_datapoint_array_sum > 1:
+                if max_values[length - 1] < 100:
+                    continue
+            ten_datapoint_result = ten_datapoint_average / ten_datapoint_value
+            if int(ten_datapoint_result) > trigger:
+                results[length] = True
+        except:
+            continue
+    return results
+
+
+SWEEP_ALGORITHMS = {
+    'histogram_bins': sweep_histogram_bins,
+    'first_hour_average': sweep_first_hour_average,
+    'stddev_from_average': sweep_stddev_from_average,
+    'grubbs': sweep_grubbs,
+    'ks_test': sweep_ks_test,
+    'mean_subtraction_cumulation': sweep_mean_subtraction_cumulation,
+    'median_absolute_deviation': sweep_median_absolute_deviation,
+    'stddev_from_moving_average': sweep_stddev_from_moving_average,
+    'least_squares': sweep_least_squares,
+    'detect_drop_off_cliff': sweep_detect_drop_off_cliff,
+}
+
+
+def sweep_stats(timeseries):
+    """
+    Determine the timestamps and values arrays and the running statistics that
+    are shared by the sweep functions.  If the time series timestamps are not
+    strictly increasing or any value is not a finite number the time series
+    cannot be swept and None is returned, the algorithms are then run on each
+    prefix.
+
+    :param timeseries: the time series
+    :type timeseries: list
+    :return: stats
+    :rtype: dict or None
+    """
+    try:
+        timestamps = np.array([int(item[0]) for item in timeseries], dtype=np.int64)
+        values = np.array([item[1] for item in timeseries], dtype=float)
+    except:
+        return None
+    if len(values) < 2:
+        return None
+    if not np.all(np.diff(timestamps) > 0):
+        return None
+    if not np.all(np.isfinite(values)):
+        return None
+    means, stds = sweep_running_mean_std(values)
+    return {
+        'timestamps': timestamps,
+        'values': values,
+        'means': means,
+        'stds': stds,
+        'tail_avgs': sweep_tail_avgs(values),
+    }
+
+
+def sweep_algorithm(algorithm, stats, start_index):
+    """
+    Run an algorithm in sweep mode.
+
+    :param algorithm: the algorithm name
+    :param stats: the sweep_stats for the time series
+    :param start_index: the first prefix index to evaluate
+    :type algorithm: str
+    :type stats: dict
+    :type start_index: int
+    :return: the anomalous prefix indices, or None if the algorithm has no sweep
+        function
+    :rtype: list or None
+    """
+    if algorithm not in SWEEP_ALGORITHMS:
+        return None
+    results = SWEEP_ALGORITHMS[algorithm](stats['timestamps'], stats['values'], stats)
+    return [int(index) for index in np.flatnonzero(results) if index >= start_index]
+
+
 """
 This is no longer no man's land, but feel free to play and try new stuff
 """
 
 
+# @added 20261019 - Crucible parallel algorithms and deferred plots
+def run_algorithm(
+        algorithm, timeseries, stats, default_range, end_timestamp,
+        full_duration):
+    """
+    Determine the prefixes of the time series that an algorithm finds
+    anomalous.  This is run in the run_algorithms process pool.
+
+    :param algorithm: the algorithm name
+    :param timeseries: the time series
+    :param stats: the sweep_stats for the time series or None
+    :param default_range: the first prefix index to evaluate
+    :param end_timestamp: passed to the algorithm
+    :param full_duration: passed to the algorithm
+    :type algorithm: str
+    :type timeseries: list
+    :type stats: dict
+    :type default_range: int
+    :type end_timestamp: int
+    :type full_duration: int
+    :return: (algorithm, anomalous_indices), anomalous_indices is None if the
+        algorithm failed
+    :rtype: tuple
+    """
+    anomalous_indices = None
+    # Evaluate the algorithm over all the prefixes in a single pass and
+    # only fall back to running the algorithm on each prefix if the
+    # algorithm has no sweep function or the sweep fails
+    if stats is not None:
+        try:
+            anomalous_indices = sweep_algorithm(algorithm, stats, default_range)
+        except:
+            logger.error('error :: %s' % (traceback.format_exc()))
+            logger.error('error :: sweep failed for %s, running on each data point' % str(algorithm))
+            anomalous_indices = None
+    if anomalous_indices is None:
+        try:
+            anomalous_indices = []
+            for index in range(default_range, len(timeseries)):
+                sliced = timeseries[:index]
+                anomaly = globals()[algorithm](sliced, end_timestamp, full_duration)
+                if anomaly:
+                    anomalous_indices.append(index)
+        except:
+            logger.error('error :: %s' % (traceback.format_exc()))
+            logger.error('error :: error thrown in algorithm running - %s' % str(algorithm))
+            anomalous_indices = None
+    return (algorithm, anomalous_indices)
+
+
+def plot_algorithm_results(results_dir, plot_data):
+    """
+    Create the algorithm and skyline.consensus.anomalies.png plots for the
+    results of run_algorithms.
+
+    :param results_dir: the crucible results directory
+    :param plot_data: the plot data determined by run_algorithms, a dict with
+        the values of the time series, the [algorithm, anomalous_indices]
+        results and the consensus_indices, None if there were no anomalies
+    :type results_dir: str
+    :type plot_data: dict
+    :return: success
+    :rtype: boolean
+    """
+    success = True
+    x_vals = np.arange(len(plot_data['values']))
+    y_vals = np.array(plot_data['values'])
+    plots = []
+    for algorithm, anomalous_indices in plot_data['algorithms']:
+        if anomalous_indices:
+            results_filename = join(results_dir + "/" + algorithm + ".DETECTED.png")
+        else:
+            results_filename = join(results_dir + "/" + algorithm + ".png")
+        plots.append([results_filename, anomalous_indices])
+    if plot_data['consensus_indices'] is not None:
+        results_filename = join(results_dir + "/skyline.consensus.anomalies.png")
+        plots.append([results_filename, plot_data['consensus_indices']])
+
+    for results_filename, anomalous_indices in plots:
+        try:
+            # Match default graphite graph size
+            fig = plt.figure(figsize=(5.86, 3.08), dpi=100)
+            plt.plot(x_vals, y_vals)
+            # Point out the datapoints that are anomalous
+            for index in anomalous_indices:
+                plt.plot([index], [y_vals[index - 1]], 'ro')
+            plt.savefig(results_filename, dpi=100)
+            plt.close(fig)
+            if python_version == 2:
+                os.chmod(results_filename, 0o644)
+            if python_version == 3:
+                os.chmod(results_filename, mode=0o644)
+        except:
+            logger.error('error :: %s' % (traceback.format_exc()))
+            logger.error('error :: failed to save %s' % str(results_filename))
+            plt.close('all')
+            success = False
+    return success
+
+
+def render_deferred_plots(results_dir):
+    """
+    Create the plots for a crucible results directory from the deferred plot
+    data that run_algorithms saved when CRUCIBLE_DEFER_PLOTS is enabled, the
+    deferred plot data file is removed once the plots are created.  Called by
+    crucible when there are no checks to process and by the webapp when the
+    results are requested.
+
+    :param results_dir: the crucible results directory
+    :type results_dir: str
+    :return: rendered
+    :rtype: boolean
+    """
+    deferred_plots_file = join(results_dir + "/" + DEFERRED_PLOTS_FILENAME)
+    if not os.path.isfile(deferred_plots_file):
+        return False
+    try:
+        with open(deferred_plots_file) as fh:
+            plot_data = json.load(fh)
+    except:
+        logger.error('error :: %s' % (traceback.format_exc()))
+        logger.error('error :: failed to load %s' % deferred_plots_file)
+        return False
+    rendered = plot_algorithm_results(results_dir, plot_data)
+    if rendered:
+        try:
+            os.remove(deferred_plots_file)
+        except:
+            logger.error('error :: %s' % (traceback.format_exc()))
+            logger.error('error :: failed to remove %s' % deferred_plots_file)
+    return rendered
+
+
 # @modified 20200421 - Feature #3500: webapp - crucible_process_metrics
 #                      Feature #1448: Crucible web UI
 # Added alert_interval and add_to_panaroma
@@ -552,57 +1084,97 @@ def run_algorithms(
                 break
         logger.info('padded_timeseries - default range set to %s to %s' % (str(default_range), str(timeseries_file)))
 
-    for algorithm in check_algorithms:
-        detected = ''
+    # @added 20261019 - Crucible sweep mode
+    # Determine the running statistics once so that each algorithm can be
+    # evaluated over all the prefixes of the time series in a single pass
+    stats = None
+    try:
+        stats = sweep_stats(timeseries)
+    except:
+        logger.error('error :: %s' % (traceback.format_exc()))
+        logger.error('error :: failed to determine sweep_stats for %s' % str(timeseries_file))
+        stats = None
+    if stats is None:
+        logger.info('timeseries cannot be swept, running algorithms on each data point for %s' % str(timeseries_file))
+
+    # @modified 20261019 - Crucible parallel algorithms and deferred plots
+    # Run the algorithms across a process pool and determine the plots
+    # separately from the analysis, the plots are created once all the
+    # algorithms have run or deferred if CRUCIBLE_DEFER_PLOTS is enabled
+    algorithm_results = {}
+    pool_processes = min(CRUCIBLE_ALGORITHM_PROCESSES, len(check_algorithms))
+    # The algorithms that do not complete in the process pool within
+    # CRUCIBLE_TESTS_TIMEOUT are not run again serially and are reported as
+    # errored
+    pool_timed_out = False
+    if pool_processes > 1:
+        pool = None
         try:
-            x_vals = np.arange(len(timeseries))
-            y_vals = np.array([y[1] for y in timeseries])
-            # Match default graphite graph size
-            plt.figure(figsize=(5.86, 3.08), dpi=100)
-            plt.plot(x_vals, y_vals)
-
-            # Start a couple datapoints in for the tail average
-            # @modified 20200422 - Feature #3500: webapp - crucible_process_metrics
-            #                      Feature #1448: Crucible web UI
-            # If the time series is padded then use the appropriate range so
-            # that the padded period data points are not analysed for anomalies
-            # for index in range(10, len(timeseries)):
-            for index in range(default_range, len(timeseries)):
-                sliced = timeseries[:index]
-                anomaly = globals()[algorithm](sliced, end_timestamp, full_duration)
-
-                # Point out the datapoint if it's anomalous
-                if anomaly:
-                    plt.plot([index], [sliced[-1][1]], 'ro')
-                    detected = "DETECTED"
-                    # @added 20190611 - Feature #3106: crucible - skyline.consensus.anomalies.png
-                    # Add the anomaly to the anomalies list to plot Skyline
-                    # anomalies if CONSENSUS is achieved
-                    anomalies.append([sliced[-1][0], sliced[-1][1], algorithm])
-
-            if detected == "DETECTED":
-                results_filename = join(results_dir + "/" + algorithm + "." + detected + ".png")
-                logger.info('ANOMALY DETECTED :: with %s on %s' % (algorithm, str(timeseries_file)))
-                anomalous = True
-                triggered_algorithms.append(algorithm)
-            else:
-                results_filename = join(results_dir + "/" + algorithm + ".png")
-
-            try:
-                plt.savefig(results_filename, dpi=100)
-                logger.info('saved %s plot :: %s' % (algorithm, results_filename))
-                if python_version == 2:
-                    # @modified 20200327 - Branch #3262: py3
-                    # os.chmod(results_filename, 0644)
-                    os.chmod(results_filename, 0o644)
-                if python_version == 3:
-                    os.chmod(results_filename, mode=0o644)
-            except:
-                logger.error('error :: %s' % (traceback.format_exc()))
-                logger.error('error :: failed to save %s for %s' % (str(results_filename), str(timeseries_file)))
+            pool = Pool(processes=pool_processes)
+            async_results = [pool.apply_async(run_algorithm, (
+                algorithm, timeseries, stats, default_range, end_timestamp,
+                full_duration)) for algorithm in check_algorithms]
+            pool_timeout_at = time.time() + CRUCIBLE_TESTS_TIMEOUT
+            for async_result in async_results:
+                if pool_timed_out:
+                    # Only collect the algorithms that have completed
+                    if not async_result.ready():
+                        continue
+                    algorithm, anomalous_indices = async_result.get()
+                else:
+                    try:
+                        algorithm, anomalous_indices = async_result.get(
+                            timeout=max((pool_timeout_at - time.time()), 1))
+                    except PoolTimeoutError:
+                        pool_timed_out = True
+                        continue
+                algorithm_results[algorithm] = anomalous_indices
+            if pool_timed_out:
+                logger.error('error :: algorithms process pool timed out after %s seconds on %s, timed out algorithms - %s' % (
+                    str(CRUCIBLE_TESTS_TIMEOUT), str(timeseries_file),
+                    str([algorithm for algorithm in check_algorithms if algorithm not in algorithm_results])))
         except:
             logger.error('error :: %s' % (traceback.format_exc()))
-            logger.error('error :: error thrown in algorithm running and plotting - %s on %s' % (str(algorithm), str(timeseries_file)))
+            logger.error('error :: failed to run algorithms in process pool on %s, running serially' % str(timeseries_file))
+            algorithm_results = {}
+        if pool:
+            if pool_timed_out:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+    for algorithm in check_algorithms:
+        if algorithm not in algorithm_results:
+            if pool_timed_out:
+                algorithm_results[algorithm] = None
+                continue
+            algorithm, anomalous_indices = run_algorithm(
+                algorithm, timeseries, stats, default_range, end_timestamp,
+                full_duration)
+            algorithm_results[algorithm] = anomalous_indices
+
+    plot_data = {
+        'values': [item[1] for item in timeseries],
+        'algorithms': [],
+        'consensus_indices': None,
+    }
+    for algorithm in check_algorithms:
+        anomalous_indices = algorithm_results[algorithm]
+        if anomalous_indices is None:
+            logger.error('error :: error thrown in algorithm running - %s on %s' % (str(algorithm), str(timeseries_file)))
+            continue
+        plot_data['algorithms'].append([algorithm, anomalous_indices])
+        for index in anomalous_indices:
+            # The last data point of timeseries[:index]
+            datapoint = timeseries[index - 1]
+            # @added 20190611 - Feature #3106: crucible - skyline.consensus.anomalies.png
+            # Add the anomaly to the anomalies list to plot Skyline
+            # anomalies if CONSENSUS is achieved
+            anomalies.append([datapoint[0], datapoint[1], algorithm])
+        if anomalous_indices:
+            logger.info('ANOMALY DETECTED :: with %s on %s' % (algorithm, str(timeseries_file)))
+            anomalous = True
+            triggered_algorithms.append(algorithm)
 
     end_analysis = int(time.time())
     # @modified 20160814 - pyflaked
@@ -665,20 +1237,31 @@ def run_algorithms(
     # skyline.anomalies_score.txt and skyline.anomalies.csv
     anomalies_score = []
     if anomalies:
+        # @modified 20261019 - Crucible parallel algorithms and deferred plots
+        # Group the triggered algorithms by timestamp in a dict, rather than
+        # searching the anomalies_score and anomalies lists for every anomaly
+        # for ts, value, algo in anomalies:
+        #     try:
+        #         processed = False
+        #         algorithms_triggered = []
+        #         if anomalies_score:
+        #             for i in anomalies_score:
+        #                 if i[0] == ts:
+        #                     processed = True
+        #                     continue
+        #         if processed:
+        #             continue
+        #         for w_ts, w_value, w_algo in anomalies:
+        #             if w_ts == ts:
+        #                 algorithms_triggered.append(w_algo)
+        anomalies_by_timestamp = OrderedDict()
         for ts, value, algo in anomalies:
+            if ts not in anomalies_by_timestamp:
+                anomalies_by_timestamp[ts] = [value, []]
+            anomalies_by_timestamp[ts][1].append(algo)
+        for ts in anomalies_by_timestamp:
             try:
-                processed = False
-                algorithms_triggered = []
-                if anomalies_score:
-                    for i in anomalies_score:
-                        if i[0] == ts:
-                            processed = True
-                            continue
-                if processed:
-                    continue
-                for w_ts, w_value, w_algo in anomalies:
-                    if w_ts == ts:
-                        algorithms_triggered.append(w_algo)
+                value, algorithms_triggered = anomalies_by_timestamp[ts]
                 # @added 20200421 - Feature #3500: webapp - crucible_process_metrics
                 #                      Feature #1448: Crucible web UI
                 # Added last_anomaly_timestamp to apply alert_interval against and
@@ -731,35 +1314,15 @@ def run_algorithms(
             else:
                 logger.info('info :: no anomalies were discarded due to them being within the alert_interval period on %s' % str(timeseries_file))
 
+        # @modified 20261019 - Crucible parallel algorithms and deferred plots
+        # Determine the data points to plot in skyline.consensus.anomalies.png
+        # with the other plots
         try:
-            logger.info('info :: plotting skyline.consensus.anomalies.png for %s' % str(timeseries_file))
-            x_vals = np.arange(len(timeseries))
-            y_vals = np.array([y[1] for y in timeseries])
-            # Match default graphite graph size
-            plt.figure(figsize=(5.86, 3.08), dpi=100)
-            plt.plot(x_vals, y_vals)
-            for index in range(10, len(timeseries)):
-                anomaly = False
-                sliced = timeseries[:index]
-                for i in anomalies_score:
-                    if sliced[-1][0] == i[0]:
-                        if i[2] >= CONSENSUS:
-                            anomaly = True
-                # Point out the datapoint if it is anomalous according to
-                # Skyline CONSENSUS
-                if anomaly:
-                    plt.plot([index], [sliced[-1][1]], 'ro')
-            results_filename = join(results_dir + "/skyline.consensus.anomalies.png")
-            plt.savefig(results_filename, dpi=100)
-            if python_version == 2:
-                # @modified 20200327 - Branch #3262: py3
-                # os.chmod(results_filename, 0644)
-                os.chmod(results_filename, 0o644)
-            if python_version == 3:
-                os.chmod(results_filename, mode=0o644)
+            consensus_timestamps = set([item[0] for item in anomalies_score if item[2] >= CONSENSUS])
+            plot_data['consensus_indices'] = [index for index in range(10, len(timeseries)) if timeseries[index - 1][0] in consensus_timestamps]
         except:
             logger.error('error :: %s' % (traceback.format_exc()))
-            logger.error('error :: failed plotting skyline.consensus.anomalies.png for %s' % str(timeseries_file))
+            logger.error('error :: failed to determine consensus anomalies to plot for %s' % str(timeseries_file))
 
         anomalies_filename = join(results_dir + "/skyline.anomalies_score.txt")
         try:
@@ -824,4 +1387,22 @@ def run_algorithms(
     else:
         logger.info('0 anomalies found for %s' % str(timeseries_file))
 
+    # @added 20261019 - Crucible parallel algorithms and deferred plots
+    # Create the plots now or save the plot data so that the plots can be
+    # created later by crucible when it has no checks to process or by the
+    # webapp when the results are requested
+    if CRUCIBLE_DEFER_PLOTS:
+        deferred_plots_file = join(results_dir + "/" + DEFERRED_PLOTS_FILENAME)
+        try:
+            with open(deferred_plots_file, 'w') as fh:
+                json.dump(plot_data, fh)
+            logger.info('info :: deferred plots to %s for %s' % (deferred_plots_file, str(timeseries_file)))
+        except:
+            logger.error('error :: %s' % (traceback.format_exc()))
+            logger.error('error :: failed to write %s, plotting now for %s' % (deferred_plots_file, str(timeseries_file)))
+            plot_algorithm_results(results_dir, plot_data)
+    else:
+        plot_algorithm_results(results_dir, plot_data)
+        logger.info('info :: plotted results for %s' % str(timeseries_file))
+
     return anomalous, triggered_algorithms, alert_interval_discarded_anomalies_count
@@ -1,12 +1,73 @@
 # coding=utf-8
 import logging
+import os
 import traceback
 from sqlalchemy import (
     create_engine, Column, Table, Integer, String, MetaData, DateTime)
+from sqlalchemy import event
 from sqlalchemy.dialects.mysql import DOUBLE, FLOAT, TINYINT, VARCHAR, SMALLINT
 
 import settings
 
+# @added 20261019 - Database engine registry
+# Each process creates a single engine with a connection pool, which is reused
+# by every check or request in the process, and the reflected Table objects are
+# cached per table name, rather than an engine being created and disposed of
+# and the tables being reflected from the INFORMATION_SCHEMA every time.  The
+# engine is keyed by the pid so that a forked child process never uses the
+# connection pool of its parent and creates its own engine.
+try:
+    PANORAMA_DB_POOL_SIZE = int(settings.PANORAMA_DB_POOL_SIZE)
+except:
+    PANORAMA_DB_POOL_SIZE = 5
+try:
+    PANORAMA_DB_POOL_MAX_OVERFLOW = int(settings.PANORAMA_DB_POOL_MAX_OVERFLOW)
+except:
+    PANORAMA_DB_POOL_MAX_OVERFLOW = 10
+try:
+    PANORAMA_DB_POOL_RECYCLE = int(settings.PANORAMA_DB_POOL_RECYCLE)
+except:
+    PANORAMA_DB_POOL_RECYCLE = 3600
+
+ENGINES = {}
+REFLECTED_TABLES = {}
+DATABASE_COUNTERS = {}
+
+
+def database_counters():
+    """
+    The database counters of the process, the number of engines created, pool
+    connections made, pool checkouts, table reflections and reflected table
+    cache hits.
+
+    :return: counters
+    :rtype: dict
+    """
+    counters = {
+        'engines_created': 0,
+        'pool_connects': 0,
+        'pool_checkouts': 0,
+        'reflections': 0,
+        'reflection_cache_hits': 0,
+    }
+    counters.update(DATABASE_COUNTERS.get(os.getpid(), {}))
+    return counters
+
+
+def increment_database_counter(counter):
+    pid = os.getpid()
+    if pid not in DATABASE_COUNTERS:
+        DATABASE_COUNTERS[pid] = {}
+    DATABASE_COUNTERS[pid][counter] = DATABASE_COUNTERS[pid].get(counter, 0) + 1
+
+
+def count_pool_connect(dbapi_connection, connection_record):
+    increment_database_counter('pool_connects')
+
+
+def count_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    increment_database_counter('pool_checkouts')
+
 
 def get_engine(current_skyline_app):
     '''
@@ -15,13 +76,32 @@ def get_engine(current_skyline_app):
     # Use SQLAlchemy, mysql.connector is still around but starting the
     # move to SQLAlchemy now that all the webapp Ionosphere SQLAlchemy patterns
     # work
+    # @modified 20261019 - Database engine registry
+    # Returns the engine of the process, which is only created on the first
+    # call in the process
     '''
+    pid = os.getpid()
+    if pid in ENGINES:
+        return ENGINES[pid], 'got MySQL engine', 'none'
     try:
         engine = create_engine(
             'mysql+mysqlconnector://%s:%s@%s:%s/%s' % (
                 settings.PANORAMA_DBUSER, settings.PANORAMA_DBUSERPASS,
                 settings.PANORAMA_DBHOST, str(settings.PANORAMA_DBPORT),
-                settings.PANORAMA_DATABASE))
+                settings.PANORAMA_DATABASE),
+            # @added 20261019 - Database engine registry
+            pool_size=PANORAMA_DB_POOL_SIZE,
+            max_overflow=PANORAMA_DB_POOL_MAX_OVERFLOW,
+            pool_recycle=PANORAMA_DB_POOL_RECYCLE,
+            pool_pre_ping=True)
+        event.listen(engine, 'connect', count_pool_connect)
+        event.listen(engine, 'checkout', count_pool_checkout)
+        # Remove the engines of any parent processes, without disposing of
+        # them as their connections belong to the parent
+        for engine_pid in list(ENGINES.keys()):
+            del ENGINES[engine_pid]
+        ENGINES[pid] = engine
+        increment_database_counter('engines_created')
         return engine, 'got MySQL engine', 'none'
     except:
         trace = traceback.format_exc()
@@ -33,6 +113,97 @@ def get_engine(current_skyline_app):
         return None, fail_msg, trace
 
 
+# @added 20261019 - Database engine registry
+def dispose_engine(current_skyline_app, engine):
+    """
+    Dispose of an engine that is not the engine of the process.  The engine of
+    the process is not disposed of so that its pooled connections are reused,
+    the connections are returned to the pool when they are closed.
+
+    :param current_skyline_app: the app calling the function
+    :param engine: the engine
+    :type current_skyline_app: str
+    :type engine: object
+    :return: None
+    """
+    if not engine:
+        return
+    current_skyline_app_logger = current_skyline_app + 'Log'
+    current_logger = logging.getLogger(current_skyline_app_logger)
+    if ENGINES.get(os.getpid()) is engine:
+        current_logger.info('database counters :: %s' % str(database_counters()))
+        return
+    try:
+        engine.dispose()
+    except:
+        current_logger.error(traceback.format_exc())
+        current_logger.error('error :: calling engine.dispose()')
+    return
+
+
+# @added 20261019 - Database engine registry
+def reflect_table(current_skyline_app, engine, table_name):
+    """
+    Returns the Table reflected from the database, reflecting the table only
+    the first time the table is requested in the process.
+
+    :param current_skyline_app: the app calling the function
+    :param engine: the engine
+    :param table_name: the table name
+    :type current_skyline_app: str
+    :type engine: object
+    :type table_name: str
+    :return: table
+    :rtype: sqlalchemy.Table
+    """
+    pid = os.getpid()
+    if pid not in REFLECTED_TABLES:
+        REFLECTED_TABLES.clear()
+        REFLECTED_TABLES[pid] = {}
+    if table_name in REFLECTED_TABLES[pid]:
+        increment_database_counter('reflection_cache_hits')
+        return REFLECTED_TABLES[pid][table_name]
+    table_meta = MetaData()
+    table = Table(table_name, table_meta, autoload=True, autoload_with=engine)
+    increment_database_counter('reflections')
+    REFLECTED_TABLES[pid][table_name] = table
+    return table
+
+
+# @added 20261019 - Database engine registry
+def cache_table(table_name, table):
+    """
+    Add a Table that the process created to the reflected table cache.
+
+    :param table_name: the table name
+    :param table: the table
+    :type table_name: str
+    :type table: sqlalchemy.Table
+    :return: None
+    """
+    pid = os.getpid()
+    if pid not in REFLECTED_TABLES:
+        REFLECTED_TABLES.clear()
+        REFLECTED_TABLES[pid] = {}
+    REFLECTED_TABLES[pid][table_name] = table
+
+
+# @added 20261019 - Database engine registry
+def cached_table(table_name):
+    """
+    Returns the Table from the reflected table cache of the process.
+
+    :param table_name: the table name
+    :type table_name: str
+    :return: table or None if the table is not cached
+    :rtype: sqlalchemy.Table
+    """
+    table = REFLECTED_TABLES.get(os.getpid(), {}).get(table_name)
+    if table is not None:
+        increment_database_counter('reflection_cache_hits')
+    return table
+
+
 def ionosphere_table_meta(current_skyline_app, engine):
 
     current_skyline_app_logger = current_skyline_app + 'Log'
@@ -40,7 +211,9 @@ def ionosphere_table_meta(current_skyline_app, engine):
 
     # Create the ionosphere table MetaData
     try:
-        ionosphere_meta = MetaData()
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # ionosphere_meta = MetaData()
     # @modified 20161209 - Branch #922: ionosphere
     #                      Task #1658: Patterning Skyline Ionosphere
     # HOWEVER:
@@ -75,7 +248,8 @@ def ionosphere_table_meta(current_skyline_app, engine):
     #        mysql_engine='MyISAM')
     #    ionosphere_table.create(engine, checkfirst=True)
     #    return ionosphere_table, 'ionosphere_table meta OK', 'none'
-        ionosphere_table = Table('ionosphere', ionosphere_meta, autoload=True, autoload_with=engine)
+        # ionosphere_table = Table('ionosphere', ionosphere_meta, autoload=True, autoload_with=engine)
+        ionosphere_table = reflect_table(current_skyline_app, engine, 'ionosphere')
         return ionosphere_table, 'ionosphere_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -92,8 +266,11 @@ def metrics_table_meta(current_skyline_app, engine):
 
     # Create the metrics table MetaData
     try:
-        metrics_meta = MetaData()
-        metrics_table = Table('metrics', metrics_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # metrics_meta = MetaData()
+        # metrics_table = Table('metrics', metrics_meta, autoload=True, autoload_with=engine)
+        metrics_table = reflect_table(current_skyline_app, engine, 'metrics')
         return metrics_table, 'metrics_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -110,8 +287,11 @@ def anomalies_table_meta(current_skyline_app, engine):
 
     # Create the anomalies table MetaData
     try:
-        anomalies_meta = MetaData()
-        anomalies_table = Table('anomalies', anomalies_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # anomalies_meta = MetaData()
+        # anomalies_table = Table('anomalies', anomalies_meta, autoload=True, autoload_with=engine)
+        anomalies_table = reflect_table(current_skyline_app, engine, 'anomalies')
         return anomalies_table, 'anomalies_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -134,8 +314,11 @@ def ionosphere_matched_table_meta(current_skyline_app, engine):
 
     # Create the ionosphere_matched table MetaData
     try:
-        ionosphere_matched_meta = MetaData()
-        ionosphere_matched_table = Table('ionosphere_matched', ionosphere_matched_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # ionosphere_matched_meta = MetaData()
+        # ionosphere_matched_table = Table('ionosphere_matched', ionosphere_matched_meta, autoload=True, autoload_with=engine)
+        ionosphere_matched_table = reflect_table(current_skyline_app, engine, 'ionosphere_matched')
         return ionosphere_matched_table, 'ionosphere_matched_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -153,8 +336,11 @@ def ionosphere_layers_table_meta(current_skyline_app, engine):
 
     # Create the ionosphere_layers table MetaData
     try:
-        ionosphere_layers_meta = MetaData()
-        ionosphere_layers_table = Table('ionosphere_layers', ionosphere_layers_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # ionosphere_layers_meta = MetaData()
+        # ionosphere_layers_table = Table('ionosphere_layers', ionosphere_layers_meta, autoload=True, autoload_with=engine)
+        ionosphere_layers_table = reflect_table(current_skyline_app, engine, 'ionosphere_layers')
         return ionosphere_layers_table, 'ionosphere_layers_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -171,8 +357,11 @@ def layers_algorithms_table_meta(current_skyline_app, engine):
 
     # Create the layers_algorithms table MetaData
     try:
-        layers_algorithms_meta = MetaData()
-        layers_algorithms_table = Table('layers_algorithms', layers_algorithms_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # layers_algorithms_meta = MetaData()
+        # layers_algorithms_table = Table('layers_algorithms', layers_algorithms_meta, autoload=True, autoload_with=engine)
+        layers_algorithms_table = reflect_table(current_skyline_app, engine, 'layers_algorithms')
         return layers_algorithms_table, 'layers_algorithms_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -189,8 +378,11 @@ def ionosphere_layers_matched_table_meta(current_skyline_app, engine):
 
     # Create the ionosphere_layers_matched table MetaData
     try:
-        ionosphere_layers_matched_meta = MetaData()
-        ionosphere_layers_matched_table = Table('ionosphere_layers_matched', ionosphere_layers_matched_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # ionosphere_layers_matched_meta = MetaData()
+        # ionosphere_layers_matched_table = Table('ionosphere_layers_matched', ionosphere_layers_matched_meta, autoload=True, autoload_with=engine)
+        ionosphere_layers_matched_table = reflect_table(current_skyline_app, engine, 'ionosphere_layers_matched')
         return ionosphere_layers_matched_table, 'ionosphere_layers_matched_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
@@ -208,8 +400,11 @@ def luminosity_table_meta(current_skyline_app, engine):
 
     # Create the luminosity table MetaData
     try:
-        luminosity_meta = MetaData()
-        luminosity_table = Table('luminosity', luminosity_meta, autoload=True, autoload_with=engine)
+        # @modified 20261019 - Database engine registry
+        # Use the reflected table cache
+        # luminosity_meta = MetaData()
+        # luminosity_table = Table('luminosity', luminosity_meta, autoload=True, autoload_with=engine)
+        luminosity_table = reflect_table(current_skyline_app, engine, 'luminosity')
         return luminosity_table, 'luminosity_table meta reflected OK', 'none'
     except:
         trace = traceback.format_exc()
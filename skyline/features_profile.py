@@ -9,7 +9,11 @@ from ast import literal_eval
 import traceback
 # import json
 from timeit import default_timer as timer
+# @added 20261019 - Minimal tsfresh feature extraction
+from multiprocessing import Pool
+# @modified 20261019 - In memory tsfresh feature extraction
 # import numpy as np
+import numpy as np
 import pandas as pd
 
 from tsfresh.feature_extraction import (
@@ -51,6 +55,319 @@ def feature_name_id(current_skyline_app, feature_name):
     return 0
 
 
+# @added 20261019 - In memory tsfresh feature extraction
+# The Skyline feature id of each tsfresh feature name, tsfresh feature names
+# that contain a comma are quoted as they are in the transposed features csv
+TSFRESH_FEATURE_IDS = dict([(str(feature[1]), int(feature[0])) for feature in TSFRESH_FEATURES])
+TSFRESH_FEATURES_VECTOR_SIZE = max(TSFRESH_FEATURE_IDS.values()) + 1
+
+
+def extract_tsfresh_features(current_skyline_app, metric, timeseries):
+    """
+    Extract the tsfresh features from a time series in memory
+
+    :param current_skyline_app: the app calling the function
+    :param metric: the base_name of the metric
+    :param timeseries: the time series as a list of [timestamp, value] items
+    :type current_skyline_app: str
+    :type metric: str
+    :type timeseries: list
+    :return: (df_t, feature_extraction_time) the transposed features DataFrame
+        with the feature names as the index and the values in the single column
+    :rtype: (pandas.DataFrame, float)
+    """
+    timestamps = []
+    values = []
+    for datapoint in timeseries:
+        try:
+            timestamp = int(float(datapoint[0]))
+            value = float(datapoint[1])
+        # @modified 20170913 - Task #2160: Test skyline with bandit
+        # Added nosec to exclude from bandit tests
+        except:  # nosec
+            continue
+        timestamps.append(timestamp)
+        values.append(value)
+    df = pd.DataFrame({
+        'metric': [str(metric)] * len(values),
+        'timestamp': np.array(timestamps, dtype=np.int64),
+        'value': np.array(values, dtype=np.float64)},
+        columns=['metric', 'timestamp', 'value'])
+    start_feature_extraction = timer()
+    # @modified 20161226 - Bug #1822: tsfresh extract_features process stalling
+    # Use the ReasonableFeatureExtractionSettings to exclude the
+    # computationally high cost features
+    tsf_settings = ReasonableFeatureExtractionSettings()
+    # Disable tqdm progress bar
+    tsf_settings.disable_progressbar = True
+    df_features = extract_features(
+        df, column_id='metric', column_sort='timestamp', column_kind=None,
+        column_value=None, feature_extraction_settings=tsf_settings)
+    feature_extraction_time = timer() - start_feature_extraction
+    del df
+    df_t = df_features.transpose()
+    del df_features
+    return df_t, feature_extraction_time
+
+
+def features_vector(df_t):
+    """
+    Create a features vector from the transposed features DataFrame
+
+    :param df_t: the transposed features DataFrame
+    :type df_t: pandas.DataFrame
+    :return: a numpy array indexed by Skyline feature id, with NaN for the
+        features that were not calculated
+    :rtype: numpy.array
+    """
+    # @modified 20261019 - Minimal tsfresh feature extraction
+    # Use feature_values_vector so that the per family extractions can also
+    # create the vector
+    return feature_values_vector(df_t.index, df_t.iloc[:, 0].values)
+
+
+# @added 20261019 - Minimal tsfresh feature extraction
+def feature_values_vector(feature_names, feature_values):
+    """
+    Create a features vector from tsfresh feature names and values
+
+    :param feature_names: the tsfresh feature names
+    :param feature_values: the feature values
+    :type feature_names: list
+    :type feature_values: list
+    :return: a numpy array indexed by Skyline feature id, with NaN for the
+        features that were not calculated
+    :rtype: numpy.array
+    """
+    vector = np.full(TSFRESH_FEATURES_VECTOR_SIZE, np.nan)
+    for feature_name, value in zip(feature_names, feature_values):
+        feature_name = str(feature_name)
+        if ',' in feature_name:
+            feature_name = '"%s"' % feature_name
+        feature_id = TSFRESH_FEATURE_IDS.get(feature_name)
+        if feature_id is None:
+            continue
+        try:
+            vector[feature_id] = float(value)
+        except:  # nosec
+            continue
+    return vector
+
+
+# @added 20261019 - Minimal tsfresh feature extraction
+# The tsfresh feature calculator (the feature family) of each Skyline feature
+# id, e.g. value__fft_coefficient__coeff_3 is calculated by fft_coefficient
+def feature_family(feature_name):
+    """
+    Determine the tsfresh feature calculator name of a tsfresh feature name
+
+    :param feature_name: the tsfresh feature name
+    :type feature_name: str
+    :return: the feature calculator name or None
+    :rtype: str
+    """
+    name_elements = str(feature_name).strip('"').split('__')
+    if len(name_elements) < 2:
+        return None
+    return name_elements[1]
+
+
+TSFRESH_FEATURE_FAMILIES = dict([(int(feature[0]), feature_family(feature[1])) for feature in TSFRESH_FEATURES])
+
+try:
+    IONOSPHERE_FEATURES_EXTRACTION_PROCESSES = int(settings.IONOSPHERE_FEATURES_EXTRACTION_PROCESSES)
+except:
+    IONOSPHERE_FEATURES_EXTRACTION_PROCESSES = 1
+
+# A feature extraction pool is created per process, the first time it is
+# required, and is used by all the feature extractions run in the process
+FEATURE_EXTRACTION_POOLS = {}
+
+
+def feature_families(feature_ids):
+    """
+    Determine the tsfresh feature calculators required to calculate the
+    features
+
+    :param feature_ids: the Skyline feature ids
+    :type feature_ids: list
+    :return: a sorted list of feature calculator names
+    :rtype: list
+    """
+    families = set()
+    for feature_id in feature_ids:
+        try:
+            family = TSFRESH_FEATURE_FAMILIES.get(int(feature_id))
+        except:  # nosec
+            continue
+        if family:
+            families.add(family)
+    return sorted(families)
+
+
+def feature_extraction_pool():
+    """
+    Returns the feature extraction pool for the current process, creating it if
+    it does not exist.
+
+    :return: the pool or None if IONOSPHERE_FEATURES_EXTRACTION_PROCESSES is 1
+    :rtype: multiprocessing.Pool
+    """
+    if IONOSPHERE_FEATURES_EXTRACTION_PROCESSES < 2:
+        return None
+    pid = os.getpid()
+    pool = FEATURE_EXTRACTION_POOLS.get(pid)
+    if pool is None:
+        pool = Pool(IONOSPHERE_FEATURES_EXTRACTION_PROCESSES)
+        FEATURE_EXTRACTION_POOLS[pid] = pool
+    return pool
+
+
+def extract_feature_family(metric, timestamps, values, family):
+    """
+    Extract the features of a single tsfresh feature calculator, with the
+    parameters of the ReasonableFeatureExtractionSettings.  This is the
+    feature extraction pool worker function.
+
+    :param metric: the base_name of the metric
+    :param timestamps: the timestamps of the time series
+    :param values: the values of the time series
+    :param family: the feature calculator name
+    :type metric: str
+    :type timestamps: list
+    :type values: list
+    :type family: str
+    :return: (family, feature_names, feature_values, seconds, error) the
+        feature names and values are None and error is the traceback if the
+        extraction failed
+    :rtype: tuple
+    """
+    start_family = timer()
+    feature_names = None
+    feature_values = None
+    error = None
+    try:
+        df = pd.DataFrame({
+            'metric': [str(metric)] * len(values),
+            'timestamp': np.array(timestamps, dtype=np.int64),
+            'value': np.array(values, dtype=np.float64)},
+            columns=['metric', 'timestamp', 'value'])
+        tsf_settings = ReasonableFeatureExtractionSettings()
+        tsf_settings.disable_progressbar = True
+        # The extraction is parallelised by family, do not let tsfresh create
+        # its own processes as well
+        tsf_settings.n_processes = 1
+        tsf_settings.name_to_param = {family: tsf_settings.name_to_param[family]}
+        df_features = extract_features(
+            df, column_id='metric', column_sort='timestamp', column_kind=None,
+            column_value=None, feature_extraction_settings=tsf_settings)
+        feature_names = [str(feature_name) for feature_name in df_features.columns]
+        feature_values = [float(value) for value in df_features.iloc[0].values]
+    except:
+        feature_names = None
+        feature_values = None
+        error = traceback.format_exc()
+    return family, feature_names, feature_values, (timer() - start_family), error
+
+
+def calculate_features(current_skyline_app, metric, timeseries, feature_ids=None):
+    """
+    Calculates the tsfresh features of a time series in memory, without
+    writing the time series or the features to csv files.  Used by Ionosphere
+    to compare an anomalous time series to features profiles.
+
+    If feature_ids are passed only the tsfresh feature calculators required
+    for those features are run, each one separately in the process feature
+    extraction pool, and the time taken by each calculator is returned.
+
+    :param current_skyline_app: the app calling the function
+    :param metric: the base_name of the metric
+    :param timeseries: the time series as a list of [timestamp, value] items
+    :param feature_ids: the Skyline feature ids that are required, if None all
+        the ReasonableFeatureExtractionSettings features are calculated
+    :type current_skyline_app: str
+    :type metric: str
+    :type timeseries: list
+    :type feature_ids: list
+    :return: (features, features_count, features_sum, calc_time, family_times)
+        where features is a numpy array indexed by Skyline feature id, with NaN
+        for the features that were not calculated or None on failure and
+        family_times is a dict of the seconds taken per feature calculator
+    :rtype: (numpy.array, int, float, str, dict)
+    """
+
+    current_skyline_app_logger = current_skyline_app + 'Log'
+    current_logger = logging.getLogger(current_skyline_app_logger)
+
+    # @added 20261019 - Minimal tsfresh feature extraction
+    family_times = {}
+    families = []
+    if feature_ids:
+        families = feature_families(feature_ids)
+    if families:
+        start_feature_extraction = timer()
+        timestamps = []
+        values = []
+        for datapoint in timeseries:
+            try:
+                timestamp = int(float(datapoint[0]))
+                value = float(datapoint[1])
+            except:  # nosec
+                continue
+            timestamps.append(timestamp)
+            values.append(value)
+        try:
+            pool = feature_extraction_pool()
+        except:
+            current_logger.error(traceback.format_exc())
+            current_logger.error('error :: calculate_features :: failed to create the feature extraction pool')
+            pool = None
+        try:
+            if pool:
+                results = [pool.apply_async(extract_feature_family, (metric, timestamps, values, family)) for family in families]
+                family_results = [result.get() for result in results]
+            else:
+                family_results = [extract_feature_family(metric, timestamps, values, family) for family in families]
+        except:
+            current_logger.error(traceback.format_exc())
+            current_logger.error('error :: calculate_features :: extracting feature families with tsfresh for %s' % str(metric))
+            return None, 0, 0, 'unknown', family_times
+        feature_names = []
+        feature_values = []
+        for family, family_feature_names, family_feature_values, family_seconds, error in family_results:
+            family_times[family] = family_seconds
+            if error:
+                current_logger.error(error)
+                current_logger.error('error :: calculate_features :: failed to extract the %s features for %s' % (
+                    family, str(metric)))
+                continue
+            feature_names += family_feature_names
+            feature_values += family_feature_values
+        feature_extraction_time = timer() - start_feature_extraction
+        features = feature_values_vector(feature_names, feature_values)
+        slowest_families = sorted(family_times.items(), key=lambda item: item[1], reverse=True)[:5]
+        current_logger.info('calculate_features :: ran %s feature calculators for the %s required features, the slowest - %s' % (
+            str(len(families)), str(len(feature_ids)),
+            ', '.join(['%s %.3f' % (family, seconds) for family, seconds in slowest_families])))
+    else:
+        try:
+            df_t, feature_extraction_time = extract_tsfresh_features(
+                current_skyline_app, metric, timeseries)
+        except:
+            current_logger.error(traceback.format_exc())
+            current_logger.error('error :: calculate_features :: extracting features with tsfresh for %s' % str(metric))
+            return None, 0, 0, 'unknown', family_times
+        features = features_vector(df_t)
+        del df_t
+    calculated = ~np.isnan(features)
+    features_count = int(np.count_nonzero(calculated))
+    features_sum = float(np.sum(features[calculated]))
+    calc_time = '%.6f' % feature_extraction_time
+    current_logger.info('calculate_features :: %s features calculated in memory for %s in %s seconds' % (
+        str(features_count), str(metric), calc_time))
+    return features, features_count, features_sum, calc_time, family_times
+
+
 def calculate_features_profile(current_skyline_app, timestamp, metric, context):
     """
     Calculates a tsfresh features profile from a training data set
@@ -276,156 +593,44 @@ def calculate_features_profile(current_skyline_app, timestamp, metric, context):
 
     del datapoints
 
-    if os.path.isfile(ts_csv):
-        os.remove(ts_csv)
-
-    for ts, value in converted:
-        # print('%s,%s' % (str(int(ts)), str(value)))
-        utc_ts_line = '%s,%s,%s\n' % (metric, str(int(ts)), str(value))
-        with open(ts_csv, 'a') as fh:
-            fh.write(utc_ts_line)
-
-    del converted
-
-    try:
-        df = pd.read_csv(ts_csv, delimiter=',', header=None, names=['metric', 'timestamp', 'value'])
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        current_logger.info('%s :: DataFrame created with %s' % (
-            log_context, ts_csv))
-    except:
-        trace = traceback.format_exc()
-        current_logger.error(trace)
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        fail_msg = 'error: %s :: failed to create a pandas DataFrame with %s' % (log_context, ts_csv)
-        current_logger.error('%s' % fail_msg)
-        if os.path.isfile(ts_csv):
-            os.remove(ts_csv)
-            # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-            # Added log_context to report the context
-            current_logger.info('%s :: removed %s' % (log_context, ts_csv))
-        end = timer()
-        return 'error', False, fp_created, fp_id, fail_msg, trace, f_calc
-
-# @added 20161207 - Task #1658: Patterning Skyline Ionosphere
-# Coverting the Dataframe types to suit MySQL data types
-# For anyone in here if you have done a code review of Skyline there are
-# a number of questions that arise from the decision to deviate from json or
-# storing msgppack as BLOB etc.  tsfresh used csv and we can csv from Graphite
-# etc.  Skyline should be able to handle csv.  As for how data is stored in
-# MySQL, this was given considerable review and thought.  Given that Ionosphere
-# and Skyline in general should not be limited to the domain of analyzing
-# Graphite machine metrics but other timeseries data sources too.
-#    df['feature_name'] = df['feature_name'].astype(string)
-#    df['value'] = df['value'].astype(float)
-
-    # Test the DataFrame
-    try:
-        df_created = df.head()
-        del df_created
-    except:
-        trace = traceback.format_exc()
-        current_logger.debug(trace)
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        fail_msg = 'error: %s :: failed to read the pandas DataFrame created with %s' % (log_context, ts_csv)
-        current_logger.error('%s' % fail_msg)
-        if os.path.isfile(ts_csv):
-            os.remove(ts_csv)
-            # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-            # Added log_context to report the context
-            current_logger.info('%s :: removed %s' % (log_context, ts_csv))
-        end = timer()
-        return 'error', False, fp_created, fp_id, fail_msg, trace, f_calc
-
-    df.columns = ['metric', 'timestamp', 'value']
-
+    # @modified 20261019 - In memory tsfresh feature extraction
+    # The time series is passed to tsfresh in a DataFrame created in memory,
+    # rather than being written to the tsfresh.input.csv and read back with
+    # pd.read_csv, only the transposed features csv is written
     start_feature_extraction = timer()
     # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
     # Added log_context to report the context
     current_logger.info('%s :: starting extract_features with %s' % (
         log_context, str(TSFRESH_VERSION)))
-    df_features = False
+    df_t = False
     try:
-        # @modified 20161226 - Bug #1822: tsfresh extract_features process stalling
-        # Changed to use the new ReasonableFeatureExtractionSettings that was
-        # introduced in tsfresh-0.4.0 to exclude the computationally high cost
-        # of extracting features from very static timeseries that has little to
-        # no variation is the values, which results in features taking up to
-        # almost 600 seconds to calculate on a timeseries of length 10075
-        # (168h - 1 datapoint per 60s)
-        # In terms of inline feature calculatation, always exclude
-        # high_comp_cost features.
-        # df_features = extract_features(df, column_id='metric', column_sort='timestamp', column_kind=None, column_value=None)
-        tsf_settings = ReasonableFeatureExtractionSettings()
-        # Disable tqdm progress bar
-        tsf_settings.disable_progressbar = True
-        df_features = extract_features(
-            df, column_id='metric', column_sort='timestamp', column_kind=None,
-            column_value=None, feature_extraction_settings=tsf_settings)
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        current_logger.info('%s :: features extracted from %s data' % (
-            log_context, ts_csv))
+        df_t, feature_extraction_time = extract_tsfresh_features(
+            current_skyline_app, metric, converted)
+        current_logger.info('%s :: features extracted and transposed from %s data' % (
+            log_context, anomaly_json))
     except:
-        trace = traceback.print_exc()
+        trace = traceback.format_exc()
         current_logger.debug(trace)
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        fail_msg = 'error: %s :: extracting features with tsfresh from - %s' % (log_context, ts_csv)
+        fail_msg = 'error: %s :: extracting features with tsfresh from - %s' % (log_context, anomaly_json)
         current_logger.error('%s' % fail_msg)
         end_feature_extraction = timer()
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
         current_logger.info(
             '%s :: feature extraction failed in %.6f seconds' % (
                 log_context, (end_feature_extraction - start_feature_extraction)))
-        if os.path.isfile(ts_csv):
-            os.remove(ts_csv)
-            # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-            # Added log_context to report the context
-            current_logger.info('%s :: removed %s' % (log_context, ts_csv))
         end = timer()
         return 'error', False, fp_created, fp_id, fail_msg, trace, f_calc
 
-    end_feature_extraction = timer()
-    feature_extraction_time = end_feature_extraction - start_feature_extraction
+    del converted
+
     # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
     # Added log_context to report the context
     current_logger.info(
         '%s :: feature extraction took %.6f seconds' % (log_context, feature_extraction_time))
 
-    del df
-
     # write to disk
     fname_out = fname_in + '.features.csv'
     # df_features.to_csv(fname_out)
 
-    # Transpose
-    df_t = False
-    try:
-        df_t = df_features.transpose()
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        current_logger.info('%s :: features transposed' % log_context)
-    except:
-        trace = traceback.print_exc()
-        current_logger.debug(trace)
-        # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-        # Added log_context to report the context
-        fail_msg = 'error :: %s :: transposing tsfresh features from - %s' % (log_context, ts_csv)
-        current_logger.error('%s' % fail_msg)
-        if os.path.isfile(ts_csv):
-            os.remove(ts_csv)
-            # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
-            # Added log_context to report the context
-            current_logger.info('%s :: removed %s' % (log_context, ts_csv))
-        end = timer()
-        return 'error', False, fp_created, fp_id, fail_msg, trace, f_calc
-
-    del df_features
-
     # Create transposed features csv
     t_fname_out = fname_in + '.features.transposed.csv'
     try:
@@ -445,14 +650,19 @@ def calculate_features_profile(current_skyline_app, timestamp, metric, context):
         end = timer()
         return 'error', False, fp_created, fp_id, fail_msg, trace, f_calc
 
-    del df_t
-
     # Calculate the count and sum of the features values
     df_sum = False
     try:
-        df_sum = pd.read_csv(
-            t_fname_out, delimiter=',', header=0,
-            names=['feature_name', 'value'])
+        # @modified 20261019 - In memory tsfresh feature extraction
+        # Use the transposed features DataFrame rather than reading the
+        # transposed features csv back
+        # df_sum = pd.read_csv(
+        #     t_fname_out, delimiter=',', header=0,
+        #     names=['feature_name', 'value'])
+        df_sum = pd.DataFrame({
+            'feature_name': [str(feature_name) for feature_name in df_t.index],
+            'value': df_t.iloc[:, 0].values},
+            columns=['feature_name', 'value'])
         df_sum.columns = ['feature_name', 'value']
         df_sum['feature_name'] = df_sum['feature_name'].astype(str)
         df_sum['value'] = df_sum['value'].astype(float)
@@ -481,6 +691,8 @@ def calculate_features_profile(current_skyline_app, timestamp, metric, context):
         current_logger.error('error :: %s :: failed to sum feature values, set to 0' % log_context)
         features_sum = 0
 
+    del df_t
+
     end = timer()
 
     # @modified 20190413 - Bug #2934: Ionosphere - no mirage.redis.24h.json file
@@ -12,7 +12,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 if True:
     import settings
     from logger import set_up_logging
-    from listen import MetricData, MetricDataPost
+    # @modified 20261019 - flux metric_data_bulk
+    # Added MetricDataBulk
+    from listen import MetricData, MetricDataPost, MetricDataBulk
     # from listen_post import MetricDataPost
     from worker import Worker
     from populate_metric import PopulateMetric
@@ -60,7 +62,11 @@ api = application = falcon.API()
 httpMetricData = MetricData()
 populateMetric = PopulateMetric()
 httpMetricDataPost = MetricDataPost()
+# @added 20261019 - flux metric_data_bulk
+httpMetricDataBulk = MetricDataBulk()
 
 api.add_route('/metric_data', httpMetricData)
 api.add_route('/populate_metric', populateMetric)
 api.add_route('/metric_data_post', httpMetricDataPost)
+# @added 20261019 - flux metric_data_bulk
+api.add_route('/metric_data_bulk', httpMetricDataBulk)
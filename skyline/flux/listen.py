@@ -7,6 +7,8 @@ from multiprocessing import Queue
 from logger import set_up_logging
 
 import falcon
+# @added 20261019 - flux metric_data_bulk
+from msgpack import Unpacker
 
 sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
 sys.path.insert(0, os.path.dirname(__file__))
@@ -490,3 +492,135 @@ class MetricDataPost(object):
         else:
             resp.status = falcon.HTTP_204
         return
+
+
+# @added 20261019 - flux metric_data_bulk
+# The content types accepted by the /flux/metric_data_bulk endpoint
+BULK_MSGPACK_CONTENT_TYPES = ['application/x-msgpack', 'application/msgpack']
+
+
+def bulk_datapoint(item):
+    """
+    Return a metric, timestamp, value tuple from a bulk datapoint item which
+    can either be a dict with the metric, timestamp and value keys or a list in
+    the form [metric, timestamp, value].  The timestamp is optional.
+    """
+    if isinstance(item, dict):
+        return item['metric'], item.get('timestamp', None), item['value']
+    if len(item) == 2:
+        return item[0], None, item[1]
+    return item[0], item[1], item[2]
+
+
+class MetricDataBulk(object):
+
+    def on_post(self, req, resp):
+        """
+        The /flux/metric_data_bulk endpoint is called via a POST with multiple
+        metrics and data points in one request body.  The API key is passed in
+        the X-Flux-Key header (or as the key URI parameter) and is validated
+        once per request, not once per data point.  The optional fill=true URI
+        parameter applies to all the data points in the request.
+
+        The body is parsed as a stream and can either be JSON lines
+        (Content-Type: application/x-ndjson), one data point per line::
+
+            {"metric": "vista.nodes.skyline-1.cpu.user", "timestamp": 1478021700, "value": 1.0}
+            ["vista.nodes.skyline-1.cpu.system", 1478021700, 0.3]
+
+        or a stream of msgpack objects of the same form
+        (Content-Type: application/x-msgpack).
+
+        If any data point is invalid the request is rejected with a 400 and
+        nothing is queued, otherwise the entire validated batch is added to the
+        flux.httpMetricDataQueue as a single item and a 204 is returned.
+        """
+        start = time()
+        key = req.get_header('X-Flux-Key')
+        if not key:
+            key = req.get_param('key')
+        if not key:
+            logger.error('error :: listen :: no key passed to metric_data_bulk - returning 401')
+            resp.status = falcon.HTTP_401
+            return
+        keyValid = validate_key('listen :: MetricDataBulk POST', str(key))
+        if not keyValid:
+            logger.error('error :: listen :: invalid key passed to metric_data_bulk - returning 401')
+            resp.status = falcon.HTTP_401
+            return
+
+        backfill = False
+        if str(req.get_param('fill')) == 'true':
+            backfill = True
+
+        # Determine the valid timestamp window once for the request rather than
+        # calling validate_timestamp for every data point
+        now = int(time())
+        try:
+            flux_max_age = settings.FLUX_MAX_AGE
+        except:
+            flux_max_age = 3600
+        too_old = now - flux_max_age
+
+        content_type = str(req.content_type).split(';')[0].strip().lower()
+        if content_type in BULK_MSGPACK_CONTENT_TYPES:
+            try:
+                items = Unpacker(req.bounded_stream, raw=False)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: listen :: metric_data_bulk failed to create Unpacker on the request stream')
+                resp.status = falcon.HTTP_400
+                return
+        else:
+            items = (json.loads(line) for line in iter(req.bounded_stream.readline, b'') if line.strip())
+
+        metric_data_batch = []
+        item_number = 0
+        try:
+            for item in items:
+                item_number += 1
+                metric, timestamp, value = bulk_datapoint(item)
+                metric = str(metric)
+                value = float(value)
+                if timestamp is None:
+                    timestamp = now
+                else:
+                    timestamp = int(timestamp)
+                    if not backfill:
+                        if len(str(timestamp)) != 10 or timestamp < too_old or timestamp > now:
+                            logger.error('error :: listen :: metric_data_bulk invalid timestamp %s for %s at item %s - returning 400' % (
+                                str(timestamp), metric, str(item_number)))
+                            resp.status = falcon.HTTP_400
+                            return
+                if not metric:
+                    raise ValueError('empty metric name')
+                metric_data_batch.append([metric, value, timestamp, backfill])
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: listen :: metric_data_bulk invalid data at item %s - returning 400' % (
+                str(item_number)))
+            resp.status = falcon.HTTP_400
+            return
+
+        if not metric_data_batch:
+            logger.error('error :: listen :: metric_data_bulk no data points in the request - returning 400')
+            resp.status = falcon.HTTP_400
+            return
+
+        # Queue the entire batch as a single item
+        try:
+            flux.httpMetricDataQueue.put(metric_data_batch, block=False)
+            logger.info('listen :: metric_data_bulk added %s data points to flux.httpMetricDataQueue in %.6f seconds' % (
+                str(len(metric_data_batch)), (time() - start)))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: listen :: failed to add metric_data_bulk data to flux.httpMetricDataQueue')
+            resp.status = falcon.HTTP_500
+            return
+
+        if LOCAL_DEBUG:
+            resp.body = json.dumps({'data_points': len(metric_data_batch)})
+            resp.status = falcon.HTTP_200
+        else:
+            resp.status = falcon.HTTP_204
+        return
@@ -16,7 +16,7 @@ import glob
 import gzip
 import zipfile
 import tarfile
-from collections import Counter
+import numpy as np
 import pandas as pd
 import pytz
 from timeit import default_timer as timer
@@ -28,7 +28,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 if True:
     import settings
     from skyline_functions import (
-        get_redis_conn, get_redis_conn_decoded, mkdir_p, sort_timeseries,
+        get_redis_conn, get_redis_conn_decoded, mkdir_p,
         filesafe_metricname)
 
 # Consolidate flux logging
@@ -73,6 +73,19 @@ utc_timezones = [
 ALLOWED_EXTENSIONS = {'json', 'csv', 'xlsx', 'xls'}
 
 
+# @added 20261019 - flux vectorised uploaded data
+def datetimes_to_timestamps(dates):
+    """
+    Convert a pandas datetime64 Series or DatetimeIndex to a NumPy int64 array
+    of UTC unix timestamps.  Timezone aware dates are converted to UTC, naive
+    dates are treated as UTC.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_convert('UTC').tz_localize(None)
+    return dates.values.astype('datetime64[s]').astype(np.int64)
+
+
 class UploadedDataWorker(Process):
     """
     The worker grabs data files from the :mod:`settings.DATA_UPLOADS_PATH` and
@@ -784,17 +797,19 @@ class UploadedDataWorker(Process):
                             successful = False
                             if upload_status:
                                 upload_status = new_upload_status(upload_status, processing_filename, 'failed - to apply timezone')
-                dates = None
                 timestamps = []
                 if successful and date_column:
                     try:
-                        dates = df[date_column].tolist()
-                        timestamps = []
-                        for d in dates:
-                            timestamps.append(int(d.strftime('%s')))
+                        # @modified 20261019 - flux vectorised uploaded data
+                        # Convert the dates to UTC timestamps with NumPy
+                        # rather than a strftime per date
+                        # dates = df[date_column].tolist()
+                        # timestamps = []
+                        # for d in dates:
+                        #     timestamps.append(int(d.strftime('%s')))
+                        timestamps = datetimes_to_timestamps(df[date_column])
                         logger.info('uploaded_data_worker :: created UTC timestamps list from date column %s data' % (
                             str(date_column)))
-                        del dates
                     except:
                         logger.error(traceback.format_exc())
                         failure_reason = 'pandas failed to convert datetimes to UTC timestamps'
@@ -803,7 +818,7 @@ class UploadedDataWorker(Process):
                         if upload_status:
                             upload_status = new_upload_status(upload_status, processing_filename, 'failed to convert datetimes to UTC timestamps')
 
-                if successful and timestamps:
+                if successful and len(timestamps):
                     try:
                         df['pandas_utc_timestamp'] = timestamps
                         logger.info('uploaded_data_worker :: added pandas_utc_timestamp column to dataframe')
@@ -846,77 +861,71 @@ class UploadedDataWorker(Process):
                 successful = True
                 data_df_failures = 0
                 processed_data_columns = []
+
+                # @added 20261019 - flux vectorised uploaded data
+                # Determine the last flux timestamp for all the data column
+                # metrics with a single MGET rather than a GET per column
+                last_flux_timestamps = {}
+                if successful and data_columns and not ignore_submitted_timestamps:
+                    try:
+                        cache_keys = ['flux.last.%s' % filesafe_metricname('%s.%s' % (str(parent_metric_namespace), str(data_col))) for data_col in data_columns]
+                        for cache_key, redis_last_metric_data in zip(cache_keys, self.redis_conn_decoded.mget(cache_keys)):
+                            if redis_last_metric_data:
+                                try:
+                                    last_metric_data = literal_eval(redis_last_metric_data)
+                                    last_flux_timestamps[cache_key] = int(last_metric_data[0])
+                                except:
+                                    logger.error(traceback.format_exc())
+                                    logger.error('error :: uploaded_data_worker :: failed to determine last_flux_timestamp from Redis key %s' % cache_key)
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: uploaded_data_worker :: failed to mget the flux.last Redis keys for the data columns')
+
                 if successful and data_columns:
                     for data_col in data_columns:
                         data_df_successful = True
-                        data_df = None
                         data_col_key = '%s (%s)' % (data_col, processing_filename, )
                         upload_status.append([data_col_key, 'processing'])
+
+                        # @modified 20261019 - flux vectorised uploaded data
+                        # The time series is handled as a NumPy array of
+                        # timestamps and a NumPy array of values, rather than
+                        # creating a list per row with DataFrame.apply
+                        timestamps = None
+                        values = None
                         try:
-                            data_df = df[['pandas_utc_timestamp', data_col]].copy()
-                            logger.info('uploaded_data_worker :: created dataframe for %s' % data_col)
+                            timestamps = df['pandas_utc_timestamp'].values
+                            values = pd.to_numeric(df[data_col], errors='coerce').values.astype(np.float64)
+                            original_timeseries_length = len(timestamps)
+                            logger.info('uploaded_data_worker :: created timeseries for %s with %s timestamps and values' % (
+                                data_col, str(original_timeseries_length)))
                         except:
                             logger.error(traceback.format_exc())
-                            failure_reason = 'failed to create dataframe for pandas_utc_timestamp and %s' % data_col
+                            failure_reason = 'failed to create timeseries from pandas_utc_timestamp and %s' % data_col
                             logger.error('error :: uploaded_data_worker :: %s' % failure_reason)
                             data_df_successful = False
                             data_df_failures += 1
                             if upload_status:
                                 upload_status = new_upload_status(upload_status, data_col_key, failure_reason)
-                            try:
-                                del data_df
-                            except:
-                                pass
                             continue
-                        timeseries = None
-                        original_timeseries_length = 0
-                        if data_df_successful:
+                        if data_df_successful and original_timeseries_length:
                             try:
-                                data_df['timeseries'] = data_df.apply(lambda x: list([x['pandas_utc_timestamp'], x[data_col]]), axis=1)
-                                timeseries = data_df['timeseries'].values.tolist()
-                                original_timeseries_length = len(timeseries)
-                                logger.info('uploaded_data_worker :: created timeseries for %s with %s timestamps and values' % (
-                                    data_col, str(original_timeseries_length)))
-                            except:
-                                logger.error(traceback.format_exc())
-                                failure_reason = 'failed to create timeseries from pandas_utc_timestamp and %s' % data_col
-                                logger.error('error :: uploaded_data_worker :: %s' % failure_reason)
-                                data_df_successful = False
-                                data_df_failures += 1
-                                if upload_status:
-                                    upload_status = new_upload_status(upload_status, data_col_key, failure_reason)
-                                try:
-                                    del data_df
-                                except:
-                                    pass
-                                continue
-                        original_timeseries = None
-                        if data_df_successful and timeseries:
-                            original_timeseries = timeseries
-                            try:
-                                sorted_timeseries = sort_timeseries(timeseries)
-                                if sorted_timeseries:
-                                    sorted_timeseries_length = len(sorted_timeseries)
-                                    timeseries = sorted_timeseries
-                                    logger.info('uploaded_data_worker :: sorted timeseries for %s which now has %s timestamps and values' % (
-                                        data_col, str(sorted_timeseries_length)))
-                                    try:
-                                        del sorted_timeseries
-                                    except:
-                                        pass
+                                # Only sort if the timestamps are unordered, a
+                                # stable sort as per sort_timeseries
+                                if np.any(timestamps[1:] < timestamps[:-1]):
+                                    sort_index = np.argsort(timestamps, kind='mergesort')
+                                    timestamps = timestamps[sort_index]
+                                    values = values[sort_index]
+                                    del sort_index
+                                logger.info('uploaded_data_worker :: sorted timeseries for %s which now has %s timestamps and values' % (
+                                    data_col, str(len(timestamps))))
                             except:
                                 logger.error(traceback.format_exc())
                                 failure_reason = 'failed to sort timeseries of pandas_utc_timestamp and %s' % data_col
                                 logger.error('error :: uploaded_data_worker :: %s' % failure_reason)
-                                timeseries = original_timeseries
 
                         metric = None
-                        if data_df_successful and timeseries:
-                            if original_timeseries:
-                                try:
-                                    del original_timeseries
-                                except:
-                                    pass
+                        if data_df_successful and original_timeseries_length:
                             try:
                                 full_metric_name = '%s.%s' % (str(parent_metric_namespace), str(data_col))
                                 metric = filesafe_metricname(full_metric_name)
@@ -929,67 +938,33 @@ class UploadedDataWorker(Process):
                                 data_df_failures += 1
                                 if upload_status:
                                     upload_status = new_upload_status(upload_status, data_col_key, failure_reason)
-                                try:
-                                    del data_df
-                                except:
-                                    pass
-                                try:
-                                    del timeseries
-                                except:
-                                    pass
                                 continue
 
                         # Best effort to de-duplicate the data sent to Graphite
+                        # @modified 20261019 - flux vectorised uploaded data
+                        # Deduplicate with a mask over the timestamps array
                         last_flux_timestamp = None
-                        if data_df_successful and timeseries and metric:
+                        if data_df_successful and metric:
                             cache_key = 'flux.last.%s' % metric
-                            redis_last_metric_data = None
-                            # @added 20200521 - Feature #3538: webapp - upload_data endpoint
-                            #                   Feature #3550: flux.uploaded_data_worker
-                            # Added the ability to ignore_submitted_timestamps and not
-                            # check flux.last metric timestamp
-                            if not ignore_submitted_timestamps:
-                                try:
-                                    redis_last_metric_data = self.redis_conn_decoded.get(cache_key)
-                                except:
-                                    logger.error(traceback.format_exc())
-                                    logger.error('error :: uploaded_data_worker :: failed to determine last_flux_timestamp from Redis key %s' % cache_key)
-                                    last_flux_timestamp = None
-                            if redis_last_metric_data:
-                                try:
-                                    last_metric_data = literal_eval(redis_last_metric_data)
-                                    last_flux_timestamp = int(last_metric_data[0])
-                                except:
-                                    logger.error(traceback.format_exc())
-                                    logger.error('error :: uploaded_data_worker :: failed to determine last_flux_timestamp from Redis key %s' % cache_key)
-                                    last_flux_timestamp = None
-                        valid_timeseries = []
+                            last_flux_timestamp = last_flux_timestamps.get(cache_key, None)
                         if last_flux_timestamp:
                             try:
                                 logger.info('uploaded_data_worker :: determined last timestamp from Redis for %s as %s' % (
                                     metric, str(last_flux_timestamp)))
-                                for timestamp, value in timeseries:
-                                    if timestamp > last_flux_timestamp:
-                                        valid_timeseries.append([timestamp, value])
-                                valid_timeseries_length = len(valid_timeseries)
+                                new_mask = timestamps > last_flux_timestamp
+                                valid_timeseries_length = int(np.count_nonzero(new_mask))
                                 logger.info('uploaded_data_worker :: deduplicated timeseries based on last_flux_timestamp for %s which now has %s timestamps and values' % (
                                     data_col, str(valid_timeseries_length)))
-                                if valid_timeseries:
-                                    timeseries = valid_timeseries
+                                if valid_timeseries_length:
+                                    timestamps = timestamps[new_mask]
+                                    values = values[new_mask]
+                                    del new_mask
                                 else:
-                                    newest_data_timestamp = str(timeseries[-1][0])
+                                    newest_data_timestamp = str(timestamps[-1])
                                     logger.info('uploaded_data_worker :: none of the timestamps in %s data are older than %s, the newset being %s, nothing to submit continuing' % (
                                         data_col, str(last_flux_timestamp), newest_data_timestamp))
                                     if upload_status:
                                         upload_status = new_upload_status(upload_status, data_col_key, 'processed - no new timestamps, all already known')
-                                    try:
-                                        del data_df
-                                    except:
-                                        pass
-                                    try:
-                                        del timeseries
-                                    except:
-                                        pass
                                     continue
                             except:
                                 logger.error(traceback.format_exc())
@@ -999,124 +974,61 @@ class UploadedDataWorker(Process):
                                 data_df_failures += 1
                                 if upload_status:
                                     upload_status = new_upload_status(upload_status, data_col_key, 'failed to determine if timestamps for %s are newer than the last known timestamp, cannot continue')
-                                try:
-                                    del data_df
-                                except:
-                                    pass
-                                try:
-                                    del timeseries
-                                except:
-                                    pass
                                 continue
 
-                        valid_timeseries = []
-                        if data_df_successful and timeseries and metric:
-                            datapoints_with_no_value = 0
-                            for timestamp, value in timeseries:
-                                    try:
-                                        if value is None:
-                                            datapoints_with_no_value += 1
-                                            continue
-                                        float_value = float(value)
-                                        valid_timeseries.append([timestamp, float_value])
-                                    except:
-                                        datapoints_with_no_value += 1
-                                        continue
+                        # @modified 20261019 - flux vectorised uploaded data
+                        # Drop the data points with no value with a mask
+                        if data_df_successful and metric:
+                            has_value_mask = ~np.isnan(values)
+                            datapoints_with_no_value = len(values) - int(np.count_nonzero(has_value_mask))
                             if datapoints_with_no_value > 0:
                                 logger.info('uploaded_data_worker :: dropped %s timestamps from %s which have no value' % (
                                     str(datapoints_with_no_value), metric))
-                            if valid_timeseries:
-                                timeseries = valid_timeseries
-                                try:
-                                    del valid_timeseries
-                                except:
-                                    pass
-                            else:
+                                timestamps = timestamps[has_value_mask]
+                                values = values[has_value_mask]
+                            del has_value_mask
+                            if not len(values):
                                 logger.info('uploaded_data_worker :: none of the timestamps have value data in %s data, nothing to submit continuing' % (
                                     data_col))
                                 if upload_status:
                                     upload_status = new_upload_status(upload_status, data_col_key, 'failed - no timestamps have value data')
-                                try:
-                                    del data_df
-                                except:
-                                    pass
-                                try:
-                                    del timeseries
-                                except:
-                                    pass
                                 continue
-                        if data_df_successful and timeseries and metric:
+                        if data_df_successful and metric:
                             try:
                                 # Deal with lower frequency data
                                 # Determine resolution from the last 30 data points
-                                resolution_timestamps = []
                                 metric_resolution_determined = False
-                                for metric_datapoint in timeseries[-30:]:
-                                    timestamp = int(metric_datapoint[0])
-                                    resolution_timestamps.append(timestamp)
-                                timestamp_resolutions = []
-                                if resolution_timestamps:
-                                    last_timestamp = None
-                                    for timestamp in resolution_timestamps:
-                                        if last_timestamp:
-                                            resolution = timestamp - last_timestamp
-                                            timestamp_resolutions.append(resolution)
-                                            last_timestamp = timestamp
-                                        else:
-                                            last_timestamp = timestamp
+                                timestamp_resolutions = np.diff(timestamps[-30:])
+                                if len(timestamp_resolutions):
                                     try:
-                                        del resolution_timestamps
-                                    except:
-                                        pass
-                                if timestamp_resolutions:
-                                    try:
-                                        timestamp_resolutions_count = Counter(timestamp_resolutions)
-                                        ordered_timestamp_resolutions_count = timestamp_resolutions_count.most_common()
-                                        metric_resolution = int(ordered_timestamp_resolutions_count[0][0])
+                                        resolutions, resolution_counts = np.unique(timestamp_resolutions, return_counts=True)
+                                        metric_resolution = int(resolutions[np.argmax(resolution_counts)])
                                         if metric_resolution > 0:
                                             metric_resolution_determined = True
                                     except:
                                         logger.error(traceback.format_exc())
                                         logger.error('error :: uploaded_data_worker :: failed to determine metric_resolution from timeseries')
-                                    try:
-                                        del timestamp_resolutions
-                                    except:
-                                        pass
+                                del timestamp_resolutions
                                 # Resample
                                 resample_at = None
                                 if metric_resolution_determined and metric_resolution < 60:
                                     resample_at = '1Min'
                                 if resample_at:
                                     try:
-                                        high_res_df = pd.DataFrame(timeseries)
-                                        high_res_df.columns = ['date', data_col]
-                                        high_res_df = high_res_df.set_index('date')
-                                        high_res_df.index = pd.to_datetime(high_res_df.index, unit='s')
-                                        resample_at = '1Min'
+                                        high_res_series = pd.Series(values, index=pd.to_datetime(timestamps, unit='s'))
                                         if resample_method == 'mean':
-                                            resampled_df = high_res_df.resample(resample_at).mean()
+                                            resampled_series = high_res_series.resample(resample_at).mean()
                                         else:
-                                            resampled_df = high_res_df.resample(resample_at).sum()
+                                            resampled_series = high_res_series.resample(resample_at).sum()
                                         logger.info('uploaded_data_worker :: resampled %s data by %s' % (
                                             data_col, resample_method))
-                                        try:
-                                            del high_res_df
-                                        except:
-                                            pass
-                                        resampled_df.reset_index(level=0, inplace=True)
-                                        resampled_df['date'] = resampled_df['date'].dt.tz_localize(pytz_tz)
-                                        dates = resampled_df['date'].tolist()
-                                        timestamps = []
-                                        for d in dates:
-                                            timestamps.append(int(d.strftime('%s')))
-                                        resampled_df['pandas_utc_timestamp'] = timestamps
-                                        resampled_df['timeseries'] = resampled_df.apply(lambda x: list([x['pandas_utc_timestamp'], x[data_col]]), axis=1)
-                                        timeseries = resampled_df['timeseries'].values.tolist()
-                                        try:
-                                            del resampled_df
-                                        except:
-                                            pass
-                                        resampled_timeseries_length = len(timeseries)
+                                        del high_res_series
+                                        # Drop any empty resample periods
+                                        resampled_series = resampled_series.dropna()
+                                        timestamps = datetimes_to_timestamps(resampled_series.index)
+                                        values = resampled_series.values.astype(np.float64)
+                                        del resampled_series
+                                        resampled_timeseries_length = len(timestamps)
                                         logger.info('uploaded_data_worker :: created resampled timeseries for %s with %s timestamps and values' % (
                                             data_col, str(resampled_timeseries_length)))
                                     except:
@@ -1127,14 +1039,6 @@ class UploadedDataWorker(Process):
                                         data_df_failures += 1
                                         if upload_status:
                                             upload_status = new_upload_status(upload_status, data_col_key, failure_reason)
-                                        try:
-                                            del data_df
-                                        except:
-                                            pass
-                                        try:
-                                            del timeseries
-                                        except:
-                                            pass
                                         continue
                             except:
                                 logger.error(traceback.format_exc())
@@ -1144,98 +1048,49 @@ class UploadedDataWorker(Process):
                                 data_df_failures += 1
                                 if upload_status:
                                     upload_status = new_upload_status(upload_status, data_col_key, failure_reason)
-                                try:
-                                    del data_df
-                                except:
-                                    pass
-                                try:
-                                    del timeseries
-                                except:
-                                    pass
                                 continue
-                        try:
-                            del data_df
-                        except:
-                            pass
                         sent_to_graphite = 0
                         last_timestamp_sent = None
                         last_value_sent = None
-                        if data_df_successful and timeseries and metric:
-                            timeseries_length = len(timeseries)
+                        if data_df_successful and metric and len(timestamps):
+                            timeseries_length = len(timestamps)
                             logger.info('uploaded_data_worker :: after preprocessing there are %s data points to send to Graphite for %s' % (
                                 str(timeseries_length), metric))
 
-                            timestamp = None
-                            value = None
                             start_populating = timer()
-                            listOfMetricTuples = []
-                            try:
-                                for timestamp, value in timeseries:
-                                    tuple_data = (metric, (int(timestamp), float(value)))
-                                    if LOCAL_DEBUG or debug_enabled_in_info:
-                                        logger.debug('debug :: uploaded_data_worker :: sending - %s' % str(tuple_data))
-                                    listOfMetricTuples.append(tuple_data)
-                                    sent_to_graphite += 1
-                                    if value == 0.0:
-                                        has_value = True
-                                    if value == 0:
-                                        has_value = True
-                                    if value:
-                                        has_value = True
-                                    if has_value:
-                                        last_timestamp_sent = int(timestamp)
-                                        last_value_sent = float(value)
-                            except:
-                                logger.error(traceback.format_exc())
-                                logger.error('error :: uploaded_data_worker :: failed to populate listOfMetricTuples for %s' % str(metric))
-                            if listOfMetricTuples:
-                                data_points_sent = 0
-                                smallListOfMetricTuples = []
-                                tuples_added = 0
-                                for data in listOfMetricTuples:
-                                    smallListOfMetricTuples.append(data)
-                                    tuples_added += 1
-                                    if tuples_added >= 1000:
-                                        if dryrun:
-                                            pickle_data_sent = True
-                                            logger.info('uploaded_data_worker :: DRYRUN :: faking sending data')
-                                        else:
-                                            pickle_data_sent = pickle_data_to_graphite(smallListOfMetricTuples)
-                                        if pickle_data_sent:
-                                            data_points_sent += tuples_added
-                                            logger.info('uploaded_data_worker :: sent %s/%s of %s data points to Graphite via pickle for %s' % (
-                                                str(tuples_added), str(data_points_sent),
-                                                str(timeseries_length), metric))
-                                            sent_to_graphite += len(smallListOfMetricTuples)
-                                            smallListOfMetricTuples = []
-                                            tuples_added = 0
-                                        else:
-                                            logger.error('error :: uploaded_data_worker :: failed to send %s data points to Graphite via pickle for %s' % (
-                                                str(tuples_added), metric))
-                                if smallListOfMetricTuples:
-                                    tuples_to_send = len(smallListOfMetricTuples)
-                                    if dryrun:
-                                        pickle_data_sent = True
-                                        logger.info('uploaded_data_worker :: DRYRUN :: faking sending data')
-                                    else:
-                                        pickle_data_sent = pickle_data_to_graphite(smallListOfMetricTuples)
-                                    if pickle_data_sent:
-                                        data_points_sent += tuples_to_send
-                                        logger.info('uploaded_data_worker :: sent the last %s/%s of %s data points to Graphite via pickle for %s' % (
-                                            str(tuples_to_send), str(data_points_sent),
-                                            str(timeseries_length), metric))
-                                    else:
-                                        logger.error('error :: uploaded_data_worker :: failed to send the last %s data points to Graphite via pickle for %s' % (
-                                            str(tuples_to_send), metric))
-                            try:
-                                del timeseries
-                            except:
-                                pass
-                            try:
-                                del listOfMetricTuples
-                            except:
-                                pass
+                            # @modified 20261019 - flux vectorised uploaded data
+                            # Build each pickle batch of 1000 metric tuples
+                            # straight from the arrays rather than creating a
+                            # full listOfMetricTuples and copying it into
+                            # smallListOfMetricTuples
+                            data_points_sent = 0
+                            for batch_start in range(0, timeseries_length, 1000):
+                                smallListOfMetricTuples = [
+                                    (metric, (timestamp, value)) for timestamp, value in zip(
+                                        timestamps[batch_start:batch_start + 1000].tolist(),
+                                        values[batch_start:batch_start + 1000].tolist())]
+                                tuples_to_send = len(smallListOfMetricTuples)
+                                if LOCAL_DEBUG or debug_enabled_in_info:
+                                    logger.debug('debug :: uploaded_data_worker :: sending - %s' % str(smallListOfMetricTuples))
+                                if dryrun:
+                                    pickle_data_sent = True
+                                    logger.info('uploaded_data_worker :: DRYRUN :: faking sending data')
+                                else:
+                                    pickle_data_sent = pickle_data_to_graphite(smallListOfMetricTuples)
+                                if pickle_data_sent:
+                                    data_points_sent += tuples_to_send
+                                    sent_to_graphite += tuples_to_send
+                                    last_timestamp_sent = int(smallListOfMetricTuples[-1][1][0])
+                                    last_value_sent = float(smallListOfMetricTuples[-1][1][1])
+                                    logger.info('uploaded_data_worker :: sent %s/%s of %s data points to Graphite via pickle for %s' % (
+                                        str(tuples_to_send), str(data_points_sent),
+                                        str(timeseries_length), metric))
+                                else:
+                                    logger.error('error :: uploaded_data_worker :: failed to send %s data points to Graphite via pickle for %s' % (
+                                        str(tuples_to_send), metric))
                             try:
+                                del timestamps
+                                del values
                                 del smallListOfMetricTuples
                             except:
                                 pass
@@ -174,7 +174,33 @@ class Worker(Process):
             # Added backfill
             backfill = False
 
+            # @added 20261019 - flux metric_data_bulk
+            # A queue item is either a single metric_data list or a batch of
+            # metric_data lists from the metric_data_bulk endpoint
+            metric_data_items = []
             if metric_data:
+                if isinstance(metric_data[0], list):
+                    metric_data_items = metric_data
+                else:
+                    metric_data_items = [metric_data]
+
+            # @added 20261019 - flux metric_data_bulk
+            # For a batch, get all the flux.last keys with a single MGET
+            # rather than a Redis GET per data point
+            last_metric_data_cache = {}
+            if len(metric_data_items) > 1 and settings.FLUX_SEND_TO_CARBON:
+                try:
+                    cache_keys = list(set(['flux.last.%s' % str(item[0]) for item in metric_data_items if not item[3]]))
+                    if cache_keys:
+                        last_metric_data_cache = dict(zip(cache_keys, self.redis_conn_decoded.mget(cache_keys)))
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: worker :: failed to mget flux.last keys for batch')
+                    last_metric_data_cache = {}
+
+            # @modified 20261019 - flux metric_data_bulk
+            # if metric_data:
+            for metric_data in metric_data_items:
                 try:
                     metric = str(metric_data[0])
                     value = float(metric_data[1])
@@ -202,7 +228,13 @@ class Worker(Process):
                             # @modified 20191128 - Bug #3266: py3 Redis binary objects not strings
                             #                      Branch #3262: py3
                             # redis_last_metric_data = self.redis_conn.get(cache_key)
-                            redis_last_metric_data = self.redis_conn_decoded.get(cache_key)
+                            # @modified 20261019 - flux metric_data_bulk
+                            # Use the batch MGET data if available
+                            # redis_last_metric_data = self.redis_conn_decoded.get(cache_key)
+                            if cache_key in last_metric_data_cache:
+                                redis_last_metric_data = last_metric_data_cache[cache_key]
+                            else:
+                                redis_last_metric_data = self.redis_conn_decoded.get(cache_key)
                             last_metric_data = literal_eval(redis_last_metric_data)
                             last_metric_timestamp = int(last_metric_data[0])
                             if LOCAL_DEBUG:
@@ -236,6 +268,9 @@ class Worker(Process):
                             if not backfill:
                                 metric_data = [timestamp, value]
                                 self.redis_conn.set(cache_key, str(metric_data))
+                                # @added 20261019 - flux metric_data_bulk
+                                if cache_key in last_metric_data_cache:
+                                    last_metric_data_cache[cache_key] = str(metric_data)
                             # @added 20200213 - Bug #3448: Repeated airgapped_metrics
                             else:
                                 # @added 20200213 - Bug #3448: Repeated airgapped_metrics
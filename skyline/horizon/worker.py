@@ -52,6 +52,12 @@ try:
 except:
     DO_NOT_SKIP_LIST = []
 
+# @added 20261019 - Feature #4726: Boundary low latency mode
+try:
+    BOUNDARY_LOW_LATENCY = settings.BOUNDARY_LOW_LATENCY
+except:
+    BOUNDARY_LOW_LATENCY = False
+
 # @added 20190130 - Task #2690: Test Skyline on Python-3.6.7
 #                   Branch #3262: py3
 python_version = int(version_info[0])
@@ -188,6 +194,13 @@ class Worker(Process):
         last_send_to_graphite = time()
         queue_sizes = []
 
+        # @added 20261019 - Feature #4726: Boundary low latency mode
+        # The datapoints of the Boundary metrics are published to the
+        # Boundary low latency process, Boundary maintains the set of the
+        # Boundary metrics in the boundary.low_latency_metrics Redis set
+        low_latency_metrics = set()
+        last_low_latency_metrics_refresh = 0
+
         # python-2.x and python3.x handle while 1 and while True differently
         # while 1:
         running = True
@@ -218,6 +231,14 @@ class Worker(Process):
                 # now = time()
                 now = int(time())
 
+                # @added 20261019 - Feature #4726: Boundary low latency mode
+                if BOUNDARY_LOW_LATENCY and (now - last_low_latency_metrics_refresh) >= 60:
+                    last_low_latency_metrics_refresh = now
+                    try:
+                        low_latency_metrics = set(self.redis_conn.smembers('boundary.low_latency_metrics'))
+                    except Exception as e:
+                        logger.error('%s :: error getting boundary.low_latency_metrics: %s' % (skyline_app, str(e)))
+
                 for metric in chunk:
 
                     # Check if we should skip it
@@ -260,6 +281,15 @@ class Worker(Process):
                     except Exception as e:
                         logger.error('%s :: error on pipe.sadd: %s' % (skyline_app, str(e)))
 
+                    # @added 20261019 - Feature #4726: Boundary low latency mode
+                    # Publish the datapoint after it is appended so that the
+                    # Boundary low latency process evaluates it immediately
+                    if str(key) in low_latency_metrics:
+                        try:
+                            pipe.publish('boundary.low_latency', packb([str(key), metric[1]]))
+                        except Exception as e:
+                            logger.error('%s :: error on pipe.publish: %s' % (skyline_app, str(e)))
+
                     if not self.skip_mini:
                         # Append to mini namespace
                         # @modified 20190130 - Task #2690: Test Skyline on Python-3.6.7
@@ -17,7 +17,9 @@ from tsfresh.feature_extraction import (
 import settings
 from skyline_functions import get_memcache_metric_object
 from database import (
-    get_engine, metrics_table_meta)
+    get_engine, metrics_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine)
 
 skyline_app = 'ionosphere'
 skyline_app_logger = '%sLog' % skyline_app
@@ -69,7 +71,11 @@ def get_metrics_db_object(base_name):
     def engine_disposal(engine):
         if engine:
             try:
-                engine.dispose()
+                # @modified 20261019 - Database engine registry
+                # The engine of the process is not disposed of so that its
+                # connection pool is reused
+                # engine.dispose()
+                dispose_engine(skyline_app, engine)
             except:
                 logger.error(traceback.format_exc())
                 logger.error('error :: calling engine.dispose()')
@@ -15,7 +15,9 @@ from skyline_functions import (mkdir_p, get_memcache_metric_object)
 from features_profile import calculate_features_profile
 
 from database import (
-    get_engine, ionosphere_table_meta, metrics_table_meta)
+    get_engine, ionosphere_table_meta, metrics_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine)
 
 # @added 2017014 - Feature #1854: Ionosphere learn
 from ionosphere_functions import create_features_profile
@@ -122,7 +124,11 @@ def ionosphere_echo(base_name, mirage_full_duration):
         try:
             if engine:
                 try:
-                    engine.dispose()
+                    # @modified 20261019 - Database engine registry
+                    # The engine of the process is not disposed of so that its
+                    # connection pool is reused
+                    # engine.dispose()
+                    dispose_engine(skyline_app, engine)
                     logger.info('ionosphere_echo :: MySQL engine disposed of')
                     return True
                 except:
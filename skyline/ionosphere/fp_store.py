@@ -0,0 +1,270 @@
+"""
+The features profiles store.
+
+A local store of the feature values and the time series of the features
+profiles of each metric, saved as numpy arrays that are memory mapped when they
+are loaded, so that the data is shared via the page cache by every Ionosphere
+process that checks the metric.  Ionosphere checks read the features profiles
+data from the store rather than querying the z_fp_<metric_id> and
+z_ts_<metric_id> tables or memcache for each features profile.
+
+The store of a metric is versioned by the enabled features profile ids of the
+metric, the feature values and time series of a features profile do not change
+once it has been created, so a new store version is created when a features
+profile is created, enabled or disabled.  Each version is created in its own
+directory, which is renamed into place so that the version is only ever seen
+complete, and the previous versions of the metric are removed.
+"""
+from __future__ import division
+import logging
+import os
+import hashlib
+import shutil
+import traceback
+
+import numpy as np
+
+import settings
+from features_profile import TSFRESH_FEATURES_VECTOR_SIZE
+
+skyline_app = 'ionosphere'
+skyline_app_logger = '%sLog' % skyline_app
+logger = logging.getLogger(skyline_app_logger)
+
+try:
+    IONOSPHERE_FEATURES_PROFILES_STORE_PATH = settings.IONOSPHERE_FEATURES_PROFILES_STORE_PATH
+except:
+    IONOSPHERE_FEATURES_PROFILES_STORE_PATH = None
+
+FP_STORE_ARRAYS = ['fp_ids', 'features', 'offsets', 'timestamps', 'values', 'minmax']
+
+
+def fp_store_version(fp_ids):
+    """
+    The version of a metric features profiles store, determined from the
+    enabled features profile ids.
+
+    :param fp_ids: the enabled features profile ids of the metric
+    :type fp_ids: list
+    :return: version
+    :rtype: str
+    """
+    ids_str = ','.join([str(fp_id) for fp_id in sorted(set([int(fp_id) for fp_id in fp_ids]))])
+    return hashlib.sha1(ids_str.encode('utf-8')).hexdigest()[:16]
+
+
+def build_fp_store(engine, metrics_id, fp_ids, version_dir):
+    """
+    Create the features profiles store arrays of a metric from the database
+    z_fp_<metric_id> and z_ts_<metric_id> tables.
+
+    :param engine: the database engine
+    :param metrics_id: the metric id
+    :param fp_ids: the features profile ids
+    :param version_dir: the directory to save the arrays to
+    :type engine: object
+    :type metrics_id: int
+    :type fp_ids: list
+    :type version_dir: str
+    :return: True
+    :rtype: boolean
+    """
+    fp_ids = sorted(set([int(fp_id) for fp_id in fp_ids]))
+    fp_index = dict([(fp_id, index) for index, fp_id in enumerate(fp_ids)])
+    fp_ids_str = ','.join([str(fp_id) for fp_id in fp_ids])
+
+    features = np.full((len(fp_ids), TSFRESH_FEATURES_VECTOR_SIZE), np.nan)
+    metric_fp_table = 'z_fp_%s' % str(int(metrics_id))
+    # Added nosec to exclude from bandit tests
+    stmt = 'SELECT fp_id, feature_id, value FROM %s WHERE fp_id IN (%s)' % (metric_fp_table, fp_ids_str)  # nosec
+    connection = engine.connect()
+    for row in connection.execute(stmt):
+        feature_id = int(row['feature_id'])
+        if feature_id >= TSFRESH_FEATURES_VECTOR_SIZE:
+            continue
+        if row['value'] is None or int(row['fp_id']) not in fp_index:
+            continue
+        features[fp_index[int(row['fp_id'])], feature_id] = float(row['value'])
+    connection.close()
+
+    ts_fp_ids = []
+    timestamps = []
+    values = []
+    metric_fp_ts_table = 'z_ts_%s' % str(int(metrics_id))
+    stmt = 'SELECT fp_id, timestamp, value FROM %s WHERE fp_id IN (%s) ORDER BY id' % (metric_fp_ts_table, fp_ids_str)  # nosec
+    connection = engine.connect()
+    for row in connection.execute(stmt):
+        if int(row['fp_id']) not in fp_index:
+            continue
+        ts_fp_ids.append(fp_index[int(row['fp_id'])])
+        timestamps.append(int(row['timestamp']))
+        if row['value'] is None:
+            values.append(np.nan)
+        else:
+            values.append(float(row['value']))
+    connection.close()
+
+    # Group the data points by features profile, preserving their order
+    ts_fp_ids = np.array(ts_fp_ids, dtype=np.int64)
+    order = np.argsort(ts_fp_ids, kind='mergesort')
+    timestamps = np.array(timestamps, dtype=np.int64)[order]
+    values = np.array(values, dtype=np.float64)[order]
+    counts = np.bincount(ts_fp_ids, minlength=len(fp_ids))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    minmax = np.full((len(fp_ids), 2), np.nan)
+    for index in range(len(fp_ids)):
+        fp_values = values[offsets[index]:offsets[index + 1]]
+        if len(fp_values) and not np.all(np.isnan(fp_values)):
+            minmax[index] = [np.nanmin(fp_values), np.nanmax(fp_values)]
+
+    arrays = {
+        'fp_ids': np.array(fp_ids, dtype=np.int64),
+        'features': features,
+        'offsets': offsets,
+        'timestamps': timestamps,
+        'values': values,
+        'minmax': minmax,
+    }
+    for array_name in FP_STORE_ARRAYS:
+        np.save(os.path.join(version_dir, '%s.npy' % array_name), arrays[array_name])
+    return True
+
+
+def get_fp_store(engine, metrics_id, fp_ids):
+    """
+    Returns the features profiles store of a metric, creating the store version
+    from the database if it does not exist.
+
+    :param engine: the database engine
+    :param metrics_id: the metric id
+    :param fp_ids: all the enabled features profile ids of the metric
+    :type engine: object
+    :type metrics_id: int
+    :type fp_ids: list
+    :return: a dict of the memory mapped arrays with an index dict of the row
+        of each fp_id, or None if there is no store
+    :rtype: dict
+    """
+    if not IONOSPHERE_FEATURES_PROFILES_STORE_PATH or not fp_ids:
+        return None
+    metric_store_dir = os.path.join(IONOSPHERE_FEATURES_PROFILES_STORE_PATH, str(int(metrics_id)))
+    version = fp_store_version(fp_ids)
+    version_dir = os.path.join(metric_store_dir, version)
+    if not os.path.isdir(version_dir):
+        if not engine:
+            return None
+        build_dir = '%s.%s.tmp' % (version_dir, str(os.getpid()))
+        try:
+            if not os.path.isdir(metric_store_dir):
+                os.makedirs(metric_store_dir)
+            if os.path.isdir(build_dir):
+                shutil.rmtree(build_dir)
+            os.makedirs(build_dir)
+            build_fp_store(engine, metrics_id, fp_ids, build_dir)
+            os.rename(build_dir, version_dir)
+            logger.info('fp_store :: created features profiles store version %s for metric id %s with %s features profiles' % (
+                version, str(metrics_id), str(len(fp_ids))))
+        except:
+            # Another process may have created the version concurrently
+            if not os.path.isdir(version_dir):
+                logger.error(traceback.format_exc())
+                logger.error('error :: fp_store :: failed to create the features profiles store for metric id %s' % str(metrics_id))
+            try:
+                if os.path.isdir(build_dir):
+                    shutil.rmtree(build_dir)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: fp_store :: failed to remove %s' % build_dir)
+            if not os.path.isdir(version_dir):
+                return None
+        # Remove the old versions
+        try:
+            for store_dir in os.listdir(metric_store_dir):
+                if store_dir == version or store_dir.endswith('.tmp'):
+                    continue
+                shutil.rmtree(os.path.join(metric_store_dir, store_dir))
+                logger.info('fp_store :: removed features profiles store version %s for metric id %s' % (
+                    store_dir, str(metrics_id)))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: fp_store :: failed to remove old features profiles store versions for metric id %s' % str(metrics_id))
+
+    fp_store = {}
+    try:
+        for array_name in FP_STORE_ARRAYS:
+            fp_store[array_name] = np.load(os.path.join(version_dir, '%s.npy' % array_name), mmap_mode='r')
+        fp_store['index'] = dict([(int(fp_id), index) for index, fp_id in enumerate(fp_store['fp_ids'])])
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: fp_store :: failed to load the features profiles store version %s for metric id %s' % (
+            version, str(metrics_id)))
+        return None
+    return fp_store
+
+
+def fp_store_features(fp_store, fp_id):
+    """
+    The features vector of a features profile.
+
+    :param fp_store: the features profiles store of the metric
+    :param fp_id: the features profile id
+    :type fp_store: dict
+    :type fp_id: int
+    :return: a numpy array indexed by Skyline feature id, with NaN for the
+        features the features profile does not have, or None
+    :rtype: numpy.array
+    """
+    if not fp_store:
+        return None
+    index = fp_store['index'].get(int(fp_id))
+    if index is None:
+        return None
+    return fp_store['features'][index]
+
+
+def fp_store_feature_ids(fp_store, fp_ids):
+    """
+    The feature ids present in any of the features profiles.
+
+    :param fp_store: the features profiles store of the metric
+    :param fp_ids: the features profile ids
+    :type fp_store: dict
+    :type fp_ids: list
+    :return: the feature ids or None if a features profile is not in the store
+    :rtype: list
+    """
+    if not fp_store or not fp_ids:
+        return None
+    indices = []
+    for fp_id in fp_ids:
+        index = fp_store['index'].get(int(fp_id))
+        if index is None:
+            return None
+        indices.append(index)
+    present = ~np.isnan(fp_store['features'][indices])
+    return [int(feature_id) for feature_id in np.flatnonzero(present.any(axis=0))]
+
+
+def fp_store_timeseries(fp_store, fp_id):
+    """
+    The time series of a features profile and its min and max values.
+
+    :param fp_store: the features profiles store of the metric
+    :param fp_id: the features profile id
+    :type fp_store: dict
+    :type fp_id: int
+    :return: (timeseries, min_value, max_value) the time series as a list of
+        [timestamp, value] items, or (None, None, None)
+    :rtype: tuple
+    """
+    if not fp_store:
+        return None, None, None
+    index = fp_store['index'].get(int(fp_id))
+    if index is None:
+        return None, None, None
+    start = fp_store['offsets'][index]
+    end = fp_store['offsets'][index + 1]
+    timeseries = [[int(ts), float(value)] for ts, value in zip(
+        fp_store['timestamps'][start:end], fp_store['values'][start:end])]
+    min_value, max_value = fp_store['minmax'][index]
+    return timeseries, float(min_value), float(max_value)
@@ -69,7 +69,9 @@ from skyline_functions import (
 # @added 20161221 - calculate features for every anomaly, instead of making the
 # user do it in the frontend or calling the webapp constantly in a cron like
 # manner.  Decouple Ionosphere from the webapp.
-from features_profile import calculate_features_profile
+# @modified 20261019 - In memory tsfresh feature extraction
+# from features_profile import calculate_features_profile
+from features_profile import calculate_features_profile, calculate_features
 
 # @modified 20170107 - Feature #1844: ionosphere_matched DB table
 # Added ionosphere_matched_meta
@@ -83,7 +85,9 @@ from database import (
     # @added 20200516 - Bug #3546: Change ionosphere_enabled if all features profiles are disabled
     # Readded metrics_table to set ionosphere_enabled to 0 if a metric has no
     # fps enabled and has been willy nillied
-    metrics_table_meta)
+    metrics_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine)
 
 from tsfresh_feature_names import TSFRESH_FEATURES
 
@@ -94,13 +98,22 @@ from tsfresh_feature_names import TSFRESH_FEATURES
 from learn import ionosphere_learn
 
 # @added 20170306 - Feature #1960: ionosphere_layers
-from layers import run_layer_algorithms
+# @modified 20261019 - Cached compiled layers definitions
+# from layers import run_layer_algorithms
+from layers import run_metric_layers
 
 # @added 20190322 - Feature #2484: FULL_DURATION feature profiles
 from common_functions import (
     get_metrics_db_object, get_calculated_features)
 # @added 20190327 - Feature #2484
 from echo import ionosphere_echo
+# @added 20261019 - Features profiles store
+from fp_store import (
+    get_fp_store, fp_store_features, fp_store_feature_ids, fp_store_timeseries)
+# @added 20261019 - Ionosphere work queue
+from work_queue import (
+    WORK_QUEUE_FIRST_SEEN_KEY, check_file_work_items, echo_work_items,
+    learn_work_items, deadline_missed, schedule_work_items)
 
 skyline_app = 'ionosphere'
 skyline_app_logger = '%sLog' % skyline_app
@@ -168,6 +181,18 @@ try:
 except:
     IONOSPHERE_MANAGE_PURGE = True
 
+# @added 20261019 - Minimal tsfresh feature extraction
+try:
+    IONOSPHERE_MINIMAL_FEATURES_EXTRACTION = settings.IONOSPHERE_MINIMAL_FEATURES_EXTRACTION
+except:
+    IONOSPHERE_MINIMAL_FEATURES_EXTRACTION = False
+
+# @added 20261019 - Ionosphere work queue
+try:
+    IONOSPHERE_WORK_QUEUE_WORKERS = int(settings.IONOSPHERE_WORK_QUEUE_WORKERS)
+except:
+    IONOSPHERE_WORK_QUEUE_WORKERS = 1
+
 # @added 20200413 - Feature #3486: analyzer_batch
 #                   Feature #3480: batch_processing
 try:
@@ -634,7 +659,11 @@ class Ionosphere(Thread):
 
         if engine:
             try:
-                engine.dispose()
+                # @modified 20261019 - Database engine registry
+                # The engine of the process is not disposed of so that its
+                # connection pool is reused
+                # engine.dispose()
+                dispose_engine(skyline_app, engine)
             except:
                 logger.error(traceback.format_exc())
                 logger.error('error :: calling engine.dispose()')
@@ -774,6 +803,236 @@ class Ionosphere(Thread):
         # learn(timestamp)
         ionosphere_learn(timestamp)
 
+    # @added 20261019 - Minimal tsfresh feature extraction
+    # @modified 20261019 - Features profiles store
+    # Added fp_store
+    def fp_feature_ids(self, engine, metrics_id, fp_ids, fp_store=None):
+        """
+        Determine the feature ids present in the features profiles, so that
+        only the features that are compared are calculated.
+
+        :param engine: the database engine
+        :param metrics_id: the metric id
+        :param fp_ids: the features profile ids
+        :param fp_store: the features profiles store of the metric
+        :type engine: object
+        :type metrics_id: int
+        :type fp_ids: list
+        :type fp_store: dict
+        :return: the feature ids or None if they could not be determined
+        :rtype: list
+        """
+        if not IONOSPHERE_MINIMAL_FEATURES_EXTRACTION:
+            return None
+        # @added 20261019 - Features profiles store
+        if fp_store:
+            try:
+                feature_ids = fp_store_feature_ids(fp_store, fp_ids)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: could not determine the feature ids of the features profiles from the features profiles store')
+                feature_ids = None
+            if feature_ids:
+                return feature_ids
+        if not fp_ids or not engine:
+            return None
+        feature_ids = []
+        metric_fp_table = 'z_fp_%s' % str(int(metrics_id))
+        try:
+            # Added nosec to exclude from bandit tests
+            stmt = 'SELECT DISTINCT feature_id FROM %s WHERE fp_id IN (%s)' % (
+                metric_fp_table, ','.join([str(int(fp_id)) for fp_id in fp_ids]))  # nosec
+            connection = engine.connect()
+            for row in connection.execute(stmt):
+                feature_ids.append(int(row['feature_id']))
+            connection.close()
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: could not determine the feature ids of the features profiles from %s' % metric_fp_table)
+            return None
+        logger.info('the %s features profiles have %s distinct features' % (
+            str(len(fp_ids)), str(len(feature_ids))))
+        return feature_ids
+
+    # @added 20261019 - Minimal tsfresh feature extraction
+    def record_feature_family_times(self, family_times):
+        """
+        Add the seconds taken by each tsfresh feature calculator to the Redis
+        hashes that are sent to Graphite every minute.
+
+        :param family_times: the seconds per feature calculator
+        :type family_times: dict
+        :return: None
+        """
+        if not family_times:
+            return
+        try:
+            pipe = self.redis_conn.pipeline()
+            for family in family_times:
+                pipe.hincrbyfloat('ionosphere.features_extraction.family_times', family, float(family_times[family]))
+                pipe.hincrby('ionosphere.features_extraction.family_counts', family, 1)
+            pipe.execute()
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to record the feature calculator times in Redis')
+
+    # @added 20261019 - Ionosphere work queue
+    def work_queue_first_seen(self, work_set_items, now):
+        """
+        Determine when each ionosphere.echo.work and ionosphere.learn.work
+        item was first seen, adding the new items to and removing the items
+        that are no longer queued from the first seen Redis hash.
+
+        :param work_set_items: the items in the work Redis sets
+        :param now: the current timestamp
+        :type work_set_items: list
+        :type now: float
+        :return: first_seen
+        :rtype: dict
+        """
+        first_seen = {}
+        try:
+            first_seen = self.redis_conn_decoded.hgetall(WORK_QUEUE_FIRST_SEEN_KEY)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to get Redis hash %s' % WORK_QUEUE_FIRST_SEEN_KEY)
+        if not first_seen:
+            first_seen = {}
+        new_items = [item for item in work_set_items if item not in first_seen]
+        stale_items = [item for item in first_seen if item not in work_set_items]
+        if not new_items and not stale_items:
+            return first_seen
+        try:
+            pipe = self.redis_conn.pipeline()
+            for item in new_items:
+                pipe.hset(WORK_QUEUE_FIRST_SEEN_KEY, item, now)
+                first_seen[item] = now
+            for item in stale_items:
+                pipe.hdel(WORK_QUEUE_FIRST_SEEN_KEY, item)
+                del first_seen[item]
+            pipe.execute()
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to update Redis hash %s' % WORK_QUEUE_FIRST_SEEN_KEY)
+        return first_seen
+
+    # @added 20261019 - Ionosphere work queue
+    def record_work_queue_latency(self, work_items, now):
+        """
+        Add the seconds each work item was queued for to the Redis hashes that
+        are sent to Graphite every minute as the queue latency of each work
+        type.
+
+        :param work_items: the work items being started
+        :param now: the timestamp the work items were started
+        :type work_items: list
+        :type now: float
+        :return: None
+        """
+        if not work_items:
+            return
+        try:
+            pipe = self.redis_conn.pipeline()
+            for work_item in work_items:
+                latency = max((now - float(work_item['queued_at'])), 0)
+                pipe.hincrbyfloat('ionosphere.work_queue.latency', work_item['work_type'], latency)
+                pipe.hincrby('ionosphere.work_queue.latency_counts', work_item['work_type'], 1)
+                if deadline_missed(work_item, now):
+                    pipe.hincrby('ionosphere.work_queue.deadlines_missed', work_item['work_type'], 1)
+            pipe.execute()
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to record the work queue latency in Redis')
+
+    # @added 20261019 - Ionosphere work queue
+    # @modified 20261019 - Ionosphere work queue
+    # Moved from the run loop, which processed the ionosphere.echo.work items
+    # inline
+    def create_echo_work_check_file(self, echo_metric_list):
+        """
+        When an item is in the ionosphere.echo.work set it needs a
+        metric_echo_check_file created to pass to process_ionosphere_echo
+
+        :param echo_metric_list: the ionosphere.echo.work item
+        :type echo_metric_list: list
+        :return: echo_metric_check_file or None if the check file was not
+            created
+        :rtype: str
+        """
+        try:
+            echo_metric_timestamp = int(echo_metric_list[2])
+            echo_base_name = str(echo_metric_list[3])
+            echo_full_duration = int(echo_metric_list[6])
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: could not determine details from ionosphere_echo_work item')
+            return None
+        echo_metric_check_file = '%s/%s.%s.echo.txt' % (
+            settings.SKYLINE_TMP_DIR, str(echo_metric_timestamp),
+            echo_base_name)
+        echo_create_fp_metric_key = 'ionosphere.%s.%s.echo_create_check' % (
+            str(echo_metric_timestamp), echo_base_name)
+        echo_create_fp_metric_count = 1
+        try:
+            echo_create_fp_metric_count = self.redis_conn.get(echo_create_fp_metric_key)
+        except Exception as e:
+            logger.error('error :: could not query Redis for ionosphere.manage_ionosphere_unique_metrics: %s' % e)
+        if not echo_create_fp_metric_count:
+            echo_create_fp_metric_count = 1
+        else:
+            echo_create_fp_metric_count = int(echo_create_fp_metric_count) + 1
+        if os.path.isfile(str(echo_metric_check_file)):
+            logger.error('error :: echo_metric_check_file - %s already exists, removing' % (
+                echo_metric_check_file))
+            self.remove_metric_check_file(echo_metric_check_file)
+        if echo_create_fp_metric_count >= 3:
+            logger.error('error :: echo_create_fp_metric_count is %s, no further attempts will be made to create an echo fp for %s' % (
+                str(echo_create_fp_metric_count), str(echo_metric_list)))
+            self.remove_echo_work_item(echo_metric_list)
+            return None
+        check_data = 'metric = \'%s\'\n' \
+                     'metric_timestamp = \'%s\'\n' \
+                     'added_by = \'%s\'\n' \
+                     'full_duration = \'%s\'\n' \
+            % (str(echo_base_name), str(echo_metric_timestamp),
+                'webapp', str(echo_full_duration))
+        try:
+            write_data_to_file(skyline_app, echo_metric_check_file, 'w', check_data)
+            logger.info('added ionosphere.echo.work item check file for process_ionosphere_echo - %s' % (
+                echo_metric_check_file))
+        except:
+            logger.info(traceback.format_exc())
+            logger.error('error :: failed to add ionosphere.echo.work item check file for process_ionosphere_echo - %s' % (
+                echo_metric_check_file))
+            return None
+        # Set a Redis key so that if the echo fp creation fails
+        # a continous loop to try to create it does not occur
+        try:
+            self.redis_conn.setex(echo_create_fp_metric_key, 3600, echo_create_fp_metric_count)
+            logger.info('updated Redis key - %s' % echo_create_fp_metric_key)
+        except:
+            logger.error('error :: failed to update Redis key - %s' % echo_create_fp_metric_key)
+        return echo_metric_check_file
+
+    # @added 20261019 - Ionosphere work queue
+    def remove_echo_work_item(self, echo_metric_list):
+        """
+        Remove an item from the ionosphere.echo.work Redis set.
+
+        :param echo_metric_list: the ionosphere.echo.work item
+        :type echo_metric_list: list
+        :return: None
+        """
+        logger.info('removing ionosphere.echo.work item %s' % (
+            str(echo_metric_list)))
+        work_set = 'ionosphere.echo.work'
+        try:
+            self.redis_conn.srem(work_set, str(echo_metric_list))
+            logger.info('removed work item - %s - from Redis set - %s' % (str(echo_metric_list), work_set))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to remove work item list from Redis set - %s' % work_set)
+
     # @added 20190326 - Feature #2484: FULL_DURATION feature profiles
     def process_ionosphere_echo(self, i, metric_check_file):
         """
@@ -913,7 +1172,11 @@ class Ionosphere(Thread):
         def engine_disposal(engine):
             if engine:
                 try:
-                    engine.dispose()
+                    # @modified 20261019 - Database engine registry
+                    # The engine of the process is not disposed of so that its
+                    # connection pool is reused
+                    # engine.dispose()
+                    dispose_engine(skyline_app, engine)
                 except:
                     logger.error(traceback.format_exc())
                     logger.error('error :: calling engine.dispose()')
@@ -936,6 +1199,8 @@ class Ionosphere(Thread):
 
         engine = None
         anomalous_timeseries = False
+        # @added 20261019 - Features profiles store
+        fp_store = None
 
         check_file_name = os.path.basename(str(metric_check_file))
         if settings.ENABLE_IONOSPHERE_DEBUG:
@@ -1700,6 +1965,17 @@ class Ionosphere(Thread):
                 # @added 20170309 - Feature #1960: ionosphere_layers
                 fp_layers_count = 0
 
+            # @added 20261019 - Features profiles store
+            # Load the feature values and time series of all the enabled
+            # features profiles of the metric from the local store, rather than
+            # querying the DB or memcache for each features profile
+            try:
+                fp_store = get_fp_store(engine, metrics_id, all_fp_ids)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to get the features profiles store for %s' % base_name)
+                fp_store = None
+
             # @added 20170306 - Feature #1960: ionosphere_layers
             # Corrected the interpolation of the fp_ids_db_object above where it
             # was set to the last row only, however it was not used anyway.
@@ -1814,7 +2090,45 @@ class Ionosphere(Thread):
 
         context = skyline_app
         f_calc = None
-        if not calculated_feature_file_found:
+        # @added 20261019 - In memory tsfresh feature extraction
+        # When the features are only required to compare to the features
+        # profiles, calculate them in memory from the time series, the
+        # features csv is only created for training data
+        calculated_features_vector = None
+        if not calculated_feature_file_found and not training_metric:
+            try:
+                with open(anomaly_json, 'r') as f:
+                    raw_timeseries = f.read()
+                timeseries_array_str = str(raw_timeseries).replace('(', '[').replace(')', ']')
+                del raw_timeseries
+                anomalous_timeseries = literal_eval(timeseries_array_str)
+                del timeseries_array_str
+                # @modified 20261019 - Minimal tsfresh feature extraction
+                # Only calculate the features present in the features profiles
+                # calculated_features_vector, features_count, features_sum, f_calc = calculate_features(skyline_app, base_name, anomalous_timeseries)
+                required_feature_ids = self.fp_feature_ids(engine, metrics_id, fp_ids, fp_store)
+                calculated_features_vector, features_count, features_sum, f_calc, family_times = calculate_features(skyline_app, base_name, anomalous_timeseries, required_feature_ids)
+                self.record_feature_family_times(family_times)
+                if not features_count:
+                    calculated_features_vector = None
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to calculate features in memory from %s' % anomaly_json)
+                calculated_features_vector = None
+            if calculated_features_vector is not None:
+                logger.info('calculated %s features in memory, features sum %s' % (
+                    str(features_count), str(features_sum)))
+                send_metric_name = '%s.features_calculation_time' % skyline_app_graphite_namespace
+                f_calc_time = '%.2f' % float(f_calc)
+                try:
+                    send_graphite_metric(skyline_app, send_metric_name, f_calc_time)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to send calculate features')
+
+        # @modified 20261019 - In memory tsfresh feature extraction
+        # if not calculated_feature_file_found:
+        if not calculated_feature_file_found and calculated_features_vector is None:
             try:
                 fp_csv, successful, fp_exists, fp_id, log_msg, traceback_format_exc, f_calc = calculate_features_profile(skyline_app, metric_timestamp, base_name, context)
             except:
@@ -1847,7 +2161,9 @@ class Ionosphere(Thread):
                     engine_disposal(engine)
                 return
 
-        if not calculated_feature_file_found:
+        # @modified 20261019 - In memory tsfresh feature extraction
+        # if not calculated_feature_file_found:
+        if not calculated_feature_file_found and calculated_features_vector is None:
             logger.error('error :: calculated features file not available - %s' % (calculated_feature_file))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             if engine:
@@ -1861,7 +2177,9 @@ class Ionosphere(Thread):
         if calculated_feature_file_found:
             calculated_features = get_calculated_features(calculated_feature_file)
 
-        if len(calculated_features) == 0:
+        # @modified 20261019 - In memory tsfresh feature extraction
+        # if len(calculated_features) == 0:
+        if len(calculated_features) == 0 and calculated_features_vector is None:
             logger.error('error :: no calculated features were determined from - %s' % (calculated_feature_file))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             if engine:
@@ -1887,6 +2205,8 @@ class Ionosphere(Thread):
         echo_calculated_feature_file = False
         echo_calculated_feature_file_found = False
         echo_calculated_features = []
+        # @added 20261019 - In memory tsfresh feature extraction
+        echo_calculated_features_vector = None
         echo_fp_ids = []
         echo_anomalous_timeseries = None
         if added_by == 'mirage':
@@ -1989,7 +2309,32 @@ class Ionosphere(Thread):
                     if os.path.isfile(echo_calculated_feature_file):
                         logger.info('echo calculated features available - %s' % (echo_calculated_feature_file))
                         echo_calculated_feature_file_found = True
-                    else:
+                    # @added 20261019 - In memory tsfresh feature extraction
+                    # Calculate the echo features in memory from the Redis
+                    # FULL_DURATION time series
+                    elif redis_anomaly_json and os.path.isfile(redis_anomaly_json):
+                        try:
+                            with open(redis_anomaly_json, 'r') as f:
+                                raw_timeseries = f.read()
+                            timeseries_array_str = str(raw_timeseries).replace('(', '[').replace(')', ']')
+                            del raw_timeseries
+                            echo_anomalous_timeseries = literal_eval(timeseries_array_str)
+                            del timeseries_array_str
+                            # @modified 20261019 - Minimal tsfresh feature extraction
+                            # echo_calculated_features_vector, echo_features_count, echo_features_sum, f_calc = calculate_features(skyline_app, base_name, echo_anomalous_timeseries)
+                            echo_required_feature_ids = self.fp_feature_ids(engine, metrics_id, echo_fp_ids, fp_store)
+                            echo_calculated_features_vector, echo_features_count, echo_features_sum, f_calc, echo_family_times = calculate_features(skyline_app, base_name, echo_anomalous_timeseries, echo_required_feature_ids)
+                            self.record_feature_family_times(echo_family_times)
+                            if not echo_features_count:
+                                echo_calculated_features_vector = None
+                            else:
+                                logger.info('calculated %s echo features in memory, features sum %s' % (
+                                    str(echo_features_count), str(echo_features_sum)))
+                        except:
+                            logger.error(traceback.format_exc())
+                            logger.error('error :: failed to calculate echo features in memory from %s' % redis_anomaly_json)
+                            echo_calculated_features_vector = None
+                    if not echo_calculated_feature_file_found and echo_calculated_features_vector is None:
                         use_context = 'ionosphere_echo_check'
                         f_calc = None
                         try:
@@ -2015,7 +2360,9 @@ class Ionosphere(Thread):
 
         # Compare calculated features to feature values for each fp id
         not_anomalous = False
-        if calculated_feature_file_found:
+        # @modified 20261019 - In memory tsfresh feature extraction
+        # if calculated_feature_file_found:
+        if calculated_feature_file_found or calculated_features_vector is not None:
             for fp_id in fp_ids:
                 if not metrics_id:
                     logger.error('error :: metric id not known')
@@ -2043,7 +2390,9 @@ class Ionosphere(Thread):
                         if fp_id == echo_fp_id:
                             check_type = 'ionosphere_echo_check'
                 if check_type == 'ionosphere_echo_check':
-                    if not echo_calculated_features:
+                    # @modified 20261019 - In memory tsfresh feature extraction
+                    # if not echo_calculated_features:
+                    if not echo_calculated_features and echo_calculated_features_vector is None:
                         continue
 
                 # @added 2018075 - Task #2446: Optimize Ionosphere
@@ -2087,7 +2436,24 @@ class Ionosphere(Thread):
                 # First check to determine if the fp_id has data in memcache
                 # before querying the database
                 fp_id_feature_values = None
-                if settings.MEMCACHE_ENABLED:
+
+                # @added 20261019 - Features profiles store
+                fp_features_vector = None
+                try:
+                    fp_features_vector = fp_store_features(fp_store, fp_id)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to get the features of fp_id %s from the features profiles store' % str(fp_id))
+                    fp_features_vector = None
+                if fp_features_vector is not None:
+                    fp_feature_ids_present = np.flatnonzero(~np.isnan(fp_features_vector))
+                    fp_features = [[int(feature_id), float(fp_features_vector[feature_id])] for feature_id in fp_feature_ids_present]
+                    features_count = len(fp_features)
+                    logger.info('determined %s features for fp_id %s from the features profiles store' % (str(features_count), str(fp_id)))
+
+                # @modified 20261019 - Features profiles store
+                # if settings.MEMCACHE_ENABLED:
+                if settings.MEMCACHE_ENABLED and not fp_features:
                     fp_id_feature_values_key = 'fp.id.%s.feature.values' % str(fp_id)
                     try:
                         # @modified 20191029 - Task #3304: py3 - handle pymemcache bytes not str
@@ -2140,7 +2506,9 @@ class Ionosphere(Thread):
                             logger.error('error :: failed to set %s in memcache' % fp_id_feature_values_key)
 
                 # @added 20170809 - Task #2132: Optimise Ionosphere DB usage
-                if settings.MEMCACHE_ENABLED:
+                # @modified 20261019 - Features profiles store
+                # if settings.MEMCACHE_ENABLED:
+                if settings.MEMCACHE_ENABLED and fp_features_vector is None:
                     try:
                         self.memcache_client.close()
                     except:
@@ -2154,39 +2522,60 @@ class Ionosphere(Thread):
                 all_calc_features_sum_list = []
 
                 # @added 20190327 - Feature #2484: FULL_DURATION feature profiles
+                # @added 20261019 - In memory tsfresh feature extraction
+                use_features_vector = None
                 if check_type == 'ionosphere':
                     use_calculated_features = calculated_features
+                    use_features_vector = calculated_features_vector
                 if check_type == 'ionosphere_echo_check':
                     use_calculated_features = echo_calculated_features
-
-                # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
-                # Bifurcate for ionosphere_echo_check
-                # for feature_name, calc_value in calculated_features:
-                for feature_name, calc_value in use_calculated_features:
-                    all_calc_features_sum_list.append(float(calc_value))
-                all_calc_features_sum = sum(all_calc_features_sum_list)
-
-                # Convert feature names in calculated_features to their id
-                logger.info('converting tsfresh feature names to Skyline feature ids')
-                calc_features_by_id = []
-                # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
-                # Bifurcate for ionosphere_echo_check
-                # for feature_name, calc_value in calculated_features:
-                for feature_name, calc_value in use_calculated_features:
-                    for skyline_feature_id, name in TSFRESH_FEATURES:
-                        if feature_name == name:
-                            calc_features_by_id.append([skyline_feature_id, float(calc_value)])
+                    use_features_vector = echo_calculated_features_vector
+
+                # @added 20261019 - In memory tsfresh feature extraction
+                # The features calculated in memory are already keyed by the
+                # Skyline feature id
+                if use_features_vector is not None:
+                    calculated_feature_ids = np.flatnonzero(~np.isnan(use_features_vector))
+                    all_calc_features_sum = float(np.sum(use_features_vector[calculated_feature_ids]))
+                    calc_features_by_id = [[int(feature_id), float(use_features_vector[feature_id])] for feature_id in calculated_feature_ids]
+                else:
+                    # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
+                    # Bifurcate for ionosphere_echo_check
+                    # for feature_name, calc_value in calculated_features:
+                    for feature_name, calc_value in use_calculated_features:
+                        all_calc_features_sum_list.append(float(calc_value))
+                    all_calc_features_sum = sum(all_calc_features_sum_list)
+
+                    # Convert feature names in calculated_features to their id
+                    logger.info('converting tsfresh feature names to Skyline feature ids')
+                    calc_features_by_id = []
+                    # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
+                    # Bifurcate for ionosphere_echo_check
+                    # for feature_name, calc_value in calculated_features:
+                    for feature_name, calc_value in use_calculated_features:
+                        for skyline_feature_id, name in TSFRESH_FEATURES:
+                            if feature_name == name:
+                                calc_features_by_id.append([skyline_feature_id, float(calc_value)])
 
                 # Determine what features each data has, extract only values for
                 # common features.
                 logger.info('determining common features')
                 relevant_fp_feature_values = []
                 relevant_calc_feature_values = []
-                for skyline_feature_id, calc_value in calc_features_by_id:
-                    for fp_feature_id, fp_value in fp_features:
-                        if skyline_feature_id == fp_feature_id:
-                            relevant_fp_feature_values.append(fp_value)
-                            relevant_calc_feature_values.append(calc_value)
+                # @modified 20261019 - Features profiles store
+                # When both the calculated features and the features profile
+                # features are vectors indexed by feature id, the common
+                # features are where both are not NaN
+                if use_features_vector is not None and fp_features_vector is not None:
+                    common_feature_ids = np.flatnonzero(~np.isnan(use_features_vector) & ~np.isnan(fp_features_vector))
+                    relevant_fp_feature_values = [float(fp_features_vector[feature_id]) for feature_id in common_feature_ids]
+                    relevant_calc_feature_values = [float(use_features_vector[feature_id]) for feature_id in common_feature_ids]
+                else:
+                    for skyline_feature_id, calc_value in calc_features_by_id:
+                        for fp_feature_id, fp_value in fp_features:
+                            if skyline_feature_id == fp_feature_id:
+                                relevant_fp_feature_values.append(fp_value)
+                                relevant_calc_feature_values.append(calc_value)
 
                 # Determine the sum of each set
                 relevant_fp_feature_values_count = len(relevant_fp_feature_values)
@@ -2339,7 +2728,21 @@ class Ionosphere(Thread):
                     # has data in memcache before querying the database
                     metric_fp_ts_table = 'z_ts_%s' % str(metrics_id)
                     fp_id_metric_ts = []
-                    if settings.MEMCACHE_ENABLED:
+                    # @added 20261019 - Features profiles store
+                    store_min_fp_value = None
+                    store_max_fp_value = None
+                    try:
+                        store_fp_id_metric_ts, store_min_fp_value, store_max_fp_value = fp_store_timeseries(fp_store, fp_id)
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: failed to get the time series of fp_id %s from the features profiles store' % str(fp_id))
+                        store_fp_id_metric_ts = None
+                    if store_fp_id_metric_ts:
+                        fp_id_metric_ts = store_fp_id_metric_ts
+                        logger.info('used the features profiles store to populate fp_id_metric_ts with %s data points' % str(len(fp_id_metric_ts)))
+                    # @modified 20261019 - Features profiles store
+                    # if settings.MEMCACHE_ENABLED:
+                    if settings.MEMCACHE_ENABLED and not fp_id_metric_ts:
                         # @added 20200421 - Task #3304: py3 - handle pymemcache bytes not str
                         # Explicitly set the fp_id_metric_ts_object so it
                         # always exists to be evaluated
@@ -2492,13 +2895,19 @@ class Ionosphere(Thread):
                     lower_range_similar = False
                     upper_range_similar = False
                     if check_range:
-                        try:
-                            minmax_fp_values = [x[1] for x in fp_id_metric_ts]
-                            min_fp_value = min(minmax_fp_values)
-                            max_fp_value = max(minmax_fp_values)
-                        except:
-                            min_fp_value = False
-                            max_fp_value = False
+                        # @modified 20261019 - Features profiles store
+                        # The store has the min and max of the fp time series
+                        if store_fp_id_metric_ts and store_min_fp_value is not None and not np.isnan(store_min_fp_value):
+                            min_fp_value = store_min_fp_value
+                            max_fp_value = store_max_fp_value
+                        else:
+                            try:
+                                minmax_fp_values = [x[1] for x in fp_id_metric_ts]
+                                min_fp_value = min(minmax_fp_values)
+                                max_fp_value = max(minmax_fp_values)
+                            except:
+                                min_fp_value = False
+                                max_fp_value = False
                         try:
                             minmax_anomalous_values = [x2[1] for x2 in use_anomalous_timeseries]
                             min_anomalous_value = min(minmax_anomalous_values)
@@ -3139,60 +3548,95 @@ class Ionosphere(Thread):
                     logger.error('error :: full duration ts json for layers was not found - %s' % (full_duration_json_file))
 
                 matched_layers_id = None
-                for layers_id in fp_layers_ids:
-                    if not_anomalous:
-                        logger.info('checking layers_id %s - %s layers profiles of %s possible layers' % (
-                            str(layers_id), str(layers_checked_count), str(fp_layers_count)))
-                    if not_anomalous:
-                        logger.info('skipping checking layers_id %s - %s layers profiles of %s possible layers as layer id %s already matched' % (
-                            str(layers_id), str(layers_checked_count), str(fp_layers_count), str(matched_layers_id)))
-                        continue
-                    if int(layers_id) != 0:
-
-                        # @added 2018075 - Task #2446: Optimize Ionosphere
-                        #                  Branch #2270: luminosity
-                        # @modified 20181014 - Feature #2430: Ionosphere validate learnt features profiles page
-                        # layers_checked += 1
-                        layers_checked_count += 1
-
-                        # @added 20190522 - Task #3034: Reduce multiprocessing Manager list usage
-                        # Added to Redis set here and commented out the
-                        # self.layers_checked.append in the try below this
-                        redis_set = 'ionosphere.layers_checked'
-                        data = layers_id
-                        try:
-                            self.redis_conn.sadd(redis_set, data)
-                        except:
-                            logger.info(traceback.format_exc())
-                            logger.error('error :: failed to add %s to Redis set %s' % (
-                                str(data), str(redis_set)))
-
-                        # Get the layers algorithms and run then on the timeseries
-                        # @modified 20170307 - Feature #1960: ionosphere_layers
-                        # Use except on everything, remember how fast Skyline can iterate
-                        try:
-                            # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
-                            # Added to the ionosphere.layers_checked Redis set
-                            # above
-                            # self.layers_checked.append(layers_id)
-
-                            # @added 2018075 - Task #2446: Optimize Ionosphere
-                            #                  Branch #2270: luminosity
-                            # not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries)
-                            # @modified 20181013 - Feature #2430: Ionosphere validate learnt features profiles page
-                            # not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries, fp_layers_count, layers_checked)
-                            not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries, fp_layers_count, layers_checked_count)
-                            if not_anomalous:
-                                matched_layers_id = layers_id
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: run_layer_algorithms failed for layers_id - %s' % (str(layers_id)))
-                        if not_anomalous:
-                            logger.info('not_anomalous :: layers_id %s was matched after checking %s layers profiles of %s possible layers' % (
-                                str(layers_id), str(layers_checked_count), str(fp_layers_count)))
-                        else:
-                            logger.info('still anomalous :: layers_id %s was NOT matched after checking %s layers profiles of %s possible layers' % (
-                                str(layers_id), str(layers_checked_count), str(fp_layers_count)))
+                # @modified 20261019 - Cached compiled layers definitions
+                # Evaluate all the layers of the metric in one pass with the
+                # cached compiled layers definitions, rather than getting an
+                # engine and querying the layers algorithms for each layer
+                # matched_layers_id = None
+                # for layers_id in fp_layers_ids:
+                #     if not_anomalous:
+                #         logger.info('checking layers_id %s - %s layers profiles of %s possible layers' % (
+                #             str(layers_id), str(layers_checked_count), str(fp_layers_count)))
+                #     if not_anomalous:
+                #         logger.info('skipping checking layers_id %s - %s layers profiles of %s possible layers as layer id %s already matched' % (
+                #             str(layers_id), str(layers_checked_count), str(fp_layers_count), str(matched_layers_id)))
+                #         continue
+                #     if int(layers_id) != 0:
+
+                #         # @added 2018075 - Task #2446: Optimize Ionosphere
+                #         #                  Branch #2270: luminosity
+                #         # @modified 20181014 - Feature #2430: Ionosphere validate learnt features profiles page
+                #         # layers_checked += 1
+                #         layers_checked_count += 1
+
+                #         # @added 20190522 - Task #3034: Reduce multiprocessing Manager list usage
+                #         # Added to Redis set here and commented out the
+                #         # self.layers_checked.append in the try below this
+                #         redis_set = 'ionosphere.layers_checked'
+                #         data = layers_id
+                #         try:
+                #             self.redis_conn.sadd(redis_set, data)
+                #         except:
+                #             logger.info(traceback.format_exc())
+                #             logger.error('error :: failed to add %s to Redis set %s' % (
+                #                 str(data), str(redis_set)))
+
+                #         # Get the layers algorithms and run then on the timeseries
+                #         # @modified 20170307 - Feature #1960: ionosphere_layers
+                #         # Use except on everything, remember how fast Skyline can iterate
+                #         try:
+                #             # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
+                #             # Added to the ionosphere.layers_checked Redis set
+                #             # above
+                #             # self.layers_checked.append(layers_id)
+
+                #             # @added 2018075 - Task #2446: Optimize Ionosphere
+                #             #                  Branch #2270: luminosity
+                #             # not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries)
+                #             # @modified 20181013 - Feature #2430: Ionosphere validate learnt features profiles page
+                #             # not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries, fp_layers_count, layers_checked)
+                #             not_anomalous = run_layer_algorithms(base_name, layers_id, anomalous_timeseries, fp_layers_count, layers_checked_count)
+                #             if not_anomalous:
+                #                 matched_layers_id = layers_id
+                #         except:
+                #             logger.error(traceback.format_exc())
+                #             logger.error('error :: run_layer_algorithms failed for layers_id - %s' % (str(layers_id)))
+                #         if not_anomalous:
+                #             logger.info('not_anomalous :: layers_id %s was matched after checking %s layers profiles of %s possible layers' % (
+                #                 str(layers_id), str(layers_checked_count), str(fp_layers_count)))
+                #         else:
+                #             logger.info('still anomalous :: layers_id %s was NOT matched after checking %s layers profiles of %s possible layers' % (
+                #                 str(layers_id), str(layers_checked_count), str(fp_layers_count)))
+                if not engine:
+                    try:
+                        engine, log_msg, trace = get_an_engine()
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: could not get a MySQL engine for the layers check')
+                checked_layers_ids = []
+                try:
+                    matched_layers_id, checked_layers_ids = run_metric_layers(
+                        base_name, metrics_id, fp_layers_ids, anomalous_timeseries,
+                        engine, self.redis_conn_decoded)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: run_metric_layers failed for %s' % base_name)
+                    matched_layers_id = None
+                layers_checked_count += len(checked_layers_ids)
+                if checked_layers_ids:
+                    try:
+                        self.redis_conn.sadd('ionosphere.layers_checked', *checked_layers_ids)
+                    except:
+                        logger.info(traceback.format_exc())
+                        logger.error('error :: failed to add %s to Redis set ionosphere.layers_checked' % (
+                            str(checked_layers_ids)))
+                if matched_layers_id:
+                    not_anomalous = True
+                    logger.info('not_anomalous :: layers_id %s was matched after checking %s layers profiles of %s possible layers' % (
+                        str(matched_layers_id), str(layers_checked_count), str(fp_layers_count)))
+                else:
+                    logger.info('still anomalous :: no layers were matched after checking %s layers profiles of %s possible layers' % (
+                        str(layers_checked_count), str(fp_layers_count)))
                 if not not_anomalous:
                     logger.info('anomalous - no features profiles layers were matched - %s' % base_name)
 
@@ -3585,139 +4029,12 @@ class Ionosphere(Thread):
                         echo_work_queue_items = len(ionosphere_echo_work)
                         if echo_work_queue_items > 0:
                             echo_job = True
-                            logger.info('processing a ionosphere.echo.work item')
-                if echo_job:
-                    for index, ionosphere_echo_work in enumerate(ionosphere_echo_work):
-                        try:
-                            echo_metric_list = literal_eval(ionosphere_echo_work)
-                            echo_metric_timestamp = int(echo_metric_list[2])
-                            echo_base_name = str(echo_metric_list[3])
-                            echo_full_duration = int(echo_metric_list[6])
-                            break
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: could not determine details from ionosphere_echo_work item')
-                            continue
-                    if not echo_base_name:
-                        echo_job = False
-                if echo_job:
-                    # When an item is in the ionosphere.echo.work set it needs
-                    # metric_echo_check_file created to pass to process_ionosphere_echo
-                    echo_metric_check_file = '%s/%s.%s.echo.txt' % (
-                        settings.SKYLINE_TMP_DIR, str(echo_metric_timestamp),
-                        echo_base_name)
-                    echo_create_fp_metric_key = 'ionosphere.%s.%s.echo_create_check' % (
-                        str(echo_metric_timestamp), echo_base_name)
-                    echo_create_fp_metric_count = 1
-                    try:
-                        echo_create_fp_metric_count = self.redis_conn.get(echo_create_fp_metric_key)
-                    except Exception as e:
-                        logger.error('error :: could not query Redis for ionosphere.manage_ionosphere_unique_metrics: %s' % e)
-                    if not echo_create_fp_metric_count:
-                        echo_create_fp_metric_count = 1
-                    else:
-                        echo_create_fp_metric_count += 1
-                    if os.path.isfile(str(echo_metric_check_file)):
-                        logger.error('error :: echo_metric_check_file - %s already exists, removing' % (
-                            echo_metric_check_file))
-                        self.remove_metric_check_file(echo_metric_check_file)
-                    if echo_create_fp_metric_count >= 3:
-                        logger.error('error :: echo_create_fp_metric_count is %s, no further attempts will be made to create an echo fp for %s' % (
-                            str(echo_create_fp_metric_count), str(echo_metric_list)))
-                        logger.info('removing ionosphere.echo.work item %s' % (
-                            str(echo_metric_list)))
-                        work_set = 'ionosphere.echo.work'
-                        try:
-                            self.redis_conn.srem(work_set, str(echo_metric_list))
-                            logger.info('removed work item - %s - from Redis set - %s' % (str(echo_metric_list), work_set))
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: failed to remove work item list from Redis set - %s' % work_set)
-                        echo_job = False
-                if echo_job:
-                    check_data = 'metric = \'%s\'\n' \
-                                 'metric_timestamp = \'%s\'\n' \
-                                 'added_by = \'%s\'\n' \
-                                 'full_duration = \'%s\'\n' \
-                        % (str(echo_base_name), str(echo_metric_timestamp),
-                            'webapp', str(echo_full_duration))
-                    echo_metric_check_file_created = False
-                    try:
-                        write_data_to_file(skyline_app, echo_metric_check_file, 'w', check_data)
-                        logger.info('added ionosphere.echo.work item check file for process_ionosphere_echo - %s' % (
-                            echo_metric_check_file))
-                        echo_metric_check_file_created = True
-                    except:
-                        logger.info(traceback.format_exc())
-                        logger.error('error :: failed to add ionosphere.echo.work item check file for process_ionosphere_echo - %s' % (
-                            echo_metric_check_file))
-                    if echo_metric_check_file_created:
-                        # Set a Redis key so that if the echo fp creation fails
-                        # a continous loop to try to create it does not occur
-                        try:
-                            self.redis_conn.setex(echo_create_fp_metric_key, 3600, echo_create_fp_metric_count)
-                            logger.info('updated Redis key for %s up' % skyline_app)
-                        except:
-                            logger.error('error :: failed to update Redis key for %s up' % skyline_app)
-                        # Spawn a single process_ionosphere_echo process
-                        function_name = 'process_ionosphere_echo'
-                        pids = []
-                        spawned_pids = []
-                        pid_count = 0
-                        now = time()
-                        for i in range(1, IONOSPHERE_PROCESSES + 1):
-                            try:
-                                p = Process(target=self.process_ionosphere_echo, args=(i, echo_metric_check_file))
-                                pids.append(p)
-                                pid_count += 1
-                                logger.info(
-                                    'starting %s of %s %s for ionosphere.echo.work item' % (
-                                        str(pid_count), str(IONOSPHERE_PROCESSES),
-                                        function_name))
-                                p.start()
-                                spawned_pids.append(p.pid)
-                            except:
-                                logger.error(traceback.format_exc())
-                                logger.error('error :: failed to start %s for ionosphere.echo.work item' % function_name)
-                                continue
-                        # Self monitor the process and terminate if the
-                        # process_ionosphere_echo has run for too long
-                        try:
-                            ionosphere_echo_max_fp_create_time = settings.IONOSPHERE_ECHO_MAX_FP_CREATE_TIME
-                        except:
-                            ionosphere_echo_max_fp_create_time = 55
-                        p_starts = time()
-                        while time() - p_starts <= ionosphere_echo_max_fp_create_time:
-                            if any(p.is_alive() for p in pids):
-                                # Just to avoid hogging the CPU
-                                sleep(.1)
-                            else:
-                                # All the processes are done, break now.
-                                time_to_run = time() - p_starts
-                                logger.info(
-                                    '%s %s completed in %.2f seconds for ionosphere.echo.work item' % (
-                                        str(IONOSPHERE_PROCESSES),
-                                        function_name, time_to_run))
-                                work_set = 'ionosphere.echo.work'
-                                try:
-                                    self.redis_conn.srem(work_set, str(echo_metric_list))
-                                    logger.info('removed work item - %s - from Redis set - %s' % (str(echo_metric_list), work_set))
-                                except:
-                                    logger.error(traceback.format_exc())
-                                    logger.error('error :: failed to remove work item list from Redis set - %s' % work_set)
-                                self.remove_metric_check_file(echo_metric_check_file)
-                                break
-                        else:
-                            # We only enter this if we didn't 'break' above.
-                            logger.info('timed out, killing all %s processes for ionosphere.echo.work item' % (function_name))
-                            for p in pids:
-                                try:
-                                    p.terminate()
-                                    # p.join()
-                                    logger.info('killed %s process for ionosphere.echo.work item' % (function_name))
-                                except:
-                                    logger.error(traceback.format_exc())
-                                    logger.error('error :: killing all %s processes for ionosphere.echo.work item' % function_name)
+                            # @modified 20261019 - Ionosphere work queue
+                            # The ionosphere.echo.work items are no longer
+                            # processed inline here, they are added to the work
+                            # queue and scheduled after the real time checks
+                            # logger.info('processing a ionosphere.echo.work item')
+                            logger.info('%s ionosphere.echo.work items to queue' % str(echo_work_queue_items))
 
                 if not metric_var_files:
                     logger.info('sleeping 20 no metric check files')
@@ -3885,6 +4202,56 @@ class Ionosphere(Thread):
                         send_metric_name = '%s.sent_to_panorama' % skyline_app_graphite_namespace
                         send_graphite_metric(skyline_app, send_metric_name, sent_to_panorama)
 
+                    # @added 20261019 - Minimal tsfresh feature extraction
+                    # Send the average time taken by each tsfresh feature
+                    # calculator
+                    try:
+                        family_times = self.redis_conn_decoded.hgetall('ionosphere.features_extraction.family_times')
+                        family_counts = self.redis_conn_decoded.hgetall('ionosphere.features_extraction.family_counts')
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: failed to get the feature calculator times from Redis')
+                        family_times = {}
+                        family_counts = {}
+                    for family in family_times:
+                        try:
+                            family_count = int(family_counts.get(family, 1)) or 1
+                            family_time = '%.6f' % (float(family_times[family]) / family_count)
+                            send_metric_name = '%s.features_extraction_time.%s' % (skyline_app_graphite_namespace, family)
+                            send_graphite_metric(skyline_app, send_metric_name, family_time)
+                        except:
+                            logger.error(traceback.format_exc())
+                            logger.error('error :: failed to send the %s feature calculator time' % str(family))
+
+                    # @added 20261019 - Ionosphere work queue
+                    # Send the average queue latency and the number of missed
+                    # deadlines of each work type
+                    try:
+                        work_queue_latency = self.redis_conn_decoded.hgetall('ionosphere.work_queue.latency')
+                        work_queue_latency_counts = self.redis_conn_decoded.hgetall('ionosphere.work_queue.latency_counts')
+                        work_queue_deadlines_missed = self.redis_conn_decoded.hgetall('ionosphere.work_queue.deadlines_missed')
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: failed to get the work queue latency from Redis')
+                        work_queue_latency = {}
+                        work_queue_latency_counts = {}
+                        work_queue_deadlines_missed = {}
+                    for work_type in ['realtime', 'echo', 'learn']:
+                        try:
+                            latency_count = int(work_queue_latency_counts.get(work_type, 0))
+                            queue_latency = '0'
+                            if latency_count:
+                                queue_latency = '%.3f' % (float(work_queue_latency.get(work_type, 0)) / latency_count)
+                            logger.info('queue_latency.%s :: %s' % (work_type, queue_latency))
+                            send_metric_name = '%s.queue_latency.%s' % (skyline_app_graphite_namespace, work_type)
+                            send_graphite_metric(skyline_app, send_metric_name, queue_latency)
+                            deadlines_missed = str(int(work_queue_deadlines_missed.get(work_type, 0)))
+                            send_metric_name = '%s.deadlines_missed.%s' % (skyline_app_graphite_namespace, work_type)
+                            send_graphite_metric(skyline_app, send_metric_name, deadlines_missed)
+                        except:
+                            logger.error(traceback.format_exc())
+                            logger.error('error :: failed to send the %s work queue latency' % work_type)
+
                     sent_graphite_metrics_now = int(time())
                     try:
                         self.redis_conn.setex(cache_key, 59, sent_graphite_metrics_now)
@@ -3915,6 +4282,13 @@ class Ionosphere(Thread):
                         'ionosphere.training_metrics',
                         'ionosphere.sent_to_panorama',
                         'ionosphere.layers_checked',
+                        # @added 20261019 - Minimal tsfresh feature extraction
+                        'ionosphere.features_extraction.family_times',
+                        'ionosphere.features_extraction.family_counts',
+                        # @added 20261019 - Ionosphere work queue
+                        'ionosphere.work_queue.latency',
+                        'ionosphere.work_queue.latency_counts',
+                        'ionosphere.work_queue.deadlines_missed',
                     ]
                     for i_redis_set in delete_redis_sets:
                         redis_set_to_delete = i_redis_set
@@ -4090,6 +4464,50 @@ class Ionosphere(Thread):
                             learn_job = True
                 if learn_job:
                     break
+                # @added 20261019 - Ionosphere work queue
+                if echo_job:
+                    break
+
+            # @added 20261019 - Ionosphere work queue
+            # Put the real time checks, the ionosphere.echo.work items and the
+            # ionosphere.learn.work items in the work queue and schedule the
+            # work items for the workers by priority and deadline
+            work_queue_now = time()
+            work_items = []
+            if ionosphere_job:
+                work_items = work_items + check_file_work_items(
+                    settings.IONOSPHERE_CHECK_PATH, metric_var_files, max_age_seconds)
+            ionosphere_echo_work = []
+            if ionosphere_echo_enabled:
+                try:
+                    ionosphere_echo_work = list(self.redis_conn_decoded.smembers('ionosphere.echo.work'))
+                except Exception as e:
+                    logger.error('error :: could not query Redis for ionosphere.echo.work - %s' % e)
+                    ionosphere_echo_work = []
+            learn_work = []
+            if settings.IONOSPHERE_LEARN:
+                try:
+                    learn_work = list(self.redis_conn_decoded.smembers('ionosphere.learn.work'))
+                except Exception as e:
+                    logger.error('error :: could not query Redis for ionosphere.learn.work - %s' % e)
+                    learn_work = []
+            work_queue_first_seen = self.work_queue_first_seen(
+                (ionosphere_echo_work + learn_work), work_queue_now)
+            work_items = work_items + echo_work_items(
+                ionosphere_echo_work, work_queue_first_seen, work_queue_now)
+            work_items = work_items + learn_work_items(
+                learn_work, work_queue_first_seen, work_queue_now)
+            scheduled_work_items = schedule_work_items(
+                work_items, IONOSPHERE_WORK_QUEUE_WORKERS, work_queue_now)
+            scheduled_work_types = [work_item['work_type'] for work_item in scheduled_work_items]
+            if 'realtime' not in scheduled_work_types:
+                ionosphere_job = False
+            learn_job = False
+            if 'learn' in scheduled_work_types:
+                learn_job = True
+            logger.info('work queue :: %s work items queued, %s scheduled for %s workers - %s' % (
+                str(len(work_items)), str(len(scheduled_work_items)),
+                str(IONOSPHERE_WORK_QUEUE_WORKERS), str(scheduled_work_types)))
 
             # @added 20190404 - Bug #2904: Initial Ionosphere echo load and Ionosphere feedback
             #                   Feature #2484: FULL_DURATION feature profiles
@@ -4102,8 +4520,14 @@ class Ionosphere(Thread):
             ionosphere_busy = False
 
             if ionosphere_job:
-                metric_var_files_sorted = sorted(metric_var_files)
-                metric_check_file = '%s/%s' % (settings.IONOSPHERE_CHECK_PATH, str(metric_var_files_sorted[0]))
+                # @modified 20261019 - Ionosphere work queue
+                # The metric_check_file is the first scheduled real time check
+                # metric_var_files_sorted = sorted(metric_var_files)
+                # metric_check_file = '%s/%s' % (settings.IONOSPHERE_CHECK_PATH, str(metric_var_files_sorted[0]))
+                for work_item in scheduled_work_items:
+                    if work_item['work_type'] == 'realtime':
+                        metric_check_file = work_item['work']
+                        break
                 # @added 20190403 - Bug #2904: Initial Ionosphere echo load and Ionosphere feedback
                 #                   Feature #2484: FULL_DURATION feature profiles
                 # Added a count of the number of checks to be done
@@ -4351,7 +4775,9 @@ class Ionosphere(Thread):
                                 logger.error(traceback.format_exc())
                                 logger.error('error :: killing all %s processes' % function_name)
 
-                logger.info('processing - %s' % str(metric_var_files_sorted[0]))
+                # @modified 20261019 - Ionosphere work queue
+                # logger.info('processing - %s' % str(metric_var_files_sorted[0]))
+                logger.info('processing - %s' % os.path.basename(str(metric_check_file)))
                 function_name = 'spin_process'
 
             # @added 20170109 - Feature #1854: Ionosphere learn
@@ -4365,19 +4791,43 @@ class Ionosphere(Thread):
             # use_full_duration_days features profile valid_learning_duration (e.g.
             # 3361) later.
             if learn_job:
-                logger.info('processing - learn work queue - %s' % str(work_queue_items))
+                # @modified 20261019 - Ionosphere work queue
+                # logger.info('processing - learn work queue - %s' % str(work_queue_items))
+                logger.info('processing - learn work queue - %s' % str(len(learn_work)))
                 function_name = 'spawn_learn_process'
 
+            # @modified 20180621 - Feature #2404: Ionosphere - fluid approximation
+            # Increase run time to 55 seconds to allow for Min-Max scaling
+            # while time() - p_starts <= 20:
+            # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
+            # Added ionosphere_echo which takes more time
+            # while time() - p_starts <= 55:
+            try:
+                ionosphere_max_runtime = settings.IONOSPHERE_MAX_RUNTIME
+            except:
+                ionosphere_max_runtime = 120
+            # @added 20261019 - Ionosphere work queue
+            try:
+                ionosphere_echo_max_fp_create_time = settings.IONOSPHERE_ECHO_MAX_FP_CREATE_TIME
+            except:
+                ionosphere_echo_max_fp_create_time = 55
+
             # Spawn processes
+            # @modified 20261019 - Ionosphere work queue
+            # Spawn a process for each scheduled work item rather than
+            # IONOSPHERE_PROCESSES processes for the ionosphere_job or the
+            # learn_job
+            work_processes = []
             pids = []
             spawned_pids = []
             pid_count = 0
             now = time()
-            # @modified 20180819 - Task #2526: Hard code IONOSPHERE_PROCESSES to 1
-            # for i in range(1, settings.IONOSPHERE_PROCESSES + 1):
-            for i in range(1, IONOSPHERE_PROCESSES + 1):
-                if ionosphere_job:
-                    try:
+            for i, work_item in enumerate(scheduled_work_items, 1):
+                work_type = work_item['work_type']
+                try:
+                    if work_type == 'realtime':
+                        function_name = 'spin_process'
+                        max_runtime = ionosphere_max_runtime
                         # @modified 20190404 - Bug #2904: Initial Ionosphere echo load and Ionosphere feedback
                         #                      Feature #2484: FULL_DURATION feature profiles
                         # Added ionosphere_busy if there are queued checks
@@ -4386,104 +4836,93 @@ class Ionosphere(Thread):
                         # alternates between normal Mirage features profiles
                         # comparisons and Ionosphere echo features profiles
                         # during busy times.
-                        # p = Process(target=self.spin_process, args=(i, metric_check_file))
-                        p = Process(target=self.spin_process, args=(i, metric_check_file, ionosphere_busy))
-                        pids.append(p)
-                        pid_count += 1
-                        logger.info(
-                            'starting %s of %s %s' % (
-                                str(pid_count),
-                                # @modified 20180819 - Task #2526: Hard code IONOSPHERE_PROCESSES to 1
-                                # str(settings.IONOSPHERE_PROCESSES),
-                                str(IONOSPHERE_PROCESSES),
-                                function_name))
-                        p.start()
-                        spawned_pids.append(p.pid)
-                    except:
-                        logger.error(traceback.format_exc())
-                        logger.error('error :: failed to start %s' % function_name)
-                        continue
-
-                # @added 20170113 - Feature #1854: Ionosphere learn - Redis ionosphere.learn.work namespace
-                if learn_job:
-                    try:
+                        p = Process(target=self.spin_process, args=(i, work_item['work'], ionosphere_busy))
+                    if work_type == 'echo':
+                        function_name = 'process_ionosphere_echo'
+                        max_runtime = ionosphere_echo_max_fp_create_time
+                        echo_metric_check_file = self.create_echo_work_check_file(work_item['work'])
+                        if not echo_metric_check_file:
+                            continue
+                        work_item['echo_metric_check_file'] = echo_metric_check_file
+                        p = Process(target=self.process_ionosphere_echo, args=(i, echo_metric_check_file))
+                    # @added 20170113 - Feature #1854: Ionosphere learn - Redis ionosphere.learn.work namespace
+                    if work_type == 'learn':
+                        function_name = 'spawn_learn_process'
+                        max_runtime = ionosphere_max_runtime
                         p = Process(target=self.spawn_learn_process, args=(i, int(now)))
-                        pids.append(p)
-                        pid_count += 1
-                        logger.info(
-                            'starting %s of %s %s' % (
-                                str(pid_count),
-                                # @modified 20180819 - Task #2526: Hard code IONOSPHERE_PROCESSES to 1
-                                # str(settings.IONOSPHERE_PROCESSES),
-                                str(IONOSPHERE_PROCESSES),
-                                function_name))
-                        p.start()
-                        spawned_pids.append(p.pid)
-                    except:
-                        logger.error(traceback.format_exc())
-                        logger.error('error :: failed to start %s' % function_name)
-                        continue
+                    pids.append(p)
+                    pid_count += 1
+                    logger.info(
+                        'starting %s of %s %s for %s work item' % (
+                            str(pid_count), str(len(scheduled_work_items)),
+                            function_name, work_type))
+                    p.start()
+                    spawned_pids.append(p.pid)
+                    work_processes.append([work_item, p, function_name, max_runtime])
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to start %s' % function_name)
+                    continue
+            self.record_work_queue_latency(
+                [work_process[0] for work_process in work_processes], now)
 
             # Self monitor processes and terminate if any spin_process has run
             # for to long
+            # @modified 20261019 - Ionosphere work queue
+            # Each process is terminated when it has run for longer than the
+            # max runtime of its work type, the other processes continue
             p_starts = time()
-            # @modified 20180621 - Feature #2404: Ionosphere - fluid approximation
-            # Increase run time to 55 seconds to allow for Min-Max scaling
-            # while time() - p_starts <= 20:
-            # @modified 20190327 - Feature #2484: FULL_DURATION feature profiles
-            # Added ionosphere_echo which takes more time
-            # while time() - p_starts <= 55:
-            try:
-                ionosphere_max_runtime = settings.IONOSPHERE_MAX_RUNTIME
-            except:
-                ionosphere_max_runtime = 120
-            while time() - p_starts <= ionosphere_max_runtime:
-                if any(p.is_alive() for p in pids):
-                    # Just to avoid hogging the CPU
-                    sleep(.1)
-                else:
-                    # All the processes are done, break now.
-                    time_to_run = time() - p_starts
-                    logger.info(
-                        '%s %s completed in %.2f seconds' % (
-                            # @modified 20180819 - Task #2526: Hard code IONOSPHERE_PROCESSES to 1
-                            # str(settings.IONOSPHERE_PROCESSES),
-                            str(IONOSPHERE_PROCESSES),
-                            function_name, time_to_run))
-                    break
-            else:
-                # We only enter this if we didn't 'break' above.
-                logger.info('timed out, killing all %s processes' % (function_name))
-                for p in pids:
+            running_work_processes = list(work_processes)
+            while running_work_processes:
+                for work_process in list(running_work_processes):
+                    work_item, p, function_name, max_runtime = work_process
+                    if p.is_alive() and time() - p_starts <= max_runtime:
+                        continue
+                    running_work_processes.remove(work_process)
+                    if not p.is_alive():
+                        time_to_run = time() - p_starts
+                        logger.info(
+                            '%s completed in %.2f seconds for %s work item' % (
+                                function_name, time_to_run, work_item['work_type']))
+                        if work_item['work_type'] == 'echo':
+                            self.remove_echo_work_item(work_item['work'])
+                            self.remove_metric_check_file(work_item['echo_metric_check_file'])
+                        continue
+                    logger.info('timed out, killing %s process for %s work item' % (
+                        function_name, work_item['work_type']))
                     try:
                         p.terminate()
                         # p.join()
                         logger.info('killed %s process' % (function_name))
                     except:
                         logger.error(traceback.format_exc())
-                        logger.error('error :: killing all %s processes' % function_name)
-
-                if ionosphere_job:
-                    check_file_name = os.path.basename(str(metric_check_file))
-                    if settings.ENABLE_IONOSPHERE_DEBUG:
-                        logger.info('debug :: check_file_name - %s' % check_file_name)
-                    check_file_timestamp = check_file_name.split('.', 1)[0]
-                    if settings.ENABLE_IONOSPHERE_DEBUG:
-                        logger.info('debug :: check_file_timestamp - %s' % str(check_file_timestamp))
-                    check_file_metricname_txt = check_file_name.split('.', 1)[1]
-                    if settings.ENABLE_IONOSPHERE_DEBUG:
-                        logger.info('debug :: check_file_metricname_txt - %s' % check_file_metricname_txt)
-                    check_file_metricname = check_file_metricname_txt.replace('.txt', '')
-                    if settings.ENABLE_IONOSPHERE_DEBUG:
-                        logger.info('debug :: check_file_metricname - %s' % check_file_metricname)
-                    check_file_metricname_dir = check_file_metricname.replace('.', '/')
-                    if settings.ENABLE_IONOSPHERE_DEBUG:
-                        logger.info('debug :: check_file_metricname_dir - %s' % check_file_metricname_dir)
-
-                    metric_failed_check_dir = '%s/%s/%s' % (failed_checks_dir, check_file_metricname_dir, check_file_timestamp)
-                    fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
+                        logger.error('error :: killing %s process' % function_name)
+
+                    if work_item['work_type'] == 'realtime':
+                        metric_check_file = work_item['work']
+                        check_file_name = os.path.basename(str(metric_check_file))
+                        if settings.ENABLE_IONOSPHERE_DEBUG:
+                            logger.info('debug :: check_file_name - %s' % check_file_name)
+                        check_file_timestamp = check_file_name.split('.', 1)[0]
+                        if settings.ENABLE_IONOSPHERE_DEBUG:
+                            logger.info('debug :: check_file_timestamp - %s' % str(check_file_timestamp))
+                        check_file_metricname_txt = check_file_name.split('.', 1)[1]
+                        if settings.ENABLE_IONOSPHERE_DEBUG:
+                            logger.info('debug :: check_file_metricname_txt - %s' % check_file_metricname_txt)
+                        check_file_metricname = check_file_metricname_txt.replace('.txt', '')
+                        if settings.ENABLE_IONOSPHERE_DEBUG:
+                            logger.info('debug :: check_file_metricname - %s' % check_file_metricname)
+                        check_file_metricname_dir = check_file_metricname.replace('.', '/')
+                        if settings.ENABLE_IONOSPHERE_DEBUG:
+                            logger.info('debug :: check_file_metricname_dir - %s' % check_file_metricname_dir)
+
+                        metric_failed_check_dir = '%s/%s/%s' % (failed_checks_dir, check_file_metricname_dir, check_file_timestamp)
+                        fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
+                if running_work_processes:
+                    # Just to avoid hogging the CPU
+                    sleep(.1)
 
-            for p in pids:
+            for work_item, p, function_name, max_runtime in work_processes:
                 if p.is_alive():
                     # @modified 20191031 - Bug #3296: Ionosphere spawn_learn_process hanging on docker
                     #                      Branch #3002 - docker
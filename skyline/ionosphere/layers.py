@@ -7,6 +7,8 @@ import re
 from sys import version_info
 
 import traceback
+# @added 20261019 - Cached compiled layers definitions
+import json
 
 # @modified 20191115 - Branch #3262: py3
 # import mysql.connector
@@ -24,7 +26,9 @@ import settings
 
 from database import (
     get_engine, ionosphere_layers_table_meta, layers_algorithms_table_meta,
-    ionosphere_layers_matched_table_meta)
+    ionosphere_layers_matched_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine)
 
 skyline_app = 'ionosphere'
 skyline_app_logger = '%sLog' % skyline_app
@@ -96,7 +100,11 @@ def run_layer_algorithms(base_name, layers_id, timeseries, layers_count, layers_
         try:
             if engine:
                 try:
-                    engine.dispose()
+                    # @modified 20261019 - Database engine registry
+                    # The engine of the process is not disposed of so that its
+                    # connection pool is reused
+                    # engine.dispose()
+                    dispose_engine(skyline_app, engine)
                     logger.info('layers :: MySQL engine disposed of')
                     return True
                 except:
@@ -658,3 +666,438 @@ def run_layer_algorithms(base_name, layers_id, timeseries, layers_count, layers_
         layers_engine_disposal(engine)
 
     return not_anomalous
+
+
+# @added 20261019 - Cached compiled layers definitions
+# The compiled layers definitions of a metric are cached in Redis, keyed on the
+# metric id and the layers ids of the metric's enabled features profiles, so a
+# new definitions key is created when layers are added or disabled.  Layers
+# algorithms are not changed once they are created.
+LAYERS_DEFINITIONS_CACHE_TTL = 86400
+
+# The same boundary semantics as the ops in run_layer_algorithms, where < and >
+# are evaluated as <= and >=
+LAYERS_NP_OPS = {
+    '<': np.less_equal,
+    '>': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+    '<=': np.less_equal,
+    '>=': np.greater_equal,
+}
+
+
+def approximately_close_limit(condition, boundary_limit, direction):
+    """
+    Determine the approximately_close boundary limit of a D (direction 1) or E
+    (direction -1) layer as per run_layer_algorithms.
+
+    :param condition: the layer condition
+    :param boundary_limit: the layer boundary limit
+    :param direction: 1 to add the tolerance, -1 to subtract it
+    :type condition: str
+    :type boundary_limit: float
+    :type direction: int
+    :return: (boundary_limit, approximately_close)
+    :rtype: tuple
+    """
+    if direction == 1 and condition not in ['>', '>=']:
+        return boundary_limit, False
+    if direction == -1 and condition not in ['<', '<=']:
+        return boundary_limit, False
+    percent_tolerance = False
+    if boundary_limit >= 11 and boundary_limit < 30:
+        percent_tolerance = 10
+    if boundary_limit >= 30:
+        percent_tolerance = 5
+    if not percent_tolerance:
+        return boundary_limit, False
+    try:
+        tolerance = int(math.ceil((boundary_limit / 100.0) * percent_tolerance))
+    except:
+        return boundary_limit, False
+    return boundary_limit + (direction * tolerance), True
+
+
+def compile_layers_definitions(layers_algorithms_rows):
+    """
+    Compile the layers_algorithms rows of a metric's layers into a definition
+    per layer.
+
+    :param layers_algorithms_rows: the layers_algorithms table rows as dicts
+    :type layers_algorithms_rows: list
+    :return: a dict of layers definitions keyed by layers id as a str
+    :rtype: dict
+    """
+    definitions = {}
+    for row in layers_algorithms_rows:
+        layers_id = str(int(row['layer_id']))
+        if layers_id not in definitions:
+            definitions[layers_id] = {
+                'fp_id': int(row['fp_id']), 'metric_id': int(row['metric_id']),
+                'd_condition': None, 'd_boundary_limit': None,
+                'd1_condition': None, 'd1_boundary_limit': None, 'd1_boundary_times': 0,
+                'e_condition': None, 'e_boundary_limit': None, 'e_boundary_times': 0,
+                'es_condition': None, 'es_day': None,
+                'f1_from_time': None, 'f2_until_time': None,
+            }
+        definition = definitions[layers_id]
+        layer = row['layer']
+        try:
+            if layer == 'D':
+                definition['d_condition'] = str(row['condition'])
+                definition['d_boundary_limit'] = float(row['layer_boundary'])
+            if layer == 'D1':
+                if str(row['condition']) != 'none':
+                    definition['d1_condition'] = str(row['condition'])
+                    definition['d1_boundary_limit'] = float(row['layer_boundary'])
+                    definition['d1_boundary_times'] = int(row['times_in_row'] or 0)
+            if layer == 'E':
+                definition['e_condition'] = str(row['condition'])
+                definition['e_boundary_limit'] = float(row['layer_boundary'])
+                definition['e_boundary_times'] = int(row['times_in_row'] or 0)
+            if layer == 'Es':
+                definition['es_condition'] = str(row['condition'])
+                definition['es_day'] = str(row['layer_boundary'])
+            if layer == 'F1':
+                definition['f1_from_time'] = str(row['layer_boundary'])
+            if layer == 'F2':
+                definition['f2_until_time'] = str(row['layer_boundary'])
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: layers :: failed to compile the %s layer of layers_id %s' % (
+                str(layer), layers_id))
+            definition['invalid'] = True
+    return definitions
+
+
+def get_layers_definitions(metric_id, layers_ids, engine, redis_conn):
+    """
+    Returns the compiled layers definitions of a metric's layers, from the Redis
+    cache or from the layers_algorithms table, with one query for all the
+    layers.
+
+    :param metric_id: the metric id
+    :param layers_ids: the layers ids
+    :param engine: the database engine
+    :param redis_conn: a decoded Redis connection
+    :type metric_id: int
+    :type layers_ids: list
+    :type engine: object
+    :type redis_conn: object
+    :return: a dict of layers definitions keyed by layers id as a str, or None
+    :rtype: dict
+    """
+    layers_ids_str = ','.join([str(int(layers_id)) for layers_id in sorted(layers_ids)])
+    cache_key = 'ionosphere.layers_definitions.%s.%s' % (str(metric_id), layers_ids_str)
+    definitions = None
+    if redis_conn:
+        try:
+            cached_definitions = redis_conn.get(cache_key)
+            if cached_definitions:
+                definitions = json.loads(cached_definitions)
+                logger.info('layers :: using the cached layers definitions of %s layers for metric id %s' % (
+                    str(len(definitions)), str(metric_id)))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: layers :: failed to get the cached layers definitions from %s' % cache_key)
+            definitions = None
+    if definitions:
+        return definitions
+    if not engine:
+        logger.error('error :: layers :: no engine to get the layers definitions for metric id %s' % str(metric_id))
+        return None
+    try:
+        layers_algorithms_table, log_msg, trace = layers_algorithms_table_meta(skyline_app, engine)
+        connection = engine.connect()
+        stmt = select([layers_algorithms_table]).where(
+            layers_algorithms_table.c.layer_id.in_([int(layers_id) for layers_id in layers_ids])).order_by(
+            layers_algorithms_table.c.id)
+        result = connection.execute(stmt)
+        layers_algorithms_rows = [{column: value for column, value in rowproxy.items()} for rowproxy in result]
+        connection.close()
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: layers :: failed to get the layers_algorithms for metric id %s' % str(metric_id))
+        return None
+    definitions = compile_layers_definitions(layers_algorithms_rows)
+    logger.info('layers :: compiled the layers definitions of %s layers for metric id %s' % (
+        str(len(definitions)), str(metric_id)))
+    if redis_conn and definitions:
+        try:
+            redis_conn.setex(cache_key, LAYERS_DEFINITIONS_CACHE_TTL, json.dumps(definitions))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: layers :: failed to cache the layers definitions in %s' % cache_key)
+    return definitions
+
+
+def layers_aggregated_timeseries(base_name, timeseries):
+    """
+    Aggregate the last hour of the time series if the metric matches a
+    settings.BOUNDARY_AUTOAGGRERATION_METRICS namespace, as per
+    run_layer_algorithms.
+
+    :param base_name: the metric base_name
+    :param timeseries: the time series list
+    :type base_name: str
+    :type timeseries: list
+    :return: the time series to evaluate the layers against
+    :rtype: list
+    """
+    autoaggregate_value = 0
+    if settings.BOUNDARY_AUTOAGGRERATION:
+        for autoaggregate_metric in settings.BOUNDARY_AUTOAGGRERATION_METRICS:
+            if re.compile(autoaggregate_metric[0]).match(base_name):
+                autoaggregate_value = int(autoaggregate_metric[1])
+                break
+    if not autoaggregate_value:
+        return timeseries
+    logger.info('layers :: aggregating timeseries at %s seconds' % str(autoaggregate_value))
+    timestamps = np.array([x[0] for x in timeseries], dtype=np.float64)
+    values = np.array([int(x[1]) for x in timeseries], dtype=np.int64)
+    last_timestamp = int(timestamps[-1])
+    start_timestamp = last_timestamp - 3600
+    aggregated_timeseries = []
+    next_timestamp = last_timestamp - autoaggregate_value
+    while next_timestamp > start_timestamp:
+        in_period = (timestamps <= last_timestamp) & (timestamps > next_timestamp)
+        aggregated_timeseries.append((last_timestamp, np.sum(values[in_period])))
+        last_timestamp = next_timestamp
+        next_timestamp = last_timestamp - autoaggregate_value
+    aggregated_timeseries.reverse()
+    return aggregated_timeseries
+
+
+def layers_condition_matrix(latest_values, conditions, limits, times):
+    """
+    Evaluate a condition of many layers against the latest values of the time
+    series in one pass.
+
+    :param latest_values: the values of the time series, latest first
+    :param conditions: the condition of each layer
+    :param limits: the boundary limit of each layer
+    :param times: the number of latest values each layer is evaluated against
+    :type latest_values: numpy.array
+    :type conditions: list
+    :type limits: list
+    :type times: list
+    :return: a boolean matrix of (layers, values)
+    :rtype: numpy.array
+    """
+    matrix = np.zeros((len(conditions), len(latest_values)), dtype=bool)
+    if not len(conditions):
+        return matrix
+    limits = np.array([limit if limit is not None else np.nan for limit in limits], dtype=np.float64)[:, None]
+    in_times = np.arange(len(latest_values))[None, :] < np.array(times, dtype=np.int64)[:, None]
+    conditions = np.array(conditions, dtype=object)
+    for condition, np_op in LAYERS_NP_OPS.items():
+        rows = conditions == condition
+        if rows.any():
+            matrix[rows] = np_op(latest_values[None, :], limits[rows])
+    return matrix & in_times
+
+
+def run_metric_layers(base_name, metric_id, layers_ids, timeseries, engine, redis_conn):
+    """
+    Called by :class:`~skyline.skyline.Ionosphere.spin_process` to evaluate
+    all of a metric's layers against the time series in one pass, with the
+    cached compiled layers definitions.  The layers are checked in order and
+    the first layer that matches is recorded as matched, as the layers were
+    checked with :func:`run_layer_algorithms`.
+
+    :param base_name: the metric base_name
+    :param metric_id: the metric id
+    :param layers_ids: the layers ids in the order to be checked
+    :param timeseries: the time series list
+    :param engine: the database engine
+    :param redis_conn: a decoded Redis connection
+    :type base_name: str
+    :type metric_id: int
+    :type layers_ids: list
+    :type timeseries: list
+    :type engine: object
+    :type redis_conn: object
+    :return: (matched_layers_id, checked_layers_ids) matched_layers_id is None
+        if no layer matched
+    :rtype: tuple
+    """
+    layers_ids = [int(layers_id) for layers_id in layers_ids if int(layers_id) != 0]
+    if not layers_ids:
+        return None, []
+    definitions = get_layers_definitions(metric_id, layers_ids, engine, redis_conn)
+    if not definitions:
+        return None, []
+
+    try:
+        use_timeseries = layers_aggregated_timeseries(base_name, timeseries)
+        values = np.array([float(x[1]) for x in use_timeseries], dtype=np.float64)
+        last_timestamp = int(use_timeseries[-1][0])
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: layers :: invalid timeseries for the layers of %s' % base_name)
+        return None, []
+    latest_values = values[::-1]
+    last_datapoint = values[-1]
+    values_count = len(latest_values)
+
+    try:
+        use_approximately_close = settings.IONOSPHERE_LAYERS_USE_APPROXIMATELY_CLOSE
+    except:
+        use_approximately_close = False
+
+    layers = []
+    for layers_id in layers_ids:
+        definition = definitions.get(str(layers_id))
+        if not definition or definition.get('invalid'):
+            logger.error('error :: layers :: no valid layers algorithms for layers_id %s - %s' % (str(layers_id), base_name))
+            continue
+        if definition['d_condition'] not in LAYERS_NP_OPS or definition['e_condition'] not in LAYERS_NP_OPS:
+            logger.error('error :: layers :: invalid D or E layer condition for layers_id %s - %s' % (str(layers_id), base_name))
+            continue
+        if definition['d1_condition'] and definition['d1_condition'] not in LAYERS_NP_OPS:
+            logger.error('error :: layers :: invalid D1 layer condition for layers_id %s - %s' % (str(layers_id), base_name))
+            continue
+        d_boundary_limit = definition['d_boundary_limit']
+        e_boundary_limit = definition['e_boundary_limit']
+        d_approximately_close = False
+        e_approximately_close = False
+        if use_approximately_close:
+            d_boundary_limit, d_approximately_close = approximately_close_limit(
+                definition['d_condition'], d_boundary_limit, 1)
+            e_boundary_limit, e_approximately_close = approximately_close_limit(
+                definition['e_condition'], e_boundary_limit, -1)
+        layers.append(dict(
+            definition, layers_id=layers_id,
+            use_d_boundary_limit=d_boundary_limit,
+            use_e_boundary_limit=e_boundary_limit,
+            d_approximately_close=d_approximately_close,
+            e_approximately_close=e_approximately_close))
+    if not layers:
+        return None, []
+
+    # D layer - the last value breaches the boundary
+    d_breached = layers_condition_matrix(
+        latest_values, [layer['d_condition'] for layer in layers],
+        [layer['use_d_boundary_limit'] for layer in layers], [1] * len(layers))[:, 0]
+    # D1 layer - any of the last times_in_row values breach the boundary, a D1
+    # layer with more times_in_row than values cannot be evaluated
+    d1_layers = np.array([bool(layer['d1_condition']) for layer in layers])
+    d1_breached = layers_condition_matrix(
+        latest_values, [layer['d1_condition'] for layer in layers],
+        [layer['d1_boundary_limit'] for layer in layers],
+        [layer['d1_boundary_times'] for layer in layers]).any(axis=1)
+    d1_breached = d1_layers & (d1_breached | (np.array([layer['d1_boundary_times'] for layer in layers]) > values_count))
+    # E layer - any of the last times_in_row values match the boundary
+    e_matched_matrix = layers_condition_matrix(
+        latest_values, [layer['e_condition'] for layer in layers],
+        [layer['use_e_boundary_limit'] for layer in layers],
+        [layer['e_boundary_times'] for layer in layers])
+    e_matched = e_matched_matrix.any(axis=1)
+    layers_matched = ~d_breached & ~d1_breached & e_matched
+
+    matched_layer = None
+    checked_layers_ids = []
+    for index, layer in enumerate(layers):
+        checked_layers_ids.append(layer['layers_id'])
+        if layer['es_condition']:
+            logger.info('layers :: Es layer not implemented yet - cannot evaluate es_day %s and es_condition %s' % (str(layer['es_day']), str(layer['es_condition'])))
+        if layer['f1_from_time']:
+            logger.info('layers :: F1 layer not implemented yet - cannot evaluate f1_from_time %s' % str(layer['f1_from_time']))
+        if layer['f2_until_time']:
+            logger.info('layers :: F2 layer not implemented yet - cannot evaluate f2_until_time %s' % str(layer['f2_until_time']))
+        if d_breached[index]:
+            logger.info('layers :: layers_id %s - discarding as the last value %s in the time series matches D layer boundary %s %s' % (
+                str(layer['layers_id']), str(last_datapoint), layer['d_condition'],
+                str(layer['use_d_boundary_limit'])))
+        elif d1_breached[index]:
+            logger.info('layers :: layers_id %s - the last %s values breach the D1 layer boundary of %s %s' % (
+                str(layer['layers_id']), str(layer['d1_boundary_times']),
+                layer['d1_condition'], str(layer['d1_boundary_limit'])))
+        elif not e_matched[index]:
+            logger.info('layers :: layers_id %s - the last %s values breach the E layer boundary of %s %s' % (
+                str(layer['layers_id']), str(layer['e_boundary_times']),
+                layer['e_condition'], str(layer['use_e_boundary_limit'])))
+        if layers_matched[index]:
+            matched_layer = layer
+            logger.info('layers :: layers_id %s - matches the E layer boundary of %s %s as not anomalous' % (
+                str(layer['layers_id']), layer['e_condition'],
+                str(layer['use_e_boundary_limit'])))
+            break
+
+    checked_timestamp = int(time())
+    try:
+        ionosphere_layers_table, log_msg, trace = ionosphere_layers_table_meta(skyline_app, engine)
+        connection = engine.connect()
+        connection.execute(
+            ionosphere_layers_table.update(
+                ionosphere_layers_table.c.id.in_(checked_layers_ids)).
+            values(check_count=ionosphere_layers_table.c.check_count + 1,
+                   last_checked=checked_timestamp))
+        connection.close()
+        logger.info('layers :: updated check_count for %s layers' % str(len(checked_layers_ids)))
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: layers :: could not update check_count and last_checked for layers %s' % str(checked_layers_ids))
+        return None, checked_layers_ids
+
+    if not matched_layer:
+        logger.info('layers :: no layers matched after checking %s layers' % str(len(checked_layers_ids)))
+        return None, checked_layers_ids
+
+    matched_layers_id = matched_layer['layers_id']
+    # In order to correctly label whether to match is an approximately_close
+    # match or not, the values are reassessed using the original boundary
+    # limits, as per run_layer_algorithms
+    approx_close = 0
+    if matched_layer['d_approximately_close'] or matched_layer['e_approximately_close']:
+        original_limits_matched = False
+        if matched_layer['d_approximately_close']:
+            if not layers_condition_matrix(
+                    latest_values, [matched_layer['d_condition']],
+                    [matched_layer['d_boundary_limit']], [1])[0, 0]:
+                original_limits_matched = True
+        if matched_layer['e_approximately_close']:
+            if layers_condition_matrix(
+                    latest_values, [matched_layer['e_condition']],
+                    [matched_layer['e_boundary_limit']],
+                    [matched_layer['e_boundary_times']]).any():
+                original_limits_matched = True
+        if original_limits_matched:
+            logger.info('layers :: approximately_close values were not needed to obtain a match, not labelling approx_close')
+        else:
+            approx_close = 1
+            logger.info('layers :: approximately_close values were needed to obtain a match, labelling approx_close')
+
+    try:
+        connection = engine.connect()
+        connection.execute(
+            ionosphere_layers_table.update(
+                ionosphere_layers_table.c.id == matched_layers_id).
+            values(matched_count=ionosphere_layers_table.c.matched_count + 1,
+                   last_matched=checked_timestamp))
+        connection.close()
+        logger.info('layers :: updated matched_count for %s' % str(matched_layers_id))
+        ionosphere_layers_matched_table, log_msg, trace = ionosphere_layers_matched_table_meta(skyline_app, engine)
+        connection = engine.connect()
+        ins = ionosphere_layers_matched_table.insert().values(
+            layer_id=int(matched_layers_id),
+            fp_id=int(matched_layer['fp_id']),
+            metric_id=int(matched_layer['metric_id']),
+            anomaly_timestamp=int(last_timestamp),
+            anomalous_datapoint=float(last_datapoint),
+            full_duration=int(settings.FULL_DURATION),
+            layers_count=len(layers_ids), layers_checked=len(checked_layers_ids),
+            approx_close=approx_close)
+        result = connection.execute(ins)
+        connection.close()
+        new_matched_id = result.inserted_primary_key[0]
+        logger.info('layers :: new ionosphere_layers_matched id: %s' % str(new_matched_id))
+    except:
+        logger.error(traceback.format_exc())
+        logger.error(
+            'error :: layers :: could not update ionosphere_layers_matched for %s with with timestamp %s' % (
+                str(matched_layers_id), str(last_timestamp)))
+        return None, checked_layers_ids
+
+    return matched_layers_id, checked_layers_ids
@@ -0,0 +1,238 @@
+"""
+The Ionosphere work queue.
+
+Ionosphere has three sources of work, the real time metric check files in
+settings.IONOSPHERE_CHECK_PATH, the ionosphere.echo.work Redis set and the
+ionosphere.learn.work Redis set.  The work is put into a single priority
+queue, real time checks first, echo checks second and learn jobs last, and
+within a priority the work is scheduled by earliest deadline first using the
+deadline types that learn documents:
+
+- Hard - missing a deadline is a total system failure.
+- Firm - the usefulness of a result is zero after its deadline.
+- Soft - the usefulness of a result degrades after its deadline.
+
+Real time checks have a Firm deadline of IONOSPHERE_CHECK_MAX_AGE, after which
+spin_process discards them, so work that can still meet its deadline is
+scheduled before Hard and Firm work that has missed its deadline.  Soft work
+that has missed its deadline is not deferred, it just becomes more urgent.
+"""
+from __future__ import division
+import logging
+import os
+from ast import literal_eval
+
+skyline_app = 'ionosphere'
+skyline_app_logger = '%sLog' % skyline_app
+logger = logging.getLogger(skyline_app_logger)
+
+WORK_QUEUE_PRIORITIES = {
+    'realtime': 0,
+    'echo': 1,
+    'learn': 2,
+}
+
+# The deadline type and the seconds from when the work was queued to its
+# deadline of the work that does not determine its own deadline.  The echo
+# deadline is the TTL of the echo_create_check key
+WORK_QUEUE_DEADLINES = {
+    'echo': ('Soft', 3600),
+    'learn': ('Soft', 3600),
+}
+
+DEADLINE_TYPES = ['Hard', 'Firm', 'Soft']
+
+# The Redis hash of the time each Redis set work item was first seen, from
+# which the queue latency is determined
+WORK_QUEUE_FIRST_SEEN_KEY = 'ionosphere.work_queue.first_seen'
+
+
+def check_file_work_items(check_path, check_files, max_age):
+    """
+    Create the work items of the real time metric check files.  The metric
+    check file names are metric_timestamp.base_name.txt and the check has a
+    Firm deadline of metric_timestamp + max_age, unless max_age is 0.
+
+    :param check_path: the settings.IONOSPHERE_CHECK_PATH
+    :param check_files: the metric check file names
+    :param max_age: the settings.IONOSPHERE_CHECK_MAX_AGE
+    :type check_path: str
+    :type check_files: list
+    :type max_age: int
+    :return: work_items
+    :rtype: list
+    """
+    work_items = []
+    for check_file in check_files:
+        metric_check_file = '%s/%s' % (check_path, str(check_file))
+        try:
+            metric_timestamp = int(check_file.split('.', 1)[0])
+            metric = check_file.split('.', 1)[1]
+            if metric.endswith('.txt'):
+                metric = metric[:-len('.txt')]
+        except:
+            logger.error('error :: work_queue :: could not determine the metric and timestamp from %s' % str(check_file))
+            continue
+        try:
+            queued_at = os.path.getmtime(metric_check_file)
+        except:
+            queued_at = metric_timestamp
+        deadline = None
+        if max_age:
+            deadline = metric_timestamp + int(max_age)
+        work_items.append({
+            'work_type': 'realtime',
+            'priority': WORK_QUEUE_PRIORITIES['realtime'],
+            'deadline_type': 'Firm',
+            'deadline': deadline,
+            'queued_at': queued_at,
+            'metric': metric,
+            'work': metric_check_file,
+        })
+    return work_items
+
+
+def echo_work_items(echo_work, first_seen, now):
+    """
+    Create the work items of the ionosphere.echo.work Redis set items.
+
+    :param echo_work: the ionosphere.echo.work set items
+    :param first_seen: the time each set item was first seen
+    :param now: the current timestamp
+    :type echo_work: list
+    :type first_seen: dict
+    :type now: float
+    :return: work_items
+    :rtype: list
+    """
+    deadline_type, deadline_seconds = WORK_QUEUE_DEADLINES['echo']
+    work_items = []
+    for echo_work_item in echo_work:
+        try:
+            echo_metric_list = literal_eval(echo_work_item)
+            metric = str(echo_metric_list[3])
+        except:
+            logger.error('error :: work_queue :: could not determine details from ionosphere_echo_work item - %s' % str(echo_work_item))
+            continue
+        queued_at = float(first_seen.get(echo_work_item, now))
+        work_items.append({
+            'work_type': 'echo',
+            'priority': WORK_QUEUE_PRIORITIES['echo'],
+            'deadline_type': deadline_type,
+            'deadline': queued_at + deadline_seconds,
+            'queued_at': queued_at,
+            'metric': metric,
+            'work': echo_metric_list,
+        })
+    return work_items
+
+
+def learn_work_items(learn_work, first_seen, now):
+    """
+    Create the work item of the ionosphere.learn.work Redis set items.  There
+    is only one learn work item, as spawn_learn_process processes all the
+    items in the set, its deadline is the earliest deadline of the items and
+    its deadline type the strictest of the items.
+
+    :param learn_work: the ionosphere.learn.work set items
+    :param first_seen: the time each set item was first seen
+    :param now: the current timestamp
+    :type learn_work: list
+    :type first_seen: dict
+    :type now: float
+    :return: work_items
+    :rtype: list
+    """
+    if not learn_work:
+        return []
+    deadline_type, deadline_seconds = WORK_QUEUE_DEADLINES['learn']
+    queued_at = min([float(first_seen.get(learn_work_item, now)) for learn_work_item in learn_work])
+    for learn_work_item in learn_work:
+        try:
+            item_deadline_type = str(literal_eval(learn_work_item)[0])
+        except:
+            continue
+        if item_deadline_type in DEADLINE_TYPES:
+            if DEADLINE_TYPES.index(item_deadline_type) < DEADLINE_TYPES.index(deadline_type):
+                deadline_type = item_deadline_type
+    return [{
+        'work_type': 'learn',
+        'priority': WORK_QUEUE_PRIORITIES['learn'],
+        'deadline_type': deadline_type,
+        'deadline': queued_at + deadline_seconds,
+        'queued_at': queued_at,
+        'metric': None,
+        'work': len(learn_work),
+    }]
+
+
+def deadline_missed(work_item, now):
+    """
+    Whether the work item has missed its deadline.
+
+    :param work_item: the work item
+    :param now: the current timestamp
+    :type work_item: dict
+    :type now: float
+    :return: True or False
+    :rtype: boolean
+    """
+    if work_item['deadline'] is None:
+        return False
+    return now > work_item['deadline']
+
+
+def order_work_items(work_items, now):
+    """
+    Order the work items by priority and then by earliest deadline first, with
+    the Hard and Firm work that has missed its deadline after the work of the
+    same priority that can still meet its deadline.
+
+    :param work_items: the work items
+    :param now: the current timestamp
+    :type work_items: list
+    :type now: float
+    :return: the ordered work items
+    :rtype: list
+    """
+    def work_item_key(work_item):
+        deferred = 0
+        if work_item['deadline_type'] in ['Hard', 'Firm'] and deadline_missed(work_item, now):
+            deferred = 1
+        deadline = work_item['deadline']
+        if deadline is None:
+            deadline = float('inf')
+        return (work_item['priority'], deferred, deadline, work_item['queued_at'])
+
+    return sorted(work_items, key=work_item_key)
+
+
+def schedule_work_items(work_items, workers, now):
+    """
+    Determine the work items to run concurrently, one per worker.  A metric is
+    only worked on by one worker at a time.
+
+    :param work_items: the work items
+    :param workers: the number of workers
+    :param now: the current timestamp
+    :type work_items: list
+    :type workers: int
+    :type now: float
+    :return: the scheduled work items
+    :rtype: list
+    """
+    scheduled = []
+    scheduled_metrics = []
+    scheduled_work_types = []
+    for work_item in order_work_items(work_items, now):
+        if len(scheduled) >= max(int(workers), 1):
+            break
+        if work_item['metric'] is None:
+            if work_item['work_type'] in scheduled_work_types:
+                continue
+        elif work_item['metric'] in scheduled_metrics:
+            continue
+        scheduled.append(work_item)
+        scheduled_metrics.append(work_item['metric'])
+        scheduled_work_types.append(work_item['work_type'])
+    return scheduled
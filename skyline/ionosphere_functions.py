@@ -40,6 +40,8 @@ from database import (
     luminosity_table_meta,
     # @added 20190501 - Branch #2646: slack
     anomalies_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine, cached_table, cache_table,
 )
 # @added 20190502 - Branch #2646: slack
 from slack_functions import slack_post_message, slack_post_reaction
@@ -88,13 +90,22 @@ def fp_create_engine_disposal(current_skyline_app, engine):
     current_skyline_app_logger = current_skyline_app + 'Log'
     current_logger = logging.getLogger(current_skyline_app_logger)
 
+    # @modified 20261019 - Database engine registry
+    # The engine of the process is not disposed of so that its connection
+    # pool is reused
+    # if engine:
+    #     current_logger.error('fp_create_engine_disposal :: calling engine.dispose()')
+    #     try:
+    #         engine.dispose()
+    #     except:
+    #         current_logger.error(traceback.format_exc())
+    #         current_logger.error('error :: fp_create_engine_disposal :: calling engine.dispose()')
     if engine:
-        current_logger.error('fp_create_engine_disposal :: calling engine.dispose()')
         try:
-            engine.dispose()
+            dispose_engine(current_skyline_app, engine)
         except:
             current_logger.error(traceback.format_exc())
-            current_logger.error('error :: fp_create_engine_disposal :: calling engine.dispose()')
+            current_logger.error('error :: fp_create_engine_disposal :: calling dispose_engine')
     return
 
 
@@ -132,54 +143,18 @@ def get_ionosphere_learn_details(current_skyline_app, base_name):
     current_skyline_app_logger = current_skyline_app + 'Log'
     current_logger = logging.getLogger(current_skyline_app_logger)
 
+    # @modified 20261019 - Panorama bulk new metric registration
+    # The namespace config matching is done by
+    # get_ionosphere_learn_details_for_metrics so that there is one
+    # implementation for a single metric and for multiple metrics
     use_full_duration = None
     valid_learning_duration = None
     use_full_duration_days = None
     max_generations = None
     max_percent_diff_from_origin = None
     try:
-        use_full_duration = int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS * 86400)
-        valid_learning_duration = int(settings.IONOSPHERE_LEARN_DEFAULT_VALID_TIMESERIES_OLDER_THAN_SECONDS)
-        use_full_duration_days = int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS)
-        max_generations = int(settings.IONOSPHERE_LEARN_DEFAULT_MAX_GENERATIONS)
-        max_percent_diff_from_origin = float(settings.IONOSPHERE_LEARN_DEFAULT_MAX_PERCENT_DIFF_FROM_ORIGIN)
-        for namespace_config in settings.IONOSPHERE_LEARN_NAMESPACE_CONFIG:
-            NAMESPACE_MATCH_PATTERN = str(namespace_config[0])
-            pattern_match = False
-            try:
-                # Match by regex
-                namespace_match_pattern = re.compile(NAMESPACE_MATCH_PATTERN)
-                pattern_match = namespace_match_pattern.match(base_name)
-                if pattern_match:
-                    try:
-                        use_full_duration_days = int(namespace_config[1])
-                        use_full_duration = int(namespace_config[1]) * 86400
-                        valid_learning_duration = int(namespace_config[2])
-                        max_generations = int(namespace_config[3])
-                        max_percent_diff_from_origin = float(namespace_config[4])
-                        current_logger.info('get_ionosphere_learn_details :: %s matches %s' % (base_name, str(namespace_config)))
-                        break
-                    except:
-                        pattern_match = False
-            except:
-                pattern_match = False
-            if not pattern_match:
-                # Match by substring
-                if str(namespace_config[0]) in base_name:
-                    try:
-                        use_full_duration_days = int(namespace_config[1])
-                        use_full_duration = int(namespace_config[1]) * 86400
-                        valid_learning_duration = int(namespace_config[2])
-                        max_generations = int(namespace_config[3])
-                        max_percent_diff_from_origin = float(namespace_config[4])
-                        current_logger.info('get_ionosphere_learn_details :: %s matches %s' % (base_name, str(namespace_config)))
-                        break
-                    except:
-                        pattern_match = False
-            if not pattern_match:
-                current_logger.info('get_ionosphere_learn_details :: no specific namespace matches found, using default settings')
-            else:
-                current_logger.info('get_ionosphere_learn_details :: found namespace config match settings')
+        learn_details = get_ionosphere_learn_details_for_metrics(current_skyline_app, [base_name])
+        use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin = learn_details[base_name]
     except:
         current_logger.error(traceback.format_exc())
         current_logger.error('error :: get_ionosphere_learn_details :: failed to check namespace config settings matches')
@@ -193,6 +168,76 @@ def get_ionosphere_learn_details(current_skyline_app, base_name):
     return use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin
 
 
+# @added 20261019 - Panorama bulk new metric registration
+def get_ionosphere_learn_details_for_metrics(current_skyline_app, base_names):
+    """
+    Determines the ionosphere learn details for multiple metrics in one pass,
+    matching each metric against :mod:`settings.IONOSPHERE_LEARN_NAMESPACE_CONFIG`
+    by regex and then by substring, with the namespace patterns only compiled
+    once and without logging per metric.  :func:`get_ionosphere_learn_details`
+    calls this function for a single metric.
+
+    :param current_skyline_app: the Skyline app name calling the function
+    :param base_names: the base_names of the metrics
+    :type current_skyline_app: str
+    :type base_names: list
+    :return: dict
+    :return: {base_name: (use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin)}
+    :rtype: dict
+
+    """
+
+    current_skyline_app_logger = current_skyline_app + 'Log'
+    current_logger = logging.getLogger(current_skyline_app_logger)
+
+    default_learn_details = (
+        int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS * 86400),
+        int(settings.IONOSPHERE_LEARN_DEFAULT_VALID_TIMESERIES_OLDER_THAN_SECONDS),
+        int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS),
+        int(settings.IONOSPHERE_LEARN_DEFAULT_MAX_GENERATIONS),
+        float(settings.IONOSPHERE_LEARN_DEFAULT_MAX_PERCENT_DIFF_FROM_ORIGIN))
+
+    namespace_configs = []
+    for namespace_config in settings.IONOSPHERE_LEARN_NAMESPACE_CONFIG:
+        namespace_match_pattern = None
+        try:
+            namespace_match_pattern = re.compile(str(namespace_config[0]))
+        except:
+            namespace_match_pattern = None
+        namespace_learn_details = None
+        try:
+            namespace_learn_details = (
+                int(namespace_config[1]) * 86400, int(namespace_config[2]),
+                int(namespace_config[1]), int(namespace_config[3]),
+                float(namespace_config[4]))
+        except:
+            current_logger.error('error :: get_ionosphere_learn_details_for_metrics :: invalid namespace config - %s' % str(namespace_config))
+            continue
+        namespace_configs.append([str(namespace_config[0]), namespace_match_pattern, namespace_learn_details])
+
+    learn_details = {}
+    namespace_matches = 0
+    for base_name in base_names:
+        learn_details[base_name] = default_learn_details
+        for namespace, namespace_match_pattern, namespace_learn_details in namespace_configs:
+            pattern_match = False
+            if namespace_match_pattern:
+                # Match by regex
+                if namespace_match_pattern.match(base_name):
+                    pattern_match = True
+            if not pattern_match:
+                # Match by substring
+                if namespace in base_name:
+                    pattern_match = True
+            if pattern_match:
+                learn_details[base_name] = namespace_learn_details
+                namespace_matches += 1
+                break
+    current_logger.info('get_ionosphere_learn_details_for_metrics :: determined learn details for %s metrics, %s matched namespace configs' % (
+        str(len(learn_details)), str(namespace_matches)))
+    return learn_details
+
+
 # @added 20200512 - Bug #2534: Ionosphere - fluid approximation - IONOSPHERE_MINMAX_SCALING_RANGE_TOLERANCE on low ranges
 #                   Feature #2404: Ionosphere - fluid approximation
 # Due to the loss of resolution in the Grpahite graph images due
@@ -900,7 +945,13 @@ def create_features_profile(current_skyline_app, requested_timestamp, data_for_m
             # Removed as under MySQL 5.7 breaks
             # mysql_key_block_size='255',
             mysql_engine='InnoDB')
-        fp_metric_table.create(engine, checkfirst=True)
+        # @modified 20261019 - Database engine registry
+        # Only check that the table exists if the process has not already
+        # created or reflected the table
+        # fp_metric_table.create(engine, checkfirst=True)
+        if cached_table(fp_table_name) is None:
+            fp_metric_table.create(engine, checkfirst=True)
+            cache_table(fp_table_name, fp_metric_table)
         fp_table_created = True
     except:
         trace = traceback.format_exc()
@@ -997,7 +1048,13 @@ def create_features_profile(current_skyline_app, requested_timestamp, data_for_m
             # Removed as under MySQL 5.7 breaks
             # mysql_key_block_size='255',
             mysql_engine='InnoDB')
-        ts_metric_table.create(engine, checkfirst=True)
+        # @modified 20261019 - Database engine registry
+        # Only check that the table exists if the process has not already
+        # created or reflected the table
+        # ts_metric_table.create(engine, checkfirst=True)
+        if cached_table(ts_table_name) is None:
+            ts_metric_table.create(engine, checkfirst=True)
+            cache_table(ts_table_name, ts_metric_table)
         # ts_table_created = True
         current_logger.info('create_features_profile :: metric ts table created OK - %s' % (ts_table_name))
     except:
@@ -31,7 +31,9 @@ from skyline_functions import (
     # charset='utf-8', decode_responses=True arguments required in py3
     get_redis_conn, get_redis_conn_decoded)
 
-from database import get_engine
+# @modified 20261019 - Database engine registry
+# from database import get_engine
+from database import get_engine, dispose_engine
 # from process_correlations import *
 
 skyline_app = 'luminosity'
@@ -270,7 +272,11 @@ class Luminosity(Thread):
         def engine_disposal(engine):
             if engine:
                 try:
-                    engine.dispose()
+                    # @modified 20261019 - Database engine registry
+                    # The engine of the process is not disposed of so that its
+                    # connection pool is reused
+                    # engine.dispose()
+                    dispose_engine(skyline_app, engine)
                 except:
                     logger.error(traceback.format_exc())
                     logger.error('error :: calling engine.dispose()')
@@ -328,8 +334,29 @@ class Luminosity(Thread):
             logger.error('error :: failed to add %s to Redis set %s' % (
                 str(data), str(redis_set)))
 
+        # @added 20261019 - Panorama bulk new metric registration
+        # Determine the metric ids from the panorama.metrics.ids Redis hash
+        # that Panorama publishes and only query MySQL for any metrics that are
+        # not in the hash
+        correlated_metrics_list = []
+        metrics_not_in_cache = []
+        correlated_metrics = list(correlated_metrics)
+        try:
+            cached_metric_ids = self.redis_conn_decoded.hmget('panorama.metrics.ids', correlated_metrics)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to get metric ids from Redis hash panorama.metrics.ids')
+            cached_metric_ids = [None] * len(correlated_metrics)
+        for metric_name, cached_metric_id in zip(correlated_metrics, cached_metric_ids):
+            if cached_metric_id:
+                correlated_metrics_list.append([int(cached_metric_id), str(metric_name)])
+            else:
+                metrics_not_in_cache.append(metric_name)
+
         metrics_str = ''
-        for metric_name in correlated_metrics:
+        # @modified 20261019 - Panorama bulk new metric registration
+        # for metric_name in correlated_metrics:
+        for metric_name in metrics_not_in_cache:
             if metrics_str == '':
                 new_metrics_str = "'%s'" % metric_name
             else:
@@ -337,15 +364,19 @@ class Luminosity(Thread):
             metrics_str = new_metrics_str
         metrics_str
 
-        query = 'SELECT id,metric FROM metrics WHERE metric in (%s)' % str(metrics_str)
-        try:
-            results = mysql_select(skyline_app, query)
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: querying MySQL - SELECT id,metric FROM metrics WHERE metric in (%s)' % str(metrics_str))
-            return False
+        # @modified 20261019 - Panorama bulk new metric registration
+        # Only query MySQL for the metrics not in panorama.metrics.ids
+        results = []
+        if metrics_str:
+            query = 'SELECT id,metric FROM metrics WHERE metric in (%s)' % str(metrics_str)
+            try:
+                results = mysql_select(skyline_app, query)
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: querying MySQL - SELECT id,metric FROM metrics WHERE metric in (%s)' % str(metrics_str))
+                return False
 
-        correlated_metrics_list = []
+        # correlated_metrics_list = []
         for metric_id, metric in results:
             correlated_metrics_list.append([int(metric_id), str(metric)])
         logger.info('number of metric ids determined from the metrics tables - %s' % str(len(correlated_metrics_list)))
@@ -0,0 +1,226 @@
+"""
+The metrics registry.
+
+An in-process registry of counters, latency histograms and sampled errors that
+is cheap enough to record into once per algorithm per metric.  Each spawned
+process records into the registry of its process and puts a snapshot of it on
+a multiprocessing Queue when it completes, the parent process merges the
+snapshots and sends the metrics to Graphite once per run, rather than every
+process appending to and the parent re-reading and summing tmp files.
+
+The latency histograms are HDR style, the values are recorded in microseconds
+into buckets of HISTOGRAM_SIGNIFICANT_BITS significant bits, so a histogram is
+a small sparse dict of bucket counts whatever the number of values recorded,
+the relative error of a percentile is less than 1/2**(HISTOGRAM_SIGNIFICANT_BITS - 1)
+and histograms from different processes are merged by adding the counts.
+"""
+from __future__ import division
+from math import ceil
+from timeit import default_timer as timer
+
+HISTOGRAM_SIGNIFICANT_BITS = 6
+
+HISTOGRAM_PERCENTILES = [50, 95, 99]
+
+
+def histogram_bucket(value):
+    """
+    The histogram bucket of a value in microseconds.
+
+    :param value: the value in microseconds
+    :type value: int
+    :return: bucket
+    :rtype: int
+    """
+    shift = max(int(value).bit_length() - HISTOGRAM_SIGNIFICANT_BITS, 0)
+    return (shift << (HISTOGRAM_SIGNIFICANT_BITS - 1)) + (int(value) >> shift)
+
+
+def histogram_bucket_value(bucket):
+    """
+    The value in microseconds that a histogram bucket represents, the middle of
+    the range of values in the bucket.
+
+    :param bucket: the bucket
+    :type bucket: int
+    :return: value
+    :rtype: float
+    """
+    shift = max((bucket >> (HISTOGRAM_SIGNIFICANT_BITS - 1)) - 1, 0)
+    top = bucket - (shift << (HISTOGRAM_SIGNIFICANT_BITS - 1))
+    return (top << shift) + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram(object):
+    """
+    A latency histogram of values recorded in seconds.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        bucket = histogram_bucket(seconds * 1000000)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, counts, count, total, max_value):
+        for bucket, bucket_count in counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + bucket_count
+        self.count += count
+        self.total += total
+        if max_value > self.max:
+            self.max = max_value
+
+    def percentile(self, percentile):
+        """
+        The value in seconds at the percentile.
+
+        :param percentile: the percentile, e.g. 95
+        :type percentile: int
+        :return: value
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        target = max(int(ceil(self.count * percentile / 100)), 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(histogram_bucket_value(bucket) / 1000000, self.max)
+        return self.max
+
+
+class RegistryTimer(object):
+    """
+    Records the time taken by the block in a histogram of the registry.
+    """
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.registry.record(self.name, timer() - self.start)
+        return False
+
+
+class MetricsRegistry(object):
+    """
+    The metrics registry of a process.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.errors = {}
+
+    def increment(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name, seconds):
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        self.histograms[name].record(seconds)
+
+    def timer(self, name):
+        """
+        A context manager that records the time taken by the block.
+
+        :param name: the histogram name
+        :type name: str
+        :return: RegistryTimer
+        """
+        return RegistryTimer(self, name)
+
+    def record_error(self, name, error_string):
+        """
+        Count an error and keep the last error string as a sample of it.
+
+        :param name: the error name, e.g. the algorithm name
+        :param error_string: the traceback.format_exc() string
+        :type name: str
+        :type error_string: str
+        """
+        count, last_error_string = self.errors.get(name, (0, None))
+        self.errors[name] = (count + 1, str(error_string))
+
+    def snapshot(self):
+        """
+        A picklable snapshot of the registry to put on a Queue.
+
+        :return: snapshot
+        :rtype: dict
+        """
+        return {
+            'counters': dict(self.counters),
+            'histograms': dict(
+                (name, (dict(histogram.counts), histogram.count, histogram.total, histogram.max))
+                for name, histogram in self.histograms.items()),
+            'errors': dict(self.errors),
+        }
+
+    def merge(self, snapshot):
+        """
+        Merge a snapshot from another process into the registry.
+
+        :param snapshot: the snapshot
+        :type snapshot: dict
+        """
+        for name, value in snapshot['counters'].items():
+            self.increment(name, value)
+        for name, (counts, count, total, max_value) in snapshot['histograms'].items():
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            self.histograms[name].merge(counts, count, total, max_value)
+        for name, (count, error_string) in snapshot['errors'].items():
+            existing_count, existing_error_string = self.errors.get(name, (0, None))
+            self.errors[name] = (existing_count + count, error_string)
+
+    def reset(self):
+        self.counters = {}
+        self.histograms = {}
+        self.errors = {}
+
+    def graphite_metrics(self):
+        """
+        The metrics to send to Graphite, the counters as is and for each
+        histogram the times_run, total_time, median_time, p95_time, p99_time
+        and max_time.
+
+        :return: a list of (name, value) tuples
+        :rtype: list
+        """
+        metrics = []
+        for name in sorted(self.counters):
+            metrics.append((name, self.counters[name]))
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            if not histogram.count:
+                continue
+            metrics.append(('%s.times_run' % name, histogram.count))
+            metrics.append(('%s.total_time' % name, round(histogram.total, 6)))
+            for percentile in HISTOGRAM_PERCENTILES:
+                if percentile == 50:
+                    percentile_name = '%s.median_time' % name
+                else:
+                    percentile_name = '%s.p%s_time' % (name, str(percentile))
+                metrics.append((percentile_name, round(histogram.percentile(percentile), 6)))
+            metrics.append(('%s.max_time' % name, round(histogram.max, 6)))
+        return metrics
+
+
+# The registry of the process
+metrics_registry = MetricsRegistry()
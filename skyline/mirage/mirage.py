@@ -59,6 +59,10 @@ from skyline_functions import (
 from matched_or_regexed_in_list import matched_or_regexed_in_list
 
 from mirage_alerters import trigger_alert
+# @added 20261019 - Alert graph render pool
+from mirage_alerters import alert_smtp_redis_graph
+# @added 20261019 - Alert dispatcher
+from alert_dispatcher import AlertDispatcher
 from negaters import trigger_negater
 from mirage_algorithms import run_selected_algorithm
 from algorithm_exceptions import TooShort, Stale, Boring
@@ -1187,39 +1191,66 @@ class Mirage(Thread):
         else:
             logger.info('bin/%s.d log management done' % skyline_app)
 
-        def smtp_trigger_alert(alert, metric, second_order_resolution_seconds, context):
-            # Spawn processes
-            pids = []
-            spawned_pids = []
-            pid_count = 0
-            try:
-                p = Process(target=self.spawn_alerter_process, args=(alert, metric, second_order_resolution_seconds, context))
-                pids.append(p)
-                pid_count += 1
-                p.start()
-                spawned_pids.append(p.pid)
-            except:
-                logger.error('error :: failed to spawn_alerter_process')
-                logger.info(traceback.format_exc())
-            p_starts = time()
-            while time() - p_starts <= 15:
-                if any(p.is_alive() for p in pids):
-                    # Just to avoid hogging the CPU
-                    sleep(.1)
-                else:
-                    # All the processes are done, break now.
-                    break
-            else:
-                # We only enter this if we didn't 'break' above.
-                logger.info('%s :: timed out, killing the spawn_trigger_alert process' % (skyline_app))
-                for p in pids:
-                    p.terminate()
-                    # p.join()
+        # @added 20261019 - Alert dispatcher
+        # Alerts are added to the queue of the alert dispatcher thread which
+        # sends them in alerter processes, Mirage does not wait on them
+        # @modified 20261019 - Alert graph render pool
+        # The Redis data graphs of smtp alerts are rendered by the render pool
+        # of the alert dispatcher while the alerts are queued
+        # alert_dispatcher = AlertDispatcher(skyline_app, trigger_alert)
+        try:
+            plot_redis_data = settings.PLOT_REDIS_DATA
+        except:
+            plot_redis_data = False
+        alert_graph_render_function = None
+        if settings.SMTP_OPTS.get('embed-images') and plot_redis_data:
+            alert_graph_render_function = alert_smtp_redis_graph
+        alert_dispatcher = AlertDispatcher(
+            skyline_app, trigger_alert, alert_graph_render_function)
+        alert_dispatcher.start()
+
+        def dispatch_alert(alert, metric, second_order_resolution_seconds, context):
+            cache_key = 'mirage.last_alert.%s.%s' % (alert[1], metric[1])
+            alert_dispatcher.enqueue(alert[1], cache_key, (alert, metric, second_order_resolution_seconds, context))
 
-            for p in pids:
-                if p.is_alive():
-                    logger.info('%s :: stopping spin_process - %s' % (skyline_app, str(p.is_alive())))
-                    p.join()
+        def smtp_trigger_alert(alert, metric, second_order_resolution_seconds, context):
+            # @modified 20261019 - Alert dispatcher
+            # Add the alert to the alert dispatcher queue rather than spawning a
+            # spawn_alerter_process and waiting up to 15 seconds for it, so that
+            # the alerts do not stall the Mirage run
+            # # Spawn processes
+            # pids = []
+            # spawned_pids = []
+            # pid_count = 0
+            # try:
+            #     p = Process(target=self.spawn_alerter_process, args=(alert, metric, second_order_resolution_seconds, context))
+            #     pids.append(p)
+            #     pid_count += 1
+            #     p.start()
+            #     spawned_pids.append(p.pid)
+            # except:
+            #     logger.error('error :: failed to spawn_alerter_process')
+            #     logger.info(traceback.format_exc())
+            # p_starts = time()
+            # while time() - p_starts <= 15:
+            #     if any(p.is_alive() for p in pids):
+            #         # Just to avoid hogging the CPU
+            #         sleep(.1)
+            #     else:
+            #         # All the processes are done, break now.
+            #         break
+            # else:
+            #     # We only enter this if we didn't 'break' above.
+            #     logger.info('%s :: timed out, killing the spawn_trigger_alert process' % (skyline_app))
+            #     for p in pids:
+            #         p.terminate()
+            #         # p.join()
+
+            # for p in pids:
+            #     if p.is_alive():
+            #         logger.info('%s :: stopping spin_process - %s' % (skyline_app, str(p.is_alive())))
+            #         p.join()
+            dispatch_alert(alert, metric, second_order_resolution_seconds, context)
 
         """
         DEVELOPMENT ONLY
@@ -1833,18 +1864,26 @@ class Mirage(Thread):
                                 # trigger_alert(alert, metric, second_order_resolution_seconds, context)
 
                                 try:
-                                    if alert[1] != 'smtp':
-                                        logger.info('trigger_alert :: alert: %s, metric: %s, second_order_resolution_seconds: %s, context: %s' % (
-                                            str(alert), str(metric),
-                                            str(second_order_resolution_seconds),
-                                            str(alert_context)))
-                                        trigger_alert(alert, metric, second_order_resolution_seconds, alert_context)
-                                    else:
-                                        logger.info('smtp_trigger_alert :: alert: %s, metric: %s, second_order_resolution_seconds: %s, context: %s' % (
-                                            str(alert), str(metric),
-                                            str(second_order_resolution_seconds),
-                                            str(alert_context)))
-                                        smtp_trigger_alert(alert, metric, second_order_resolution_seconds, alert_context)
+                                    # @modified 20261019 - Alert dispatcher
+                                    # All the alerters are dispatched by the
+                                    # alert dispatcher
+                                    # if alert[1] != 'smtp':
+                                    #     logger.info('trigger_alert :: alert: %s, metric: %s, second_order_resolution_seconds: %s, context: %s' % (
+                                    #         str(alert), str(metric),
+                                    #         str(second_order_resolution_seconds),
+                                    #         str(alert_context)))
+                                    #     trigger_alert(alert, metric, second_order_resolution_seconds, alert_context)
+                                    # else:
+                                    #     logger.info('smtp_trigger_alert :: alert: %s, metric: %s, second_order_resolution_seconds: %s, context: %s' % (
+                                    #         str(alert), str(metric),
+                                    #         str(second_order_resolution_seconds),
+                                    #         str(alert_context)))
+                                    #     smtp_trigger_alert(alert, metric, second_order_resolution_seconds, alert_context)
+                                    logger.info('dispatch_alert :: alert: %s, metric: %s, second_order_resolution_seconds: %s, context: %s' % (
+                                        str(alert), str(metric),
+                                        str(second_order_resolution_seconds),
+                                        str(alert_context)))
+                                    dispatch_alert(alert, metric, second_order_resolution_seconds, alert_context)
                                     logger.info('sent %s alert: For %s' % (alert[1], metric[1]))
                                 except Exception as e:
                                     logger.error('error :: could not send %s alert for %s: %s' % (alert[1], metric[1], e))
@@ -1906,6 +1945,18 @@ class Mirage(Thread):
             send_metric_name = skyline_app_graphite_namespace + '.run_time'
             send_graphite_metric(skyline_app, send_metric_name, graphite_run_time)
 
+            # @added 20261019 - Alert dispatcher
+            # Send the alert dispatcher back pressure metrics
+            try:
+                alert_dispatcher_metrics = alert_dispatcher.metrics()
+                logger.info('alert_dispatcher   :: %s' % str(alert_dispatcher_metrics))
+                for key, value in alert_dispatcher_metrics.items():
+                    send_metric_name = '%s.alert_dispatcher.%s' % (skyline_app_graphite_namespace, key)
+                    send_graphite_metric(skyline_app, send_metric_name, str(value))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to send the alert_dispatcher metrics')
+
             if settings.ENABLE_CRUCIBLE and settings.MIRAGE_CRUCIBLE_ENABLED:
                 try:
                     # @modified 20190522 - Task #3034: Reduce multiprocessing Manager list usage
@@ -9,7 +9,9 @@ from threading import Thread
 # Use Redis sets in place of Manager().list() to reduce memory and number of
 # processes
 # from multiprocessing import Process, Manager
-from multiprocessing import Process
+# @modified 20261019 - Panorama batched updates
+# Panorama no longer spawns processes
+# from multiprocessing import Process
 import os
 from os import kill, getpid, listdir
 from os.path import join, isfile
@@ -21,9 +23,13 @@ import traceback
 from sys import version_info
 import mysql.connector
 from mysql.connector import errorcode
+# @added 20261019 - Panorama batched anomaly ingestion
+from mysql.connector.pooling import MySQLConnectionPool
 
 # @added 20190502 - Branch #2646: slack
-from sqlalchemy.sql import select
+# @modified 20261019 - Panorama batched updates
+# The updates are made with the Panorama MySQL connection pool
+# from sqlalchemy.sql import select
 
 import settings
 
@@ -44,10 +50,14 @@ from skyline_functions import (
 # IONOSPHERE_LEARN_DEFAULT_ values or the namespace specific values matched
 # from settings.IONOSPHERE_LEARN_NAMESPACE_CONFIG to the metric database
 # entry.
-from ionosphere_functions import get_ionosphere_learn_details
+# @modified 20261019 - Panorama bulk new metric registration
+# Added get_ionosphere_learn_details_for_metrics
+from ionosphere_functions import (
+    get_ionosphere_learn_details, get_ionosphere_learn_details_for_metrics)
 
 # @added 20190502 - Branch #2646: slack
-from database import get_engine, metrics_table_meta, anomalies_table_meta
+# @modified 20261019 - Panorama batched updates
+# from database import get_engine, metrics_table_meta, anomalies_table_meta
 
 skyline_app = 'panorama'
 skyline_app_logger = '%sLog' % skyline_app
@@ -123,6 +133,31 @@ try:
 except:
     BATCH_PROCESSING_NAMESPACES = []
 
+# @added 20261019 - Panorama batched anomaly ingestion
+try:
+    PANORAMA_MYSQL_POOL_SIZE = int(settings.PANORAMA_MYSQL_POOL_SIZE)
+except:
+    PANORAMA_MYSQL_POOL_SIZE = 3
+try:
+    PANORAMA_CHECK_BATCH_SIZE = int(settings.PANORAMA_CHECK_BATCH_SIZE)
+except:
+    PANORAMA_CHECK_BATCH_SIZE = 100
+try:
+    PANORAMA_CHECK_BATCH_TIME = int(settings.PANORAMA_CHECK_BATCH_TIME)
+except:
+    PANORAMA_CHECK_BATCH_TIME = 20
+
+# @added 20261019 - Panorama bulk new metric registration
+# The number of rows per multi-row INSERT when registering new metrics
+INSERT_NEW_METRICS_BATCH_SIZE = 1000
+# The number of seconds between publishing the ids of all the metrics, in
+# between only the ids of new metrics are published
+PUBLISH_ALL_METRIC_IDS_INTERVAL = 3600
+
+# @added 20261019 - Panorama batched updates
+# The number of rows per grouped UPDATE ... CASE statement
+MYSQL_UPDATE_BATCH_SIZE = 500
+
 # Database configuration
 config = {'user': settings.PANORAMA_DBUSER,
           'password': settings.PANORAMA_DBUSERPASS,
@@ -131,6 +166,29 @@ config = {'user': settings.PANORAMA_DBUSER,
           'database': settings.PANORAMA_DATABASE,
           'raise_on_warnings': True}
 
+# @added 20261019 - Panorama batched anomaly ingestion
+# A MySQL connection pool per process, a pool cannot be shared with the
+# processes that Panorama spawns as the connections would be shared.
+mysql_pools = {}
+
+
+def get_mysql_connection():
+    """
+    Get a connection from the process MySQL connection pool, creating the pool
+    if it does not exist.  Calling close() on the connection returns it to the
+    pool.
+
+    :return: cnx
+    :rtype: object
+
+    """
+    pid = getpid()
+    if pid not in mysql_pools:
+        mysql_pools[pid] = MySQLConnectionPool(
+            pool_name='%s_%s' % (skyline_app, str(pid)),
+            pool_size=PANORAMA_MYSQL_POOL_SIZE, **config)
+    return mysql_pools[pid].get_connection()
+
 
 class Panorama(Thread):
     """
@@ -175,6 +233,13 @@ class Panorama(Thread):
         # self.anomalous_metrics = Manager().list()
         # self.metric_variables = Manager().list()
         self.mysql_conn = mysql.connector.connect(**config)
+        # @added 20261019 - Panorama batched anomaly ingestion
+        # An in memory cache of the ids of hosts, apps, sources, metrics and
+        # algorithms
+        self.mysql_ids = {}
+        # @added 20261019 - Panorama bulk new metric registration
+        # When the ids of all the metrics were last published
+        self.all_metric_ids_published_at = 0
 
     def check_if_parent_is_alive(self):
         """
@@ -191,12 +256,14 @@ class Panorama(Thread):
     for timeseries.
     """
 
-    def mysql_select(self, select):
+    def mysql_select(self, select, params=None):
         """
         Select data from mysql database
 
         :param select: the select string
+        :param params: the optional parameters for the select string
         :type select: str
+        :type params: list
         :return: tuple
         :rtype: tuple, boolean
 
@@ -221,7 +288,9 @@ class Panorama(Thread):
         """
 
         try:
-            cnx = mysql.connector.connect(**config)
+            # @modified 20261019 - Panorama batched anomaly ingestion
+            # cnx = mysql.connector.connect(**config)
+            cnx = get_mysql_connection()
             if ENABLE_PANORAMA_DEBUG:
                 logger.info('debug :: connected to mysql')
         except mysql.connector.Error as err:
@@ -235,7 +304,9 @@ class Panorama(Thread):
                     logger.info('debug :: %s' % (str(select)))
                 cursor = cnx.cursor()
                 query = ('%s' % (str(select)))
-                cursor.execute(query)
+                # @modified 20261019 - Panorama batched updates
+                # cursor.execute(query)
+                cursor.execute(query, params)
                 result = cursor.fetchall()
                 cursor.close()
                 cnx.close()
@@ -283,7 +354,9 @@ class Panorama(Thread):
         """
 
         try:
-            cnx = mysql.connector.connect(**config)
+            # @modified 20261019 - Panorama batched anomaly ingestion
+            # cnx = mysql.connector.connect(**config)
+            cnx = get_mysql_connection()
             if ENABLE_PANORAMA_DEBUG:
                 logger.info('debug :: connected to mysql')
         except mysql.connector.Error as err:
@@ -312,6 +385,272 @@ class Panorama(Thread):
 
         return False
 
+    # @added 20261019 - Panorama batched anomaly ingestion
+    def mysql_insert_many(self, table, columns, rows):
+        """
+        Insert multiple rows into a mysql table with a multi-row INSERT in a
+        single transaction.
+
+        :param table: the table name
+        :param columns: the column names
+        :param rows: a list of tuples of the values for each row
+        :type table: str
+        :type columns: list
+        :type rows: list
+        :return: the id of the first row inserted, with a multi-row INSERT the
+            ids of the rows are >= this id
+        :rtype: int or boolean
+
+        """
+        if not rows:
+            return False
+        row_placeholder = '(%s)' % ', '.join(['%s'] * len(columns))
+        insert = 'INSERT INTO %s (%s) VALUES %s' % (  # nosec
+            table, ', '.join(columns),
+            ', '.join([row_placeholder] * len(rows)))
+        params = []
+        for row in rows:
+            params += list(row)
+        try:
+            cnx = get_mysql_connection()
+        except mysql.connector.Error as err:
+            logger.error('error :: mysql error - %s' % str(err))
+            logger.error('error :: failed to connect to mysql')
+            raise
+        try:
+            cursor = cnx.cursor()
+            cursor.execute(insert, params)
+            first_inserted_id = cursor.lastrowid
+            cnx.commit()
+            cursor.close()
+            cnx.close()
+            return first_inserted_id
+        except mysql.connector.Error as err:
+            logger.error('error :: mysql error - %s' % str(err))
+            logger.error('error :: failed to insert %s records into %s' % (
+                str(len(rows)), table))
+            try:
+                cnx.rollback()
+            except:
+                pass
+            cnx.close()
+            raise
+
+    # @added 20261019 - Panorama batched updates
+    def mysql_update_case(self, table, column, values_by_id):
+        """
+        Update a column for multiple rows in a mysql table with grouped
+        ``UPDATE ... SET column = CASE id WHEN ... END`` statements in a single
+        transaction.
+
+        :param table: the table name
+        :param column: the column name
+        :param values_by_id: a dictionary of the column values keyed by row id
+        :type table: str
+        :type column: str
+        :type values_by_id: dict
+        :return: the ids of the rows updated
+        :rtype: list
+
+        """
+        updated_ids = []
+        if not values_by_id:
+            return updated_ids
+        ids = sorted(values_by_id)
+        try:
+            cnx = get_mysql_connection()
+        except mysql.connector.Error as err:
+            logger.error('error :: mysql error - %s' % str(err))
+            logger.error('error :: failed to connect to mysql')
+            return updated_ids
+        try:
+            cursor = cnx.cursor()
+            for index in range(0, len(ids), MYSQL_UPDATE_BATCH_SIZE):
+                batch_ids = ids[index:(index + MYSQL_UPDATE_BATCH_SIZE)]
+                update = 'UPDATE %s SET %s = CASE id %s END WHERE id IN (%s)' % (  # nosec
+                    table, column, ' '.join(['WHEN %s THEN %s'] * len(batch_ids)),
+                    ', '.join(['%s'] * len(batch_ids)))
+                params = []
+                for row_id in batch_ids:
+                    params += [row_id, values_by_id[row_id]]
+                params += batch_ids
+                cursor.execute(update, params)
+            cnx.commit()
+            cursor.close()
+            updated_ids = ids
+        except mysql.connector.Error as err:
+            logger.error('error :: mysql error - %s' % str(err))
+            logger.error('error :: failed to update %s in %s for %s rows' % (
+                column, table, str(len(ids))))
+            try:
+                cnx.rollback()
+            except:
+                pass
+        try:
+            cnx.close()
+        except:
+            pass
+        return updated_ids
+
+    # @modified 20261019 - Panorama batched anomaly ingestion
+    # Moved determine_id from spin_process to a method and added the in memory
+    # self.mysql_ids cache so that the ids are cached for the life of Panorama
+    # Determine id of something thing
+    def determine_id(self, table, key, value):
+        """
+        Get the id of something from Redis or the database and create a new
+        Redis key with the value if one does not exist.
+
+        :param table: table name
+        :param key: key name
+        :param value: value name
+        :type table: str
+        :type key: str
+        :type value: str
+        :return: int or boolean
+
+        """
+
+        query_cache_key = '%s.mysql_ids.%s.%s.%s' % (skyline_app, table, key, value)
+        determined_id = None
+        redis_determined_id = None
+
+        # @added 20261019 - Panorama batched anomaly ingestion
+        if query_cache_key in self.mysql_ids:
+            return self.mysql_ids[query_cache_key]
+
+        if settings.ENABLE_PANORAMA_DEBUG:
+            logger.info('debug :: query_cache_key - %s' % (query_cache_key))
+
+        try:
+            redis_known_id = self.redis_conn.get(query_cache_key)
+        except:
+            redis_known_id = None
+
+        if redis_known_id:
+            unpacker = Unpacker(use_list=False)
+            unpacker.feed(redis_known_id)
+            redis_determined_id = list(unpacker)
+
+        if redis_determined_id:
+            determined_id = int(redis_determined_id[0])
+
+        if determined_id:
+            if determined_id > 0:
+                self.mysql_ids[query_cache_key] = determined_id
+                return determined_id
+
+        # Query MySQL
+        # @modified 20170913 - Task #2160: Test skyline with bandit
+        # Added nosec to exclude from bandit tests
+        query = 'select id FROM %s WHERE %s=\'%s\'' % (table, key, value)  # nosec
+
+        # @modified 20170916 - Bug #2166: panorama incorrect mysql_id cache keys
+        # Wrap in except
+        # results = self.mysql_select(query)
+        results = None
+        try:
+            results = self.mysql_select(query)
+        except:
+            logger.error('error :: failed to determine results from - %s' % (query))
+
+        determined_id = 0
+        if results:
+            try:
+                determined_id = int(results[0][0])
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                logger.error('error :: determined_id is not an int')
+                determined_id = 0
+
+        if determined_id > 0:
+            # Set the key for a week
+            if not redis_determined_id:
+                try:
+                    self.redis_conn.setex(query_cache_key, 604800, packb(determined_id))
+                    logger.info('set redis query_cache_key - %s - id: %s' % (
+                        query_cache_key, str(determined_id)))
+                except Exception as e:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: failed to set query_cache_key - %s - id: %s' % (
+                        query_cache_key, str(determined_id)))
+            self.mysql_ids[query_cache_key] = int(determined_id)
+            return int(determined_id)
+
+        # @added 20170115 - Feature #1854: Ionosphere learn - generations
+        # Added determination of the learn related variables
+        # learn_full_duration_days, learn_valid_ts_older_than,
+        # max_generations and max_percent_diff_from_origin value to the
+        # insert statement if the table is the metrics table.
+        if table == 'metrics' and key == 'metric':
+            # Set defaults
+            learn_full_duration_days = int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS)
+            valid_learning_duration = int(settings.IONOSPHERE_LEARN_DEFAULT_VALID_TIMESERIES_OLDER_THAN_SECONDS)
+            max_generations = int(settings.IONOSPHERE_LEARN_DEFAULT_MAX_GENERATIONS)
+            max_percent_diff_from_origin = float(settings.IONOSPHERE_LEARN_DEFAULT_MAX_PERCENT_DIFF_FROM_ORIGIN)
+            try:
+                use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin = get_ionosphere_learn_details(skyline_app, value)
+                learn_full_duration_days = use_full_duration_days
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to get_ionosphere_learn_details for %s' % value)
+
+            logger.info('metric learn details determined for %s' % value)
+            logger.info('learn_full_duration_days     :: %s days' % (str(learn_full_duration_days)))
+            logger.info('valid_learning_duration      :: %s seconds' % (str(valid_learning_duration)))
+            logger.info('max_generations              :: %s' % (str(max_generations)))
+            logger.info('max_percent_diff_from_origin :: %s' % (str(max_percent_diff_from_origin)))
+
+        # INSERT because no known id
+        # @modified 20170115 - Feature #1854: Ionosphere learn - generations
+        # Added the learn_full_duration_days, learn_valid_ts_older_than,
+        # max_generations and max_percent_diff_from_origin value to the
+        # insert statement if the table is the metrics table.
+        # insert_query = 'insert into %s (%s) VALUES (\'%s\')' % (table, key, value)
+        if table == 'metrics' and key == 'metric':
+            # @modified 20170913 - Task #2160: Test skyline with bandit
+            # Added nosec to exclude from bandit tests
+            insert_query_string = '%s (%s, learn_full_duration_days, learn_valid_ts_older_than, max_generations, max_percent_diff_from_origin) VALUES (\'%s\', %s, %s, %s, %s)' % (
+                table, key, value, str(learn_full_duration_days),
+                str(valid_learning_duration), str(max_generations),
+                str(max_percent_diff_from_origin))
+            insert_query = 'insert into %s' % insert_query_string  # nosec
+        else:
+            insert_query = 'insert into %s (%s) VALUES (\'%s\')' % (table, key, value)  # nosec
+
+        logger.info('inserting %s into %s table' % (value, table))
+        try:
+            results = self.mysql_insert(insert_query)
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to determine the id of %s from the insert' % (value))
+            raise
+
+        determined_id = 0
+        if results:
+            determined_id = int(results)
+        else:
+            logger.error('error :: results not set')
+            raise
+
+        if determined_id > 0:
+            # Set the key for a week
+            if not redis_determined_id:
+                try:
+                    self.redis_conn.setex(query_cache_key, 604800, packb(determined_id))
+                    logger.info('set redis query_cache_key - %s - id: %s' % (
+                        query_cache_key, str(determined_id)))
+                except Exception as e:
+                    logger.error(traceback.format_exc())
+                    logger.error('%s' % str(e))
+                    logger.error('error :: failed to set query_cache_key - %s - id: %s' % (
+                        query_cache_key, str(determined_id)))
+            self.mysql_ids[query_cache_key] = determined_id
+            return determined_id
+
+        logger.error('error :: failed to determine the inserted id for %s' % value)
+        return False
+
     # @added 20200204 - Feature #3442: Panorama - add metric to metrics table immediately
     def insert_new_metric(self, metric_name):
         """
@@ -360,6 +699,83 @@ class Panorama(Thread):
         logger.error('error :: failed to determine the inserted id for %s' % metric_name)
         return False
 
+    # @added 20261019 - Panorama bulk new metric registration
+    def insert_new_metrics(self, base_names):
+        """
+        Insert multiple new metrics into the metrics table with batched
+        multi-row inserts, with the learn details for all the metrics
+        determined in one pass.
+
+        :param base_names: the metric names
+        :type base_names: list
+        :return: a dictionary of the inserted metric ids keyed by metric name
+        :rtype: dict
+
+        """
+        metric_ids = {}
+        if not base_names:
+            return metric_ids
+        learn_details = get_ionosphere_learn_details_for_metrics(skyline_app, base_names)
+        columns = [
+            'metric', 'learn_full_duration_days', 'learn_valid_ts_older_than',
+            'max_generations', 'max_percent_diff_from_origin']
+        first_inserted_ids = []
+        for index in range(0, len(base_names), INSERT_NEW_METRICS_BATCH_SIZE):
+            batch_base_names = base_names[index:(index + INSERT_NEW_METRICS_BATCH_SIZE)]
+            rows = []
+            for base_name in batch_base_names:
+                use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin = learn_details[base_name]
+                rows.append((
+                    base_name, use_full_duration_days, valid_learning_duration,
+                    max_generations, max_percent_diff_from_origin))
+            try:
+                first_inserted_id = self.mysql_insert_many('metrics', columns, rows)
+                if first_inserted_id:
+                    first_inserted_ids.append(int(first_inserted_id))
+                logger.info('inserted %s metrics into metrics table' % str(len(rows)))
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: failed to insert %s metrics into metrics table' % str(len(rows)))
+        if not first_inserted_ids:
+            return metric_ids
+        query = 'SELECT id, metric FROM metrics WHERE id >= %s' % str(min(first_inserted_ids))  # nosec
+        results = self.mysql_select(query)
+        if results:
+            for metric_id, metric in results:
+                metric_ids[str(metric)] = int(metric_id)
+        return metric_ids
+
+    # @added 20261019 - Panorama bulk new metric registration
+    def publish_metric_ids(self, metric_ids):
+        """
+        Add the metric ids to the in memory self.mysql_ids cache, the
+        panorama.mysql_ids.metrics.metric.<metric> Redis keys and the
+        panorama.metrics.ids Redis hash, which is the shared metric name to id
+        map used by other apps, e.g. Luminosity.
+
+        :param metric_ids: a dictionary of the metric ids keyed by metric name
+        :type metric_ids: dict
+        :return: boolean
+        :rtype: boolean
+
+        """
+        if not metric_ids:
+            return False
+        try:
+            pipe = self.redis_conn.pipeline()
+            for metric in metric_ids:
+                query_cache_key = '%s.mysql_ids.metrics.metric.%s' % (skyline_app, metric)
+                self.mysql_ids[query_cache_key] = metric_ids[metric]
+                pipe.setex(query_cache_key, 604800, packb(metric_ids[metric]))
+            pipe.hmset('%s.metrics.ids' % skyline_app, metric_ids)
+            pipe.execute()
+            logger.info('published %s metric ids' % str(len(metric_ids)))
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to publish metric ids')
+            return False
+        return True
+
     # @added 20170101 - Feature #1830: Ionosphere alerts
     #                   Bug #1460: panorama check file fails
     #                   Panorama check file fails #24
@@ -480,208 +896,96 @@ class Panorama(Thread):
 
         return metric_vars_array
 
-    def update_slack_thread_ts(self, i, base_name, metric_timestamp, slack_thread_ts):
+    # @modified 20261019 - Panorama batched updates
+    # Replaced update_slack_thread_ts which was run in a Process per update
+    # with update_slack_thread_ts_batch which updates all the anomalies in a
+    # cycle with grouped UPDATE ... CASE statements
+    def update_slack_thread_ts_batch(self, slack_thread_ts_updates):
         """
-        Update an anomaly record with the slack_thread_ts.
+        Update anomaly records with their slack_thread_ts.
 
-        :param i: python process id
-        :param metric_check_file: full path to the metric check file
-
-        :return: returns True
+        :param slack_thread_ts_updates: a list of
+            [cache_key, base_name, metric_timestamp, slack_thread_ts] items
+        :type slack_thread_ts_updates: list
+        :return: the number of anomaly records updated
+        :rtype: int
 
         """
-
-        def get_an_engine():
-            try:
-                engine, log_msg, trace = get_engine(skyline_app)
-                return engine, log_msg, trace
-            except:
-                logger.error(traceback.format_exc())
-                log_msg = 'error :: update_slack_thread_ts :: failed to get MySQL engine in update_slack_thread_ts'
-                logger.error('error :: update_slack_thread_ts :: failed to get MySQL engine in update_slack_thread_ts')
-                return None, log_msg, trace
-
-        def engine_disposal(engine):
-            if engine:
-                try:
-                    engine.dispose()
-                except:
-                    logger.error(traceback.format_exc())
-                    logger.error('error :: update_slack_thread_ts :: calling engine.dispose()')
-            return
-
-        child_process_pid = os.getpid()
-        logger.info('update_slack_thread_ts :: child_process_pid %s, processing %s, %s, %s' % (
-            str(child_process_pid), base_name, str(metric_timestamp),
-            str(slack_thread_ts)))
-        try:
-            engine, log_msg, trace = get_an_engine()
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_slack_thread_ts :: could not get a MySQL engine to update slack_thread_ts in anomalies for %s' % (base_name))
-        if not engine:
-            logger.error('error :: update_slack_thread_ts :: engine not obtained to update slack_thread_ts in anomalies for %s' % (base_name))
-            return False
-        try:
-            metrics_table, log_msg, trace = metrics_table_meta(skyline_app, engine)
-            logger.info(log_msg)
-            logger.info('update_slack_thread_ts :: metrics_table OK')
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_slack_thread_ts :: failed to get metrics_table meta for %s' % base_name)
-        metric_id = None
-        try:
-            connection = engine.connect()
-            stmt = select([metrics_table]).where(metrics_table.c.metric == base_name)
-            result = connection.execute(stmt)
-            for row in result:
-                metric_id = int(row['id'])
-            connection.close()
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_slack_thread_ts :: could not determine metric id from metrics table')
-        logger.info('update_slack_thread_ts :: metric id determined as %s' % str(metric_id))
-        if metric_id:
-            try:
-                anomalies_table, log_msg, trace = anomalies_table_meta(skyline_app, engine)
-                logger.info(log_msg)
-                logger.info('update_slack_thread_ts :: anomalies_table OK')
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: update_slack_thread_ts :: failed to get anomalies_table meta for %s' % base_name)
-        anomaly_id = None
-        try:
-            connection = engine.connect()
-            stmt = select([anomalies_table]).\
-                where(anomalies_table.c.metric_id == metric_id).\
-                where(anomalies_table.c.anomaly_timestamp == metric_timestamp)
-            result = connection.execute(stmt)
-            for row in result:
-                anomaly_id = int(row['id'])
-            connection.close()
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_slack_thread_ts :: could not determine anomaly id from anomaly table')
-        logger.info('update_slack_thread_ts :: anomaly id determined as %s' % str(anomaly_id))
-        anomaly_record_updated = False
-        if anomaly_id:
-            try:
-                connection = engine.connect()
-                connection.execute(
-                    anomalies_table.update(
-                        anomalies_table.c.id == anomaly_id).
-                    values(slack_thread_ts=slack_thread_ts))
-                connection.close()
-                logger.info('update_slack_thread_ts :: updated slack_thread_ts for anomaly id %s' % str(anomaly_id))
-                anomaly_record_updated = True
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: update_slack_thread_ts :: could not update slack_thread_ts for anomaly id %s' % str(anomaly_id))
-        if engine:
-            try:
-                engine_disposal(engine)
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: update_slack_thread_ts :: could not dispose engine')
-        cache_key = 'panorama.slack_thread_ts.%s.%s' % (str(metric_timestamp), base_name)
-        delete_cache_key = False
-        if anomaly_record_updated:
-            delete_cache_key = True
-        if not anomaly_record_updated:
-            # Allow for 60 seconds for an anomaly to be added
-            now = time()
-            anomaly_age = int(now) - int(metric_timestamp)
-            if anomaly_age > 60:
-                delete_cache_key = True
-        if delete_cache_key:
-            logger.info('update_slack_thread_ts :: deleting cache_key %s' % cache_key)
+        if not slack_thread_ts_updates:
+            return 0
+
+        base_names = list(set([item[1] for item in slack_thread_ts_updates]))
+        metric_timestamps = list(set([int(item[2]) for item in slack_thread_ts_updates]))
+        metric_ids = {}
+        for index in range(0, len(base_names), MYSQL_UPDATE_BATCH_SIZE):
+            batch_base_names = base_names[index:(index + MYSQL_UPDATE_BATCH_SIZE)]
+            query = 'SELECT id, metric FROM metrics WHERE metric IN (%s)' % ', '.join(['%s'] * len(batch_base_names))
+            results = self.mysql_select(query, batch_base_names)
+            if results:
+                for metric_id, metric in results:
+                    metric_ids[str(metric)] = int(metric_id)
+        logger.info('update_slack_thread_ts_batch :: determined %s metric ids of %s metrics' % (
+            str(len(metric_ids)), str(len(base_names))))
+
+        anomaly_ids = {}
+        if metric_ids:
+            query = 'SELECT id, metric_id, anomaly_timestamp FROM anomalies WHERE metric_id IN (%s) AND anomaly_timestamp IN (%s)' % (
+                ', '.join(['%s'] * len(metric_ids)),
+                ', '.join(['%s'] * len(metric_timestamps)))
+            results = self.mysql_select(query, list(metric_ids.values()) + metric_timestamps)
+            if results:
+                for anomaly_id, metric_id, anomaly_timestamp in results:
+                    anomaly_ids[(int(metric_id), int(anomaly_timestamp))] = int(anomaly_id)
+
+        slack_thread_ts_by_anomaly_id = {}
+        for cache_key, base_name, metric_timestamp, slack_thread_ts in slack_thread_ts_updates:
+            anomaly_id = anomaly_ids.get((metric_ids.get(base_name), int(metric_timestamp)))
+            if anomaly_id:
+                slack_thread_ts_by_anomaly_id[anomaly_id] = slack_thread_ts
+        updated_anomaly_ids = self.mysql_update_case(
+            'anomalies', 'slack_thread_ts', slack_thread_ts_by_anomaly_id)
+        logger.info('update_slack_thread_ts_batch :: updated slack_thread_ts for %s anomalies' % (
+            str(len(updated_anomaly_ids))))
+
+        # Delete the keys of the updated anomalies and allow for 60 seconds
+        # for an anomaly to be added for the others
+        cache_keys_to_delete = []
+        now = int(time())
+        for cache_key, base_name, metric_timestamp, slack_thread_ts in slack_thread_ts_updates:
+            anomaly_id = anomaly_ids.get((metric_ids.get(base_name), int(metric_timestamp)))
+            if anomaly_id in updated_anomaly_ids or (now - int(metric_timestamp)) > 60:
+                cache_keys_to_delete.append(cache_key)
+        if cache_keys_to_delete:
             try:
-                self.redis_conn.delete(cache_key)
-                logger.info('update_slack_thread_ts :: cache_key %s deleted' % cache_key)
+                self.redis_conn.delete(*cache_keys_to_delete)
+                logger.info('update_slack_thread_ts_batch :: deleted %s cache keys' % str(len(cache_keys_to_delete)))
             except:
                 logger.error(traceback.format_exc())
-                logger.error('error :: update_slack_thread_ts :: failed to delete cache_key %s' % cache_key)
-        return
+                logger.error('error :: update_slack_thread_ts_batch :: failed to delete cache keys')
+        return len(updated_anomaly_ids)
 
     # @added 20191107 - Feature #3306: Record anomaly_end_timestamp
     #                   Branch #3262: py3
-    def update_anomaly_end_timestamp(self, i, anomaly_id, anomaly_end_timestamp):
+    # @modified 20261019 - Panorama batched updates
+    # Replaced update_anomaly_end_timestamp which was run in a Process per
+    # update with update_anomaly_end_timestamp_batch
+    def update_anomaly_end_timestamp_batch(self, anomaly_end_timestamps):
         """
-        Update an anomaly record with the anomaly_end_timestamp.
+        Update anomaly records with their anomaly_end_timestamp.
 
         :param self: self
-        :param i: python process id
-        :param anomaly_id: the anomaly id
-        :param anomaly_end_timestamp: the anomaly end timestamp
+        :param anomaly_end_timestamps: a dictionary of the anomaly end
+            timestamps keyed by anomaly id
         :type self: object
-        :type i: object
-        :type anomaly_id: int
-        :type anomaly_end_timestamp: int
-        :return: boolean
-        :rtype: boolean
+        :type anomaly_end_timestamps: dict
+        :return: the ids of the anomalies updated
+        :rtype: list
         """
-
-        def get_an_engine():
-            try:
-                engine, log_msg, trace = get_engine(skyline_app)
-                return engine, log_msg, trace
-            except:
-                logger.error(traceback.format_exc())
-                log_msg = 'error :: update_anomaly_end_timestamp :: failed to get MySQL engine in update_anomaly_end_timestamp'
-                logger.error('error :: update_anomaly_end_timestamp :: failed to get MySQL engine in update_anomaly_end_timestamp')
-                return None, log_msg, trace
-
-        def engine_disposal(engine):
-            if engine:
-                try:
-                    engine.dispose()
-                except:
-                    logger.error(traceback.format_exc())
-                    logger.error('error :: update_anomaly_end_timestamp :: calling engine.dispose()')
-            return
-
-        child_process_pid = os.getpid()
-        logger.info('update_anomaly_end_timestamp :: child_process_pid %s, processing anomaly_id %s and setting anomaly_end_timestamp as %s' % (
-            str(child_process_pid), str(anomaly_id), str(anomaly_end_timestamp)))
-        updated_anomaly_record = False
-        try:
-            engine, log_msg, trace = get_an_engine()
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_anomaly_end_timestamp :: could not get a MySQL engine to update slack_thread_ts in anomalies for anomaly_id %s' % (str(anomaly_id)))
-        if not engine:
-            logger.error('error :: update_anomaly_end_timestamp :: engine not obtained to update slack_thread_ts in anomalies for anomaly_id %s' % (str(anomaly_id)))
-            return False
-
-        try:
-            anomalies_table, log_msg, trace = anomalies_table_meta(skyline_app, engine)
-            logger.info(log_msg)
-            logger.info('update_anomaly_end_timestamp :: anomalies_table OK')
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_anomaly_end_timestamp :: failed to get anomalies_table meta for anomaly_id %s' % str(anomaly_id))
-
-        try:
-            connection = engine.connect()
-            connection.execute(
-                anomalies_table.update(
-                    anomalies_table.c.id == anomaly_id).
-                values(anomaly_end_timestamp=anomaly_end_timestamp))
-            connection.close()
-            updated_anomaly_record = True
-            logger.info('update_anomaly_end_timestamp :: updated anomaly_end_timestamp (%s) for anomaly id %s' % (
-                str(anomaly_end_timestamp), str(anomaly_id)))
-        except:
-            logger.error(traceback.format_exc())
-            logger.error('error :: update_anomaly_end_timestamp :: could not update anomaly_end_timestamp (%s) for anomaly id %s' % (
-                str(anomaly_end_timestamp), str(anomaly_id)))
-        if engine:
-            try:
-                engine_disposal(engine)
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: update_anomaly_end_timestamp :: could not dispose engine')
-        return updated_anomaly_record
+        updated_anomaly_ids = self.mysql_update_case(
+            'anomalies', 'anomaly_end_timestamp', anomaly_end_timestamps)
+        logger.info('update_anomaly_end_timestamp_batch :: updated anomaly_end_timestamp for %s of %s anomalies' % (
+            str(len(updated_anomaly_ids)), str(len(anomaly_end_timestamps))))
+        return updated_anomaly_ids
 
     def spin_process(self, i, metric_check_file):
         """
@@ -690,7 +994,8 @@ class Panorama(Thread):
         :param i: python process id
         :param metric_check_file: full path to the metric check file
 
-        :return: returns True
+        :return: returns the anomaly dict to be inserted by insert_anomalies or
+            ``False``
 
         """
 
@@ -1002,6 +1307,10 @@ class Panorama(Thread):
         # Evaluate the reported anomaly timestamp to determine whether
         # PANORAMA_EXPIRY_TIME should be applied to a batch metric
         batch_metric = None
+        # @added 20261019 - Panorama batched anomaly ingestion
+        # Declared here as it is returned in the anomaly dict so that run can
+        # apply the batch metric rule to the anomalies of the same batch
+        analyzer_batch_anomaly = None
         if BATCH_PROCESSING:
             batch_metric = True
             try:
@@ -1099,177 +1408,29 @@ class Panorama(Thread):
 
             return
 
-        # Determine id of something thing
-        def determine_id(table, key, value):
-            """
-            Get the id of something from Redis or the database and create a new
-            Redis key with the value if one does not exist.
-
-            :param table: table name
-            :param key: key name
-            :param value: value name
-            :type table: str
-            :type key: str
-            :type value: str
-            :return: int or boolean
-
-            """
-
-            query_cache_key = '%s.mysql_ids.%s.%s.%s' % (skyline_app, table, key, value)
-            determined_id = None
-            redis_determined_id = None
-            if settings.ENABLE_PANORAMA_DEBUG:
-                logger.info('debug :: query_cache_key - %s' % (query_cache_key))
-
-            try:
-                redis_known_id = self.redis_conn.get(query_cache_key)
-            except:
-                redis_known_id = None
-
-            if redis_known_id:
-                unpacker = Unpacker(use_list=False)
-                unpacker.feed(redis_known_id)
-                redis_determined_id = list(unpacker)
-
-            if redis_determined_id:
-                determined_id = int(redis_determined_id[0])
-
-            if determined_id:
-                if determined_id > 0:
-                    return determined_id
-
-            # Query MySQL
-            # @modified 20170913 - Task #2160: Test skyline with bandit
-            # Added nosec to exclude from bandit tests
-            query = 'select id FROM %s WHERE %s=\'%s\'' % (table, key, value)  # nosec
-
-            # @modified 20170916 - Bug #2166: panorama incorrect mysql_id cache keys
-            # Wrap in except
-            # results = self.mysql_select(query)
-            results = None
-            try:
-                results = self.mysql_select(query)
-            except:
-                logger.error('error :: failed to determine results from - %s' % (query))
-
-            determined_id = 0
-            if results:
-                try:
-                    determined_id = int(results[0][0])
-                except Exception as e:
-                    logger.error(traceback.format_exc())
-                    logger.error('error :: determined_id is not an int')
-                    determined_id = 0
-
-            if determined_id > 0:
-                # Set the key for a week
-                if not redis_determined_id:
-                    try:
-                        self.redis_conn.setex(query_cache_key, 604800, packb(determined_id))
-                        logger.info('set redis query_cache_key - %s - id: %s' % (
-                            query_cache_key, str(determined_id)))
-                    except Exception as e:
-                        logger.error(traceback.format_exc())
-                        logger.error('error :: failed to set query_cache_key - %s - id: %s' % (
-                            query_cache_key, str(determined_id)))
-                return int(determined_id)
-
-            # @added 20170115 - Feature #1854: Ionosphere learn - generations
-            # Added determination of the learn related variables
-            # learn_full_duration_days, learn_valid_ts_older_than,
-            # max_generations and max_percent_diff_from_origin value to the
-            # insert statement if the table is the metrics table.
-            if table == 'metrics' and key == 'metric':
-                # Set defaults
-                learn_full_duration_days = int(settings.IONOSPHERE_LEARN_DEFAULT_FULL_DURATION_DAYS)
-                valid_learning_duration = int(settings.IONOSPHERE_LEARN_DEFAULT_VALID_TIMESERIES_OLDER_THAN_SECONDS)
-                max_generations = int(settings.IONOSPHERE_LEARN_DEFAULT_MAX_GENERATIONS)
-                max_percent_diff_from_origin = float(settings.IONOSPHERE_LEARN_DEFAULT_MAX_PERCENT_DIFF_FROM_ORIGIN)
-                try:
-                    use_full_duration, valid_learning_duration, use_full_duration_days, max_generations, max_percent_diff_from_origin = get_ionosphere_learn_details(skyline_app, value)
-                    learn_full_duration_days = use_full_duration_days
-                except:
-                    logger.error(traceback.format_exc())
-                    logger.error('error :: failed to get_ionosphere_learn_details for %s' % value)
-
-                logger.info('metric learn details determined for %s' % value)
-                logger.info('learn_full_duration_days     :: %s days' % (str(learn_full_duration_days)))
-                logger.info('valid_learning_duration      :: %s seconds' % (str(valid_learning_duration)))
-                logger.info('max_generations              :: %s' % (str(max_generations)))
-                logger.info('max_percent_diff_from_origin :: %s' % (str(max_percent_diff_from_origin)))
-
-            # INSERT because no known id
-            # @modified 20170115 - Feature #1854: Ionosphere learn - generations
-            # Added the learn_full_duration_days, learn_valid_ts_older_than,
-            # max_generations and max_percent_diff_from_origin value to the
-            # insert statement if the table is the metrics table.
-            # insert_query = 'insert into %s (%s) VALUES (\'%s\')' % (table, key, value)
-            if table == 'metrics' and key == 'metric':
-                # @modified 20170913 - Task #2160: Test skyline with bandit
-                # Added nosec to exclude from bandit tests
-                insert_query_string = '%s (%s, learn_full_duration_days, learn_valid_ts_older_than, max_generations, max_percent_diff_from_origin) VALUES (\'%s\', %s, %s, %s, %s)' % (
-                    table, key, value, str(learn_full_duration_days),
-                    str(valid_learning_duration), str(max_generations),
-                    str(max_percent_diff_from_origin))
-                insert_query = 'insert into %s' % insert_query_string  # nosec
-            else:
-                insert_query = 'insert into %s (%s) VALUES (\'%s\')' % (table, key, value)  # nosec
-
-            logger.info('inserting %s into %s table' % (value, table))
-            try:
-                results = self.mysql_insert(insert_query)
-            except:
-                logger.error(traceback.format_exc())
-                logger.error('error :: failed to determine the id of %s from the insert' % (value))
-                raise
-
-            determined_id = 0
-            if results:
-                determined_id = int(results)
-            else:
-                logger.error('error :: results not set')
-                raise
-
-            if determined_id > 0:
-                # Set the key for a week
-                if not redis_determined_id:
-                    try:
-                        self.redis_conn.setex(query_cache_key, 604800, packb(determined_id))
-                        logger.info('set redis query_cache_key - %s - id: %s' % (
-                            query_cache_key, str(determined_id)))
-                    except Exception as e:
-                        logger.error(traceback.format_exc())
-                        logger.error('%s' % str(e))
-                        logger.error('error :: failed to set query_cache_key - %s - id: %s' % (
-                            query_cache_key, str(determined_id)))
-                return determined_id
-
-            logger.error('error :: failed to determine the inserted id for %s' % value)
-            return False
-
         try:
-            added_by_host_id = determine_id('hosts', 'host', added_by)
+            added_by_host_id = self.determine_id('hosts', 'host', added_by)
         except:
             logger.error('error :: failed to determine id of %s' % (added_by))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             return False
 
         try:
-            app_id = determine_id('apps', 'app', app)
+            app_id = self.determine_id('apps', 'app', app)
         except:
             logger.error('error :: failed to determine id of %s' % (app))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             return False
 
         try:
-            source_id = determine_id('sources', 'source', source)
+            source_id = self.determine_id('sources', 'source', source)
         except:
             logger.error('error :: failed to determine id of %s' % (source))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             return False
 
         try:
-            metric_id = determine_id('metrics', 'metric', metric)
+            metric_id = self.determine_id('metrics', 'metric', metric)
         except:
             logger.error('error :: failed to determine id of %s' % (metric))
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
@@ -1278,7 +1439,7 @@ class Panorama(Thread):
         algorithms_ids_csv = ''
         for algorithm in algorithms:
             try:
-                algorithm_id = determine_id('algorithms', 'algorithm', algorithm)
+                algorithm_id = self.determine_id('algorithms', 'algorithm', algorithm)
             except:
                 logger.error('error :: failed to determine id of %s' % (algorithm))
                 fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
@@ -1292,7 +1453,7 @@ class Panorama(Thread):
         triggered_algorithms_ids_csv = ''
         for triggered_algorithm in triggered_algorithms:
             try:
-                triggered_algorithm_id = determine_id('algorithms', 'algorithm', triggered_algorithm)
+                triggered_algorithm_id = self.determine_id('algorithms', 'algorithm', triggered_algorithm)
             except:
                 logger.error('error :: failed to determine id of %s' % (triggered_algorithm))
                 fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
@@ -1304,7 +1465,11 @@ class Panorama(Thread):
                     triggered_algorithms_ids_csv, str(triggered_algorithm_id))
                 triggered_algorithms_ids_csv = new_triggered_algorithms_ids_csv
 
-        logger.info('inserting anomaly')
+        # @modified 20261019 - Panorama batched anomaly ingestion
+        # The anomaly is no longer inserted by spin_process, the anomaly is
+        # returned and all the anomalies of the cycle are inserted by
+        # insert_anomalies in a single transaction
+        # logger.info('inserting anomaly')
         try:
             full_duration = int(metric_timestamp) - int(from_timestamp)
             if settings.ENABLE_PANORAMA_DEBUG:
@@ -1324,25 +1489,6 @@ class Panorama(Thread):
             return False
 
         try:
-            # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
-            #                      Feature #1448: Crucible web UI
-            #                      Branch #868: crucible
-            # Added label and user_id
-            columns = '%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s' % (
-                'metric_id', 'host_id', 'app_id', 'source_id',
-                'anomaly_timestamp', 'anomalous_datapoint', 'full_duration',
-                'algorithms_run', 'triggered_algorithms', 'label', 'user_id')
-            if settings.ENABLE_PANORAMA_DEBUG:
-                logger.info('debug :: columns - %s' % str(columns))
-        except:
-            logger.error('error :: failed to construct columns string')
-            logger.info(traceback.format_exc())
-            fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
-            return False
-
-        try:
-            # @modified 20170913 - Task #2160: Test skyline with bandit
-            # Added nosec to exclude from bandit tests
             # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
             #                      Feature #1448: Crucible web UI
             #                      Branch #868: crucible
@@ -1350,84 +1496,156 @@ class Panorama(Thread):
             if not user_id:
                 # User the Skyline user id
                 user_id = 1
-            query_string = '(%s) VALUES (%d, %d, %d, %d, %s, %.6f, %d, \'%s\', \'%s\', \'%s\', %d)' % (
-                columns, metric_id, added_by_host_id, app_id, source_id,
-                metric_timestamp, anomalous_datapoint, full_duration,
-                algorithms_ids_csv, triggered_algorithms_ids_csv, str(label),
-                int(user_id))
-            query = 'insert into anomalies %s' % query_string  # nosec
+            # @modified 20261019 - Panorama batched anomaly ingestion
+            # The row values in the order of anomalies_columns
+            anomaly_row = (
+                int(metric_id), int(added_by_host_id), int(app_id),
+                int(source_id), int(metric_timestamp), anomalous_datapoint,
+                int(full_duration), algorithms_ids_csv,
+                triggered_algorithms_ids_csv, str(label), int(user_id))
         except:
-            logger.error('error :: failed to construct insert query')
+            logger.error('error :: failed to construct anomaly row')
             logger.info(traceback.format_exc())
             fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
             return False
 
         if settings.ENABLE_PANORAMA_DEBUG:
-            logger.info('debug :: anomaly insert - %s' % str(query))
+            logger.info('debug :: anomaly row - %s' % str(anomaly_row))
+
+        anomaly = {
+            'metric': metric,
+            'metric_timestamp': int(metric_timestamp),
+            'value': value,
+            'app': app,
+            'cache_key': cache_key,
+            'batch_metric': batch_metric,
+            'analyzer_batch_anomaly': analyzer_batch_anomaly,
+            'set_anomaly_key': set_anomaly_key,
+            'add_to_current_anomalies': add_to_current_anomalies,
+            'metric_check_file': str(metric_check_file),
+            'metric_failed_check_dir': metric_failed_check_dir,
+            'row': anomaly_row,
+        }
+        return anomaly
+
+    # @added 20261019 - Panorama batched anomaly ingestion
+    def insert_anomalies(self, anomalies):
+        """
+        Insert the anomalies determined by spin_process into the anomalies
+        table with a multi-row INSERT in a single transaction, set the Panorama
+        last_check keys, add the anomalies to the current.anomalies Redis set
+        and remove the check files.
+
+        :param anomalies: a list of anomaly dicts returned by spin_process
+        :type anomalies: list
+        :return: a list of the anomaly ids
+        :rtype: list
 
-        try:
-            anomaly_id = self.mysql_insert(query)
-            logger.info('anomaly id - %d - created for %s at %s' % (
-                anomaly_id, metric, metric_timestamp))
-        except:
-            logger.error('error :: failed to insert anomaly %s at %s' % (
-                metric, metric_timestamp))
-            fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
-            return False
+        """
+        if not anomalies:
+            return []
 
-        # Set anomaly record cache key
         # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
         #                      Feature #1448: Crucible web UI
         #                      Branch #868: crucible
-        # Only if it was not added_by webapp or crucible
-        if set_anomaly_key:
-            try:
-                # @modified 20200413 - Feature #3486: analyzer_batch
-                #                   Feature #3480: batch_processing
-                # Set key to timestamp if a batch metric.  I have looked and cannot
-                # find where the panorama.last_check is used anyway else other than
-                # above in panorama its self and further it does not appear that the
-                # packb(value) is used at all, just the existence of the key its
-                # self.
-                if batch_metric:
-                    self.redis_conn.setex(
-                        cache_key, settings.PANORAMA_EXPIRY_TIME,
-                        int(metric_timestamp))
-                else:
-                    self.redis_conn.setex(
-                        cache_key, settings.PANORAMA_EXPIRY_TIME, packb(value))
-                logger.info('set cache_key - %s.last_check.%s.%s - %s' % (
-                    skyline_app, app, metric, str(settings.PANORAMA_EXPIRY_TIME)))
-            except Exception as e:
-                logger.error(
-                    'error :: could not query cache_key - %s.last_check.%s.%s - %s' % (
-                        skyline_app, app, metric, e))
+        # Added label and user_id
+        anomalies_columns = [
+            'metric_id', 'host_id', 'app_id', 'source_id',
+            'anomaly_timestamp', 'anomalous_datapoint', 'full_duration',
+            'algorithms_run', 'triggered_algorithms', 'label', 'user_id']
+
+        logger.info('inserting %s anomalies' % str(len(anomalies)))
+        first_anomaly_id = None
+        try:
+            first_anomaly_id = self.mysql_insert_many(
+                'anomalies', anomalies_columns,
+                [anomaly['row'] for anomaly in anomalies])
+        except:
+            logger.error(traceback.format_exc())
+            logger.error('error :: failed to insert %s anomalies' % str(len(anomalies)))
+        if not first_anomaly_id:
+            for anomaly in anomalies:
+                fail_check(skyline_app, anomaly['metric_failed_check_dir'], anomaly['metric_check_file'])
+            return []
+
+        # Determine the ids of the inserted anomalies, the ids of the rows of a
+        # multi-row INSERT are not guaranteed to be consecutive
+        inserted_ids = {}
+        query = 'SELECT id, metric_id, anomaly_timestamp FROM anomalies WHERE id >= %s' % str(int(first_anomaly_id))  # nosec
+        results = self.mysql_select(query)
+        if results:
+            for anomaly_id, metric_id, anomaly_timestamp in results:
+                inserted_ids[(int(metric_id), int(anomaly_timestamp))] = int(anomaly_id)
+
+        anomaly_ids = []
+        for anomaly in anomalies:
+            metric = anomaly['metric']
+            metric_timestamp = anomaly['metric_timestamp']
+            app = anomaly['app']
+            cache_key = anomaly['cache_key']
+            anomaly_id = inserted_ids.get((anomaly['row'][0], metric_timestamp))
+            if anomaly_id:
+                anomaly_ids.append(anomaly_id)
+                logger.info('anomaly id - %d - created for %s at %s' % (
+                    anomaly_id, metric, metric_timestamp))
+            else:
+                logger.error('error :: failed to determine the anomaly id for %s at %s' % (
+                    metric, metric_timestamp))
 
-        # @added 20191031 - Feature #3306: Record anomaly_end_timestamp
-        # Add to current anomalies set
-        # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
-        #                      Feature #1448: Crucible web UI
-        #                      Branch #868: crucible
-        # Only if it was not added_by webapp or crucible
-        if add_to_current_anomalies:
-            try:
-                redis_set = 'current.anomalies'
-                data = [metric, metric_timestamp, anomaly_id, None]
-                self.redis_conn.sadd(redis_set, str(data))
-                logger.info('added %s to Redis set %s' % (str(data), redis_set))
-            except Exception as e:
-                logger.error(
-                    'error :: could not add %s to Redis set %s - %s' % (
-                        str(data), redis_set, e))
+            # Set anomaly record cache key
+            # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
+            #                      Feature #1448: Crucible web UI
+            #                      Branch #868: crucible
+            # Only if it was not added_by webapp or crucible
+            if anomaly['set_anomaly_key']:
+                try:
+                    # @modified 20200413 - Feature #3486: analyzer_batch
+                    #                   Feature #3480: batch_processing
+                    # Set key to timestamp if a batch metric.  I have looked and cannot
+                    # find where the panorama.last_check is used anyway else other than
+                    # above in panorama its self and further it does not appear that the
+                    # packb(value) is used at all, just the existence of the key its
+                    # self.
+                    if anomaly['batch_metric']:
+                        self.redis_conn.setex(
+                            cache_key, settings.PANORAMA_EXPIRY_TIME,
+                            int(metric_timestamp))
+                    else:
+                        self.redis_conn.setex(
+                            cache_key, settings.PANORAMA_EXPIRY_TIME, packb(anomaly['value']))
+                    logger.info('set cache_key - %s.last_check.%s.%s - %s' % (
+                        skyline_app, app, metric, str(settings.PANORAMA_EXPIRY_TIME)))
+                except Exception as e:
+                    logger.error(
+                        'error :: could not query cache_key - %s.last_check.%s.%s - %s' % (
+                            skyline_app, app, metric, e))
 
-        if os.path.isfile(str(metric_check_file)):
-            try:
-                os.remove(str(metric_check_file))
-                logger.info('metric_check_file removed - %s' % str(metric_check_file))
-            except OSError:
-                pass
+            # @added 20191031 - Feature #3306: Record anomaly_end_timestamp
+            # Add to current anomalies set
+            # @modified 20200420 - Feature #3500: webapp - crucible_process_metrics
+            #                      Feature #1448: Crucible web UI
+            #                      Branch #868: crucible
+            # Only if it was not added_by webapp or crucible
+            if anomaly['add_to_current_anomalies'] and anomaly_id:
+                try:
+                    redis_set = 'current.anomalies'
+                    data = [metric, metric_timestamp, anomaly_id, None]
+                    self.redis_conn.sadd(redis_set, str(data))
+                    logger.info('added %s to Redis set %s' % (str(data), redis_set))
+                except Exception as e:
+                    logger.error(
+                        'error :: could not add %s to Redis set %s - %s' % (
+                            str(data), redis_set, e))
 
-        return anomaly_id
+            metric_check_file = anomaly['metric_check_file']
+            if os.path.isfile(metric_check_file):
+                try:
+                    os.remove(metric_check_file)
+                    logger.info('metric_check_file removed - %s' % metric_check_file)
+                except OSError:
+                    pass
+
+        return anomaly_ids
 
     def run(self):
         """
@@ -1617,25 +1835,44 @@ class Panorama(Thread):
                                 logger.error(traceback.format_exc())
                                 logger.error('error :: failed to get data from %s Redis set' % redis_set)
                                 unique_metrics = []
-                            db_fullnamespace_unique_metrics = []
+                            # @modified 20261019 - Panorama bulk new metric registration
+                            # Determine the new metrics with a set difference
+                            # and insert them in bulk rather than calling
+                            # insert_new_metric for each metric, then publish
+                            # the metric ids
+                            # db_fullnamespace_unique_metrics = []
+                            db_metric_ids = {}
                             results = False
                             if unique_metrics:
-                                query = 'SELECT metric FROM metrics'
+                                query = 'SELECT id, metric FROM metrics'
                                 results = self.mysql_select(query)
                                 if results:
-                                    for result in results:
-                                        db_metric_name = '%s%s' % (settings.FULL_NAMESPACE, str(result[0]))
-                                        db_fullnamespace_unique_metrics.append(db_metric_name)
-                            if unique_metrics and db_fullnamespace_unique_metrics:
-                                for unique_metric in unique_metrics:
-                                    if unique_metric not in db_fullnamespace_unique_metrics:
-                                        try:
-                                            base_name = unique_metric.replace(settings.FULL_NAMESPACE, '', 1)
-                                            metric_id = self.insert_new_metric(base_name)
-                                            logger.info('inserted %s into metrics table, assigned id %s' % (base_name, str(metric_id)))
-                                        except:
-                                            logger.error(traceback.format_exc())
-                                            logger.error('error :: failed to insert %s into metrics table' % unique_metric)
+                                    for metric_id, metric in results:
+                                        db_metric_ids[str(metric)] = int(metric_id)
+                            if unique_metrics and db_metric_ids:
+                                base_names = set([unique_metric.replace(settings.FULL_NAMESPACE, '', 1) for unique_metric in unique_metrics])
+                                new_base_names = sorted(list(base_names - set(db_metric_ids)))
+                                if new_base_names:
+                                    logger.info('inserting %s new metrics into the metrics table' % str(len(new_base_names)))
+                                    new_metric_ids = {}
+                                    try:
+                                        new_metric_ids = self.insert_new_metrics(new_base_names)
+                                        logger.info('inserted %s new metrics into metrics table' % str(len(new_metric_ids)))
+                                    except:
+                                        logger.error(traceback.format_exc())
+                                        logger.error('error :: failed to insert new metrics into metrics table')
+                                    db_metric_ids.update(new_metric_ids)
+                                # Only publish the ids of the metrics inserted
+                                # in this pass, with a periodic publish of the
+                                # ids of all the metrics to refresh the Redis
+                                # keys before they expire
+                                if (int(time()) - self.all_metric_ids_published_at) >= PUBLISH_ALL_METRIC_IDS_INTERVAL:
+                                    if self.publish_metric_ids(db_metric_ids):
+                                        self.all_metric_ids_published_at = int(time())
+                                elif new_base_names:
+                                    self.publish_metric_ids(dict(
+                                        (metric, db_metric_ids[metric]) for metric in new_base_names
+                                        if metric in db_metric_ids))
                             try:
                                 del unique_metrics
                             except:
@@ -1679,6 +1916,12 @@ class Panorama(Thread):
                     logger.info(traceback.format_exc())
                     logger.error('error :: failed to get data from %s Redis set' % redis_set)
                     current_anomalies = []
+                # @modified 20261019 - Panorama batched updates
+                # Rather than spawning a Process to update each anomaly, the
+                # anomaly_end_timestamps are collected and updated in a batch
+                anomaly_end_timestamps = {}
+                current_anomalies_items = {}
+                items_to_remove = []
                 if current_anomalies:
                     for item in current_anomalies:
                         remove_item = False
@@ -1698,6 +1941,7 @@ class Panorama(Thread):
                             logger.error(traceback.format_exc())
                             logger.error('error :: failed to evaluate data from item %s from Redis set %s' % (
                                 str(item), redis_set))
+                            continue
                         if not anomaly_id:
                             if anomaly_timestamp > (int(time()) - settings.STALE_PERIOD):
                                 # If no anomaly is has been created by now, it
@@ -1708,52 +1952,21 @@ class Panorama(Thread):
                                 continue
 
                         if anomaly_id and anomaly_end_timestamp:
-                            # Update SQL
-                            # Spawn update_anomaly_end_timestamp process
-                            pids = []
-                            spawned_pids = []
-                            pid_count = 0
-                            now = time()
-                            for i in range(1, 2):
-                                try:
-                                    p = Process(target=self.update_anomaly_end_timestamp, args=(i, anomaly_id, anomaly_end_timestamp))
-                                    pids.append(p)
-                                    pid_count += 1
-                                    logger.info('starting update_anomaly_end_timestamp')
-                                    p.start()
-                                    spawned_pids.append(p.pid)
-                                except:
-                                    logger.info(traceback.format_exc())
-                                    logger.error('error :: to start update_anomaly_end_timestamp')
-                                    continue
-                            p_starts = time()
-                            # If the Skyline MySQL database is on a remote host
-                            # 2 seconds here is sometimes not sufficient so
-                            # increased to 10
-                            while time() - p_starts <= 10:
-                                if any(p.is_alive() for p in pids):
-                                    # Just to avoid hogging the CPU
-                                    sleep(.1)
-                                else:
-                                    # All the processes are done, break now.
-                                    time_to_run = time() - p_starts
-                                    logger.info(
-                                        '%s :: update_anomaly_end_timestamp completed in %.2f seconds' % (
-                                            skyline_app, time_to_run))
-                                    remove_item = True
-                                    break
-                            else:
-                                # We only enter this if we didn't 'break' above.
-                                logger.info('%s :: timed out, killing all update_anomaly_end_timestamp processes' % (skyline_app))
-                                for p in pids:
-                                    p.terminate()
+                            anomaly_end_timestamps[anomaly_id] = anomaly_end_timestamp
+                            current_anomalies_items[anomaly_id] = item
                         if remove_item:
-                            try:
-                                redis_set = 'current.anomalies'
-                                self.redis_conn.srem(redis_set, str(list_data))
-                            except:
-                                logger.error(traceback.format_exc())
-                                logger.error('error :: failed to remove %s for Redis set %s' % (str(list_data), redis_set))
+                            items_to_remove.append(item)
+                if anomaly_end_timestamps:
+                    updated_anomaly_ids = self.update_anomaly_end_timestamp_batch(anomaly_end_timestamps)
+                    for anomaly_id in updated_anomaly_ids:
+                        items_to_remove.append(current_anomalies_items[anomaly_id])
+                if items_to_remove:
+                    try:
+                        redis_set = 'current.anomalies'
+                        self.redis_conn.srem(redis_set, *items_to_remove)
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: failed to remove %s items from Redis set %s' % (str(len(items_to_remove)), redis_set))
 
                 # @added 20190501 - Branch #2646: slack
                 # Check if any Redis keys exist with a slack_thread_ts to update
@@ -1776,6 +1989,10 @@ class Panorama(Thread):
                     if not slack_thread_ts_updates:
                         logger.info('no panorama.slack_thread_ts Redis keys to process, OK')
 
+                # @modified 20261019 - Panorama batched updates
+                # Rather than spawning a Process to update each anomaly, the
+                # slack_thread_ts updates are collected and updated in a batch
+                slack_thread_ts_batch = []
                 if slack_thread_ts_updates:
                     for cache_key in slack_thread_ts_updates:
                         base_name = None
@@ -1804,114 +2021,98 @@ class Panorama(Thread):
                                 logger.error(traceback.format_exc())
                                 logger.error('error :: failed to delete cache_key %s' % cache_key)
                         if update_db_record:
-                            # Spawn update_slack_thread_ts process
-                            pids = []
-                            spawned_pids = []
-                            pid_count = 0
-                            now = time()
-                            for i in range(1, 2):
-                                try:
-                                    p = Process(target=self.update_slack_thread_ts, args=(i, base_name, metric_timestamp, slack_thread_ts))
-                                    pids.append(p)
-                                    pid_count += 1
-                                    logger.info('starting update_slack_thread_ts')
-                                    p.start()
-                                    spawned_pids.append(p.pid)
-                                except:
-                                    logger.info(traceback.format_exc())
-                                    logger.error('error :: to start update_slack_thread_ts')
-                                    continue
-                            p_starts = time()
-                            # @modified 20190509 - Branch #2646: slack
-                            # If the Skyline MySQL database is on a remote host
-                            # 2 seconds here is sometimes not sufficient so
-                            # increased to 10
-                            while time() - p_starts <= 10:
-                                if any(p.is_alive() for p in pids):
-                                    # Just to avoid hogging the CPU
-                                    sleep(.1)
-                                else:
-                                    # All the processes are done, break now.
-                                    time_to_run = time() - p_starts
-                                    logger.info(
-                                        '%s :: update_slack_thread_ts completed in %.2f seconds' % (
-                                            skyline_app, time_to_run))
-                                    break
-                            else:
-                                # We only enter this if we didn't 'break' above.
-                                logger.info('%s :: timed out, killing all update_slack_thread_ts processes' % (skyline_app))
-                                for p in pids:
-                                    p.terminate()
+                            slack_thread_ts_batch.append([cache_key, base_name, metric_timestamp, slack_thread_ts])
+                if slack_thread_ts_batch:
+                    try:
+                        self.update_slack_thread_ts_batch(slack_thread_ts_batch)
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: update_slack_thread_ts_batch failed')
 
             metric_var_files_sorted = sorted(metric_var_files)
-            metric_check_file = '%s/%s' % (settings.PANORAMA_CHECK_PATH, str(metric_var_files_sorted[0]))
 
-            logger.info('assigning anomaly for insertion - %s' % str(metric_var_files_sorted[0]))
-
-            # Spawn processes
-            pids = []
-            spawned_pids = []
-            pid_count = 0
-            now = time()
-            for i in range(1, settings.PANORAMA_PROCESSES + 1):
+            # @modified 20261019 - Panorama batched anomaly ingestion
+            # Rather than spawning a spin_process Process for the first check
+            # file every cycle, drain all the pending check files.  Each check
+            # file is evaluated by spin_process in the Panorama thread so that
+            # the in memory self.mysql_ids cache is used and all the anomalies
+            # are then inserted with a multi-row INSERT in a single transaction.
+            # metric_check_file = '%s/%s' % (settings.PANORAMA_CHECK_PATH, str(metric_var_files_sorted[0]))
+            # logger.info('assigning anomaly for insertion - %s' % str(metric_var_files_sorted[0]))
+            # p = Process(target=self.spin_process, args=(i, metric_check_file))
+            # @modified 20261019 - Panorama batched anomaly ingestion
+            # Bound each drain to PANORAMA_CHECK_BATCH_SIZE check files and
+            # PANORAMA_CHECK_BATCH_TIME seconds, the remaining check files are
+            # carried over to the next cycle, oldest first, so that a slow
+            # MySQL or Redis does not stall the ingestion of all the pending
+            # check files in a single drain.
+            # logger.info('assigning %s anomalies for insertion' % str(len(metric_var_files_sorted)))
+            metric_var_files_batch = metric_var_files_sorted[:PANORAMA_CHECK_BATCH_SIZE]
+            logger.info('assigning %s of %s anomalies for insertion' % (
+                str(len(metric_var_files_batch)), str(len(metric_var_files_sorted))))
+            spin_process_start = time()
+            anomalies = []
+            # The last anomaly accepted in this batch for each last_check key
+            batch_anomalies_by_cache_key = {}
+            evaluated_check_files = 0
+            for metric_var_file in metric_var_files_batch:
+                if (time() - spin_process_start) > PANORAMA_CHECK_BATCH_TIME:
+                    logger.info('%s :: the drain reached PANORAMA_CHECK_BATCH_TIME of %s seconds, carrying over %s check files to the next cycle' % (
+                        skyline_app, str(PANORAMA_CHECK_BATCH_TIME),
+                        str(len(metric_var_files_sorted) - evaluated_check_files)))
+                    break
+                evaluated_check_files += 1
+                metric_check_file = '%s/%s' % (settings.PANORAMA_CHECK_PATH, str(metric_var_file))
+                anomaly = None
                 try:
-                    p = Process(target=self.spin_process, args=(i, metric_check_file))
-                    pids.append(p)
-                    pid_count += 1
-                    logger.info('starting %s of %s spin_process/es' % (str(pid_count), str(settings.PANORAMA_PROCESSES)))
-                    p.start()
-                    spawned_pids.append(p.pid)
+                    anomaly = self.spin_process(1, metric_check_file)
                 except:
-                    logger.error('error :: to start spin_process')
-                    logger.info(traceback.format_exc())
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: spin_process failed on %s' % metric_check_file)
+                    check_file_name = os.path.basename(str(metric_check_file))
+                    check_file_timestamp = check_file_name.split('.', 1)[0]
+                    check_file_metricname_txt = check_file_name.split('.', 1)[1]
+                    check_file_metricname = check_file_metricname_txt.replace('.txt', '')
+                    check_file_metricname_dir = check_file_metricname.replace('.', '/')
+                    metric_failed_check_dir = '%s/%s/%s' % (failed_checks_dir, check_file_metricname_dir, check_file_timestamp)
+                    fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
+                if not anomaly:
                     continue
-
-            # Send wait signal to zombie processes
-            # for p in pids:
-            #     p.join()
-            # Self monitor processes and terminate if any spin_process has run
-            # for longer than CRUCIBLE_TESTS_TIMEOUT
-            p_starts = time()
-            while time() - p_starts <= 20:
-                if any(p.is_alive() for p in pids):
-                    # Just to avoid hogging the CPU
-                    sleep(.1)
-                else:
-                    # All the processes are done, break now.
-                    time_to_run = time() - p_starts
-                    logger.info(
-                        '%s :: %s spin_process/es completed in %.2f seconds' % (
-                            skyline_app, str(settings.PANORAMA_PROCESSES),
-                            time_to_run))
-                    break
-            else:
-                # We only enter this if we didn't 'break' above.
-                logger.info('%s :: timed out, killing all spin_process processes' % (skyline_app))
-                for p in pids:
-                    p.terminate()
-                    # p.join()
-
-                check_file_name = os.path.basename(str(metric_check_file))
-                if settings.ENABLE_PANORAMA_DEBUG:
-                    logger.info('debug :: check_file_name - %s' % check_file_name)
-                check_file_timestamp = check_file_name.split('.', 1)[0]
-                if settings.ENABLE_PANORAMA_DEBUG:
-                    logger.info('debug :: check_file_timestamp - %s' % str(check_file_timestamp))
-                check_file_metricname_txt = check_file_name.split('.', 1)[1]
-                if settings.ENABLE_PANORAMA_DEBUG:
-                    logger.info('debug :: check_file_metricname_txt - %s' % check_file_metricname_txt)
-                check_file_metricname = check_file_metricname_txt.replace('.txt', '')
-                if settings.ENABLE_PANORAMA_DEBUG:
-                    logger.info('debug :: check_file_metricname - %s' % check_file_metricname)
-                check_file_metricname_dir = check_file_metricname.replace('.', '/')
-                if settings.ENABLE_PANORAMA_DEBUG:
-                    logger.info('debug :: check_file_metricname_dir - %s' % check_file_metricname_dir)
-
-                metric_failed_check_dir = '%s/%s/%s' % (failed_checks_dir, check_file_metricname_dir, check_file_timestamp)
-
-                fail_check(skyline_app, metric_failed_check_dir, str(metric_check_file))
-
-            for p in pids:
-                if p.is_alive():
-                    logger.info('%s :: stopping spin_process - %s' % (skyline_app, str(p.is_alive())))
-                    p.join()
+                # The last_check key is only set when the anomalies are
+                # inserted, so apply the last_check rules that spin_process
+                # applies to the anomaly already accepted for the app metric in
+                # this batch, as if its last_check key had been set.  Only an
+                # analyzer_batch anomaly of a batch metric that is more than
+                # PANORAMA_EXPIRY_TIME after the accepted anomaly is recorded.
+                last_batch_anomaly = None
+                if anomaly['set_anomaly_key']:
+                    last_batch_anomaly = batch_anomalies_by_cache_key.get(anomaly['cache_key'])
+                if last_batch_anomaly:
+                    record_anomaly = False
+                    if anomaly['batch_metric'] and last_batch_anomaly['batch_metric'] and anomaly['analyzer_batch_anomaly']:
+                        seconds_between_batch_anomalies = anomaly['metric_timestamp'] - last_batch_anomaly['metric_timestamp']
+                        if seconds_between_batch_anomalies > settings.PANORAMA_EXPIRY_TIME:
+                            logger.info('the difference between the last anomaly timestamp (%s) in this batch and the current anomaly timestamp (%s) for batch metric %s is greater than %s, recording anomaly' % (
+                                str(last_batch_anomaly['metric_timestamp']),
+                                str(anomaly['metric_timestamp']),
+                                anomaly['metric'], str(settings.PANORAMA_EXPIRY_TIME)))
+                            record_anomaly = True
+                    if not record_anomaly:
+                        logger.info('not recording anomaly for - %s, an anomaly for the metric has already been recorded in this batch' % (
+                            anomaly['metric']))
+                        try:
+                            os.remove(anomaly['metric_check_file'])
+                            logger.info('metric_check_file removed - %s' % anomaly['metric_check_file'])
+                        except OSError:
+                            pass
+                        continue
+                if anomaly['set_anomaly_key']:
+                    batch_anomalies_by_cache_key[anomaly['cache_key']] = anomaly
+                anomalies.append(anomaly)
+
+            if anomalies:
+                anomaly_ids = self.insert_anomalies(anomalies)
+                logger.info(
+                    '%s :: %s of %s anomalies inserted in %.2f seconds' % (
+                        skyline_app, str(len(anomaly_ids)), str(len(anomalies)),
+                        (time() - spin_process_start)))
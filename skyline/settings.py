@@ -697,7 +697,16 @@ ENABLE_ALGORITHM_RUN_METRICS = True
   ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.median_time``
   ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.times_run``
   ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.total_time``
+  ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.p95_time``
+  ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.p99_time``
+  ``skyline.analyzer.<hostname>.algorithm_breakdown.<algorithm_name>.timings.max_time``
   These are related to the RUN_OPTIMIZED_WORKFLOW performance tuning.
+- And the same timing metrics for the spin_process stages to the graphite
+  namespaces of ``skyline.analyzer.<hostname>.stage_timings.<stage>`` where
+  stage is redis_read, decode, sort, algorithms and redis_writes.
+- The timings are recorded in the in-process metrics registry of each
+  spin_process and aggregated by Analyzer once per run, so this can be left
+  enabled.
 """
 
 ENABLE_ALL_ALGORITHMS_RUN_METRICS = False
@@ -709,6 +718,49 @@ ENABLE_ALL_ALGORITHMS_RUN_METRICS = False
     workflow and will run and time all algorithms against all timeseries.
 """
 
+ANALYZER_PROFILE = False
+"""
+:var ANALYZER_PROFILE: Profile each Analyzer run.
+:vartype ANALYZER_PROFILE: boolean
+
+- If set to ``True`` each spin_process records the wall and CPU time of its
+  redis_read, decode, sort, flux_resort, airgaps, algorithms and redis_writes
+  stages and writes a Chrome trace JSON file of the stages to a directory for
+  the run in :mod:`settings.ANALYZER_PROFILE_DIR`.  The trace files can be
+  loaded in chrome://tracing or https://ui.perfetto.dev and the runs and files
+  are listed and downloadable at the webapp /analyzer_profiles endpoint.
+- The airgaps stage is nested in the algorithms stage.  The per stage
+  breakdown and the stage_timings metrics are the self time of each stage, the
+  algorithms time does not include the airgaps time.  In the trace the
+  algorithms events are the full duration with the airgaps events nested in
+  them and the self time in the event args.
+- The ANALYZER_PROFILE_PROCESS spin_process is also profiled with cProfile and
+  its pstats file is written to the same directory.
+- This adds overhead to the run, only enable it when investigating slow runs.
+"""
+
+ANALYZER_PROFILE_DIR = '/tmp/skyline/profiles'
+"""
+:var ANALYZER_PROFILE_DIR: The directory in which the ANALYZER_PROFILE run
+    directories are created.
+:vartype ANALYZER_PROFILE_DIR: str
+"""
+
+ANALYZER_PROFILE_CYCLES = 10
+"""
+:var ANALYZER_PROFILE_CYCLES: The number of ANALYZER_PROFILE run directories
+    to keep, the oldest are removed.
+:vartype ANALYZER_PROFILE_CYCLES: int
+"""
+
+ANALYZER_PROFILE_PROCESS = 1
+"""
+:var ANALYZER_PROFILE_PROCESS: The number of the spin_process to profile with
+    cProfile when ANALYZER_PROFILE is enabled, set to 0 to not cProfile any
+    spin_process.
+:vartype ANALYZER_PROFILE_PROCESS: int
+"""
+
 ENABLE_SECOND_ORDER = False
 """
 :var ENABLE_SECOND_ORDER: This is to enable second order anomalies.
@@ -724,6 +776,32 @@ ENABLE_ALERTS = True
 :vartype ENABLE_ALERTS: boolean
 """
 
+ALERT_DISPATCHER_PROCESSES = 2
+"""
+:var ALERT_DISPATCHER_PROCESSES: The maximum number of alerter processes that
+    the Analyzer and Mirage alert dispatchers run concurrently for each alerter,
+    e.g. smtp, slack, syslog and each http_alerter.  Analyzer and Mirage add
+    alerts to the alert dispatcher queue and do not wait for the alerts to be
+    sent.
+:vartype ALERT_DISPATCHER_PROCESSES: int
+"""
+
+ALERT_DISPATCHER_BATCH_SIZE = 10
+"""
+:var ALERT_DISPATCHER_BATCH_SIZE: The maximum number of queued alerts of an
+    alerter that are sent by a single alerter process, the SMTP connection and
+    the Slack and HTTP sessions are reused for the alerts in the batch.  Each
+    alert is allowed 15 seconds.
+:vartype ALERT_DISPATCHER_BATCH_SIZE: int
+"""
+
+ALERT_DISPATCHER_MAX_QUEUE_SIZE = 1000
+"""
+:var ALERT_DISPATCHER_MAX_QUEUE_SIZE: The maximum number of alerts that can be
+    queued, alerts are dropped and counted as such when the queue is full.
+:vartype ALERT_DISPATCHER_MAX_QUEUE_SIZE: int
+"""
+
 ENABLE_MIRAGE = False
 """
 :var ENABLE_MIRAGE: This enables Analyzer to output to Mirage
@@ -852,6 +930,22 @@ PLOT_REDIS_DATA = True
 
 """
 
+ALERT_GRAPH_RENDER_PROCESSES = 1
+"""
+:var ALERT_GRAPH_RENDER_PROCESSES: The number of processes that Analyzer and
+    Mirage use to render the PLOT_REDIS_DATA graphs of smtp alerts while the
+    alerts are queued on the alert dispatcher.
+:vartype ALERT_GRAPH_RENDER_PROCESSES: int
+"""
+
+ALERT_GRAPH_RENDER_WAIT = 5
+"""
+:var ALERT_GRAPH_RENDER_WAIT: The number of seconds an smtp alert waits for
+    its PLOT_REDIS_DATA graph to be rendered, after which the alerter renders
+    the graph itself.
+:vartype ALERT_GRAPH_RENDER_WAIT: int
+"""
+
 NON_DERIVATIVE_MONOTONIC_METRICS = [
     'the_namespace_of_the_monotonic_metric_to_not_calculate_the_derivative_for',
 ]
@@ -1260,6 +1354,32 @@ PANORAMA_DBUSERPASS = 'the_user_password'
 :vartype PANORAMA_DBUSERPASS: str
 """
 
+PANORAMA_DB_POOL_SIZE = 5
+"""
+:var PANORAMA_DB_POOL_SIZE: The number of database connections each Skyline
+    process keeps open in its connection pool.  Each process creates a single
+    SQLAlchemy engine that is reused by every check or request in the process,
+    rather than creating and disposing of an engine every time.
+:vartype PANORAMA_DB_POOL_SIZE: int
+"""
+
+PANORAMA_DB_POOL_MAX_OVERFLOW = 10
+"""
+:var PANORAMA_DB_POOL_MAX_OVERFLOW: The number of database connections a process
+    can open in addition to PANORAMA_DB_POOL_SIZE when all the pooled
+    connections are in use, these are closed when they are returned to the
+    pool.
+:vartype PANORAMA_DB_POOL_MAX_OVERFLOW: int
+"""
+
+PANORAMA_DB_POOL_RECYCLE = 3600
+"""
+:var PANORAMA_DB_POOL_RECYCLE: The number of seconds after which a pooled
+    database connection is recycled, this must be less than the MySQL
+    wait_timeout.
+:vartype PANORAMA_DB_POOL_RECYCLE: int
+"""
+
 NUMBER_OF_ANOMALIES_TO_STORE_IN_PANORAMA = 0
 """
 :var NUMBER_OF_ANOMALIES_TO_STORE_IN_PANORAMA: The number of anomalies to store
@@ -1311,6 +1431,30 @@ PANORAMA_INSERT_METRICS_IMMEDIATELY = False
 :vartype PANORAMA_CHECK_INTERVAL: boolean
 """
 
+PANORAMA_MYSQL_POOL_SIZE = 3
+"""
+:var PANORAMA_MYSQL_POOL_SIZE: The number of MySQL connections Panorama keeps
+    open in its connection pool, rather than opening a new connection for every
+    query.
+:vartype PANORAMA_MYSQL_POOL_SIZE: int
+"""
+
+PANORAMA_CHECK_BATCH_SIZE = 100
+"""
+:var PANORAMA_CHECK_BATCH_SIZE: The maximum number of check files Panorama
+    evaluates and inserts in a single batch, any remaining check files are
+    carried over to the next batch, oldest first.
+:vartype PANORAMA_CHECK_BATCH_SIZE: int
+"""
+
+PANORAMA_CHECK_BATCH_TIME = 20
+"""
+:var PANORAMA_CHECK_BATCH_TIME: The number of seconds after which Panorama stops
+    evaluating check files in a batch and inserts the anomalies that have been
+    evaluated, the remaining check files are carried over to the next batch.
+:vartype PANORAMA_CHECK_BATCH_TIME: int
+"""
+
 """
 Mirage settings
 """
@@ -1615,6 +1759,34 @@ timeseries aggregated.  To aggregate a timeseries to minutely values use 60 as
 the ``AGGREGATION_VALUE``, e.g. sum metric datapoints by minute
 """
 
+BOUNDARY_LOW_LATENCY = False
+"""
+:var BOUNDARY_LOW_LATENCY: Enables the Boundary low latency mode
+:vartype BOUNDARY_LOW_LATENCY: boolean
+
+In the low latency mode the Horizon workers publish the datapoints of the
+:mod:`settings.BOUNDARY_METRICS` metrics to Boundary as they are appended to
+Redis and a long lived Boundary process evaluates the Boundary algorithms on
+every new datapoint, so that anomalies are alerted on within seconds rather than
+on the next Boundary run.  In the low latency process the ``ALERT_THRESHOLD``
+of a metric is the number of consecutive anomalous datapoints, which is counted
+separately from the number of anomalous runs that the Boundary runs count.
+Boundary runs continue to analyse all the Boundary metrics as normal.  Both Horizon and Boundary must be restarted for a change to
+this setting to take effect.
+"""
+
+BOUNDARY_LOW_LATENCY_WINDOW = 3600
+"""
+:var BOUNDARY_LOW_LATENCY_WINDOW: The number of seconds of datapoints that the
+    Boundary low latency process keeps for each metric.
+:vartype BOUNDARY_LOW_LATENCY_WINDOW: int
+
+This must be at least the largest ``MIN_AVERAGE_SECONDS`` of the
+:mod:`settings.BOUNDARY_METRICS` and 3600 if
+:mod:`settings.BOUNDARY_AUTOAGGRERATION` is enabled.  At least
+:mod:`settings.MAX_TOLERABLE_BOREDOM` datapoints are always kept.
+"""
+
 BOUNDARY_ALERTER_OPTS = {
     # When an alert is sent as key is set with in the alert namespaces with an
     # expiration value
@@ -1753,10 +1925,35 @@ CRUCIBLE_TESTS_TIMEOUT = 60
 """
 :var CRUCIBLE_TESTS_TIMEOUT: # This is the number of seconds that Crucible tests
     can take. 60 is a reasonable default for a run with a
-    :mod:`settings.FULL_DURATION` of 86400
+    :mod:`settings.FULL_DURATION` of 86400.  This is also the number of seconds
+    that the :mod:`settings.CRUCIBLE_ALGORITHM_PROCESSES` process pool is given
+    to run the algorithms on a time series, the pool is terminated when it
+    expires and any algorithms that have not completed are reported as errored.
 :vartype CRUCIBLE_TESTS_TIMEOUT: int
 """
 
+CRUCIBLE_ALGORITHM_PROCESSES = 4
+"""
+:var CRUCIBLE_ALGORITHM_PROCESSES: The number of processes in the pool that
+    each Crucible spin_process uses to run the algorithms on a time series.  Set
+    to 1 to run the algorithms serially.
+:vartype CRUCIBLE_ALGORITHM_PROCESSES: int
+"""
+
+CRUCIBLE_DEFER_PLOTS = False
+"""
+:var CRUCIBLE_DEFER_PLOTS: Do not create the algorithm and
+    skyline.consensus.anomalies.png plots when a check is analysed, but save the
+    plot data in the results directory.  The plots are created by Crucible when
+    it has no checks to process or by the webapp when the Crucible job results
+    are requested.  This allows large Crucible jobs submitted from the webapp to
+    complete the analysis of all the metrics first.  Note that when enabled the
+    plot images are not in the results directory when the check completes, so
+    anything that reads them directly must wait for them to be created.  The
+    default is ``False``, the plots are created when the check is analysed.
+:vartype CRUCIBLE_DEFER_PLOTS: boolean
+"""
+
 ENABLE_CRUCIBLE_DEBUG = False
 """
 :var ENABLE_CRUCIBLE_DEBUG: DEVELOPMENT only - enables additional debug logging
@@ -1937,6 +2134,45 @@ IONOSPHERE_MAX_RUNTIME = 120
 :vartype IONOSPHERE_MAX_RUNTIME: int
 """
 
+IONOSPHERE_WORK_QUEUE_WORKERS = 1
+"""
+:var IONOSPHERE_WORK_QUEUE_WORKERS: The number of Ionosphere work queue items,
+    real time checks, echo checks and learn jobs, that Ionosphere runs
+    concurrently.  Real time checks are scheduled first, echo checks second and
+    learn jobs last, by earliest deadline first within each priority, and a
+    metric is only checked by one worker at a time.  Running more than 1
+    worker is untested and like IONOSPHERE_PROCESSES should be left at 1 unless
+    there is a requirement for Ionosphere to analyse the metrics quicker.
+:vartype IONOSPHERE_WORK_QUEUE_WORKERS: int
+"""
+
+IONOSPHERE_MINIMAL_FEATURES_EXTRACTION = False
+"""
+:var IONOSPHERE_MINIMAL_FEATURES_EXTRACTION: When Ionosphere calculates the
+    features of an anomalous time series to compare to the features profiles,
+    only run the tsfresh feature calculators that are required to calculate the
+    features that are present in the metric's enabled features profiles, rather
+    than all the ReasonableFeatureExtractionSettings features.  The time taken
+    by each feature calculator is sent to Graphite as
+    ``skyline.ionosphere.<SERVER_METRICS_NAME>.features_extraction_time.<calculator>``
+    Note that when enabled the all_calc_features_sum recorded with each match
+    is the sum of only the features that were calculated, so matches recorded
+    with it enabled cannot be compared to matches recorded without it.  The
+    default is ``False``, all the features are calculated.
+:vartype IONOSPHERE_MINIMAL_FEATURES_EXTRACTION: boolean
+"""
+
+IONOSPHERE_FEATURES_EXTRACTION_PROCESSES = 2
+"""
+:var IONOSPHERE_FEATURES_EXTRACTION_PROCESSES: The number of processes in the
+    pool that Ionosphere uses to run the tsfresh feature calculators in parallel
+    when :mod:`settings.IONOSPHERE_MINIMAL_FEATURES_EXTRACTION` is enabled.  The
+    pool is shared by all the feature calculations of an Ionosphere check, e.g.
+    the Mirage and the ionosphere_echo features.  Set to 1 to run the feature
+    calculators in the Ionosphere check process.
+:vartype IONOSPHERE_FEATURES_EXTRACTION_PROCESSES: int
+"""
+
 ENABLE_IONOSPHERE_DEBUG = False
 """
 :var ENABLE_IONOSPHERE_DEBUG: DEVELOPMENT only - enables additional debug logging
@@ -1966,6 +2202,18 @@ IONOSPHERE_LEARN_FOLDER = '/opt/skyline/ionosphere/learn'
 :vartype IONOSPHERE_LEARN_FOLDER: str
 """
 
+IONOSPHERE_FEATURES_PROFILES_STORE_PATH = '/opt/skyline/ionosphere/fp_store'
+"""
+:var IONOSPHERE_FEATURES_PROFILES_STORE_PATH: This is the path where Ionosphere
+    stores the feature values and time series of the features profiles of each
+    metric as memory mapped numpy arrays, so that checks do not query the
+    database or memcache for each features profile.  A new version of a metric
+    store is created from the database whenever a features profile of the
+    metric is created, enabled or disabled.  Set to ``''`` to disable the store
+    - absolute path
+:vartype IONOSPHERE_FEATURES_PROFILES_STORE_PATH: str
+"""
+
 IONOSPHERE_CHECK_MAX_AGE = 300
 """
 :var IONOSPHERE_CHECK_MAX_AGE: Ionosphere will only process a check file if it is
@@ -2580,6 +2828,22 @@ FLUX_STATSD_PORT = 8125
 :vartype FLUX_STATSD_PORT: int
 """
 
+FLUX_POPULATE_METRIC_MAX_REQUESTS_PER_HOST = 4
+"""
+:var FLUX_POPULATE_METRIC_MAX_REQUESTS_PER_HOST: The maximum number of
+    concurrent in flight requests the flux populate_metric_worker makes to any
+    one remote host when backfilling metrics.
+:vartype FLUX_POPULATE_METRIC_MAX_REQUESTS_PER_HOST: int
+"""
+
+FLUX_POPULATE_METRIC_BATCH_SIZE = 100
+"""
+:var FLUX_POPULATE_METRIC_BATCH_SIZE: The maximum number of metrics the flux
+    populate_metric_worker takes from the queue and fetches concurrently in a
+    single batch.
+:vartype FLUX_POPULATE_METRIC_BATCH_SIZE: int
+"""
+
 """
 Vista settings
 """
@@ -2702,3 +2966,25 @@ VISTA_GRAPHITE_BATCH_SIZE = 20
     being requested with the same from parameter (timestamp).
 :vartype VISTA_GRAPHITE_BATCH_SIZE: int
 """
+
+VISTA_FETCHER_MAX_REQUESTS_PER_HOST = 4
+"""
+:var VISTA_FETCHER_MAX_REQUESTS_PER_HOST: The maximum number of concurrent in
+    flight requests that a Vista fetch_process makes to any one remote host.
+:vartype VISTA_FETCHER_MAX_REQUESTS_PER_HOST: int
+"""
+
+VISTA_FETCHER_REQUEST_TIMEOUT = 20
+"""
+:var VISTA_FETCHER_REQUEST_TIMEOUT: The number of seconds Vista waits for a
+    remote host to respond to a request before the request is abandoned.
+:vartype VISTA_FETCHER_REQUEST_TIMEOUT: int
+"""
+
+VISTA_FETCHER_REQUEST_RETRIES = 2
+"""
+:var VISTA_FETCHER_REQUEST_RETRIES: The number of times Vista retries a request
+    that fails to connect or that returns a 502, 503 or 504 before the request
+    is abandoned.
+:vartype VISTA_FETCHER_REQUEST_RETRIES: int
+"""
@@ -14,6 +14,19 @@ import os
 import traceback
 import json
 import requests
+# @added 20261019 - Concurrent per host limited URL fetching
+# concurrent.futures is not in the Python 2.7 stdlib, if the futures backport
+# is not installed fetch_urls_concurrently fetches the URLs serially
+try:
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+except ImportError:
+    ThreadPoolExecutor = None
+    as_completed = None
+from threading import BoundedSemaphore
+try:
+    from urllib.parse import urlparse  # Python 3
+except ImportError:
+    from urlparse import urlparse  # Python 2.7
 # @modified 20191025 - Task #3290: Handle urllib2 in py3
 #                      Branch #3262: py3
 # try:
@@ -290,6 +303,76 @@ def mkdir_p(path):
             raise
 
 
+# @added 20261019 - Alert graph render pool
+# The requests sessions of the process, reused by the alerters and
+# fetch_graphite_graph_image and closed by the alert_dispatcher
+# close_alerter_connections
+REQUESTS_SESSIONS = {}
+
+
+def get_requests_session(name='default'):
+    """
+    Returns a requests session of the process so that HTTP keep-alive
+    connections are reused.
+
+    :param name: the session name
+    :type name: str
+    :return: session
+    :rtype: requests.Session
+    """
+    if name not in REQUESTS_SESSIONS:
+        REQUESTS_SESSIONS[name] = requests.Session()
+    return REQUESTS_SESSIONS[name]
+
+
+# @added 20261019 - Alert graph render pool
+def fetch_graphite_graph_image(current_skyline_app, url):
+    """
+    Fetches a Graphite graph image with the pooled requests session of the
+    process, with the GRAPHITE_CONNECT_TIMEOUT and GRAPHITE_READ_TIMEOUT and
+    the GRAPHITE_CUSTOM_HEADERS.
+
+    :param current_skyline_app: the app calling the function so the function
+        knows which log to write too.
+    :param url: the graph URL
+    :type current_skyline_app: str
+    :type url: str
+    :return: image_data or None
+    :rtype: bytes
+
+    """
+    current_skyline_app_logger = str(current_skyline_app) + 'Log'
+    current_logger = logging.getLogger(current_skyline_app_logger)
+    try:
+        connect_timeout = int(settings.GRAPHITE_CONNECT_TIMEOUT)
+    except:
+        connect_timeout = 5
+    try:
+        read_timeout = int(settings.GRAPHITE_READ_TIMEOUT)
+    except:
+        read_timeout = 10
+    headers = get_graphite_custom_headers(current_skyline_app)
+    try:
+        current_logger.info('%s :: fetch_graphite_graph_image :: fetching %s' % (
+            str(current_skyline_app), str(url)))
+        session = get_requests_session('graphite')
+        if headers:
+            r = session.get(url, headers=headers, timeout=(connect_timeout, read_timeout))
+        else:
+            r = session.get(url, timeout=(connect_timeout, read_timeout))
+        if r.status_code != 200:
+            current_logger.error('error :: %s :: fetch_graphite_graph_image :: Graphite responded with status code %s - %s' % (
+                str(current_skyline_app), str(r.status_code), str(url)))
+            return None
+        image_data = r.content
+    except:
+        current_logger.error(traceback.format_exc())
+        current_logger.error('error :: %s :: fetch_graphite_graph_image :: failed to fetch %s' % (
+            str(current_skyline_app), str(url)))
+        return None
+    return image_data
+
+
 # @added 20191023 - Task #3290: Handle urllib2 in py3
 #                   Branch #3262: py3
 # Use urlretrieve
@@ -310,22 +393,24 @@ def get_graphite_graph_image(current_skyline_app, url=None, image_file=None):
     :rtype:  boolean
 
     """
-    try:
-        python_version
-    except:
-        from sys import version_info
-        python_version = int(version_info[0])
-    try:
-        urllib.urlretrieve
-    except:
-        try:
-            import urllib
-        except:
-            # For backwards compatibility with py2 load urlib.request as urllib so
-            # that urllib.urlretrieve is available to both as the same module.
-            # from urllib import request as urllib
-            import urllib.request
-            import urllib.error
+    # @modified 20261019 - Alert graph render pool
+    # urlretrieve is no longer used
+    # try:
+    #     python_version
+    # except:
+    #     from sys import version_info
+    #     python_version = int(version_info[0])
+    # try:
+    #     urllib.urlretrieve
+    # except:
+    #     try:
+    #         import urllib
+    #     except:
+    #         # For backwards compatibility with py2 load urlib.request as urllib so
+    #         # that urllib.urlretrieve is available to both as the same module.
+    #         # from urllib import request as urllib
+    #         import urllib.request
+    #         import urllib.error
 
     current_skyline_app_logger = str(current_skyline_app) + 'Log'
     current_logger = logging.getLogger(current_skyline_app_logger)
@@ -356,15 +441,44 @@ def get_graphite_graph_image(current_skyline_app, url=None, image_file=None):
         current_logger.error(
             'error :: %s :: get_graphite_graph_image - could not create directory - %s' % (str(file_dir)))
 
+    # @modified 20261019 - Alert graph render pool
+    # Fetch the image with the pooled requests session of the process with the
+    # Graphite timeouts, rather than with urlretrieve which has no timeout
+    # try:
+    #     current_logger.info('%s :: get_graphite_graph_image :: saving %s to %s' % (
+    #         str(current_skyline_app), str(url), str(image_file)))
+    #     if python_version == 2:
+    #         urllib.urlretrieve(url, image_file)
+    #         os.chmod(image_file, 0o644)
+    #     if python_version == 3:
+    #         urllib.request.urlretrieve(url, image_file)
+    #         os.chmod(image_file, mode=0o644)
+    #     current_logger.info('%s :: get_graphite_graph_image :: saved %s to %s' % (
+    #         str(current_skyline_app), str(url), str(image_file)))
+    # except:
+    #     current_logger.error(traceback.format_exc())
+    #     fail_msg = 'error :: %s :: get_graphite_graph_image :: failed to save %s to %s' % (
+    #         str(current_skyline_app), str(url), str(image_file))
+    #     current_logger.error(fail_msg)
+    #     if current_skyline_app == 'webapp':
+    #         # Raise to webbapp
+    #         raise
+    #     else:
+    #         return False
+    image_data = fetch_graphite_graph_image(current_skyline_app, url)
+    if image_data is None:
+        fail_msg = 'error :: %s :: get_graphite_graph_image :: failed to save %s to %s' % (
+            str(current_skyline_app), str(url), str(image_file))
+        current_logger.error(fail_msg)
+        if current_skyline_app == 'webapp':
+            # Raise to webbapp
+            raise ValueError(fail_msg)
+        else:
+            return False
     try:
-        current_logger.info('%s :: get_graphite_graph_image :: saving %s to %s' % (
-            str(current_skyline_app), str(url), str(image_file)))
-        if python_version == 2:
-            urllib.urlretrieve(url, image_file)
-            os.chmod(image_file, 0o644)
-        if python_version == 3:
-            urllib.request.urlretrieve(url, image_file)
-            os.chmod(image_file, mode=0o644)
+        with open(image_file, 'wb') as f:
+            f.write(image_data)
+        os.chmod(image_file, 0o644)
         current_logger.info('%s :: get_graphite_graph_image :: saved %s to %s' % (
             str(current_skyline_app), str(url), str(image_file)))
     except:
@@ -2112,3 +2226,82 @@ def sort_timeseries(timeseries):
         del timeseries
 
     return sorted_timeseries
+
+
+# @added 20261019 - Concurrent per host limited URL fetching
+def fetch_urls_concurrently(
+        current_skyline_app, session, fetch_urls, max_requests_per_host,
+        timeout, log_requests=False):
+    """
+    Fetch the URLs concurrently with a shared requests session, with no more
+    than max_requests_per_host requests in flight to any one remote host.  Used
+    by vista fetcher and flux populate_metric_worker.  If concurrent.futures is
+    not available (Python 2.7 without the futures backport) the URLs are
+    fetched serially.
+
+    :param current_skyline_app: the skyline app using this function
+    :param session: the requests.Session to use
+    :param fetch_urls: the URLs to fetch
+    :param max_requests_per_host: the maximum number of concurrent requests to
+        make to a remote host
+    :param timeout: the requests timeout, seconds or a (connect, read) tuple
+    :param log_requests: whether to log each request
+    :type current_skyline_app: str
+    :type session: object
+    :type fetch_urls: list
+    :type max_requests_per_host: int
+    :type timeout: int or tuple
+    :type log_requests: boolean
+    :return: (responses, latencies) a dictionary of the responses keyed by URL,
+        URLs that could not be fetched are not present, and a list of
+        [remote_host, seconds] for each request
+    :rtype: tuple
+
+    """
+    current_skyline_app_logger = current_skyline_app + 'Log'
+    current_logger = logging.getLogger(current_skyline_app_logger)
+
+    fetch_urls = list(set(fetch_urls))
+    host_semaphores = {}
+    for fetch_url in fetch_urls:
+        host = urlparse(fetch_url).netloc
+        if host not in host_semaphores:
+            host_semaphores[host] = BoundedSemaphore(max_requests_per_host)
+
+    def fetch(fetch_url):
+        host = urlparse(fetch_url).netloc
+        with host_semaphores[host]:
+            if log_requests:
+                current_logger.info('%s :: getting data from %s' % (
+                    current_skyline_app, str(fetch_url)))
+            start = time()
+            response = session.get(fetch_url, timeout=timeout)
+            return response, [host, (time() - start)]
+
+    responses = {}
+    latencies = []
+    if not fetch_urls:
+        return responses, latencies
+    if ThreadPoolExecutor is None:
+        for fetch_url in fetch_urls:
+            try:
+                responses[fetch_url], latency = fetch(fetch_url)
+                latencies.append(latency)
+            except:
+                current_logger.error(traceback.format_exc())
+                current_logger.error('error :: %s :: failed to get data from %s' % (
+                    current_skyline_app, str(fetch_url)))
+        return responses, latencies
+    max_workers = max_requests_per_host * len(host_semaphores)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_urls = {executor.submit(fetch, fetch_url): fetch_url for fetch_url in fetch_urls}
+        for future in as_completed(future_urls):
+            fetch_url = future_urls[future]
+            try:
+                responses[fetch_url], latency = future.result()
+                latencies.append(latency)
+            except:
+                current_logger.error(traceback.format_exc())
+                current_logger.error('error :: %s :: failed to get data from %s' % (
+                    current_skyline_app, str(fetch_url)))
+    return responses, latencies
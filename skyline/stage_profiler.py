@@ -0,0 +1,259 @@
+"""
+The stage profiler.
+
+Times the stages of an app process, e.g. the redis_read, decode, sort, airgaps,
+flux_resort, algorithms and redis_writes stages of an Analyzer spin_process.
+The wall time of each stage is recorded in the metrics registry if one is
+passed.  When profiling is enabled the wall and CPU time of each stage is also
+recorded and a trace of each process is written to the profile cycle directory
+as a Chrome trace JSON file (which can be loaded in chrome://tracing or
+Perfetto) with the per stage breakdown, and one process can also be profiled
+with cProfile and its pstats file written to the same directory.  The profile
+cycle directories are rotated, only the last n are kept.
+
+Stages can be nested, e.g. the airgaps stage is run within the algorithms stage
+of an Analyzer spin_process.  The time recorded for a stage in the metrics
+registry and the per stage breakdown is its self time, the time of the stages
+nested in it is subtracted so that the breakdown does not count any time twice.
+The trace events are the full duration of each stage, with the self time in
+the event args.
+"""
+from __future__ import division
+import os
+import json
+import shutil
+import resource
+from os import getpid
+from time import time
+
+try:
+    import cProfile
+except:
+    cProfile = None
+
+# The maximum number of trace events to record per process, after which only
+# the stage totals are recorded, so that a trace of a process analysing
+# 1000s of metrics remains loadable
+MAX_TRACE_EVENTS = 20000
+
+TRACE_FILE_SUFFIX = 'trace.json'
+PSTATS_FILE_SUFFIX = 'pstats'
+
+
+def cpu_time():
+    """
+    The user and system CPU time of the process in seconds.
+
+    :return: seconds
+    :rtype: float
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def profile_cycle_dir(profile_dir, skyline_app, cycles=10):
+    """
+    Create the profile directory for an app cycle and remove the oldest cycle
+    directories so that only the last cycles are kept.
+
+    :param profile_dir: the profile directory, e.g. settings.ANALYZER_PROFILE_DIR
+    :param skyline_app: the app
+    :param cycles: the number of cycle directories to keep
+    :type profile_dir: str
+    :type skyline_app: str
+    :type cycles: int
+    :return: cycle_dir
+    :rtype: str
+    """
+    app_profile_dir = os.path.join(profile_dir, skyline_app)
+    cycle_dir = os.path.join(app_profile_dir, str(int(time())))
+    if not os.path.isdir(cycle_dir):
+        os.makedirs(cycle_dir)
+    cycle_dirs = sorted(
+        [d for d in os.listdir(app_profile_dir) if d.isdigit()], key=int)
+    for old_cycle in cycle_dirs[:-cycles]:
+        shutil.rmtree(os.path.join(app_profile_dir, old_cycle), ignore_errors=True)
+    return cycle_dir
+
+
+def profile_cycles(profile_dir, skyline_app):
+    """
+    The profile cycles of an app, newest first, with the files and the stage
+    breakdown of each process.
+
+    :param profile_dir: the profile directory, e.g. settings.ANALYZER_PROFILE_DIR
+    :param skyline_app: the app
+    :type profile_dir: str
+    :type skyline_app: str
+    :return: cycles
+    :rtype: list
+    """
+    cycles = []
+    app_profile_dir = os.path.join(profile_dir, skyline_app)
+    if not os.path.isdir(app_profile_dir):
+        return cycles
+    cycle_dirs = sorted(
+        [d for d in os.listdir(app_profile_dir) if d.isdigit()], key=int,
+        reverse=True)
+    for cycle in cycle_dirs:
+        cycle_dir = os.path.join(app_profile_dir, cycle)
+        files = sorted(os.listdir(cycle_dir))
+        stages = {}
+        for trace_file in files:
+            if not trace_file.endswith(TRACE_FILE_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(cycle_dir, trace_file), 'r') as f:
+                    trace = json.load(f)
+                stages[trace_file] = trace['otherData']['stages']
+            except:
+                stages[trace_file] = None
+        cycles.append({'cycle': int(cycle), 'files': files, 'stages': stages})
+    return cycles
+
+
+class StageProfiler(object):
+    """
+    The stage profiler of a process, disabled until it is configured.
+    """
+
+    def __init__(self):
+        self.configure(None, 0)
+
+    def configure(self, skyline_app, process_number, registry=None, cycle_dir=None, cprofile=False):
+        """
+        Configure the stage profiler of the process, e.g. at the start of a
+        spin_process.
+
+        :param skyline_app: the app
+        :param process_number: the number of the process, e.g. the i of the
+            spin_process
+        :param registry: the metrics registry to record the stage wall times
+            in as stage_timings.<stage>
+        :param cycle_dir: the profile cycle directory, if passed the wall and
+            CPU time of each stage is traced
+        :param cprofile: profile the process with cProfile
+        :type skyline_app: str
+        :type process_number: int
+        :type registry: metrics_registry.MetricsRegistry
+        :type cycle_dir: str
+        :type cprofile: boolean
+        """
+        self.skyline_app = skyline_app
+        self.process_number = process_number
+        self.registry = registry
+        self.cycle_dir = cycle_dir
+        self.pid = getpid()
+        self.stages = {}
+        self.events = []
+        # The stages that have been started and not ended, innermost last
+        self.active_stages = []
+        self.started = time()
+        self.profile = None
+        if cycle_dir and cprofile and cProfile:
+            self.profile = cProfile.Profile()
+        self.enabled = bool(registry is not None or cycle_dir)
+
+    def enable(self):
+        if self.profile:
+            self.profile.enable()
+
+    def start(self):
+        """
+        The start of a stage, pass the returned value to end.
+
+        :return: [wall, cpu, nested wall, nested cpu]
+        :rtype: list
+        """
+        if self.cycle_dir:
+            started = [time(), cpu_time(), 0.0, 0.0]
+        else:
+            started = [time(), 0, 0.0, 0.0]
+        self.active_stages.append(started)
+        return started
+
+    def end(self, stage, started):
+        """
+        Record the time taken by a stage, less the time of the stages nested
+        in it.
+
+        :param stage: the stage name
+        :param started: the value returned by start
+        :type stage: str
+        :type started: list
+        """
+        wall = time() - started[0]
+        cpu = 0
+        if self.cycle_dir:
+            cpu = cpu_time() - started[1]
+        # Remove the stage and any nested stages that were not ended, e.g. if
+        # an exception was raised, from the active stages and add its time to
+        # the nested time of the stage it is nested in
+        for index in range((len(self.active_stages) - 1), -1, -1):
+            if self.active_stages[index] is started:
+                del self.active_stages[index:]
+                break
+        if self.active_stages:
+            self.active_stages[-1][2] += wall
+            self.active_stages[-1][3] += cpu
+        self_wall = max((wall - started[2]), 0.0)
+        if self.registry is not None:
+            self.registry.record('stage_timings.%s' % stage, self_wall)
+        if not self.cycle_dir:
+            return
+        self_cpu = max((cpu - started[3]), 0.0)
+        if stage not in self.stages:
+            self.stages[stage] = {'count': 0, 'wall': 0.0, 'cpu': 0.0}
+        self.stages[stage]['count'] += 1
+        self.stages[stage]['wall'] += self_wall
+        self.stages[stage]['cpu'] += self_cpu
+        if len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append({
+                'name': stage, 'cat': self.skyline_app, 'ph': 'X',
+                'ts': int(started[0] * 1000000), 'dur': int(wall * 1000000),
+                'pid': self.pid, 'tid': self.process_number,
+                'args': {
+                    'cpu_us': int(cpu * 1000000),
+                    'self_us': int(self_wall * 1000000),
+                    'self_cpu_us': int(self_cpu * 1000000)}})
+
+    def write(self):
+        """
+        Write the trace and the pstats of the process to the profile cycle
+        directory.
+
+        :return: the files written
+        :rtype: list
+        """
+        files = []
+        if not self.cycle_dir:
+            return files
+        if self.profile:
+            self.profile.disable()
+        file_prefix = os.path.join(self.cycle_dir, '%s.%s' % (
+            self.skyline_app, str(self.process_number)))
+        trace = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'skyline_app': self.skyline_app,
+                'process_number': self.process_number,
+                'pid': self.pid,
+                'run_time': round(time() - self.started, 6),
+                'events_truncated': len(self.events) >= MAX_TRACE_EVENTS,
+                'stages': self.stages,
+            },
+        }
+        trace_file = '%s.%s' % (file_prefix, TRACE_FILE_SUFFIX)
+        with open(trace_file, 'w') as f:
+            json.dump(trace, f)
+        files.append(trace_file)
+        if self.profile:
+            pstats_file = '%s.%s' % (file_prefix, PSTATS_FILE_SUFFIX)
+            self.profile.dump_stats(pstats_file)
+            files.append(pstats_file)
+        return files
+
+
+# The stage profiler of the process
+stage_profiler = StageProfiler()
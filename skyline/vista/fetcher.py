@@ -13,6 +13,8 @@ import re
 from sys import version_info
 import os.path
 from ast import literal_eval
+# @added 20261019 - vista bulk submission to flux
+import json
 try:
     from urllib.parse import quote
 except:
@@ -21,6 +23,8 @@ except:
 # @modified 20191115 - Branch #3262: py3
 # from redis import StrictRedis
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 
 import settings
 python_version = int(version_info[0])
@@ -30,7 +34,9 @@ if True:
         send_graphite_metric, filesafe_metricname,
         # @added 20191111 - Bug #3266: py3 Redis binary objects not strings
         #                   Branch #3262: py3
-        get_redis_conn, get_redis_conn_decoded)
+        get_redis_conn, get_redis_conn_decoded,
+        # @added 20261019 - vista concurrent fetcher
+        fetch_urls_concurrently)
 
 parent_skyline_app = 'vista'
 child_skyline_app = 'fetcher'
@@ -63,12 +69,48 @@ except:
 USE_FLUX = False
 LOCAL_DEBUG = False
 
+# @added 20261019 - vista concurrent fetcher
+try:
+    VISTA_FETCHER_MAX_REQUESTS_PER_HOST = int(settings.VISTA_FETCHER_MAX_REQUESTS_PER_HOST)
+except:
+    VISTA_FETCHER_MAX_REQUESTS_PER_HOST = 4
+try:
+    VISTA_FETCHER_REQUEST_TIMEOUT = int(settings.VISTA_FETCHER_REQUEST_TIMEOUT)
+except:
+    VISTA_FETCHER_REQUEST_TIMEOUT = 20
+try:
+    VISTA_FETCHER_REQUEST_RETRIES = int(settings.VISTA_FETCHER_REQUEST_RETRIES)
+except:
+    VISTA_FETCHER_REQUEST_RETRIES = 2
+
+
+def fetcher_session():
+    """
+    Create a requests session with a keep-alive connection pool that retries
+    requests that fail to connect or that return a 502, 503 or 504.
+
+    :return: session
+    :rtype: object
+
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=VISTA_FETCHER_REQUEST_RETRIES, backoff_factor=0.5,
+        status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(
+        pool_maxsize=VISTA_FETCHER_MAX_REQUESTS_PER_HOST, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
 class Fetcher(Thread):
     """
-    The fetcher thread asynchronisly retrieves the latest data points for
-    metrics from multiple endpoints using asyncio and aiohttp and submits the
-    data to the Redis set, vista.fetcher.metrics.json for the worker to process.
+    The fetcher thread concurrently retrieves the latest data points for
+    metrics from multiple endpoints, with a limit of
+    VISTA_FETCHER_MAX_REQUESTS_PER_HOST concurrent requests per remote host, and
+    submits the data to the Redis set, vista.fetcher.metrics.json for the worker
+    to process.
     """
     def __init__(self, parent_pid):
         super(Fetcher, self).__init__()
@@ -121,12 +163,19 @@ class Fetcher(Thread):
             graphite_batch_target_count = settings.VISTA_GRAPHITE_BATCH_SIZE
         except:
             graphite_batch_target_count = 20
-        graphite_batches = []  # [batch_no, remote_host, from_timestamp, url]
+        # @modified 20261019 - vista concurrent fetcher
+        # The batches are keyed by (remote_host, from_timestamp_str) and only
+        # the last batch for each key can have space for more targets, so
+        # adding a metric to a batch is O(1) rather than rebuilding the
+        # graphite_batches list on every addition.  The additional targets are
+        # added to the URL once the batches are built.
+        # graphite_batches = []  # [batch_no, remote_host, from_timestamp, url]
+        graphite_batches = {}  # {(remote_host, from_timestamp_str): [[url, [targets]]]}
         in_batch_responses = []
-        batch_number = 0
         for remote_host_type, frequency, remote_target, graphite_target, metric, url, namespace_prefix, api_key, token, user, password in metrics_to_fetch:
             if remote_host_type != 'graphite':
                 continue
+            remote_host = None
             try:
                 url_elements = url.split('/')
                 remote_host = url_elements[2]
@@ -151,59 +200,89 @@ class Fetcher(Thread):
             except:
                 logger.info(traceback.format_exc())
                 logger.error('error :: fetcher :: failed to determine the metric from the target url parameter - %s' % str(url))
-            added_to_batch = False
-            add_to_batch = False
-            for batch_number, batch_remote_host, batch_from_timestamp, batch_url in graphite_batches:
-                if added_to_batch:
-                    continue
-                try:
-                    if remote_host == batch_remote_host:
-                        if str(from_timestamp) == str(batch_from_timestamp):
-                            try:
-                                if batch_url.count('target') < graphite_batch_target_count:
-                                    add_to_batch = int(batch_number)
-                            except:
-                                logger.error('error :: fetcher :: failed to determine whether to add to batch')
-                                continue
-                except:
-                    logger.error('error :: fetcher :: failed to determine whether to add to batch')
-            if not add_to_batch:
-                batch_number += 1
-                batch_url = url
-                batch_data = [batch_number, remote_host, from_timestamp_str, url]
-                graphite_batches.append(batch_data)
-                added_to_batch = batch_number
-            if add_to_batch:
-                new_graphite_batches = []
-                for batch_number, batch_remote_host, batch_from_timestamp, batch_url in graphite_batches:
-                    if batch_number == add_to_batch:
-                        new_end = '&target=%s&format=json' % remote_target
-                        new_url = batch_url.replace('&format=json', new_end)
-                        batch_url = new_url
-                        added_to_batch = batch_number
-                    batch_data = [batch_number, batch_remote_host, batch_from_timestamp, batch_url]
-                    new_graphite_batches.append(batch_data)
-                graphite_batches = new_graphite_batches
-            if added_to_batch:
-                in_batch_responses.append(target)
-        batch_responses = []
+            batch_key = (remote_host, str(from_timestamp))
+            batches = graphite_batches.setdefault(batch_key, [])
+            if batches and (len(batches[-1][1]) + 1) < graphite_batch_target_count:
+                batches[-1][1].append(remote_target)
+            else:
+                batches.append([url, []])
+            in_batch_responses.append(target)
+
+        batch_urls = []
+        for batch_key in graphite_batches:
+            for batch_url, batch_targets in graphite_batches[batch_key]:
+                if batch_targets:
+                    new_end = '%s&format=json' % ''.join(['&target=%s' % batch_target for batch_target in batch_targets])
+                    batch_url = batch_url.replace('&format=json', new_end)
+                batch_urls.append(batch_url)
+
+        # @added 20261019 - vista concurrent fetcher
+        # All the requests are made concurrently over a keep-alive connection
+        # pool with no more than VISTA_FETCHER_MAX_REQUESTS_PER_HOST requests in
+        # flight to any one remote host
+        session = fetcher_session()
+        request_latencies = []
+
+        # @modified 20261019 - vista concurrent fetcher
+        # The batch responses are indexed by target so that each metric is
+        # looked up rather than iterating all the batch responses per metric
+        # batch_responses = []
+        batch_responses = {}
+        batch_responses_count = 0
         start_batch_fetches = int(time())
-        for batch_number, remote_host, from_timestamp_str, url in graphite_batches:
+        responses, latencies = fetch_urls_concurrently(
+            parent_skyline_app, session, batch_urls,
+            VISTA_FETCHER_MAX_REQUESTS_PER_HOST, VISTA_FETCHER_REQUEST_TIMEOUT,
+            log_requests=LOCAL_DEBUG)
+        request_latencies += latencies
+        for url in batch_urls:
+            if url not in responses:
+                continue
             try:
-                batch_response = requests.get(url)
-                batch_js = batch_response.json()
-                batch_responses.append(batch_js)
+                batch_js = responses[url].json()
+                for i in batch_js:
+                    batch_responses[str(i['target'])] = i
+                batch_responses_count += 1
             except:
                 logger.error(traceback.format_exc())
                 logger.error('error :: fetcher :: failed to get valid response for batch request %s' % str(url))
-        if batch_responses:
+        if batch_responses_count:
             end_batch_fetches = int(time())
             time_to_fetch_batches = end_batch_fetches - start_batch_fetches
             logger.info('fetcher :: %s metric batch requests of %s metrics per batch were fetched in %s seconds' % (
-                str(len(batch_responses)), str(graphite_batch_target_count), str(time_to_fetch_batches)))
+                str(batch_responses_count), str(graphite_batch_target_count), str(time_to_fetch_batches)))
         if in_batch_responses:
             logger.info('fetcher :: %s metrics were fetched in batch requests' % str(len(in_batch_responses)))
 
+        # @added 20261019 - vista concurrent fetcher
+        # Fetch the metrics that were not returned in a batch response
+        # concurrently as well
+        urls_to_fetch = []
+        for remote_host_type, frequency, remote_target, graphite_target, metric, url, namespace_prefix, api_key, token, user, password in metrics_to_fetch:
+            if remote_target not in batch_responses:
+                urls_to_fetch.append(url)
+        url_responses = {}
+        if urls_to_fetch:
+            url_responses, latencies = fetch_urls_concurrently(
+                parent_skyline_app, session, urls_to_fetch,
+                VISTA_FETCHER_MAX_REQUESTS_PER_HOST,
+                VISTA_FETCHER_REQUEST_TIMEOUT, log_requests=LOCAL_DEBUG)
+            request_latencies += latencies
+        try:
+            session.close()
+        except:
+            pass
+
+        # @added 20261019 - vista concurrent fetcher
+        # Add the request latencies to the Redis list for the fetcher to
+        # publish to Graphite
+        if request_latencies:
+            try:
+                self.redis_conn.rpush('vista.fetcher.request_latencies', *[str(latency) for latency in request_latencies])
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: fetcher :: failed to add request latencies to Redis list vista.fetcher.request_latencies')
+
         for remote_host_type, frequency, remote_target, graphite_target, metric, url, namespace_prefix, api_key, token, user, password in metrics_to_fetch:
             success = False
 
@@ -213,37 +292,27 @@ class Fetcher(Thread):
             # requested individually as per the default behaviour
             js = None
             batched_response = False
-            if remote_target in in_batch_responses:
-                try:
-                    for responses in batch_responses:
-                        for i in responses:
-                            if str(i['target']) == remote_target:
-                                js = i
-                                batched_response = True
-                                success = True
-                                logger.info('fetcher :: data for %s was fetched in a batch' % str(remote_target))
-                except:
-                    logger.error(traceback.format_exc())
-                    logger.error('error :: fetcher :: failed to detemine if %s was in batch_responses' % str(remote_target))
+            # @modified 20261019 - vista concurrent fetcher
+            # if remote_target in in_batch_responses:
+            if remote_target in batch_responses:
+                js = batch_responses[remote_target]
+                batched_response = True
+                success = True
 
             # @modified 20191127 - Feature #3338: Vista - batch Graphite requests
             # Wrapped in if not success
             response = None
             if not success:
-                try:
-                    # @modified 20191011 - Task #3258: Reduce vista logging
-                    if LOCAL_DEBUG:
-                        logger.info('fetcher :: getting data from %s' % str(url))
-                    response = requests.get(url)
+                # @modified 20261019 - vista concurrent fetcher
+                # The response was fetched concurrently
+                # response = requests.get(url)
+                response = url_responses.get(url)
+                if response is not None:
                     if response.status_code == 200:
                         success = True
-                except:
-                    logger.error(traceback.format_exc())
-                    # @modified 20191115 - Branch #3262: py3
-                    # Do not report last response data
-                    # logger.error('error :: fetcher :: http status code - %s, reason - %s' % (
-                    #     str(response.status_code), str(response.reason)))
-                    logger.error('error :: fetcher :: failed to get data from %s' % str(url))
+                    else:
+                        logger.error('error :: fetcher :: http status code - %s, reason - %s from %s' % (
+                            str(response.status_code), str(response.reason), str(url)))
             if not success:
                 continue
 
@@ -461,7 +530,10 @@ class Fetcher(Thread):
                 str(timeseries_length), metric))
 
             payload = None
-            timeseries_str = '"%s"' % timeseries
+            # @modified 20261019 - vista bulk submission to flux
+            # The datapoints are added as a list and the payload as json so
+            # that the worker parses the data once
+            # timeseries_str = '"%s"' % timeseries
             try:
                 payload = [{
                     'remote_host_type': remote_host_type,
@@ -473,13 +545,14 @@ class Fetcher(Thread):
                     'token': token,
                     'user': user,
                     'password': password,
-                    'datapoints': timeseries_str
+                    'datapoints': timeseries
                 }]
             except:
                 logger.error(traceback.format_exc())
                 logger.error('error :: fetcher :: could not build the payload json')
             redis_set = 'vista.fetcher.metrics.json'
-            data = str(payload)
+            # data = str(payload)
+            data = json.dumps(payload)
             try:
                 self.redis_conn.sadd(redis_set, data)
                 if LOCAL_DEBUG:
@@ -1250,6 +1323,48 @@ class Fetcher(Thread):
                     logger.error(traceback.format_exc())
                     logger.error('error :: fetcher :: could not get Redis set %s' % redis_set)
 
+            # @added 20261019 - vista concurrent fetcher
+            # Publish the per remote host request latency percentiles
+            request_latencies = []
+            try:
+                redis_list = 'vista.fetcher.request_latencies'
+                pipe = self.redis_conn_decoded.pipeline()
+                pipe.lrange(redis_list, 0, -1)
+                pipe.delete(redis_list)
+                request_latencies = pipe.execute()[0]
+            except:
+                logger.error(traceback.format_exc())
+                logger.error('error :: fetcher :: could not get Redis list %s' % redis_list)
+            host_latencies = {}
+            for str_request_latency in request_latencies:
+                try:
+                    remote_host, latency = literal_eval(str_request_latency)
+                    host_latencies.setdefault(remote_host, []).append(float(latency))
+                except:
+                    logger.error('error :: fetcher :: failed to determine latency from %s' % str(str_request_latency))
+            for remote_host in host_latencies:
+                latencies = sorted(host_latencies[remote_host])
+                latencies_count = len(latencies)
+                host_metric_namespace = re.sub('[^a-zA-Z0-9_-]', '_', remote_host)
+                latency_metrics = [
+                    ['requests', latencies_count],
+                    ['p50', latencies[int(latencies_count * 0.5)]],
+                    ['p95', latencies[min(int(latencies_count * 0.95), (latencies_count - 1))]],
+                    ['max', latencies[-1]],
+                ]
+                for latency_metric, latency_value in latency_metrics:
+                    send_metric_name = '%s.latency.%s.%s' % (
+                        skyline_app_graphite_namespace, host_metric_namespace,
+                        latency_metric)
+                    try:
+                        send_graphite_metric(parent_skyline_app, send_metric_name, str(round(latency_value, 3)))
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: fetcher :: could not send %s to Graphite' % send_metric_name)
+                logger.info('fetcher :: %s requests to %s, latency p50 %.3f, p95 %.3f, max %.3f seconds' % (
+                    str(latencies_count), remote_host, latency_metrics[1][1],
+                    latency_metrics[2][1], latency_metrics[3][1]))
+
             send_metric_name = '%s.sent_to_flux' % skyline_app_graphite_namespace
             try:
                 logger.info('fetcher :: sending Graphite - %s, %s' % (
@@ -10,6 +10,9 @@ from sys import version_info
 import os.path
 from ast import literal_eval
 import datetime
+# @added 20261019 - vista bulk submission to flux
+import json
+import math
 
 # @added 20200107 - Task #3376: Enable vista and flux to deal with lower frequency data
 from collections import Counter
@@ -18,10 +21,6 @@ from collections import Counter
 import requests
 import pandas as pd
 
-# @added 20200225 - Bug #3476: vista - handle very large floats
-# Handle very large floats
-from numpy import format_float_positional
-
 import settings
 from skyline_functions import (
     send_graphite_metric,
@@ -54,6 +53,83 @@ this_host = str(os.uname()[1])
 LOCAL_DEBUG = False
 
 
+# @added 20261019 - vista bulk submission to flux
+def load_metric_data(str_metric_data):
+    """
+    Load a vista.fetcher.metrics.json Redis set member, the fetcher adds the
+    members as json with the datapoints as a list.  Members added by an older
+    fetcher are the str of a list with the datapoints as a quoted str and are
+    handled with literal_eval.
+    """
+    try:
+        metric_data = json.loads(str_metric_data)
+    except ValueError:
+        metric_data = literal_eval(str_metric_data)
+    datapoints = metric_data[0]['datapoints']
+    if not isinstance(datapoints, list):
+        metric_data[0]['datapoints'] = literal_eval(literal_eval(datapoints))
+    return metric_data
+
+
+# @added 20261019 - vista bulk submission to flux
+def submit_flux_bulk(flux_session, flux_bulk_url, headers, metrics_datapoints):
+    """
+    Submit the data points of multiple metrics to the flux metric_data_bulk
+    endpoint in one request.  flux rejects the entire request with a 400 if
+    any data point is invalid, so if the request is rejected the metrics are
+    bisected and each half is submitted until the metrics with invalid data
+    points are identified, so that one invalid metric does not stall all the
+    others.
+
+    :param flux_session: the requests session
+    :param flux_bulk_url: the flux metric_data_bulk url
+    :param headers: the request headers
+    :param metrics_datapoints: a list of [metric_key, datapoints] items where
+        datapoints is a list of [metric, timestamp, value] data points
+    :type flux_session: object
+    :type flux_bulk_url: str
+    :type headers: dict
+    :type metrics_datapoints: list
+    :return: (submitted, rejected) the lists of the metric_keys that were
+        submitted and those that flux rejected.  The metric_keys of a request
+        that failed for any other reason are in neither list so that they are
+        submitted again on the next pass.
+    :rtype: tuple
+    """
+    metric_keys = [metric_key for metric_key, datapoints in metrics_datapoints]
+    body_datapoints = []
+    for metric_key, datapoints in metrics_datapoints:
+        body_datapoints += datapoints
+    if not body_datapoints:
+        return metric_keys, []
+    status_code = None
+    try:
+        body = '\n'.join([json.dumps(datapoint) for datapoint in body_datapoints])
+        response = flux_session.post(flux_bulk_url, data=body.encode('utf-8'), headers=headers, timeout=60)
+        status_code = response.status_code
+        if status_code not in [200, 204]:
+            logger.error('error :: worker :: http status code - %s, reason - %s from %s for %s metrics' % (
+                str(response.status_code), str(response.reason),
+                str(flux_bulk_url), str(len(metric_keys))))
+    except:
+        logger.error(traceback.format_exc())
+        logger.error('error :: worker :: failed to request %s' % str(flux_bulk_url))
+    if status_code in [200, 204]:
+        return metric_keys, []
+    if status_code != 400:
+        return [], []
+    if len(metrics_datapoints) == 1:
+        logger.error('error :: worker :: flux rejected the data points of %s - %s' % (
+            str(metric_keys[0]), str(body_datapoints)))
+        return [], metric_keys
+    half = len(metrics_datapoints) // 2
+    submitted, rejected = submit_flux_bulk(
+        flux_session, flux_bulk_url, headers, metrics_datapoints[:half])
+    more_submitted, more_rejected = submit_flux_bulk(
+        flux_session, flux_bulk_url, headers, metrics_datapoints[half:])
+    return submitted + more_submitted, rejected + more_rejected
+
+
 class Worker(Process):
     """
     The worker process retrieves time series published to the Vista Fetcher
@@ -128,6 +204,13 @@ class Worker(Process):
         last_sent_to_graphite = int(time())
         metrics_sent_to_flux = 0
 
+        # @added 20261019 - vista bulk submission to flux
+        flux_session = requests.Session()
+        try:
+            flux_max_age = settings.FLUX_MAX_AGE
+        except:
+            flux_max_age = 3600
+
         # python-2.x and python3.x handle while 1 and while True differently
         # while 1:
         running = True
@@ -174,6 +257,32 @@ class Worker(Process):
                     logger.info('worker :: no data from Redis set %s' % str(redis_set))
                 sleep(5)
 
+            # @added 20261019 - vista bulk submission to flux
+            # Parse each member once and get the flux.last keys for all the
+            # metrics with a single MGET
+            loaded_metrics_data = {}
+            for str_metric_data in metrics_data:
+                try:
+                    loaded_metrics_data[str_metric_data] = load_metric_data(str_metric_data)
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: worker :: failed to load metric_data from %s' % str(str_metric_data))
+            last_flux_metric_data_cache = {}
+            if loaded_metrics_data:
+                try:
+                    cache_keys = list(set(['flux.last.%s' % str(metric_data[0]['metric']) for metric_data in loaded_metrics_data.values()]))
+                    last_flux_metric_data_cache = dict(zip(cache_keys, self.redis_conn_decoded.mget(cache_keys)))
+                except:
+                    logger.error(traceback.format_exc())
+                    logger.error('error :: worker :: failed to mget the flux.last Redis keys')
+
+            # @added 20261019 - vista bulk submission to flux
+            # The data points to submit to flux in one bulk request and the
+            # Redis set members and remote_targets they relate to
+            submitted_metrics_data = []
+            flux_now = int(time())
+            flux_too_old = flux_now - flux_max_age
+
             for str_metric_data in metrics_data:
                 delete_set_record = False
                 remote_host_type = None
@@ -185,7 +294,9 @@ class Worker(Process):
                     # if python_version == 3:
                     #     str_metric_data = str_metric_data.decode('UTF-8')
 
-                    metric_data = literal_eval(str_metric_data)
+                    # @modified 20261019 - vista bulk submission to flux
+                    # metric_data = literal_eval(str_metric_data)
+                    metric_data = loaded_metrics_data[str_metric_data]
                     remote_host_type = str(metric_data[0]['remote_host_type'])
                     if LOCAL_DEBUG:
                         logger.info('worker :: got data from Redis set for remote_host_type %s' % str(remote_host_type))
@@ -232,12 +343,15 @@ class Worker(Process):
                     last_flux_metric_data = None
                     cache_key = 'flux.last.%s' % (metric)
                     try:
-                        if python_version == 3:
-                            redis_last_flux_metric_data = self.redis_conn.get(cache_key).decode('UTF-8')
-                        else:
-                            redis_last_flux_metric_data = self.redis_conn.get(cache_key)
-                        redis_last_flux_metric_data = redis_last_flux_metric_data
-                        last_flux_metric_data = literal_eval(redis_last_flux_metric_data)
+                        # @modified 20261019 - vista bulk submission to flux
+                        # Use the MGET data
+                        # if python_version == 3:
+                        #     redis_last_flux_metric_data = self.redis_conn.get(cache_key).decode('UTF-8')
+                        # else:
+                        #     redis_last_flux_metric_data = self.redis_conn.get(cache_key)
+                        redis_last_flux_metric_data = last_flux_metric_data_cache.get(cache_key, None)
+                        if redis_last_flux_metric_data:
+                            last_flux_metric_data = literal_eval(redis_last_flux_metric_data)
                         if LOCAL_DEBUG:
                             logger.info('worker :: got last_flux_metric_data from Redis')
                     except:
@@ -265,7 +379,6 @@ class Worker(Process):
                     current_datetime = datetime.datetime.utcfromtimestamp(time_now).replace(hour=current_minute_hour, minute=current_minute_minute, second=0, microsecond=0)
                     current_minute_timestamp_start = int(current_datetime.strftime('%s'))
 
-                    datapoint = None
                     last_timestamp_with_data = None
                     timeseries = []
 
@@ -274,13 +387,12 @@ class Worker(Process):
                     metric_resolution_determined = False
 
                     try:
-                        if python_version == 3:
-                            datapoints_str = literal_eval(metric_data[0]['datapoints'])
-                            metric_datapoints = literal_eval(datapoints_str)
-                        else:
-                            # metric_datapoints = metric_data[0]['datapoints']
-                            datapoints_str = literal_eval(metric_data[0]['datapoints'])
-                            metric_datapoints = literal_eval(datapoints_str)
+                        # @modified 20261019 - vista bulk submission to flux
+                        # The datapoints are parsed once by load_metric_data
+                        # if python_version == 3:
+                        #     datapoints_str = literal_eval(metric_data[0]['datapoints'])
+                        #     metric_datapoints = literal_eval(datapoints_str)
+                        metric_datapoints = metric_data[0]['datapoints']
                         # for value, timestamp in metric_data[0]['datapoints']:
                         if LOCAL_DEBUG:
                             len_metric_datapoints = len(metric_datapoints)
@@ -368,7 +480,6 @@ class Worker(Process):
                                 has_value = True
                             if has_value:
                                 last_timestamp_with_data = int(timestamp)
-                                datapoint = value
                                 break
                         if last_timestamp_with_data:
                             have_data = True
@@ -415,7 +526,8 @@ class Worker(Process):
                     continue
 
                 if valid_data:
-                    flux_host = 'http://%s:%s' % (settings.FLUX_IP, settings.FLUX_PORT)
+                    # @modified 20261019 - vista bulk submission to flux
+                    # flux_host = 'http://%s:%s' % (settings.FLUX_IP, settings.FLUX_PORT)
 
                     # Resample
                     resample_at = None
@@ -445,60 +557,67 @@ class Worker(Process):
                             logger.error('error :: worker :: failed to resample time series at %s for %s with time series %s' % (
                                 str(resample_at), str(metric), str(timeseries)))
 
+                    # @modified 20261019 - vista bulk submission to flux
+                    # Rather than making a GET request to flux for each data
+                    # point, add the data points to the bulk request
+                    # flux rejects the entire bulk request if any data point
+                    # is invalid, so data points flux would reject as too old
+                    # or in the future are dropped here
+                    # Non finite values are dropped as flux rejects them
+                    datapoints_dropped = 0
+                    metric_datapoints = []
                     for timestamp, value in timeseries:
-                        # @added 20200225 - Bug #3476: vista - handle very large floats
-                        # Handle very large floats
-                        # So that flux is never passed a value=1.00243039089e+11
-                        if 'e' in str(value):
-                            datapoint = format_float_positional(value)
-                        else:
-                            datapoint = float(value)
-                        flux_url = '%s/metric_data?metric=%s&value=%s&timestamp=%s&key=%s' % (
-                            flux_host, metric, str(datapoint),
-                            str(timestamp),
-                            settings.FLUX_SELF_API_KEY)
-                        success = False
-                        try:
-                            response = requests.get(flux_url)
-                            if response.status_code == 200:
-                                success = True
-                            elif response.status_code == 204:
-                                success = True
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: worker :: failed to request %s' % str(flux_url))
-                        if not success:
-                            logger.error('error :: worker :: http status code - %s, reason - %s from %s' % (
-                                str(response.status_code), str(response.reason),
-                                str(flux_url)))
-                            logger.debug('debug :: timeseries - %s' % str(timeseries))
-
-                    if success:
-                        metrics_sent_to_flux += 1
-                        redis_set = 'vista.fetcher.metrics.json'
-
-                        # @added 20191011 - Task #3258: Reduce vista logging
-                        timeseries_length = len(timeseries)
-
-                        # @modified 20191011 - Task #3258: Reduce vista logging
-                        # logger.info('worker :: data submitted to flux OK, removing data from Redis set %s' % (
-                        #     redis_set))
-                        logger.info('worker :: %s data points submitted to flux OK for %s' % (
-                            str(timeseries_length), metric))
-                        try:
-                            self.redis_conn.srem(redis_set, str_metric_data)
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: worker :: failed to delete data from Redis set %s, data - %s' % (
-                                redis_set, str(str_metric_data)))
-
-                        redis_set = 'vista.fetcher.unique_metrics'
-                        try:
-                            self.redis_conn.sadd(redis_set, remote_target)
-                        except:
-                            logger.error(traceback.format_exc())
-                            logger.error('error :: worker :: failed to add %s to Redis set %s' % (
-                                remote_target, redis_set))
+                        if int(timestamp) < flux_too_old or int(timestamp) > flux_now:
+                            datapoints_dropped += 1
+                            continue
+                        if math.isnan(float(value)) or math.isinf(float(value)):
+                            datapoints_dropped += 1
+                            continue
+                        metric_datapoints.append([metric, int(timestamp), float(value)])
+                    if datapoints_dropped:
+                        logger.info('worker :: dropped %s data points for %s which are older than FLUX_MAX_AGE, in the future or not finite' % (
+                            str(datapoints_dropped), metric))
+                    submitted_metrics_data.append([str_metric_data, remote_target, metric, len(timeseries), metric_datapoints])
+
+            # @added 20261019 - vista bulk submission to flux
+            # Submit all the data points to flux in one request, if flux
+            # rejects the request the metrics are bisected to identify the
+            # metrics with invalid data points
+            if submitted_metrics_data:
+                flux_bulk_url = 'http://%s:%s/metric_data_bulk' % (settings.FLUX_IP, settings.FLUX_PORT)
+                headers = {
+                    'Content-Type': 'application/x-ndjson',
+                    'X-Flux-Key': settings.FLUX_SELF_API_KEY,
+                }
+                # If all the data points of a metric were dropped there is
+                # nothing to submit but the set member is still removed
+                metrics_datapoints = [[index, metric_data_item[4]] for index, metric_data_item in enumerate(submitted_metrics_data)]
+                submitted_indices, rejected_indices = submit_flux_bulk(
+                    flux_session, flux_bulk_url, headers, metrics_datapoints)
+                if submitted_indices:
+                    metrics_sent_to_flux += len(submitted_indices)
+                    logger.info('worker :: data points for %s of %s metrics submitted to flux OK' % (
+                        str(len(submitted_indices)), str(len(submitted_metrics_data))))
+                if rejected_indices:
+                    logger.error('error :: worker :: flux rejected the data points of %s metrics, removing them from vista.fetcher.metrics.json' % (
+                        str(len(rejected_indices))))
+                if submitted_indices or rejected_indices:
+                    try:
+                        pipe = self.redis_conn.pipeline()
+                        for index in submitted_indices:
+                            str_metric_data, remote_target, metric, timeseries_length, metric_datapoints = submitted_metrics_data[index]
+                            # @added 20191011 - Task #3258: Reduce vista logging
+                            if LOCAL_DEBUG:
+                                logger.info('worker :: %s data points submitted to flux OK for %s' % (
+                                    str(timeseries_length), metric))
+                            pipe.srem('vista.fetcher.metrics.json', str_metric_data)
+                            pipe.sadd('vista.fetcher.unique_metrics', remote_target)
+                        for index in rejected_indices:
+                            pipe.srem('vista.fetcher.metrics.json', submitted_metrics_data[index][0])
+                        pipe.execute()
+                    except:
+                        logger.error(traceback.format_exc())
+                        logger.error('error :: worker :: failed to update the vista.fetcher.metrics.json and vista.fetcher.unique_metrics Redis sets')
 
             time_now = int(time())
             if (time_now - last_sent_to_graphite) >= 60:
@@ -14,7 +14,9 @@ import settings
 import skyline_version
 from skyline_functions import (
     mkdir_p, write_data_to_file, filesafe_metricname, is_derivative_metric)
-from database import (get_engine, metrics_table_meta)
+# @modified 20261019 - Database engine registry
+# from database import (get_engine, metrics_table_meta)
+from database import (get_engine, metrics_table_meta, dispose_engine)
 
 skyline_version = skyline_version.__absolute_version__
 skyline_app = 'webapp'
@@ -47,7 +49,11 @@ def get_an_engine():
 def engine_disposal(engine):
     if engine:
         try:
-            engine.dispose()
+            # @modified 20261019 - Database engine registry
+            # The engine of the process is not disposed of so that its
+            # connection pool is reused
+            # engine.dispose()
+            dispose_engine(skyline_app, engine)
         except:
             logger.error(traceback.format_exc())
             logger.error('error :: calling engine.dispose()')
@@ -361,6 +367,11 @@ drwxr-xr-x. 439 skyline skyline  53248 Mar 30 08:56 ..
                 for file in files:
                     if 'skyline.anomalies_score.txt' == file:
                         completed_job = True
+                        # @added 20261019 - Crucible parallel algorithms and deferred plots
+                        # The .DETECTED.png plots may be deferred, the
+                        # skyline.anomalies_score.txt is only created if an
+                        # algorithm triggered
+                        has_anomalies = True
                         skyline_anomalies_score_file = '%s/%s' % (root, file)
                         try:
                             with open(skyline_anomalies_score_file) as f:
@@ -491,6 +502,19 @@ drwxr-xr-x. 439 skyline skyline  53248 Mar 30 08:56 ..
 [root@skyline-1 ~]
     """
 
+    # @added 20261019 - Crucible parallel algorithms and deferred plots
+    # If crucible has not created the plots yet, create them now
+    if os.path.isfile('%s/skyline.deferred_plots.json' % data_dir):
+        try:
+            from crucible.crucible_algorithms import render_deferred_plots
+            logger.info('get_crucible_job :: creating deferred plots in %s' % (data_dir))
+            render_deferred_plots(data_dir)
+        except:
+            trace = traceback.format_exc()
+            fail_msg = 'error :: failed to create deferred plots in %s' % data_dir
+            logger.error(trace)
+            logger.error(fail_msg)
+
     try:
         logger.info('get_crucible_job :: walking %s' % (data_dir))
         for root, dirs, files in walk(data_dir):
@@ -521,6 +545,9 @@ drwxr-xr-x. 439 skyline skyline  53248 Mar 30 08:56 ..
                     image_file_names.append(file)
                 if file.endswith('.DETECTED.png'):
                     has_anomalies = True
+                # @added 20261019 - Crucible parallel algorithms and deferred plots
+                if file == 'skyline.anomalies_score.txt':
+                    has_anomalies = True
                 if file.endswith(crucible_job_sent_to_panorama_file_pattern):
                     panorama_done = True
                     try:
@@ -49,6 +49,8 @@ from database import (
     ionosphere_layers_matched_table_meta,
     # @added 20190502 - Branch #2646: slack
     anomalies_table_meta,
+    # @added 20261019 - Database engine registry
+    dispose_engine,
 )
 # @added 20190502 - Branch #2646: slack
 from slack_functions import slack_post_message, slack_post_reaction
@@ -300,7 +302,11 @@ def get_an_engine():
 def engine_disposal(engine):
     if engine:
         try:
-            engine.dispose()
+            # @modified 20261019 - Database engine registry
+            # The engine of the process is not disposed of so that its
+            # connection pool is reused
+            # engine.dispose()
+            dispose_engine(skyline_app, engine)
         except:
             logger.error(traceback.format_exc())
             logger.error('error :: calling engine.dispose()')
@@ -177,6 +177,21 @@ try:
     flux_process_uploads = settings.FLUX_PROCESS_UPLOADS
 except:
     flux_process_uploads = False
+# @added 20261019 - Feature #4720: Analyzer profiling
+from stage_profiler import profile_cycles
+try:
+    ANALYZER_PROFILE_DIR = settings.ANALYZER_PROFILE_DIR
+except:
+    ANALYZER_PROFILE_DIR = '%s/profiles' % settings.SKYLINE_TMP_DIR
+# @added 20261019 - Feature #4728: Anomalies snapshots
+from anomalies_snapshot import (
+    snapshots_dir, snapshot_versions, read_snapshot, anomalies_delta,
+    SNAPSHOT_APPS)
+# The snapshots that have been read, by snapshots directory and version, so
+# that a snapshot is only
+# read and decompressed once rather than per request
+anomalies_snapshots_cache = {}
+
 if flux_process_uploads:
     try:
         file_uploads_enabled = settings.WEBAPP_ACCEPT_DATA_UPLOADS
@@ -531,16 +546,104 @@ def then():
         return 'Uh oh ... a Skyline 500 :(', 500
 
 
+# @added 20261019 - Feature #4728: Anomalies snapshots
+def get_anomalies_snapshot(snapshot_dir, version):
+    """
+    Get a snapshot from the anomalies_snapshots_cache, reading it if it has not
+    been read yet.
+
+    :param snapshot_dir: the snapshots directory
+    :param version: the snapshot version
+    :type snapshot_dir: str
+    :type version: int
+    :return: (snapshot, gzipped_snapshot)
+    :rtype: tuple
+    """
+    if (snapshot_dir, version) not in anomalies_snapshots_cache:
+        snapshot, gzipped_snapshot = read_snapshot(snapshot_dir, version)
+        if not snapshot:
+            return None, None
+        anomalies_snapshots_cache[(snapshot_dir, version)] = (snapshot, gzipped_snapshot)
+        # Only cache the versions that are kept
+        versions = snapshot_versions(snapshot_dir)
+        for cached_snapshot_dir, cached_version in list(anomalies_snapshots_cache.keys()):
+            if cached_snapshot_dir == snapshot_dir and cached_version not in versions:
+                del anomalies_snapshots_cache[(cached_snapshot_dir, cached_version)]
+    return anomalies_snapshots_cache[(snapshot_dir, version)]
+
+
 @app.route("/anomalies.json")
 def anomalies():
+    # @modified 20261019 - Feature #4728: Anomalies snapshots
+    # The anomalies.json is served with send_file as a conditional response,
+    # so that a client gets a 304 if it has not changed and it is streamed
+    # rather than read into memory.  With the snapshot parameter the current
+    # gzipped snapshot is served as is with its ETag and with the since
+    # parameter the anomalies added and removed since that snapshot version
+    # are served.  The app parameter selects the analyzer (default) or boundary
+    # snapshots.
+    # try:
+    #     anomalies_json = path.abspath(path.join(path.dirname(__file__), '..', settings.ANOMALY_DUMP))
+    #     with open(anomalies_json, 'r') as f:
+    #         json_data = f.read()
+    # except:
+    #     logger.error('error :: failed to get anomalies.json: ' + traceback.format_exc())
+    #     return 'Uh oh ... a Skyline 500 :(', 500
+    # return json_data, 200
+    anomalies_json = path.abspath(path.join(path.dirname(__file__), '..', settings.ANOMALY_DUMP))
+    if 'snapshot' not in request.args and 'since' not in request.args:
+        try:
+            return send_file(
+                anomalies_json, mimetype='application/javascript',
+                conditional=True, cache_timeout=0)
+        except:
+            logger.error('error :: failed to get anomalies.json: ' + traceback.format_exc())
+            return 'Uh oh ... a Skyline 500 :(', 500
+
+    snapshot_app = request.args.get('app', 'analyzer')
+    if snapshot_app not in SNAPSHOT_APPS:
+        return 'Bad Request - app must be one of %s' % ', '.join(SNAPSHOT_APPS), 400
     try:
-        anomalies_json = path.abspath(path.join(path.dirname(__file__), '..', settings.ANOMALY_DUMP))
-        with open(anomalies_json, 'r') as f:
-            json_data = f.read()
+        snapshot_dir = snapshots_dir(anomalies_json, snapshot_app)
+        versions = snapshot_versions(snapshot_dir)
+        if not versions:
+            return 'No anomalies snapshot', 404
+        snapshot, gzipped_snapshot = get_anomalies_snapshot(snapshot_dir, versions[-1])
+        if not snapshot:
+            return 'No anomalies snapshot', 404
     except:
-        logger.error('error :: failed to get anomalies.json: ' + traceback.format_exc())
+        logger.error('error :: failed to get the anomalies snapshot: ' + traceback.format_exc())
         return 'Uh oh ... a Skyline 500 :(', 500
-    return json_data, 200
+
+    etag = snapshot['etag']
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    since_snapshot = None
+    if 'since' in request.args:
+        try:
+            since_version = int(request.args.get('since'))
+        except:
+            return 'Bad Request - since must be a snapshot version', 400
+        since_snapshot, since_gzipped_snapshot = get_anomalies_snapshot(snapshot_dir, since_version)
+
+    if since_snapshot:
+        # A delta since a version that is kept
+        response = Response(
+            json.dumps(anomalies_delta(snapshot, since_snapshot)),
+            mimetype='application/json')
+    elif 'gzip' in request.headers.get('Accept-Encoding', '').lower():
+        # The full snapshot, served as the gzipped file
+        response = Response(gzipped_snapshot, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    else:
+        response = Response(json.dumps(snapshot), mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['X-Skyline-Anomalies-Version'] = str(snapshot['version'])
+    return response
 
 
 @app.route("/panorama.json")
@@ -4554,6 +4657,49 @@ def ionosphere_images():
     return 'Bad Request', 400
 
 
+# @added 20261019 - Feature #4720: Analyzer profiling
+@app.route('/analyzer_profiles')
+@requires_auth
+def analyzer_profiles():
+    """
+    Without arguments returns the ANALYZER_PROFILE runs as json, newest first,
+    with the files and the stage breakdown of each spin_process.  With the
+    cycle and file arguments returns the file, a Chrome trace json file or a
+    pstats file.
+    """
+    cycle = request.args.get('cycle', None)
+    profile_file = request.args.get('file', None)
+    if not cycle and not profile_file:
+        try:
+            cycles = profile_cycles(ANALYZER_PROFILE_DIR, 'analyzer')
+        except:
+            message = 'Uh oh ... a Skyline 500 :( - could not list the analyzer profiles'
+            trace = traceback.format_exc()
+            return internal_error(message, trace)
+        return jsonify({'analyzer_profiles': cycles}), 200
+
+    # Only allow files in the profile cycle directories to be requested
+    if not str(cycle).isdigit() or not profile_file or path.basename(str(profile_file)) != str(profile_file):
+        error_string = 'error :: invalid request arguments - cycle=%s, file=%s' % (
+            str(cycle), str(profile_file))
+        logger.error(error_string)
+        resp = json.dumps({'400 Bad Request': error_string})
+        return flask_escape(resp), 400
+    filename = path.join(ANALYZER_PROFILE_DIR, 'analyzer', str(cycle), str(profile_file))
+    if not os.path.isfile(filename):
+        return 'Not Found', 404
+    if filename.endswith('.json'):
+        mimetype = 'application/json'
+    else:
+        mimetype = 'application/octet-stream'
+    try:
+        return send_file(filename, mimetype=mimetype, as_attachment=True)
+    except:
+        message = 'Uh oh ... a Skyline 500 :( - could not return %s' % filename
+        trace = traceback.format_exc()
+        return internal_error(message, trace)
+
+
 # @added 20170102 - Feature #1838: utilites - ALERTS matcher
 #                   Branch #922: ionosphere
 #                   Task #1658: Patterning Skyline Ionosphere
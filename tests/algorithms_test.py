@@ -4,6 +4,8 @@ from time import time
 import os.path
 import sys
 
+import numpy as np
+
 #from skyline.analyzer import algorithms
 #from skyline import settings
 
@@ -115,6 +117,47 @@ class TestAlgorithms(unittest.TestCase):
         self.assertEqual(ensemble, [True])
         self.assertEqual(tail_avg, 334)
 
+    def airgapped_data(self, ts):
+        """
+        A 60 second resolution time series with a 600 second air gap 30
+        minutes ago
+        """
+        end_timestamp = int(ts) // 60 * 60
+        timeseries = [[float(t), 1] for t in range(end_timestamp - 7200, end_timestamp + 1, 60)]
+        airgap_timestamp = end_timestamp - 1800
+        return [x for x in timeseries if not airgap_timestamp < x[0] < airgap_timestamp + 600]
+
+    @patch.object(algorithms, 'IDENTIFY_AIRGAPS', True)
+    @patch.object(algorithms, 'time')
+    def test_identify_airgaps(self, timeMock):
+        timeMock.return_value = time()
+        timeseries = self.airgapped_data(timeMock.return_value)
+        airgaps, unordered_timeseries = algorithms.identify_airgaps(
+            'metrics.test.metric', timeseries, [], [])
+        airgap_timestamp = int(timeMock.return_value) // 60 * 60 - 1800
+        self.assertEqual(
+            airgaps, [['test.metric', 60, airgap_timestamp + 1, airgap_timestamp + 599, 0]])
+        self.assertFalse(unordered_timeseries)
+        # Known air gaps are not identified again
+        airgaps, unordered_timeseries = algorithms.identify_airgaps(
+            'metrics.test.metric', timeseries, [str(airgaps[0])], [])
+        self.assertEqual(airgaps, [])
+
+    @patch.object(algorithms, 'IDENTIFY_AIRGAPS', True)
+    @patch.object(algorithms, 'time')
+    def test_identify_airgaps_unordered_timeseries(self, timeMock):
+        timeMock.return_value = time()
+        timeseries = self.airgapped_data(timeMock.return_value)
+        timeseries[-2], timeseries[-3] = timeseries[-3], timeseries[-2]
+        airgaps, unordered_timeseries = algorithms.identify_airgaps(
+            'metrics.test.metric', timeseries, [], [])
+        self.assertTrue(unordered_timeseries)
+
+    def test_determine_airgap_resolution(self):
+        self.assertEqual(algorithms.determine_airgap_resolution(np.array([60, 60, 10, 60])), 60)
+        # As per Counter.most_common the first of equally common resolutions
+        self.assertEqual(algorithms.determine_airgap_resolution(np.array([10, 60, 60, 10])), 10)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,139 @@
+import unittest2 as unittest
+from mock import patch
+import os.path
+import sys
+import shutil
+import tempfile
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.join(os.path.dirname(os.path.realpath(current_dir)))
+skyline_dir = parent_dir + '/skyline'
+sys.path.append(skyline_dir)
+
+import anomalies_snapshot
+
+
+class TestAnomaliesSnapshot(unittest.TestCase):
+    """
+    Test the anomalies snapshot versions, ETags and deltas
+    """
+
+    def setUp(self):
+        self.dump_dir = tempfile.mkdtemp()
+        self.anomaly_dump = os.path.join(self.dump_dir, 'anomalies.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dump_dir)
+
+    def anomalies(self, *metrics):
+        return [[1.0, metric, 1600000000] for metric in metrics]
+
+    def test_snapshots_dir(self):
+        self.assertEqual(
+            anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer'),
+            os.path.join(self.dump_dir, 'anomalies.analyzer.snapshots'))
+        self.assertNotEqual(
+            anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer'),
+            anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'boundary'))
+
+    def test_anomalies_etag(self):
+        etag = anomalies_snapshot.anomalies_etag('[[1.0, "a", 1600000000]]')
+        self.assertEqual(len(etag), 40)
+        self.assertEqual(etag, anomalies_snapshot.anomalies_etag('[[1.0, "a", 1600000000]]'))
+        self.assertNotEqual(etag, anomalies_snapshot.anomalies_etag('[[1.0, "b", 1600000000]]'))
+
+    def test_write_anomalies_snapshot_versions(self):
+        version, etag = anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a'), 'analyzer')
+        self.assertEqual(version, 1)
+        with open(self.anomaly_dump) as f:
+            self.assertEqual(f.read(), 'handle_data(%s)' % self.anomalies('a'))
+
+        # The same anomalies do not publish a new version
+        self.assertEqual(
+            anomalies_snapshot.write_anomalies_snapshot(
+                self.anomaly_dump, self.anomalies('a'), 'analyzer'),
+            (1, etag))
+
+        version, new_etag = anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a', 'b'), 'analyzer')
+        self.assertEqual(version, 2)
+        self.assertNotEqual(new_etag, etag)
+
+        snapshot_dir = anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer')
+        self.assertEqual(anomalies_snapshot.snapshot_versions(snapshot_dir), [1, 2])
+        snapshot, gzipped_snapshot = anomalies_snapshot.read_snapshot(snapshot_dir, 2)
+        self.assertEqual(snapshot['version'], 2)
+        self.assertEqual(snapshot['etag'], new_etag)
+        self.assertEqual(snapshot['anomalies'], self.anomalies('a', 'b'))
+        self.assertEqual(anomalies_snapshot.read_snapshot(snapshot_dir, 3), (None, None))
+
+    def test_write_anomalies_snapshot_apps(self):
+        anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a'), 'analyzer')
+        anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('b'), 'boundary')
+        # Another app publishing different anomalies does not change the
+        # version or ETag of an app
+        version, etag = anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a'), 'analyzer')
+        self.assertEqual(version, 1)
+        self.assertEqual(version, anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('b'), 'boundary')[0])
+
+    def test_write_anomalies_snapshot_version_published_by_another_process(self):
+        anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a'), 'analyzer')
+        snapshot_dir = anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer')
+        publish_snapshot_file = anomalies_snapshot.publish_snapshot_file
+
+        def publish_after_another_process(tmp_snapshot_file, new_snapshot_file):
+            # Another process publishes the version first
+            if not os.path.isfile(anomalies_snapshot.snapshot_file(snapshot_dir, 2)):
+                shutil.copy(
+                    anomalies_snapshot.snapshot_file(snapshot_dir, 1),
+                    anomalies_snapshot.snapshot_file(snapshot_dir, 2))
+            return publish_snapshot_file(tmp_snapshot_file, new_snapshot_file)
+
+        with patch.object(anomalies_snapshot, 'publish_snapshot_file', side_effect=publish_after_another_process):
+            version, etag = anomalies_snapshot.write_anomalies_snapshot(
+                self.anomaly_dump, self.anomalies('a', 'b'), 'analyzer')
+        self.assertEqual(version, 3)
+        self.assertEqual(anomalies_snapshot.read_snapshot(snapshot_dir, 3)[0]['etag'], etag)
+        # The version published by the other process is not overwritten
+        self.assertEqual(
+            anomalies_snapshot.read_snapshot(snapshot_dir, 2)[0]['anomalies'],
+            self.anomalies('a'))
+        self.assertEqual(
+            [f for f in os.listdir(snapshot_dir) if f.endswith('.tmp')], [])
+
+    @patch.object(anomalies_snapshot, 'SNAPSHOT_HISTORY', 3)
+    def test_write_anomalies_snapshot_history(self):
+        for metric in ['a', 'b', 'c', 'd', 'e']:
+            anomalies_snapshot.write_anomalies_snapshot(
+                self.anomaly_dump, self.anomalies(metric), 'analyzer')
+        snapshot_dir = anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer')
+        self.assertEqual(anomalies_snapshot.snapshot_versions(snapshot_dir), [3, 4, 5])
+
+    def test_anomalies_delta(self):
+        anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('a', 'b'), 'analyzer')
+        anomalies_snapshot.write_anomalies_snapshot(
+            self.anomaly_dump, self.anomalies('b', 'c'), 'analyzer')
+        snapshot_dir = anomalies_snapshot.snapshots_dir(self.anomaly_dump, 'analyzer')
+        since_snapshot = anomalies_snapshot.read_snapshot(snapshot_dir, 1)[0]
+        snapshot = anomalies_snapshot.read_snapshot(snapshot_dir, 2)[0]
+        delta = anomalies_snapshot.anomalies_delta(snapshot, since_snapshot)
+        self.assertEqual(delta['version'], 2)
+        self.assertEqual(delta['etag'], snapshot['etag'])
+        self.assertEqual(delta['since'], 1)
+        self.assertEqual(delta['added'], self.anomalies('c'))
+        self.assertEqual(delta['removed'], self.anomalies('a'))
+
+        delta = anomalies_snapshot.anomalies_delta(snapshot, snapshot)
+        self.assertEqual(delta['added'], [])
+        self.assertEqual(delta['removed'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
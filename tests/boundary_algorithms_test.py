@@ -0,0 +1,183 @@
+import unittest2 as unittest
+from mock import patch
+from time import time
+import os.path
+import sys
+import random
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.join(os.path.dirname(os.path.realpath(current_dir)))
+skyline_dir = parent_dir + '/skyline'
+sys.path.append(skyline_dir)
+
+from boundary import boundary_algorithms
+
+
+def list_autoaggregate_ts(timeseries, autoaggregate_value):
+    """
+    The list based autoaggregate_ts that the vectorised autoaggregate_ts
+    replaced, to test parity against.
+    """
+    aggregated_timeseries = []
+    int_end_timestamp = int(timeseries[-1][0])
+    last_timestamp = int_end_timestamp
+    next_timestamp = last_timestamp - int(autoaggregate_value)
+    start_timestamp = int_end_timestamp - 3600
+    while int(next_timestamp) > int(start_timestamp):
+        value = np.sum(np.array([int(x[1]) for x in timeseries if x[0] <= last_timestamp and x[0] > next_timestamp]))
+        aggregated_timeseries += ((last_timestamp, value),)
+        last_timestamp = next_timestamp
+        next_timestamp = last_timestamp - autoaggregate_value
+    aggregated_timeseries.reverse()
+    return aggregated_timeseries
+
+
+def list_detect_drop_off_cliff(timeseries, metric_min_average, metric_min_average_seconds):
+    """
+    The list based detect_drop_off_cliff that the vectorised
+    detect_drop_off_cliff replaced, to test parity against.
+    """
+    if len(timeseries) < 30:
+        return False
+    int_end_timestamp = int(timeseries[-1][0])
+    resolution = int_end_timestamp - int(timeseries[-2][0])
+    ten_datapoints_ago = int_end_timestamp - (resolution * 10)
+    ten_datapoint_array = np.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > ten_datapoints_ago])
+    ten_datapoint_array_len = len(ten_datapoint_array)
+    if ten_datapoint_array_len > 3:
+        ten_datapoint_min_value = np.amin(ten_datapoint_array)
+        if ten_datapoint_min_value < 0:
+            return False
+        ten_datapoint_max_value = np.amax(ten_datapoint_array)
+        if ten_datapoint_max_value == 0:
+            return False
+        if ten_datapoint_min_value == ten_datapoint_max_value:
+            return False
+        ten_datapoint_array_sum = np.sum(ten_datapoint_array)
+        ten_datapoint_average = ten_datapoint_array_sum / ten_datapoint_array_len
+        ten_datapoint_value = int(ten_datapoint_array[-1])
+        if len(np.where(ten_datapoint_array <= ten_datapoint_min_value)) > 2:
+            return False
+        twenty_datapoints_ago = int_end_timestamp - (resolution * 20)
+        twenty_datapoint_array = np.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > twenty_datapoints_ago])
+        if len(np.where(twenty_datapoint_array <= ten_datapoint_min_value)) > 2:
+            return False
+        if metric_min_average > 0 and metric_min_average_seconds > 0:
+            min_average_datapoints_ago = int_end_timestamp - metric_min_average_seconds
+            min_average_array = np.array([x[1] for x in timeseries if x[0] <= int_end_timestamp and x[0] > min_average_datapoints_ago])
+            if np.sum(min_average_array) / len(min_average_array) < metric_min_average:
+                return False
+        if ten_datapoint_max_value < 101:
+            trigger = 15
+        if ten_datapoint_max_value < 20:
+            trigger = ten_datapoint_average / 2
+        if ten_datapoint_max_value > 100:
+            trigger = 100
+        if ten_datapoint_value == 0:
+            ten_datapoint_value = 0.1
+        if ten_datapoint_value == 1:
+            trigger = 1
+        if ten_datapoint_value == 1 and ten_datapoint_max_value < 10:
+            trigger = 0.1
+        if ten_datapoint_value == 0.1 and ten_datapoint_average < 1 and ten_datapoint_array_sum < 7:
+            trigger = 7
+        if int(ten_datapoint_average / ten_datapoint_value) > trigger:
+            return True
+    return False
+
+
+class TestBoundaryAlgorithms(unittest.TestCase):
+    """
+    Test the vectorised Boundary algorithms for parity with the list based
+    algorithms
+    """
+
+    def data(self, ts, resolution=60, length=1440, seed=1):
+        """
+        A noisy high rate timeseries
+        """
+        random.seed(seed)
+        end_timestamp = int(ts) // resolution * resolution
+        return [
+            [float(end_timestamp - (length - n) * resolution), float(random.randint(900, 1100))]
+            for n in range(1, length + 1)]
+
+    def cliff_data(self, ts, last_value, seed=1):
+        timeseries = self.data(ts, seed=seed)
+        timeseries[-1][1] = float(last_value)
+        return timeseries
+
+    def test_timeseries_to_array(self):
+        timeseries = self.data(time())
+        timeseries_array = boundary_algorithms.timeseries_to_array(timeseries)
+        self.assertEqual(timeseries_array.shape, (len(timeseries), 2))
+        self.assertEqual(timeseries_array[-1].tolist(), timeseries[-1])
+        self.assertIs(boundary_algorithms.timeseries_to_array(timeseries_array), timeseries_array)
+        self.assertEqual(boundary_algorithms.timeseries_to_array([]).shape, (0, 2))
+
+    def test_autoaggregate_ts_parity(self):
+        for resolution in [10, 60]:
+            for autoaggregate_value in [60, 300, 600, 900]:
+                timeseries = self.data(time(), resolution=resolution, length=1000)
+                expected = list_autoaggregate_ts(timeseries, autoaggregate_value)
+                aggregated = boundary_algorithms.autoaggregate_ts(timeseries, autoaggregate_value)
+                self.assertEqual(
+                    [[float(t), float(v)] for t, v in expected],
+                    aggregated.tolist())
+
+    def test_autoaggregate_ts_unsorted_parity(self):
+        timeseries = self.data(time(), resolution=10, length=1000)
+        shuffled_timeseries = list(timeseries[:-1])
+        random.shuffle(shuffled_timeseries)
+        shuffled_timeseries.append(timeseries[-1])
+        expected = list_autoaggregate_ts(shuffled_timeseries, 300)
+        aggregated = boundary_algorithms.autoaggregate_ts(shuffled_timeseries, 300)
+        self.assertEqual(
+            [[float(t), float(v)] for t, v in expected], aggregated.tolist())
+
+    def test_detect_drop_off_cliff_parity(self):
+        for seed in range(10):
+            for last_value in [0, 1, 5, 9, 100, 500, 1000]:
+                for min_average, min_average_seconds in [(0, 0), (500, 1200), (2000, 1200)]:
+                    timeseries = self.cliff_data(time(), last_value, seed=seed)
+                    expected = list_detect_drop_off_cliff(timeseries, min_average, min_average_seconds)
+                    result = boundary_algorithms.detect_drop_off_cliff(
+                        boundary_algorithms.timeseries_to_array(timeseries),
+                        'test.metric', 3600, min_average, min_average_seconds, 0)
+                    self.assertEqual(bool(expected), bool(result))
+
+    def test_detect_drop_off_cliff(self):
+        timeseries = self.cliff_data(time(), 1)
+        self.assertTrue(boundary_algorithms.detect_drop_off_cliff(
+            boundary_algorithms.timeseries_to_array(timeseries),
+            'test.metric', 3600, 0, 0, 0))
+        timeseries = self.cliff_data(time(), 1000)
+        self.assertFalse(boundary_algorithms.detect_drop_off_cliff(
+            boundary_algorithms.timeseries_to_array(timeseries),
+            'test.metric', 3600, 0, 0, 0))
+
+    @patch.object(boundary_algorithms, 'time')
+    def test_run_selected_algorithm(self, timeMock):
+        ts = time()
+        timeMock.return_value = ts
+        timeseries = self.cliff_data(ts, 1)
+        timeseries_array = boundary_algorithms.timeseries_to_array(timeseries)
+        for algorithm, metric_trigger, expected in [
+                ('detect_drop_off_cliff', 0, True),
+                ('less_than', 5, True), ('less_than', 1, False),
+                ('greater_than', 0, True), ('greater_than', 1, False)]:
+            result = boundary_algorithms.run_selected_algorithm(
+                timeseries, 'test.metric', 3600, 0, 0, metric_trigger, 1,
+                'smtp', False, 0, algorithm, timeseries_array=timeseries_array)
+            self.assertEqual(result[0], expected)
+            self.assertEqual(result[2], 1.0)
+            # The timeseries_array is converted if it is not passed
+            self.assertEqual(result[:3], boundary_algorithms.run_selected_algorithm(
+                timeseries, 'test.metric', 3600, 0, 0, metric_trigger, 1,
+                'smtp', False, 0, algorithm)[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest2 as unittest
+import os.path
+import sys
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.join(os.path.dirname(os.path.realpath(current_dir)))
+skyline_dir = parent_dir + '/skyline'
+sys.path.append(skyline_dir)
+
+from boundary.boundary_low_latency import TailWindows
+
+
+class TestTailWindows(unittest.TestCase):
+    """
+    Test the Boundary low latency TailWindows
+    """
+
+    def data(self, end_timestamp=1600000000, resolution=60, length=100):
+        return [
+            [end_timestamp - (length - n) * resolution, float(n)]
+            for n in range(1, length + 1)]
+
+    def test_seed_trims_to_window(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=5)
+        timeseries = self.data()
+        tail_windows.seed('test.metric', timeseries)
+        self.assertTrue(tail_windows.has('test.metric'))
+        window_timeseries = tail_windows.timeseries('test.metric')
+        # 600 seconds of 60 second datapoints plus the last datapoint
+        self.assertEqual(len(window_timeseries), 11)
+        self.assertEqual(window_timeseries[-1], (float(timeseries[-1][0]), timeseries[-1][1]))
+        self.assertEqual(window_timeseries[0][0], float(timeseries[-1][0] - 600))
+
+    def test_trim_keeps_min_datapoints(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=30)
+        timeseries = self.data()
+        tail_windows.seed('test.metric', timeseries)
+        self.assertEqual(len(tail_windows.timeseries('test.metric')), 30)
+        # A datapoint well beyond the window still keeps min_datapoints
+        tail_windows.append('test.metric', timeseries[-1][0] + 86400, 1.0)
+        window_timeseries = tail_windows.timeseries('test.metric')
+        self.assertEqual(len(window_timeseries), 30)
+        self.assertEqual(window_timeseries[-1], (float(timeseries[-1][0] + 86400), 1.0))
+
+    def test_append(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=5)
+        timeseries = self.data()
+        tail_windows.seed('test.metric', timeseries)
+        self.assertTrue(tail_windows.append('test.metric', timeseries[-1][0] + 60, 1000.0))
+        window_timeseries = tail_windows.timeseries('test.metric')
+        self.assertEqual(len(window_timeseries), 11)
+        self.assertEqual(window_timeseries[-1], (float(timeseries[-1][0] + 60), 1000.0))
+
+    def test_append_rejects_out_of_order(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=5)
+        timeseries = self.data()
+        tail_windows.seed('test.metric', timeseries)
+        before = tail_windows.timeseries('test.metric')
+        self.assertFalse(tail_windows.append('test.metric', timeseries[-1][0] - 30, 1000.0))
+        self.assertEqual(tail_windows.timeseries('test.metric'), before)
+
+    def test_append_same_timestamp_replaces(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=5)
+        timeseries = self.data()
+        tail_windows.seed('test.metric', timeseries)
+        before = tail_windows.timeseries('test.metric')
+        self.assertTrue(tail_windows.append('test.metric', timeseries[-1][0], 1000.0))
+        window_timeseries = tail_windows.timeseries('test.metric')
+        self.assertEqual(len(window_timeseries), len(before))
+        self.assertEqual(window_timeseries[:-1], before[:-1])
+        self.assertEqual(window_timeseries[-1], (float(timeseries[-1][0]), 1000.0))
+
+    def test_prune(self):
+        tail_windows = TailWindows(window_seconds=600, min_datapoints=5)
+        tail_windows.seed('test.metric', self.data())
+        tail_windows.append('other.metric', 1600000000, 1.0)
+        tail_windows.prune(['other.metric'])
+        self.assertFalse(tail_windows.has('test.metric'))
+        self.assertTrue(tail_windows.has('other.metric'))
+        self.assertEqual(tail_windows.timeseries('test.metric'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
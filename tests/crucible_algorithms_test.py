@@ -0,0 +1,77 @@
+import unittest2 as unittest
+from mock import patch
+import os.path
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.join(os.path.dirname(os.path.realpath(current_dir)))
+skyline_dir = parent_dir + '/skyline'
+sys.path.append(skyline_dir)
+sys.path.append(skyline_dir + '/crucible')
+
+import crucible_algorithms
+
+
+class TestCrucibleSweepAlgorithms(unittest.TestCase):
+    """
+    Test that the Crucible sweep mode algorithms return the same results as
+    running the algorithms on each prefix of the time series
+    """
+
+    default_range = 10
+
+    def data(self, datapoints=500, resolution=60):
+        """
+        A noisy daily seasonal time series with a few spikes and a drop off a
+        cliff.
+        """
+        np.random.seed(20261019)
+        timestamps = 1600000000 + (np.arange(datapoints) * resolution)
+        values = 1000 + (200 * np.sin(np.arange(datapoints) * ((2 * np.pi * resolution) / 86400)))
+        values = values + np.random.normal(0, 20, datapoints)
+        spikes = np.random.randint(int(datapoints * 0.2), datapoints, 10)
+        values[spikes] = values[spikes] * 3
+        values[int(datapoints * 0.9):int(datapoints * 0.9) + 20] = 5
+        return [[int(ts), float(value)] for ts, value in zip(timestamps, values)]
+
+    def prefix_anomalies(self, algorithm, timeseries):
+        algorithm_function = getattr(crucible_algorithms, algorithm)
+        # scipy.array was removed in later scipy versions
+        with patch.object(crucible_algorithms.scipy, 'array', np.array, create=True):
+            return [
+                index for index in range(self.default_range, len(timeseries))
+                if algorithm_function(timeseries[:index], None, None)]
+
+    def test_sweep_algorithms_parity(self):
+        for timeseries in [self.data(), self.data(datapoints=300, resolution=600)]:
+            stats = crucible_algorithms.sweep_stats(timeseries)
+            self.assertIsNotNone(stats)
+            for algorithm in crucible_algorithms.SWEEP_ALGORITHMS:
+                self.assertEqual(
+                    crucible_algorithms.sweep_algorithm(algorithm, stats, self.default_range),
+                    self.prefix_anomalies(algorithm, timeseries),
+                    msg='%s sweep results differ' % algorithm)
+
+    def test_sweep_algorithm_without_sweep_function(self):
+        stats = crucible_algorithms.sweep_stats(self.data())
+        self.assertIsNone(crucible_algorithms.sweep_algorithm('no_such_algorithm', stats, self.default_range))
+
+    def test_sweep_stats_unsweepable(self):
+        timeseries = self.data(datapoints=200)
+        self.assertIsNone(crucible_algorithms.sweep_stats(timeseries[:1]))
+        unsorted_timeseries = list(timeseries)
+        unsorted_timeseries[50], unsorted_timeseries[51] = unsorted_timeseries[51], unsorted_timeseries[50]
+        self.assertIsNone(crucible_algorithms.sweep_stats(unsorted_timeseries))
+        duplicate_timeseries = list(timeseries)
+        duplicate_timeseries[51] = [timeseries[50][0], timeseries[51][1]]
+        self.assertIsNone(crucible_algorithms.sweep_stats(duplicate_timeseries))
+        for value in [float('nan'), float('inf'), None]:
+            non_finite_timeseries = list(timeseries)
+            non_finite_timeseries[50] = [timeseries[50][0], value]
+            self.assertIsNone(crucible_algorithms.sweep_stats(non_finite_timeseries))
+
+
+if __name__ == '__main__':
+    unittest.main()
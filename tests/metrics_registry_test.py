@@ -0,0 +1,137 @@
+import unittest2 as unittest
+import os.path
+import sys
+import random
+from math import ceil
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+parent_dir = os.path.join(os.path.dirname(os.path.realpath(current_dir)))
+skyline_dir = parent_dir + '/skyline'
+sys.path.append(skyline_dir)
+
+import metrics_registry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """
+    Test the metrics registry histograms, snapshots and Graphite metrics
+    """
+
+    # The relative error of a histogram value
+    relative_error = 1.0 / 2 ** (metrics_registry.HISTOGRAM_SIGNIFICANT_BITS - 1)
+
+    def latencies(self, length=10000, seed=1):
+        random.seed(seed)
+        return [random.lognormvariate(-6, 1.5) for n in range(length)]
+
+    def exact_percentile(self, values, percentile):
+        """
+        The nearest rank percentile of the values
+        """
+        return sorted(values)[max(int(ceil(len(values) * percentile / 100.0)), 1) - 1]
+
+    def test_histogram_bucket_round_trip(self):
+        # Values smaller than 2 ** HISTOGRAM_SIGNIFICANT_BITS have a bucket
+        # each
+        for value in range(2 ** metrics_registry.HISTOGRAM_SIGNIFICANT_BITS):
+            bucket = metrics_registry.histogram_bucket(value)
+            self.assertEqual(metrics_registry.histogram_bucket_value(bucket), value)
+        last_bucket = 0
+        for value in [1, 63, 64, 65, 127, 128, 1000, 123456, 10 ** 7, 10 ** 9]:
+            bucket = metrics_registry.histogram_bucket(value)
+            self.assertGreaterEqual(bucket, last_bucket)
+            last_bucket = bucket
+            bucket_value = metrics_registry.histogram_bucket_value(bucket)
+            self.assertLessEqual(abs(bucket_value - value) / value, self.relative_error)
+        for value in self.latencies():
+            microseconds = int(value * 1000000)
+            if not microseconds:
+                continue
+            bucket_value = metrics_registry.histogram_bucket_value(
+                metrics_registry.histogram_bucket(microseconds))
+            self.assertLessEqual(abs(bucket_value - microseconds) / microseconds, self.relative_error)
+
+    def test_percentile(self):
+        histogram = metrics_registry.LatencyHistogram()
+        self.assertEqual(histogram.percentile(95), 0.0)
+        latencies = self.latencies()
+        for seconds in latencies:
+            histogram.record(seconds)
+        self.assertEqual(histogram.count, len(latencies))
+        self.assertAlmostEqual(histogram.total, sum(latencies))
+        self.assertEqual(histogram.max, max(latencies))
+        for percentile in metrics_registry.HISTOGRAM_PERCENTILES:
+            expected = self.exact_percentile(latencies, percentile)
+            self.assertLessEqual(
+                abs(histogram.percentile(percentile) - expected) / expected,
+                self.relative_error)
+        self.assertLessEqual(histogram.percentile(100), max(latencies))
+        self.assertLessEqual(
+            abs(histogram.percentile(100) - max(latencies)) / max(latencies),
+            self.relative_error)
+
+    def test_merged_percentiles(self):
+        latencies = self.latencies()
+        registries = [metrics_registry.MetricsRegistry() for n in range(4)]
+        all_registry = metrics_registry.MetricsRegistry()
+        for index, seconds in enumerate(latencies):
+            registries[index % 4].record('algorithm', seconds)
+            all_registry.record('algorithm', seconds)
+        merged_registry = metrics_registry.MetricsRegistry()
+        for registry in registries:
+            merged_registry.merge(registry.snapshot())
+        merged_histogram = merged_registry.histograms['algorithm']
+        all_histogram = all_registry.histograms['algorithm']
+        self.assertEqual(merged_histogram.counts, all_histogram.counts)
+        self.assertEqual(merged_histogram.count, len(latencies))
+        self.assertAlmostEqual(merged_histogram.total, sum(latencies))
+        self.assertEqual(merged_histogram.max, max(latencies))
+        for percentile in metrics_registry.HISTOGRAM_PERCENTILES:
+            expected = self.exact_percentile(latencies, percentile)
+            self.assertEqual(merged_histogram.percentile(percentile), all_histogram.percentile(percentile))
+            self.assertLessEqual(
+                abs(merged_histogram.percentile(percentile) - expected) / expected,
+                self.relative_error)
+
+    def test_merge_counters_and_errors(self):
+        registry = metrics_registry.MetricsRegistry()
+        registry.increment('checked')
+        registry.record_error('algorithm', 'first error')
+        other_registry = metrics_registry.MetricsRegistry()
+        other_registry.increment('checked', 2)
+        other_registry.record_error('algorithm', 'second error')
+        other_registry.record_error('algorithm', 'third error')
+        registry.merge(other_registry.snapshot())
+        self.assertEqual(registry.counters['checked'], 3)
+        self.assertEqual(registry.errors['algorithm'], (3, 'third error'))
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {'counters': {}, 'histograms': {}, 'errors': {}})
+
+    def test_timer(self):
+        registry = metrics_registry.MetricsRegistry()
+        with registry.timer('block'):
+            pass
+        self.assertEqual(registry.histograms['block'].count, 1)
+
+    def test_graphite_metrics(self):
+        registry = metrics_registry.MetricsRegistry()
+        registry.increment('checked', 5)
+        registry.record('algorithm', 0.5)
+        registry.record('algorithm', 1.5)
+        registry.histograms['empty'] = metrics_registry.LatencyHistogram()
+        metrics = registry.graphite_metrics()
+        self.assertEqual([name for name, value in metrics], [
+            'checked', 'algorithm.times_run', 'algorithm.total_time',
+            'algorithm.median_time', 'algorithm.p95_time', 'algorithm.p99_time',
+            'algorithm.max_time'])
+        metrics = dict(metrics)
+        self.assertEqual(metrics['checked'], 5)
+        self.assertEqual(metrics['algorithm.times_run'], 2)
+        self.assertEqual(metrics['algorithm.total_time'], 2.0)
+        self.assertEqual(metrics['algorithm.max_time'], 1.5)
+        self.assertLessEqual(abs(metrics['algorithm.median_time'] - 0.5) / 0.5, self.relative_error)
+        self.assertLessEqual(abs(metrics['algorithm.p99_time'] - 1.5) / 1.5, self.relative_error)
+
+
+if __name__ == '__main__':
+    unittest.main()
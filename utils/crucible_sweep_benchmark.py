@@ -0,0 +1,96 @@
+"""
+Benchmark the crucible sweep mode against running each algorithm on every
+prefix of the time series, as crucible run_algorithms did.
+
+Run from the Skyline root directory with the Skyline settings available, e.g.
+
+python utils/crucible_sweep_benchmark.py -n 10000
+
+Reports the seconds taken by each method for each algorithm and whether the
+anomalous data points are the same.
+"""
+from __future__ import division
+from optparse import OptionParser
+import os
+import sys
+from time import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'skyline'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'skyline', 'crucible'))
+
+if True:
+    import crucible_algorithms
+
+parser = OptionParser()
+parser.add_option("-n", "--datapoints", dest="datapoints", default=10000, type='int',
+                  help="The number of data points in the time series (default is 10000)")
+parser.add_option("-r", "--resolution", dest="resolution", default=60, type='int',
+                  help="The resolution of the time series in seconds (default is 60)")
+parser.add_option("-a", "--algorithms", dest="algorithms", default='',
+                  help="A comma separated list of algorithms to benchmark (default is all)")
+parser.add_option("-s", "--skip-prefix", dest="skip_prefix", action='store_true', default=False,
+                  help="Only time the sweep mode")
+
+(options, args) = parser.parse_args()
+
+
+def generate_timeseries(datapoints, resolution):
+    """
+    A noisy daily seasonal time series with a few spikes and a drop off a cliff.
+    """
+    np.random.seed(20261019)
+    timestamps = 1600000000 + (np.arange(datapoints) * resolution)
+    values = 1000 + (200 * np.sin(np.arange(datapoints) * ((2 * np.pi * resolution) / 86400)))
+    values = values + np.random.normal(0, 20, datapoints)
+    spikes = np.random.randint(100, datapoints, 10)
+    values[spikes] = values[spikes] * 3
+    values[int(datapoints * 0.9):int(datapoints * 0.9) + 20] = 5
+    return [[int(ts), float(value)] for ts, value in zip(timestamps, values)]
+
+
+def report(algorithm, prefix_seconds, sweep_seconds, prefix_anomalies, sweep_anomalies):
+    if prefix_seconds is None:
+        print('%s: sweep %.3f seconds, %s anomalies' % (
+            algorithm, sweep_seconds, str(len(sweep_anomalies))))
+        return
+    print('%s: prefix %.3f seconds, sweep %.3f seconds, %.1fx, %s anomalies, parity %s' % (
+        algorithm, prefix_seconds, sweep_seconds,
+        (prefix_seconds / max(sweep_seconds, 0.000001)),
+        str(len(sweep_anomalies)), str(prefix_anomalies == sweep_anomalies)))
+
+
+if __name__ == '__main__':
+    timeseries = generate_timeseries(options.datapoints, options.resolution)
+    if options.algorithms:
+        algorithms = options.algorithms.split(',')
+    else:
+        algorithms = list(crucible_algorithms.SWEEP_ALGORITHMS.keys())
+    start_index = 10
+    start = time()
+    stats = crucible_algorithms.sweep_stats(timeseries)
+    print('sweep_stats: %.3f seconds' % (time() - start))
+    prefix_total = 0
+    sweep_total = 0
+    for algorithm in algorithms:
+        prefix_seconds = None
+        prefix_anomalies = None
+        if not options.skip_prefix:
+            start = time()
+            algorithm_function = getattr(crucible_algorithms, algorithm)
+            prefix_anomalies = []
+            for index in range(start_index, len(timeseries)):
+                if algorithm_function(timeseries[:index], None, None):
+                    prefix_anomalies.append(index)
+            prefix_seconds = time() - start
+            prefix_total += prefix_seconds
+        start = time()
+        sweep_anomalies = crucible_algorithms.sweep_algorithm(algorithm, stats, start_index)
+        sweep_seconds = time() - start
+        sweep_total += sweep_seconds
+        report(algorithm, prefix_seconds, sweep_seconds, prefix_anomalies, sweep_anomalies)
+    if options.skip_prefix:
+        print('total: sweep %.3f seconds' % sweep_total)
+    else:
+        print('total: prefix %.3f seconds, sweep %.3f seconds' % (prefix_total, sweep_total))
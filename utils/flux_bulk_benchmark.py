@@ -0,0 +1,79 @@
+"""
+Benchmark the flux /metric_data_bulk endpoint against the per data point
+/metric_data GET endpoint.
+
+Run against a running flux instance, directly or via the reverse proxy, e.g.
+
+python utils/flux_bulk_benchmark.py -u http://127.0.0.1:8000 -k YOURown32charSkylineAPIkeySecret -n 1000 -b 5000
+
+Reports requests/sec and datapoints/sec for each method.  Note that the data
+points are submitted with fill=true so that they are not discarded as too old
+or as duplicates by the flux worker, therefore use a test metric namespace.
+"""
+from __future__ import division
+import json
+from optparse import OptionParser
+from time import time
+
+import msgpack
+import requests
+
+parser = OptionParser()
+parser.add_option("-u", "--url", dest="url", default='http://127.0.0.1:8000',
+                  help="The flux URL (default is http://127.0.0.1:8000)")
+parser.add_option("-k", "--key", dest="key", default='YOURown32charSkylineAPIkeySecret',
+                  help="The flux API key")
+parser.add_option("-m", "--metric", dest="metric", default='skyline.benchmark.flux.bulk',
+                  help="The metric namespace prefix to submit (default is skyline.benchmark.flux.bulk)")
+parser.add_option("-n", "--requests", dest="requests", default=1000, type='int',
+                  help="The number of GET requests to make (default is 1000)")
+parser.add_option("-b", "--batch-size", dest="batch_size", default=5000, type='int',
+                  help="The number of data points per bulk request (default is 5000)")
+parser.add_option("-r", "--bulk-requests", dest="bulk_requests", default=20, type='int',
+                  help="The number of bulk requests to make (default is 20)")
+
+(options, args) = parser.parse_args()
+
+
+def datapoints(count):
+    now = int(time())
+    return [['%s.%s' % (options.metric, str(i % 100)), now - (count - i), float(i)] for i in range(count)]
+
+
+def report(method, elapsed, request_count, datapoint_count):
+    print('%s: %s requests, %s datapoints in %.3f seconds - %.1f requests/sec, %.1f datapoints/sec' % (
+        method, str(request_count), str(datapoint_count), elapsed,
+        (request_count / elapsed), (datapoint_count / elapsed)))
+
+
+def benchmark_get(session):
+    data = datapoints(options.requests)
+    start = time()
+    for metric, timestamp, value in data:
+        session.get('%s/metric_data' % options.url, params={
+            'metric': metric, 'timestamp': timestamp, 'value': value,
+            'key': options.key, 'fill': 'true'})
+    report('GET /metric_data', (time() - start), len(data), len(data))
+
+
+def benchmark_bulk(session, content_type):
+    bodies = []
+    for i in range(options.bulk_requests):
+        data = datapoints(options.batch_size)
+        if content_type == 'application/x-msgpack':
+            bodies.append(b''.join([msgpack.packb(item) for item in data]))
+        else:
+            bodies.append('\n'.join([json.dumps(item) for item in data]).encode('utf-8'))
+    headers = {'Content-Type': content_type, 'X-Flux-Key': options.key}
+    start = time()
+    for body in bodies:
+        session.post('%s/metric_data_bulk?fill=true' % options.url, data=body, headers=headers)
+    report('POST /metric_data_bulk %s' % content_type, (time() - start),
+           len(bodies), (len(bodies) * options.batch_size))
+
+
+if __name__ == '__main__':
+    session = requests.Session()
+    benchmark_get(session)
+    benchmark_bulk(session, 'application/x-ndjson')
+    benchmark_bulk(session, 'application/x-msgpack')